@@ -0,0 +1 @@
+"""Benchmarks of the app driven in-process through its ASGI interface."""
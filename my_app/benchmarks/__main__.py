@@ -0,0 +1,242 @@
+"""Command line entry point of the benchmarks.
+
+Run from the `my_app` directory::
+
+    python -m benchmarks                        # compare with baseline.json
+    python -m benchmarks --update-baseline      # store a new baseline
+    python -m benchmarks --backend postgres     # use the configured database
+    python -m benchmarks --only http. --output results.json
+
+The results are printed as a table on stderr and written as JSON. The
+process exits with status 1 when a benchmark is slower than the baseline
+by more than `--threshold` and by at least `--min-delta-ms`; every
+benchmark is timed in `--rounds` rounds and the median round is kept,
+and the baseline is scaled by how much slower this machine ran a fixed
+calibration workload.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from benchmarks.harness import (
+    Report,
+    calibrate,
+    compare,
+    environment,
+    format_table,
+    machine_ratio,
+    measure,
+)
+from benchmarks.suites import (
+    BACKENDS,
+    Dataset,
+    http_cases,
+    overridden_config,
+    serialization_cases,
+    service_cases,
+)
+from manage_free_time.infrastructure import main as app_main
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DATASET_KEYS = ("ideas", "users", "seed")
+
+
+def parse_arguments(argv: list[str]) -> argparse.Namespace:
+    """Parse the command line.
+
+    Args:
+        argv (list[str]): The arguments without the program name.
+
+    Returns:
+        argparse.Namespace: The options.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="memory")
+    parser.add_argument("--ideas", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=3,
+        help="Timed rounds per benchmark; the median of the rounds is kept.",
+    )
+    parser.add_argument(
+        "--only", default="", help="Run benchmarks whose names start with this."
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store the results as the new baseline instead of comparing.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown against the baseline, e.g. 0.25 for 25%%.",
+    )
+    parser.add_argument(
+        "--metric",
+        choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"],
+        default="p50_ms",
+        help="The latency compared with the baseline.",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.5,
+        help="Ignore slowdowns smaller than this many milliseconds.",
+    )
+    return parser.parse_args(argv)
+
+
+async def run(options: argparse.Namespace) -> Report:
+    """Prepare the backend and run the selected benchmarks.
+
+    Args:
+        options (argparse.Namespace): The options.
+
+    Returns:
+        Report: The results.
+    """
+    dataset = Dataset(ideas=options.ideas, users=options.users, seed=options.seed)
+    report = Report(backend=options.backend, results={}, environment=environment())
+    report.environment.update(
+        ideas=str(dataset.ideas),
+        users=str(dataset.users),
+        seed=str(dataset.seed),
+        calibration_ms=f"{calibrate():.3f}",
+    )
+
+    # A single benchmark client would exhaust the limits of every route.
+    with overridden_config(RATE_LIMITS={}):
+        async with BACKENDS[options.backend](dataset) as container:
+            transport = httpx.ASGITransport(app=app_main.app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://benchmark"
+            ) as client:
+                cases = [
+                    *http_cases(client, dataset),
+                    *service_cases(container, dataset),
+                    *await serialization_cases(container),
+                ]
+                for case in cases:
+                    if not case.name.startswith(options.only):
+                        continue
+                    random.seed(options.seed)
+                    report.results[case.name] = await measure(
+                        case.name,
+                        case.operation,
+                        max(1, int(options.iterations * case.scale)),
+                        max(1, int(options.warmup * case.scale)),
+                        options.rounds,
+                    )
+                    print(f"  {case.name}", file=sys.stderr)
+
+    return report
+
+
+def _dataset(report: Report) -> tuple[Optional[str], ...]:
+    """Get the sizes and the seed of the data a report was measured on.
+
+    Args:
+        report (Report): The report.
+
+    Returns:
+        tuple[Optional[str], ...]: The values of `DATASET_KEYS`.
+    """
+    return tuple(report.environment.get(key) for key in DATASET_KEYS)
+
+
+def _describe(report: Report) -> str:
+    """Describe the data a report was measured on.
+
+    Args:
+        report (Report): The report.
+
+    Returns:
+        str: E.g. `ideas=10000 users=1000 seed=42`.
+    """
+    return " ".join(
+        f"{key}={value}" for key, value in zip(DATASET_KEYS, _dataset(report))
+    )
+
+
+def main(argv: list[str]) -> int:
+    """Run the benchmarks and compare them with the baseline.
+
+    Args:
+        argv (list[str]): The arguments without the program name.
+
+    Returns:
+        int: The exit status.
+    """
+    options = parse_arguments(argv)
+    report = asyncio.run(run(options))
+
+    if options.output:
+        options.output.write_text(report.to_json() + "\n")
+    if options.update_baseline:
+        options.baseline.write_text(report.to_json() + "\n")
+        print(format_table(report), file=sys.stderr)
+        return 0
+
+    baseline = None
+    if options.baseline.exists():
+        baseline = Report.load(options.baseline)
+        if baseline.backend != report.backend:
+            print(
+                f"Baseline was taken on the {baseline.backend} backend, "
+                "not comparing.",
+                file=sys.stderr,
+            )
+            baseline = None
+        elif _dataset(baseline) != _dataset(report):
+            print(
+                "Baseline was taken on a different dataset "
+                f"({_describe(baseline)}, not {_describe(report)}), not comparing.",
+                file=sys.stderr,
+            )
+            baseline = None
+
+    print(format_table(report, baseline, options.metric), file=sys.stderr)
+    if baseline is not None:
+        print(
+            f"This machine ran the calibration {machine_ratio(report, baseline):.2f}x"
+            " as long as the baseline one; baseline times are scaled by it.",
+            file=sys.stderr,
+        )
+    if not options.output:
+        print(report.to_json())
+    if baseline is None:
+        return 0
+
+    regressions = compare(
+        report,
+        baseline,
+        options.threshold,
+        options.metric,
+        options.min_delta_ms,
+    )
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.name}: {regression.metric} "
+            f"{regression.baseline:.3f} -> {regression.current:.3f} ms "
+            f"({regression.ratio - 1:+.0%})",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,202 @@
+"""Memory footprint benchmark of the in-memory idea repositories.
+
+Run from the `my_app` directory::
+
+    python -m benchmarks.footprint                      # 10M ideas
+    python -m benchmarks.footprint --ideas 1000000 --sample 100000
+
+The columnar repository is filled with `--ideas` ideas and the repository
+of `Idea` models with `--sample` of them, as holding millions of models
+takes many gigabytes; its footprint is scaled up linearly. The footprint
+is the size of all objects reachable from the repository, so it counts
+the memory the repository keeps alive alone. The process exits with
+status 1 when the columnar repository is less than `--min-ratio` times
+smaller.
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+from types import FunctionType, ModuleType
+from typing import Callable, Iterator
+
+from benchmarks.memory import MemoryIdeaRepository
+from benchmarks.suites import CATEGORIES, TAGS, WORDS
+from manage_free_time.core.domain.idea import Idea
+from manage_free_time.infrastructure.repositories.ideacolumnar import \
+    ColumnarIdeaRepository
+
+USERS = 100_000
+
+Row = tuple[int, int, str, str, list[str]]
+
+
+def generate_rows(count: int, seed: int) -> Iterator[Row]:
+    """Draw ideas like the other benchmarks do, without building models.
+
+    Args:
+        count (int): The number of ideas.
+        seed (int): The seed of the generator.
+
+    Yields:
+        Row: The id, user id, title, category and tags of an idea.
+    """
+    rng = random.Random(seed)
+    for idea_id in range(1, count + 1):
+        yield (
+            idea_id,
+            rng.randint(1, USERS),
+            " ".join(rng.sample(WORDS, 3)),
+            rng.choice(CATEGORIES),
+            rng.sample(TAGS, 3),
+        )
+
+
+def fill_columnar(rows: Iterator[Row]) -> ColumnarIdeaRepository:
+    """Load ideas into the columnar repository.
+
+    Args:
+        rows (Iterator[Row]): The ideas.
+
+    Returns:
+        ColumnarIdeaRepository: The filled repository.
+    """
+    repository = ColumnarIdeaRepository()
+    repository.load(rows)
+    return repository
+
+
+def fill_models(rows: Iterator[Row]) -> MemoryIdeaRepository:
+    """Store ideas as models, validated like rows read from the database.
+
+    Args:
+        rows (Iterator[Row]): The ideas.
+
+    Returns:
+        MemoryIdeaRepository: The filled repository.
+    """
+    repository = MemoryIdeaRepository()
+    for idea_id, user_id, title, category, tags in rows:
+        repository._store(Idea(
+            id=idea_id,
+            user_id=user_id,
+            title=title,
+            category=category,
+            tags=tags,
+        ))
+    return repository
+
+
+def deep_size(root: object) -> int:
+    """Sum the sizes of all objects reachable from the root.
+
+    Classes, modules and functions are shared by the whole process and
+    are not counted. Buffers of arrays and strings are included in the
+    sizes of their objects.
+
+    Args:
+        root (object): The object.
+
+    Returns:
+        int: The size in bytes.
+    """
+    seen: set[int] = set()
+    pending = [root]
+    total = 0
+    while pending:
+        current = pending.pop()
+        if id(current) in seen or isinstance(
+            current, (type, ModuleType, FunctionType)
+        ):
+            continue
+
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        pending.extend(gc.get_referents(current))
+
+    return total
+
+
+def measure_footprint(
+    fill: Callable[[Iterator[Row]], object],
+    rows: Iterator[Row],
+) -> int:
+    """Fill a new repository and measure the memory it keeps.
+
+    Args:
+        fill (Callable[[Iterator[Row]], object]): Creates and fills the
+            repository.
+        rows (Iterator[Row]): The ideas.
+
+    Returns:
+        int: The size of the repository in bytes.
+    """
+    return deep_size(fill(rows))
+
+
+def parse_arguments(argv: list[str]) -> argparse.Namespace:
+    """Parse the command line.
+
+    Args:
+        argv (list[str]): The arguments without the program name.
+
+    Returns:
+        argparse.Namespace: The options.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.footprint")
+    parser.add_argument("--ideas", type=int, default=10_000_000)
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=500_000,
+        help="Ideas held as models, scaled up to --ideas.",
+    )
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--min-ratio", type=float, default=5.0)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    """Measure both repositories and compare their footprints.
+
+    Args:
+        argv (list[str]): The arguments without the program name.
+
+    Returns:
+        int: The exit status.
+    """
+    options = parse_arguments(argv)
+    sample = min(options.sample, options.ideas)
+
+    columnar = measure_footprint(
+        fill_columnar, generate_rows(options.ideas, options.seed)
+    )
+    models = measure_footprint(fill_models, generate_rows(sample, options.seed))
+
+    columnar_per_idea = columnar / options.ideas
+    models_per_idea = models / sample
+    ratio = models_per_idea / columnar_per_idea
+    print(
+        f"{'repository':<12} {'ideas':>12} {'MiB':>10} {'B/idea':>8}\n"
+        f"{'columnar':<12} {options.ideas:>12} {columnar / 2**20:>10.1f} "
+        f"{columnar_per_idea:>8.1f}\n"
+        f"{'models':<12} {sample:>12} {models / 2**20:>10.1f} "
+        f"{models_per_idea:>8.1f}\n"
+        f"models / columnar: {ratio:.1f}x",
+        file=sys.stderr,
+    )
+    print(json.dumps({
+        "ideas": options.ideas,
+        "columnar_bytes": columnar,
+        "models_sample": sample,
+        "models_bytes": models,
+        "ratio": ratio,
+    }))
+
+    return 0 if ratio >= options.min_ratio else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
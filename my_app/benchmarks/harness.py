@@ -0,0 +1,313 @@
+"""Module containing the measurement and reporting part of the benchmarks."""
+
+import gc
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+Operation = Callable[[], Awaitable[object]]
+
+
+@dataclass
+class Result:
+    """Latency percentiles and throughput of a single benchmark."""
+
+    name: str
+    iterations: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    ops_per_s: float
+
+
+@dataclass
+class Report:
+    """Results of a run together with the conditions they were taken in."""
+
+    backend: str
+    results: dict[str, Result]
+    environment: dict[str, str] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        """Serialize the report.
+
+        Returns:
+            str: The report as indented JSON.
+        """
+        return json.dumps(
+            {
+                "backend": self.backend,
+                "environment": self.environment,
+                "results": {
+                    name: asdict(result) for name, result in self.results.items()
+                },
+            },
+            indent=2,
+            sort_keys=True,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "Report":
+        """Read a report written by `to_json`.
+
+        Args:
+            path (Path): The path to the JSON file.
+
+        Returns:
+            Report: The report.
+        """
+        data = json.loads(path.read_text())
+        return cls(
+            backend=data["backend"],
+            environment=data.get("environment", {}),
+            results={
+                name: Result(**result) for name, result in data["results"].items()
+            },
+        )
+
+
+@dataclass
+class Regression:
+    """A benchmark slower than its baseline by more than the threshold."""
+
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """float: The current value divided by the baseline one."""
+        return self.current / self.baseline if self.baseline else math.inf
+
+
+def environment() -> dict[str, str]:
+    """Describe the interpreter and the machine the benchmarks run on.
+
+    Returns:
+        dict[str, str]: The Python version, implementation and platform.
+    """
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def calibrate(runs: int = 20) -> float:
+    """Time a fixed pure-Python workload to gauge the speed of the machine.
+
+    Reports carry it, so results taken on a slower or busier machine are
+    compared with the baseline scaled by the ratio of the calibrations.
+
+    Args:
+        runs (int): The number of runs, the fastest one is kept.
+
+    Returns:
+        float: The duration of the fastest run in milliseconds.
+    """
+    rng = random.Random(0)
+    values = [rng.random() for _ in range(50_000)]
+    durations = []
+    for _ in range(runs):
+        begin = time.perf_counter_ns()
+        ranked = {value: rank for rank, value in enumerate(sorted(values))}
+        json.dumps([ranked[value] for value in values[:10_000]])
+        durations.append((time.perf_counter_ns() - begin) / 1e6)
+
+    return min(durations)
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Get a percentile of sorted samples with linear interpolation.
+
+    Args:
+        samples (list[float]): The samples in ascending order.
+        fraction (float): The percentile as a fraction, e.g. 0.95.
+
+    Returns:
+        float: The interpolated value.
+    """
+    position = (len(samples) - 1) * fraction
+    lower = math.floor(position)
+    upper = min(lower + 1, len(samples) - 1)
+
+    return samples[lower] + (samples[upper] - samples[lower]) * (position - lower)
+
+
+async def measure(
+    name: str,
+    operation: Operation,
+    iterations: int,
+    warmup: int,
+    rounds: int = 1,
+) -> Result:
+    """Run an operation repeatedly and summarize its latency.
+
+    The garbage collector is collected before and disabled during the
+    timed iterations, so a collection triggered by an earlier benchmark
+    does not land in the samples of a later one. With several rounds
+    every statistic is the median of the rounds, so a single round
+    disturbed by another process does not move the result.
+
+    Args:
+        name (str): The name of the benchmark.
+        operation (Operation): The awaited operation.
+        iterations (int): The number of timed runs per round.
+        warmup (int): The number of untimed runs before them.
+        rounds (int): The number of timed rounds.
+
+    Returns:
+        Result: The latency percentiles and throughput.
+    """
+    for _ in range(warmup):
+        await operation()
+
+    results = [await _round(name, operation, iterations) for _ in range(rounds)]
+    return Result(
+        name=name,
+        iterations=iterations * rounds,
+        **{
+            metric: statistics.median(getattr(result, metric) for result in results)
+            for metric in (
+                "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "ops_per_s"
+            )
+        },
+    )
+
+
+async def _round(name: str, operation: Operation, iterations: int) -> Result:
+    """Time one round of runs of an operation.
+
+    Args:
+        name (str): The name of the benchmark.
+        operation (Operation): The awaited operation.
+        iterations (int): The number of timed runs.
+
+    Returns:
+        Result: The latency percentiles and throughput of the round.
+    """
+    samples = [0.0] * iterations
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for iteration in range(iterations):
+            begin = time.perf_counter_ns()
+            await operation()
+            samples[iteration] = (time.perf_counter_ns() - begin) / 1e6
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+
+    samples.sort()
+    return Result(
+        name=name,
+        iterations=iterations,
+        mean_ms=sum(samples) / iterations,
+        p50_ms=percentile(samples, 0.50),
+        p95_ms=percentile(samples, 0.95),
+        p99_ms=percentile(samples, 0.99),
+        max_ms=samples[-1],
+        ops_per_s=iterations / elapsed,
+    )
+
+
+def compare(
+    current: Report,
+    baseline: Report,
+    threshold: float,
+    metric: str = "p50_ms",
+    min_delta_ms: float = 0.0,
+) -> list[Regression]:
+    """Find benchmarks slower than the baseline beyond the threshold.
+
+    Benchmarks missing in either report are not compared. When both
+    reports were calibrated, the baseline is first scaled by the ratio
+    of the calibrations. A slowdown smaller than `min_delta_ms` is
+    ignored, as operations taking a few microseconds vary by more than
+    any sensible threshold between runs.
+
+    Args:
+        current (Report): The results of this run.
+        baseline (Report): The stored results.
+        threshold (float): The allowed slowdown, e.g. 0.25 for 25%.
+        metric (str): The compared field of `Result`.
+        min_delta_ms (float): The smallest slowdown reported, in ms.
+
+    Returns:
+        list[Regression]: The regressions, the worst first.
+    """
+    scale = machine_ratio(current, baseline)
+    regressions = []
+    for name, result in current.results.items():
+        stored: Optional[Result] = baseline.results.get(name)
+        if stored is None:
+            continue
+
+        before, after = getattr(stored, metric) * scale, getattr(result, metric)
+        if after > before * (1 + threshold) and after - before >= min_delta_ms:
+            regressions.append(Regression(name, metric, before, after))
+
+    return sorted(regressions, key=lambda regression: -regression.ratio)
+
+
+def machine_ratio(current: Report, baseline: Report) -> float:
+    """Get how much slower the machine of a report was than of the baseline.
+
+    Args:
+        current (Report): The results of this run.
+        baseline (Report): The stored results.
+
+    Returns:
+        float: The ratio of the calibrations, 1.0 if either is missing.
+    """
+    ours = current.environment.get("calibration_ms")
+    theirs = baseline.environment.get("calibration_ms")
+    if not ours or not theirs:
+        return 1.0
+
+    return float(ours) / float(theirs)
+
+
+def format_table(
+    current: Report,
+    baseline: Optional[Report] = None,
+    metric: str = "p50_ms",
+) -> str:
+    """Render results as a text table for the terminal.
+
+    Args:
+        current (Report): The results of this run.
+        baseline (Optional[Report]): The stored results to show changes against.
+        metric (str): The field of `Result` the change is computed for.
+
+    Returns:
+        str: The table.
+    """
+    header = (
+        f"{'benchmark':<40} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'ops/s':>10} {'change':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, result in current.results.items():
+        change = ""
+        stored = baseline.results.get(name) if baseline else None
+        if stored and getattr(stored, metric):
+            change = f"{getattr(result, metric) / getattr(stored, metric) - 1:+.0%}"
+        lines.append(
+            f"{name:<40} {result.p50_ms:>9.3f} {result.p95_ms:>9.3f} "
+            f"{result.p99_ms:>9.3f} {result.ops_per_s:>10.0f} {change:>8}"
+        )
+
+    return "\n".join(lines)
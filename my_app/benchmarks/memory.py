@@ -0,0 +1,700 @@
+"""Module containing in-memory repositories used by the benchmarks.
+
+They implement the repository protocols with plain dicts, so the app can
+be benchmarked without a database and the numbers show the cost of the
+application code alone.
+"""
+
+import random
+from bisect import bisect_right
+from datetime import date
+from typing import AsyncIterator, Iterable, Optional
+
+from manage_free_time.core.domain.idea import Idea, IdeaIn
+from manage_free_time.core.domain.user_profile import UserProfile, UserProfileIn
+from manage_free_time.core.domain.weekly_plan import WeeklyPlan, WeeklyPlanIn
+from manage_free_time.core.repositories.iidea import IIdeaRepository
+from manage_free_time.core.repositories.iuser_profile import IUserProfileRepository
+from manage_free_time.core.repositories.iweekly_plan import IWeeklyPlanRepository
+from manage_free_time.infrastructure.repositories.iidea_changes import \
+    IIdeaChangeRepository
+from manage_free_time.infrastructure.repositories.iidea_pages import (
+    IdeaPageJson,
+    IIdeaPageRepository,
+    page_json,
+)
+
+
+def _page(ideas: list[Idea], after: Optional[int], limit: Optional[int]) -> list[Idea]:
+    """Slice a keyset page out of ideas sorted by id.
+
+    Args:
+        ideas (list[Idea]): The ideas sorted by id.
+        after (Optional[int]): Only ideas with a greater id are returned.
+        limit (Optional[int]): The maximal number of returned ideas.
+
+    Returns:
+        list[Idea]: The ideas of the page.
+    """
+    start = 0
+    if after is not None:
+        start = bisect_right([idea.id for idea in ideas], after)
+    end = start + limit if limit is not None else len(ideas)
+
+    return ideas[start:end]
+
+
+class MemoryIdeaRepository(
+    IIdeaRepository, IIdeaPageRepository, IIdeaChangeRepository
+):
+    """A class keeping ideas in dicts ordered by id.
+
+    Ideas are also grouped by category and author, so the lookups the
+    app makes most often do not scan the whole catalogue. Every write
+    appends the id of the idea to a change log, whose position is the
+    version of the change.
+    """
+
+    _ideas: dict[int, Idea]
+    _by_category: dict[str, dict[int, Idea]]
+    _by_user: dict[int, dict[int, Idea]]
+    _next_id: int
+    _changes: list[int]
+    _pruned: int
+
+    def __init__(self) -> None:
+        """The initializer of the `MemoryIdeaRepository`."""
+        self._ideas = {}
+        self._by_category = {}
+        self._by_user = {}
+        self._next_id = 1
+        self._changes = []
+        self._pruned = 0
+
+    async def get_all_ideas(
+        self, after: int | None = None, limit: int | None = None
+    ) -> Iterable[Idea]:
+        """The method getting a page of all ideas.
+
+        Args:
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: The ideas ordered by id.
+        """
+        return _page(list(self._ideas.values()), after, limit)
+
+    async def get_by_category(
+        self, category: str, after: int | None = None, limit: int | None = None
+    ) -> Iterable[Idea]:
+        """The method getting a page of ideas in a category.
+
+        Args:
+            category (str): The category.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: The ideas ordered by id.
+        """
+        ideas = list(self._by_category.get(category, {}).values())
+        return _page(ideas, after, limit)
+
+    async def get_ideas_json(
+        self,
+        category: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> IdeaPageJson:
+        """The method getting a page of ideas serialized to JSON.
+
+        Args:
+            category (str | None): The category to filter by.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            IdeaPageJson: The JSON array of the ideas ordered by id.
+        """
+        if category is None:
+            ideas = list(await self.get_all_ideas(after, limit))
+        else:
+            ideas = list(await self.get_by_category(category, after, limit))
+
+        return page_json(ideas)
+
+    async def iter_ideas(
+        self,
+        category: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[Idea]:
+        """The method streaming ideas ordered by id.
+
+        Args:
+            category (str | None): The category to filter by.
+            after (int | None): Only ideas with a greater id are yielded.
+            limit (int | None): The maximal number of yielded ideas.
+
+        Yields:
+            Idea: The next idea.
+        """
+        if category is None:
+            ideas = await self.get_all_ideas(after, limit)
+        else:
+            ideas = await self.get_by_category(category, after, limit)
+        for idea in ideas:
+            yield idea
+
+    async def get_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool = True,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> Iterable[Idea]:
+        """The method getting a page of ideas with the tags.
+
+        Args:
+            tags (list[str]): The tags.
+            match_all (bool): Whether ideas must have all tags or any of them.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: The ideas ordered by id.
+        """
+        match = all if match_all else any
+        ideas = [
+            idea for idea in self._ideas.values()
+            if match(tag in idea.tags for tag in tags)
+        ]
+        return _page(ideas, after, limit)
+
+    async def search_by_title(
+        self,
+        query: str,
+        category: str | None = None,
+        tags: list[str] | None = None,
+        limit: int = 20,
+    ) -> Iterable[Idea]:
+        """The method getting ideas whose titles contain the query.
+
+        Args:
+            query (str): The searched text.
+            category (str | None): The category to filter by.
+            tags (list[str] | None): Tags the ideas must all have.
+            limit (int): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: The matching ideas.
+        """
+        query = query.lower()
+        ideas = [
+            idea for idea in self._ideas.values()
+            if query in idea.title.lower()
+            and (category is None or idea.category == category)
+            and all(tag in idea.tags for tag in tags or [])
+        ]
+        return ideas[:limit]
+
+    async def get_by_user(self, user_id: int) -> Iterable[Idea]:
+        """The method getting ideas of a user.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Iterable[Idea]: The ideas of the user.
+        """
+        return list(self._by_user.get(user_id, {}).values())
+
+    async def get_by_id(self, idea_id: int) -> Idea | None:
+        """The method getting an idea by id.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            Idea | None: The idea if exists.
+        """
+        return self._ideas.get(idea_id)
+
+    async def get_by_ids(self, idea_ids: list[int]) -> Iterable[Idea]:
+        """The method getting the ideas with the ids.
+
+        Args:
+            idea_ids (list[int]): The ids of the ideas.
+
+        Returns:
+            Iterable[Idea]: The existing ideas ordered by id.
+        """
+        return [
+            self._ideas[idea_id]
+            for idea_id in sorted(set(idea_ids))
+            if idea_id in self._ideas
+        ]
+
+    async def get_random_idea(self, category: str | None = None) -> Idea | None:
+        """The method getting a random idea.
+
+        Args:
+            category (str | None): The category to pick from.
+
+        Returns:
+            Idea | None: A random idea if there is one.
+        """
+        if category is None:
+            ideas = list(self._ideas.values())
+        else:
+            ideas = list(await self.get_by_category(category))
+        return random.choice(ideas) if ideas else None
+
+    async def add_idea(self, data: IdeaIn, user_id: int) -> Idea | None:
+        """The method adding an idea.
+
+        Args:
+            data (IdeaIn): The details of the idea.
+            user_id (int): The id of the author.
+
+        Returns:
+            Idea | None: The added idea.
+        """
+        idea = Idea(id=self._next_id, user_id=user_id, **data.model_dump())
+        self._store(idea)
+        self._changes.append(idea.id)
+        self._next_id += 1
+
+        return idea
+
+    async def add_ideas(
+        self, data: list[IdeaIn], user_id: int
+    ) -> list[Idea | None]:
+        """The method adding many ideas.
+
+        Args:
+            data (list[IdeaIn]): The details of the ideas.
+            user_id (int): The id of the author.
+
+        Returns:
+            list[Idea | None]: The added ideas.
+        """
+        return [await self.add_idea(idea, user_id) for idea in data]
+
+    async def add_ideas_by_users(
+        self, rows: list[tuple[IdeaIn, int]]
+    ) -> list[Idea | None]:
+        """The method adding many ideas of different authors.
+
+        Args:
+            rows (list[tuple[IdeaIn, int]]): The details of the ideas with
+                the ids of their authors.
+
+        Returns:
+            list[Idea | None]: The added ideas.
+        """
+        return [await self.add_idea(idea, user_id) for idea, user_id in rows]
+
+    async def update_idea(self, idea_id: int, data: IdeaIn) -> Idea | None:
+        """The method updating an idea.
+
+        Args:
+            idea_id (int): The id of the idea.
+            data (IdeaIn): The new details of the idea.
+
+        Returns:
+            Idea | None: The updated idea if exists.
+        """
+        idea = self._ideas.get(idea_id)
+        if idea is None:
+            return None
+
+        updated = idea.model_copy(update=data.model_dump())
+        del self._by_category[idea.category][idea_id]
+        self._ideas[idea_id] = updated
+        category = self._by_category.setdefault(updated.category, {})
+        category[idea_id] = updated
+        self._by_category[updated.category] = dict(sorted(category.items()))
+        self._by_user[idea.user_id][idea_id] = updated
+        self._changes.append(idea_id)
+        return updated
+
+    async def update_ideas(
+        self, rows: list[tuple[int, IdeaIn]]
+    ) -> list[Idea | None]:
+        """The method updating many ideas in order.
+
+        Args:
+            rows (list[tuple[int, IdeaIn]]): The ids of the ideas with
+                their new details.
+
+        Returns:
+            list[Idea | None]: The updated ideas, None for missing ones.
+        """
+        return [await self.update_idea(idea_id, data) for idea_id, data in rows]
+
+    async def delete_idea(self, idea_id: int) -> bool:
+        """The method removing an idea.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            bool: Whether the idea existed.
+        """
+        idea = self._ideas.pop(idea_id, None)
+        if idea is None:
+            return False
+
+        del self._by_category[idea.category][idea_id]
+        del self._by_user[idea.user_id][idea_id]
+        self._changes.append(idea_id)
+        return True
+
+    async def get_change_version(self) -> int:
+        """The method getting the version the next change will get.
+
+        Returns:
+            int: The version.
+        """
+        return self._pruned + len(self._changes) + 1
+
+    async def get_changed_ids(self, since: int) -> list[int] | None:
+        """The method getting the ideas changed since a version.
+
+        Args:
+            since (int): The version returned by `get_change_version`.
+
+        Returns:
+            list[int] | None: The ids of the changed ideas, or None if the
+                changes since the version were pruned.
+        """
+        if since <= self._pruned:
+            return None
+
+        return list(dict.fromkeys(self._changes[since - self._pruned - 1:]))
+
+    async def prune_changes(self, before: int) -> None:
+        """The method forgetting the changes older than a version.
+
+        Args:
+            before (int): The version returned by `get_change_version`.
+        """
+        pruned = min(before - 1 - self._pruned, len(self._changes))
+        if pruned > 0:
+            del self._changes[:pruned]
+            self._pruned += pruned
+
+    def _store(self, idea: Idea) -> None:
+        """Put an idea into the dicts.
+
+        Args:
+            idea (Idea): The idea.
+        """
+        self._ideas[idea.id] = idea
+        self._by_category.setdefault(idea.category, {})[idea.id] = idea
+        self._by_user.setdefault(idea.user_id, {})[idea.id] = idea
+
+
+class MemoryUserProfileRepository(IUserProfileRepository):
+    """A class keeping user profiles and follows in dicts."""
+
+    _ideas: IIdeaRepository
+    _profiles: dict[int, UserProfileIn]
+    _follows: set[tuple[int, int]]
+    _next_id: int
+
+    def __init__(self, ideas: IIdeaRepository) -> None:
+        """The initializer of the `MemoryUserProfileRepository`.
+
+        Args:
+            ideas (IIdeaRepository): The repository of the users' ideas.
+        """
+        self._ideas = ideas
+        self._profiles = {}
+        self._follows = set()
+        self._next_id = 1
+
+    async def get_all_profiles(self) -> Iterable[UserProfile]:
+        """The method getting all profiles.
+
+        Returns:
+            Iterable[UserProfile]: The profiles ordered by id.
+        """
+        return [
+            await self._profile(user_id, data)
+            for user_id, data in self._profiles.items()
+        ]
+
+    async def get_by_id(self, user_id: int) -> Optional[UserProfile]:
+        """The method getting a profile by id.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Optional[UserProfile]: The profile if exists.
+        """
+        data = self._profiles.get(user_id)
+        return await self._profile(user_id, data) if data else None
+
+    async def get_by_username(self, username: str) -> Optional[UserProfile]:
+        """The method getting a profile by username.
+
+        Args:
+            username (str): The username.
+
+        Returns:
+            Optional[UserProfile]: The profile if exists.
+        """
+        for user_id, data in self._profiles.items():
+            if data.username == username:
+                return await self._profile(user_id, data)
+        return None
+
+    async def get_user_ideas(self, user_id: int) -> Iterable[int]:
+        """The method getting ids of the ideas of a user.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Iterable[int]: The ids of the ideas.
+        """
+        return [idea.id for idea in await self._ideas.get_by_user(user_id)]
+
+    async def add_user_profile(self, data: UserProfileIn) -> UserProfile:
+        """The method adding a profile.
+
+        Args:
+            data (UserProfileIn): The details of the profile.
+
+        Returns:
+            UserProfile: The added profile.
+        """
+        user_id = self._next_id
+        self._profiles[user_id] = data
+        self._next_id += 1
+
+        return await self._profile(user_id, data)
+
+    async def update_user_profile(
+        self, user_id: int, data: UserProfileIn
+    ) -> Optional[UserProfile]:
+        """The method updating a profile.
+
+        Args:
+            user_id (int): The id of the user.
+            data (UserProfileIn): The new details of the profile.
+
+        Returns:
+            Optional[UserProfile]: The updated profile if exists.
+        """
+        if user_id not in self._profiles:
+            return None
+
+        self._profiles[user_id] = data
+        return await self._profile(user_id, data)
+
+    async def delete_user_profile(self, user_id: int) -> bool:
+        """The method removing a profile and its follows.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            bool: Whether the profile existed.
+        """
+        self._follows = {edge for edge in self._follows if user_id not in edge}
+        return self._profiles.pop(user_id, None) is not None
+
+    async def follow_user(self, follower_id: int, followee_id: int) -> bool:
+        """The method storing a follow.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_id (int): The id of the followed user.
+
+        Returns:
+            bool: Whether the follow was new.
+        """
+        edge = (follower_id, followee_id)
+        if edge in self._follows:
+            return False
+
+        self._follows.add(edge)
+        return True
+
+    async def unfollow_user(self, follower_id: int, followee_id: int) -> bool:
+        """The method removing a follow.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_id (int): The id of the followed user.
+
+        Returns:
+            bool: Whether the follow existed.
+        """
+        edge = (follower_id, followee_id)
+        if edge not in self._follows:
+            return False
+
+        self._follows.discard(edge)
+        return True
+
+    async def iter_follows(self) -> AsyncIterator[tuple[int, int]]:
+        """The method streaming all follows.
+
+        Yields:
+            tuple[int, int]: The follower and followee ids.
+        """
+        for edge in sorted(self._follows):
+            yield edge
+
+    async def _profile(self, user_id: int, data: UserProfileIn) -> UserProfile:
+        """Build a profile with the ids of the user's ideas.
+
+        Args:
+            user_id (int): The id of the user.
+            data (UserProfileIn): The details of the profile.
+
+        Returns:
+            UserProfile: The profile.
+        """
+        return UserProfile(
+            id=user_id,
+            idea_ids=list(await self.get_user_ideas(user_id)),
+            **data.model_dump(),
+        )
+
+
+class MemoryWeeklyPlanRepository(IWeeklyPlanRepository):
+    """A class keeping weekly plans in a dict keyed by user and week."""
+
+    _plans: dict[tuple[int, date], WeeklyPlan]
+
+    def __init__(self) -> None:
+        """The initializer of the `MemoryWeeklyPlanRepository`."""
+        self._plans = {}
+
+    async def get_plan_by_user(self, user_id: int) -> Optional[WeeklyPlan]:
+        """The method getting the latest plan of a user.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Optional[WeeklyPlan]: The plan if exists.
+        """
+        weeks = sorted(week for user, week in self._plans if user == user_id)
+        return self._plans[(user_id, weeks[-1])] if weeks else None
+
+    async def get_plan(self, user_id: int, week_start: date) -> Optional[WeeklyPlan]:
+        """The method getting the plan of a user starting on the day.
+
+        Args:
+            user_id (int): The id of the user.
+            week_start (date): The first day of the plan.
+
+        Returns:
+            Optional[WeeklyPlan]: The plan if exists.
+        """
+        return self._plans.get((user_id, week_start))
+
+    async def get_plans(
+        self, user_id: int, week_starts: list[date]
+    ) -> Iterable[WeeklyPlan]:
+        """The method getting the plans of a user starting on the days.
+
+        Args:
+            user_id (int): The id of the user.
+            week_starts (list[date]): The first days of the plans.
+
+        Returns:
+            Iterable[WeeklyPlan]: The plans in ascending order of weeks.
+        """
+        return [
+            self._plans[(user_id, week)]
+            for week in sorted(week_starts)
+            if (user_id, week) in self._plans
+        ]
+
+    async def get_latest_plans(self, before: date) -> Iterable[WeeklyPlan]:
+        """The method getting the last plan of every user before the day.
+
+        Args:
+            before (date): Only plans starting before this day are considered.
+
+        Returns:
+            Iterable[WeeklyPlan]: At most one plan of every user.
+        """
+        latest: dict[int, WeeklyPlan] = {}
+        for (user_id, week), plan in sorted(self._plans.items()):
+            if week < before:
+                latest[user_id] = plan
+        return list(latest.values())
+
+    async def iter_plan_weeks(self) -> AsyncIterator[tuple[int, date, date]]:
+        """The method streaming the date ranges of all plans.
+
+        Yields:
+            tuple[int, date, date]: The user id with the first and the last
+                day of a plan.
+        """
+        for (user_id, week), plan in self._plans.items():
+            yield user_id, week, plan.week_end_date
+
+    async def create_weekly_plan(self, user_id: int, data: WeeklyPlanIn) -> WeeklyPlan:
+        """The method adding a plan.
+
+        Args:
+            user_id (int): The id of the user.
+            data (WeeklyPlanIn): The details of the plan.
+
+        Returns:
+            WeeklyPlan: The added plan.
+        """
+        plan = WeeklyPlan(user_id=user_id, **data.model_dump())
+        self._plans[(user_id, plan.week_start_date)] = plan
+
+        return plan
+
+    async def update_weekly_plan(
+        self, user_id: int, week_start: date, data: WeeklyPlanIn
+    ) -> Optional[WeeklyPlan]:
+        """The method updating the plan of a user starting on the day.
+
+        Args:
+            user_id (int): The id of the user.
+            week_start (date): The current first day of the plan.
+            data (WeeklyPlanIn): The new details of the plan.
+
+        Returns:
+            Optional[WeeklyPlan]: The updated plan if exists.
+        """
+        if self._plans.pop((user_id, week_start), None) is None:
+            return None
+
+        return await self.create_weekly_plan(user_id, data)
+
+    async def delete_weekly_plan(self, user_id: int, week_start: date) -> bool:
+        """The method removing the plan of a user starting on the day.
+
+        Args:
+            user_id (int): The id of the user.
+            week_start (date): The first day of the plan.
+
+        Returns:
+            bool: Whether the plan existed.
+        """
+        return self._plans.pop((user_id, week_start), None) is not None
+
+    async def save_weekly_plans(self, plans: list[WeeklyPlan]) -> None:
+        """The method storing plans, replacing ones for the same weeks.
+
+        Args:
+            plans (list[WeeklyPlan]): The plans.
+        """
+        for plan in plans:
+            self._plans[(plan.user_id, plan.week_start_date)] = plan
@@ -0,0 +1,506 @@
+"""Module containing the benchmarked operations and the data they run on."""
+
+import asyncio
+import atexit
+import inspect
+import json
+import os
+import random
+import shutil
+import tempfile
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import partial
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Iterator
+
+import httpx
+from dependency_injector import providers
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+
+from benchmarks.harness import Operation
+from benchmarks.memory import (
+    MemoryIdeaRepository,
+    MemoryUserProfileRepository,
+    MemoryWeeklyPlanRepository,
+)
+from manage_free_time.api.responses import ModelJSONResponse
+from manage_free_time.core.domain.idea import Idea, IdeaIn
+from manage_free_time.core.domain.user_profile import UserProfileIn
+from manage_free_time.core.domain.weekly_plan import WeeklyPlanIn
+from manage_free_time.core.repositories.iidea import IIdeaRepository
+from manage_free_time.infrastructure import main
+from manage_free_time.infrastructure.config import config
+from manage_free_time.infrastructure.container import Container
+from manage_free_time.infrastructure.idea_writer import IdeaWriteQueue
+from manage_free_time.infrastructure.repositories.ideacolumnar import \
+    ColumnarIdeaRepository
+from manage_free_time.infrastructure.services.iidea import IIdeaService
+from manage_free_time.infrastructure.snapshot import IdeaSnapshots
+
+CATEGORIES = [
+    "sport", "kultura", "kuchnia", "podroze", "gry", "muzyka", "natura", "nauka",
+]
+TAGS = [f"tag{number}" for number in range(40)]
+WORDS = [
+    "spacer", "rower", "kino", "teatr", "basen", "gotowanie", "planszowki",
+    "koncert", "wycieczka", "muzeum", "joga", "bieganie", "ksiazka", "gory",
+]
+FOLLOWS_PER_USER = 20
+SERIALIZED_IDEAS = 1000
+LIST_RESPONSES = ("validated", "models", "rows")
+WRITE_BURST = 50
+READ_BURST = 50
+UNLIMITED_RATE = 1e9
+
+
+@dataclass
+class Dataset:
+    """The sizes of the generated data and the seed of its generator."""
+
+    ideas: int
+    users: int
+    seed: int
+
+
+@dataclass
+class Case:
+    """A named benchmark with the share of the base iteration count it runs."""
+
+    name: str
+    operation: Operation
+    scale: float = 1.0
+
+
+def random_idea(rng: random.Random) -> IdeaIn:
+    """Draw the details of an idea.
+
+    Args:
+        rng (random.Random): The seeded generator.
+
+    Returns:
+        IdeaIn: The idea.
+    """
+    return IdeaIn(
+        title=" ".join(rng.sample(WORDS, 3)),
+        category=rng.choice(CATEGORIES),
+        tags=rng.sample(TAGS, 3),
+    )
+
+
+@contextmanager
+def overridden_config(**settings: Any) -> Iterator[None]:
+    """Change settings of the app for the duration of a block.
+
+    The previous values are restored however the block exits, so a
+    failing benchmark cannot leak its settings into later ones.
+
+    Args:
+        **settings (Any): The new values by the names of the settings.
+    """
+    previous = {name: getattr(config, name) for name in settings}
+    for name, value in settings.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(config, name, value)
+
+
+async def _seed(container: Container, dataset: Dataset) -> None:
+    """Fill empty repositories with reproducible data.
+
+    Args:
+        container (Container): The container with the repositories.
+        dataset (Dataset): The sizes of the data.
+    """
+    rng = random.Random(dataset.seed)
+    profiles = container.user_profile_repository()
+    ideas = container.idea_repository()
+    if list(await ideas.get_all_ideas(limit=1)):
+        return
+
+    user_ids = [
+        (await profiles.add_user_profile(
+            UserProfileIn(username=f"bench-{number}", bio=None)
+        )).id
+        for number in range(dataset.users)
+    ]
+    for start in range(0, dataset.ideas, 1000):
+        batch = [random_idea(rng) for _ in range(min(1000, dataset.ideas - start))]
+        await ideas.add_ideas(batch, rng.choice(user_ids))
+    for follower_id in user_ids:
+        for followee_id in rng.sample(user_ids, FOLLOWS_PER_USER):
+            if followee_id != follower_id:
+                await profiles.follow_user(follower_id, followee_id)
+
+
+async def _load(container: Container) -> None:
+    """Build the in-process indexes the way the app lifespan does.
+
+    Args:
+        container (Container): The container with the services.
+    """
+    await container.user_profile_service().load_follow_graph()
+    await container.idea_service().load_indexes()
+    await container.weekly_plan_service().load_plan_index()
+
+
+@asynccontextmanager
+async def _in_memory(
+    dataset: Dataset, ideas: IIdeaRepository
+) -> AsyncIterator[Container]:
+    """Run the app on in-memory repositories.
+
+    Args:
+        dataset (Dataset): The sizes of the data.
+        ideas (IIdeaRepository): The in-memory idea repository.
+
+    Yields:
+        Container: The container of the app with the repositories replaced.
+    """
+    container = main.container
+    container.idea_store.override(providers.Object(ideas))
+    container.idea_repository.override(providers.Object(ideas))
+    container.idea_version_store.override(providers.Object(None))
+    container.user_profile_repository.override(
+        providers.Object(MemoryUserProfileRepository(ideas))
+    )
+    container.weekly_plan_repository.override(
+        providers.Object(MemoryWeeklyPlanRepository())
+    )
+    try:
+        await _seed(container, dataset)
+        await _load(container)
+        yield container
+    finally:
+        container.reset_override()
+
+
+def memory_backend(dataset: Dataset) -> AsyncContextManager[Container]:
+    """Run the app on repositories of models kept in dicts.
+
+    Args:
+        dataset (Dataset): The sizes of the data.
+
+    Returns:
+        AsyncContextManager[Container]: The container of the app.
+    """
+    return _in_memory(dataset, MemoryIdeaRepository())
+
+
+def columnar_backend(dataset: Dataset) -> AsyncContextManager[Container]:
+    """Run the app on the columnar idea repository.
+
+    Args:
+        dataset (Dataset): The sizes of the data.
+
+    Returns:
+        AsyncContextManager[Container]: The container of the app.
+    """
+    return _in_memory(dataset, ColumnarIdeaRepository())
+
+
+@asynccontextmanager
+async def postgres_backend(dataset: Dataset) -> AsyncIterator[Container]:
+    """Run the app on the database configured in the environment.
+
+    The app lifespan connects to the database. The data is seeded only
+    into an empty database, so use a disposable one, e.g. the service
+    from docker-compose.
+
+    Args:
+        dataset (Dataset): The sizes of the data.
+
+    Yields:
+        Container: The container of the app.
+    """
+    async with main.lifespan(main.app):
+        await _seed(main.container, dataset)
+        await _load(main.container)
+        yield main.container
+
+
+BACKENDS: dict[str, Callable[[Dataset], AsyncContextManager[Container]]] = {
+    "memory": memory_backend,
+    "columnar": columnar_backend,
+    "postgres": postgres_backend,
+}
+
+
+def http_cases(client: httpx.AsyncClient, dataset: Dataset) -> list[Case]:
+    """Build the benchmarks of the HTTP endpoints.
+
+    Args:
+        client (httpx.AsyncClient): The client bound to the app.
+        dataset (Dataset): The sizes of the data.
+
+    Returns:
+        list[Case]: The benchmarks.
+    """
+    rng = random.Random(dataset.seed)
+
+    async def get(url: str) -> None:
+        response = await client.get(url)
+        response.raise_for_status()
+
+    async def get_limited(url: str) -> None:
+        route = f"GET {url.partition('?')[0]}"
+        with overridden_config(
+            RATE_LIMITS={route: (UNLIMITED_RATE, UNLIMITED_RATE)}
+        ):
+            await get(url)
+
+    async def get_as(mode: str, url: str) -> None:
+        with overridden_config(IDEA_LIST_RESPONSE=mode):
+            await get(url)
+
+    etags: dict[str, str] = {}
+
+    async def revalidate(url: str) -> None:
+        response = await client.get(
+            url, headers={"If-None-Match": etags.get(url, "")}
+        )
+        if response.status_code != 304:
+            response.raise_for_status()
+            etags[url] = response.headers["etag"]
+
+    async def add_idea() -> None:
+        response = await client.post(
+            f"/idea/dodaj?uzytkownik_id={rng.randint(1, dataset.users)}",
+            json=random_idea(rng).model_dump(),
+        )
+        response.raise_for_status()
+
+    list_cases = [
+        Case(
+            f"http.{name}.{mode}",
+            lambda mode=mode, url=url: get_as(mode, url()),
+            scale,
+        )
+        for name, url, scale in (
+            ("wszystkie_strona", lambda: "/idea/wszystkie?limit=1000", 0.2),
+            (
+                "kategoria_strona",
+                lambda: f"/idea/kategoria/{rng.choice(CATEGORIES)}?limit=1000",
+                0.2,
+            ),
+        )
+        for mode in LIST_RESPONSES
+    ]
+
+    return list_cases + [
+        Case("http.losowy", lambda: get("/idea/losowy")),
+        Case(
+            "http.losowy_uzytkownik",
+            lambda: get(
+                f"/idea/losowy?uzytkownik_id={rng.randint(1, dataset.users)}"
+            ),
+        ),
+        Case(
+            "http.losowy_uzytkownik.rate_limited",
+            lambda: get_limited(
+                f"/idea/losowy?uzytkownik_id={rng.randint(1, dataset.users)}"
+            ),
+        ),
+        Case(
+            "http.losowy_kategoria",
+            lambda: get(f"/idea/losowy?kategoria={rng.choice(CATEGORIES)}"),
+        ),
+        Case("http.dodaj", add_idea),
+        Case("http.wszystkie_strona", lambda: get("/idea/wszystkie?limit=100")),
+        Case(
+            "http.wszystkie_strona.not_modified",
+            lambda: revalidate("/idea/wszystkie?limit=100"),
+        ),
+        Case("http.wszystkie", lambda: get("/idea/wszystkie"), scale=0.05),
+        Case(
+            "http.kategoria_strona",
+            lambda: get(f"/idea/kategoria/{rng.choice(CATEGORIES)}?limit=100"),
+        ),
+        Case(
+            "http.kategoria",
+            lambda: get(f"/idea/kategoria/{rng.choice(CATEGORIES)}"),
+            scale=0.2,
+        ),
+    ]
+
+
+def service_cases(container: Container, dataset: Dataset) -> list[Case]:
+    """Build the micro-benchmarks of the services.
+
+    Args:
+        container (Container): The container with the services.
+        dataset (Dataset): The sizes of the data.
+
+    Returns:
+        list[Case]: The benchmarks.
+    """
+    rng = random.Random(dataset.seed)
+    ideas = container.idea_service()
+    profiles = container.user_profile_service()
+    plans = container.weekly_plan_service()
+    week = date(2030, 1, 7)
+
+    def user_id() -> int:
+        return rng.randint(1, dataset.users)
+
+    writer = IdeaWriteQueue(
+        container.idea_repository(),
+        batch_size=config.IDEA_WRITE_BATCH_SIZE,
+        batch_wait=config.IDEA_WRITE_BATCH_WAIT,
+    )
+    writing_ideas = container.idea_service(writer=writer)
+    snapshot_directory = tempfile.mkdtemp(prefix="benchmarks-")
+    atexit.register(shutil.rmtree, snapshot_directory, ignore_errors=True)
+    snapshot_ideas = container.idea_service(
+        snapshots=IdeaSnapshots(
+            container.idea_repository(),
+            container.idea_store(),
+            os.path.join(snapshot_directory, "ideas.snapshot"),
+        )
+    )
+
+    async def add_burst(service: IIdeaService) -> None:
+        await writer.start()
+        await asyncio.gather(*(
+            service.add_idea(random_idea(rng), user_id())
+            for _ in range(WRITE_BURST)
+        ))
+
+    async def read_burst(coalesced: bool) -> None:
+        get_ideas_by_category = ideas.get_ideas_by_category
+        if not coalesced:
+            get_ideas_by_category = partial(
+                inspect.unwrap(type(ideas).get_ideas_by_category), ideas
+            )
+        category = rng.choice(CATEGORIES)
+        await asyncio.gather(*(
+            get_ideas_by_category(category, limit=100)
+            for _ in range(READ_BURST)
+        ))
+
+    async def follow_counts() -> None:
+        profiles.get_follow_counts(user_id())
+
+    async def followers() -> None:
+        profiles.get_followers(user_id(), limit=100)
+
+    async def plan_for_user() -> None:
+        await plans.generate_plan(user_id(), week)
+
+    async def create_plan() -> None:
+        start = week + timedelta(weeks=rng.randint(1, 5000))
+        await plans.create_plan(
+            user_id(),
+            WeeklyPlanIn(
+                week_start_date=start,
+                week_end_date=start + timedelta(days=6),
+                ideas_ids=[1, 2, 3],
+            ),
+        )
+
+    return [
+        Case("service.idea.get_random_idea", ideas.get_random_idea),
+        Case(
+            "service.idea.get_random_idea_for_user",
+            lambda: ideas.get_random_idea(user_id=user_id()),
+        ),
+        Case(
+            "service.idea.get_ideas_by_category",
+            lambda: ideas.get_ideas_by_category(rng.choice(CATEGORIES), limit=100),
+        ),
+        Case(
+            "service.idea.get_ideas_by_tags",
+            lambda: ideas.get_ideas_by_tags(rng.sample(TAGS, 2), limit=100),
+        ),
+        Case(
+            "service.idea.search_ideas",
+            lambda: ideas.search_ideas(rng.choice(WORDS)[:3]),
+        ),
+        Case(
+            "service.idea.read_burst.direct",
+            lambda: read_burst(coalesced=False),
+            0.1,
+        ),
+        Case(
+            "service.idea.read_burst.coalesced",
+            lambda: read_burst(coalesced=True),
+            0.1,
+        ),
+        Case("service.idea.add_burst.direct", lambda: add_burst(ideas), 0.1),
+        Case(
+            "service.idea.add_burst.write_behind",
+            lambda: add_burst(writing_ideas),
+            0.1,
+        ),
+        Case(
+            "service.idea.load_indexes.repository", ideas.load_indexes, 0.02
+        ),
+        Case(
+            "service.idea.load_indexes.snapshot", snapshot_ideas.load_indexes, 0.02
+        ),
+        Case(
+            "service.idea.get_similar_ideas",
+            lambda: ideas.get_similar_ideas(rng.randint(1, dataset.ideas)),
+        ),
+        Case(
+            "service.profile.get_profile_by_id",
+            lambda: profiles.get_profile_by_id(user_id()),
+        ),
+        Case("service.profile.get_follow_counts", follow_counts),
+        Case("service.profile.get_followers", followers),
+        Case("service.plan.generate_plan", plan_for_user, scale=0.2),
+        Case("service.plan.create_plan", create_plan),
+        Case(
+            "service.plan.get_plans_in_range",
+            lambda: plans.get_plans_in_range(
+                user_id(), week, week + timedelta(weeks=52)
+            ),
+        ),
+    ]
+
+
+async def serialization_cases(container: Container) -> list[Case]:
+    """Build the benchmarks of serializing lists of ideas.
+
+    Args:
+        container (Container): The container with the idea service.
+
+    Returns:
+        list[Case]: The benchmarks.
+    """
+    ideas = list(
+        await container.idea_service().get_all_ideas(limit=SERIALIZED_IDEAS)
+    )
+    adapter = TypeAdapter(list[Idea])
+    field = create_model_field("ideas", list[Idea], mode="serialization")
+
+    async def pydantic() -> None:
+        adapter.dump_json(ideas)
+
+    async def fastapi_encoder() -> None:
+        json.dumps(jsonable_encoder(ideas))
+
+    async def validate() -> None:
+        adapter.validate_python([idea.model_dump() for idea in ideas])
+
+    async def validated_response() -> None:
+        content = await serialize_response(field=field, response_content=ideas)
+        JSONResponse(content)
+
+    async def model_response() -> None:
+        ModelJSONResponse(ideas)
+
+    return [
+        Case("serialize.ideas.dump_json", pydantic),
+        Case("serialize.ideas.jsonable_encoder", fastapi_encoder, scale=0.2),
+        Case("serialize.ideas.validate", validate, scale=0.2),
+        Case("serialize.response.validated", validated_response, scale=0.2),
+        Case("serialize.response.models", model_response),
+    ]
@@ -0,0 +1,109 @@
+"""Module parsing streamed NDJSON and CSV uploads of ideas."""
+
+import codecs
+import csv
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+
+from manage_free_time.core.domain.idea import IdeaIn
+
+CSV_TAG_SEPARATOR = "|"
+
+ParsedRow = tuple[int, IdeaIn | str]
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 chunks into lines.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The body of the request.
+
+    Yields:
+        str: The next line without its terminator.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    rest = ""
+    async for chunk in chunks:
+        lines = (rest + decoder.decode(chunk)).split("\n")
+        rest = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    rest += decoder.decode(b"", final=True)
+    if rest:
+        yield rest.rstrip("\r")
+
+
+def _describe(error: ValidationError) -> str:
+    """Summarize a validation error in one line.
+
+    Args:
+        error (ValidationError): The error.
+
+    Returns:
+        str: The summary.
+    """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+async def parse_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """Parse an NDJSON stream with one idea per line.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The body of the request.
+
+    Yields:
+        ParsedRow: The line number and the idea or the validation error.
+    """
+    number = 0
+    async for line in _lines(chunks):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            yield number, IdeaIn.model_validate_json(line)
+        except ValidationError as error:
+            yield number, _describe(error)
+
+
+async def parse_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """Parse a CSV stream with a `title,category,tags` header.
+
+    Tags in a cell are separated with `CSV_TAG_SEPARATOR`. Every record
+    must fit in one line.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The body of the request.
+
+    Yields:
+        ParsedRow: The line number and the idea or the validation error.
+    """
+    header = None
+    number = 0
+    async for line in _lines(chunks):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            record = next(csv.reader([line]))
+        except csv.Error as error:
+            yield number, str(error)
+            continue
+
+        if header is None:
+            header = [column.strip() for column in record]
+            continue
+        if len(record) != len(header):
+            yield number, f"expected {len(header)} columns, got {len(record)}"
+            continue
+
+        row = dict(zip(header, record))
+        tags = row.get("tags", "")
+        row["tags"] = [tag.strip() for tag in tags.split(CSV_TAG_SEPARATOR) if tag.strip()]
+        try:
+            yield number, IdeaIn.model_validate(row)
+        except ValidationError as error:
+            yield number, _describe(error)
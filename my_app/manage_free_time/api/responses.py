@@ -0,0 +1,31 @@
+"""A module providing response classes of the API."""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class ModelJSONResponse(JSONResponse):
+    """A JSON response serializing its content straight to bytes.
+
+    Pydantic models, lists of them and plain values are encoded by
+    `pydantic_core.to_json` in a single pass, without converting them to
+    dicts first. Bytes are taken as an already encoded JSON document.
+    Returning this response from an endpoint also skips the validation
+    of the content against the `response_model`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """The method encoding the content of the response.
+
+        Args:
+            content (Any): Models, JSON-compatible values or encoded JSON.
+
+        Returns:
+            bytes: The body of the response.
+        """
+        if isinstance(content, bytes):
+            return content
+
+        return to_json(content)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from dependency_injector.wiring import Provide, inject
+
+from manage_free_time.infrastructure.cache import LRUCache
+from manage_free_time.infrastructure.container import Container
+
+router = APIRouter()
+
+
+@router.get("/statystyki", response_model=dict[str, int])
+@inject
+async def get_cache_stats(
+    cache: LRUCache = Depends(Provide[Container.repository_cache]),
+) -> dict[str, int]:
+    """
+    Endpoint do pobierania liczników pamięci podręcznej repozytoriów.
+
+    Args:
+        cache (LRUCache): Wstrzyknięta zależność pamięci podręcznej.
+
+    Returns:
+        dict[str, int]: Rozmiar oraz liczby trafień, chybień i usunięć wpisów.
+    """
+    return cache.stats()
@@ -1,88 +1,534 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List
-from dependency_injector.wiring import Provide, inject
-
-from manage_free_time.container import Container
-from manage_free_time.core.domain.idea import Idea, IdeaIn
-from manage_free_time.infrastructure.services.idea import IIdeaService
-
-router = APIRouter()
-
-@router.get("/losowy", response_model=Idea)
-@inject
-async def get_random_idea(
-    kategoria: str = Query(None, description="Kategoria pomysłu"),
-    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
-) -> Idea:
-    """
-    Endpoint do pobierania losowego pomysłu.
-
-    Args:
-        kategoria (str): Kategoria, z której ma zostać wybrany pomysł.
-        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
-
-    Returns:
-        Idea: Szczegóły losowego pomysłu.
-    """
-    idea = await serwis.get_random_idea(kategoria=kategoria)
-    if not idea:
-        raise HTTPException(status_code=404, detail="Pomysł nie został znaleziony")
-    return idea
-
-
-@router.post("/dodaj", response_model=Idea, status_code=201)
-@inject
-async def add_idea(
-    nowy_pomysl: IdeaIn,
-    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
-) -> Idea:
-    """
-    Endpoint do dodawania nowego pomysłu.
-
-    Args:
-        nowy_pomysl (IdeaIn): Dane nowego pomysłu.
-        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
-
-    Returns:
-        Idea: Szczegóły dodanego pomysłu.
-    """
-    dodany_pomysl = await serwis.add_idea(nowy_pomysl)
-    return dodany_pomysl
-
-
-@router.get("/wszystkie", response_model=List[Idea])
-@inject
-async def get_all_ideas(
-    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
-) -> List[Idea]:
-    """
-    Endpoint do pobierania wszystkich pomysłów.
-
-    Args:
-        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
-
-    Returns:
-        List[Idea]: Lista wszystkich pomysłów.
-    """
-    pomysly = await serwis.get_all_ideas()
-    return pomysly
-
-
-@router.get("/kategoria/{kategoria}", response_model=List[Idea])
-@inject
-async def get_ideas_by_category(
-    kategoria: str,
-    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
-) -> List[Idea]:
-    """
-    Endpoint do pobierania pomysłów według kategorii.
-
-    Args:
-        kategoria (str): Nazwa kategorii.
-        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
-
-    Returns:
-        List[Idea]: Lista pomysłów w danej kategorii.
-    """
-    pomysly = await serwis.get_ideas_by_category(kategoria)
-    return pomysly
+import hashlib
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Literal, Optional
+from dependency_injector.wiring import Provide, inject
+
+from manage_free_time.api.importers import parse_csv, parse_ndjson
+from manage_free_time.api.responses import ModelJSONResponse
+from manage_free_time.infrastructure.config import config
+from manage_free_time.infrastructure.container import Container
+from manage_free_time.core.domain.idea import Idea, IdeaIn, IdeaImportReport
+from manage_free_time.infrastructure.services.iidea import IIdeaService
+
+router = APIRouter(default_response_class=ModelJSONResponse)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_CHUNK_SIZE = 64 * 1024
+MAX_PAGE_SIZE = 1000
+
+
+def _wants_ndjson(request: Request) -> bool:
+    """Sprawdza, czy klient zażądał strumienia NDJSON w nagłówku Accept."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def _cache_headers(
+    serwis: IIdeaService,
+    request: Request,
+    kategoria: Optional[str],
+    after: Optional[int],
+    limit: Optional[int],
+) -> dict[str, str]:
+    """
+    Tworzy nagłówki pozwalające klientom i proxy buforować listę pomysłów.
+
+    ETag jest skrótem wersji kolekcji z serwisu, parametrów strony
+    i formatu odpowiedzi, więc zmienia się dopiero po zapisie pomysłu
+    z tej kolekcji i nie wymaga odczytu pomysłów. Przy bazie danych
+    wersja jest wspólna dla wszystkich workerów, więc zapis obsłużony
+    przez jeden z nich unieważnia ETagi pozostałych. Wersja jest
+    pobierana przed odczytem listy – zapis w trakcie odczytu zmieni ją
+    przy następnym żądaniu, zamiast utrwalić nieaktualną treść.
+
+    Args:
+        serwis (IIdeaService): Serwis pomysłów.
+        request (Request): Przychodzące żądanie HTTP.
+        kategoria (Optional[str]): Nazwa kategorii lub None dla wszystkich.
+        after (Optional[int]): Kursor – identyfikator ostatniego pomysłu.
+        limit (Optional[int]): Maksymalna liczba pomysłów.
+
+    Returns:
+        dict[str, str]: Nagłówki `ETag`, `Cache-Control` i `Vary`.
+    """
+    postac = "ndjson" if _wants_ndjson(request) else config.IDEA_LIST_RESPONSE
+    klucz = "|".join((
+        await serwis.get_version(category=kategoria),
+        kategoria or "",
+        str(after),
+        str(limit),
+        postac,
+    ))
+    skrot = hashlib.blake2b(klucz.encode(), digest_size=12).hexdigest()
+    return {
+        "ETag": f'"{skrot}"',
+        "Cache-Control": (
+            f"public, max-age={config.IDEA_LIST_MAX_AGE}, must-revalidate"
+        ),
+        "Vary": "Accept",
+    }
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """
+    Sprawdza, czy klient ma już aktualną wersję odpowiedzi.
+
+    Nagłówek `If-None-Match` porównywany jest słabo, zgodnie z RFC 9110,
+    więc znacznik `W/` dodany przez proxy nie przeszkadza w dopasowaniu.
+
+    Args:
+        request (Request): Przychodzące żądanie HTTP.
+        etag (str): Aktualny ETag odpowiedzi.
+
+    Returns:
+        bool: True, jeśli można odpowiedzieć kodem 304.
+    """
+    naglowek = request.headers.get("if-none-match")
+    if naglowek is None:
+        return False
+    if naglowek.strip() == "*":
+        return True
+
+    return any(
+        znacznik.strip().removeprefix("W/") == etag
+        for znacznik in naglowek.split(",")
+    )
+
+
+async def _ndjson_chunks(pomysly: AsyncIterator[Idea]) -> AsyncIterator[bytes]:
+    """
+    Serializuje pomysły do NDJSON, wysyłając je porcjami.
+
+    Args:
+        pomysly (AsyncIterator[Idea]): Strumień pomysłów z repozytorium.
+
+    Yields:
+        bytes: Kolejne porcje linii JSON o rozmiarze około `NDJSON_CHUNK_SIZE`.
+    """
+    bufor = bytearray()
+    async for pomysl in pomysly:
+        bufor += pomysl.model_dump_json().encode()
+        bufor += b"\n"
+        if len(bufor) >= NDJSON_CHUNK_SIZE:
+            yield bytes(bufor)
+            bufor.clear()
+    if bufor:
+        yield bytes(bufor)
+
+
+async def _ndjson_response(
+    pomysly: AsyncIterator[Idea], naglowki: dict[str, str]
+) -> StreamingResponse:
+    """
+    Tworzy odpowiedź strumieniującą pomysły jako NDJSON.
+
+    Pierwsza porcja jest odczytywana przed wysłaniem nagłówków, więc
+    strumień czekający zbyt długo na wolne miejsce w repozytorium kończy
+    się odpowiedzią 503, a nie przerwanym strumieniem.
+
+    Args:
+        pomysly (AsyncIterator[Idea]): Strumień pomysłów z repozytorium.
+        naglowki (dict[str, str]): Nagłówki buforowania odpowiedzi.
+
+    Returns:
+        StreamingResponse: Odpowiedź ze strumieniem pomysłów.
+    """
+    porcje = _ndjson_chunks(pomysly)
+    pierwsza = await anext(porcje, b"")
+
+    async def wszystkie_porcje() -> AsyncIterator[bytes]:
+        if pierwsza:
+            yield pierwsza
+        async for porcja in porcje:
+            yield porcja
+
+    return StreamingResponse(
+        wszystkie_porcje(), media_type=NDJSON_MEDIA_TYPE, headers=naglowki
+    )
+
+
+def _set_next_cursor(
+    response: Response,
+    pomysly: List[Idea],
+    limit: Optional[int],
+) -> None:
+    """Ustawia nagłówek z kursorem następnej strony, jeśli strona jest pełna."""
+    if limit is not None and len(pomysly) == limit:
+        response.headers["X-Next-After"] = str(pomysly[-1].id)
+
+
+async def _list_response(
+    serwis: IIdeaService,
+    response: Response,
+    kategoria: Optional[str],
+    after: Optional[int],
+    limit: Optional[int],
+    naglowki: dict[str, str],
+) -> List[Idea] | Response:
+    """
+    Pobiera stronę pomysłów i serializuje ją w sposób z `IDEA_LIST_RESPONSE`.
+
+    - `validated` – FastAPI waliduje listę względem `response_model`
+      i dopiero potem ją serializuje,
+    - `models` – gotowe modele są zamieniane na bajty bez ponownej walidacji,
+    - `rows` – tablicę JSON buduje baza danych, bez tworzenia modeli.
+
+    Args:
+        serwis (IIdeaService): Serwis pomysłów.
+        response (Response): Odpowiedź, do której dodawany jest kursor.
+        kategoria (Optional[str]): Nazwa kategorii lub None dla wszystkich.
+        after (Optional[int]): Kursor – identyfikator ostatniego pomysłu.
+        limit (Optional[int]): Maksymalna liczba pomysłów.
+        naglowki (dict[str, str]): Nagłówki buforowania z `_cache_headers`.
+
+    Returns:
+        List[Idea] | Response: Lista do walidacji lub gotowa odpowiedź.
+    """
+    if config.IDEA_LIST_RESPONSE == "rows":
+        strona = await serwis.get_ideas_json(
+            category=kategoria, after=after, limit=limit
+        )
+        odpowiedz = ModelJSONResponse(strona.body, headers=naglowki)
+        if limit is not None and strona.count == limit:
+            odpowiedz.headers["X-Next-After"] = str(strona.last_id)
+        return odpowiedz
+
+    if kategoria is None:
+        pomysly = list(await serwis.get_all_ideas(after=after, limit=limit))
+    else:
+        pomysly = list(
+            await serwis.get_ideas_by_category(kategoria, after=after, limit=limit)
+        )
+
+    if config.IDEA_LIST_RESPONSE == "validated":
+        response.headers.update(naglowki)
+        _set_next_cursor(response, pomysly, limit)
+        return pomysly
+
+    odpowiedz = ModelJSONResponse(pomysly, headers=naglowki)
+    _set_next_cursor(odpowiedz, pomysly, limit)
+    return odpowiedz
+
+
+@router.get("/losowy", response_model=Idea)
+@inject
+async def get_random_idea(
+    kategoria: str = Query(None, description="Kategoria pomysłu"),
+    uzytkownik_id: Optional[int] = Query(
+        None, description="Identyfikator użytkownika do spersonalizowania losowania"
+    ),
+    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
+) -> Idea:
+    """
+    Endpoint do pobierania losowego pomysłu.
+
+    Z podanym `uzytkownik_id` częściej losowane są pomysły z tagami,
+    których użytkownik używa w swoich pomysłach, a niedawno pokazane
+    pomysły są pomijane.
+
+    Args:
+        kategoria (str): Kategoria, z której ma zostać wybrany pomysł.
+        uzytkownik_id (Optional[int]): Identyfikator użytkownika.
+        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
+
+    Returns:
+        Idea: Szczegóły losowego pomysłu.
+    """
+    idea = await serwis.get_random_idea(
+        category=kategoria, user_id=uzytkownik_id
+    )
+    if not idea:
+        raise HTTPException(status_code=404, detail="Pomysł nie został znaleziony")
+    return idea
+
+
+@router.post("/dodaj", response_model=Idea, status_code=201)
+@inject
+async def add_idea(
+    nowy_pomysl: IdeaIn,
+    uzytkownik_id: int = Query(..., description="Identyfikator autora pomysłu"),
+    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
+) -> Idea:
+    """
+    Endpoint do dodawania nowego pomysłu.
+
+    Args:
+        nowy_pomysl (IdeaIn): Dane nowego pomysłu.
+        uzytkownik_id (int): Identyfikator autora pomysłu.
+        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
+
+    Returns:
+        Idea: Szczegóły dodanego pomysłu.
+    """
+    dodany_pomysl = await serwis.add_idea(nowy_pomysl, uzytkownik_id)
+    if not dodany_pomysl:
+        raise HTTPException(status_code=400, detail="Nie udało się dodać pomysłu")
+    return dodany_pomysl
+
+
+@router.post("/importuj", response_model=IdeaImportReport)
+@inject
+async def import_ideas(
+    request: Request,
+    uzytkownik_id: int = Query(..., description="Identyfikator autora pomysłów"),
+    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
+) -> IdeaImportReport:
+    """
+    Endpoint do masowego importu pomysłów z pliku NDJSON lub CSV.
+
+    Treść żądania jest przetwarzana strumieniowo. Błędne wiersze są
+    pomijane i zgłaszane w raporcie razem z numerem linii.
+
+    Args:
+        request (Request): Żądanie z plikiem w treści.
+        uzytkownik_id (int): Identyfikator autora pomysłów.
+        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
+
+    Returns:
+        IdeaImportReport: Liczba zaimportowanych i odrzuconych wierszy.
+    """
+    typ = request.headers.get("content-type", "").split(";")[0].strip()
+    if typ == "text/csv":
+        wiersze = parse_csv(request.stream())
+    elif typ in (NDJSON_MEDIA_TYPE, "application/jsonl"):
+        wiersze = parse_ndjson(request.stream())
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Obsługiwane formaty to text/csv i application/x-ndjson",
+        )
+
+    return await serwis.import_ideas(
+        wiersze,
+        uzytkownik_id,
+        config.IMPORT_BATCH_SIZE,
+    )
+
+
+@router.get("/wszystkie", response_model=List[Idea])
+@inject
+async def get_all_ideas(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Rozmiar strony"
+    ),
+    after: Optional[int] = Query(
+        None, description="Identyfikator ostatniego pomysłu poprzedniej strony"
+    ),
+    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
+) -> List[Idea] | Response:
+    """
+    Endpoint do pobierania wszystkich pomysłów.
+
+    Wyniki są uporządkowane według identyfikatora. Przy żądaniu
+    `Accept: application/x-ndjson` pomysły są strumieniowane linia po linii,
+    a w przeciwnym razie serializowane zgodnie z `IDEA_LIST_RESPONSE`.
+    Żądanie z aktualnym ETagiem w `If-None-Match` dostaje odpowiedź 304
+    bez odczytu pomysłów.
+
+    Args:
+        request (Request): Przychodzące żądanie HTTP.
+        response (Response): Odpowiedź, do której dodawany jest kursor.
+        limit (Optional[int]): Maksymalna liczba pomysłów.
+        after (Optional[int]): Kursor – identyfikator ostatniego pomysłu.
+        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
+
+    Returns:
+        List[Idea] | Response: Lista, gotowa odpowiedź lub strumień pomysłów.
+    """
+    naglowki = await _cache_headers(serwis, request, None, after, limit)
+    if _not_modified(request, naglowki["ETag"]):
+        return Response(status_code=304, headers=naglowki)
+
+    if _wants_ndjson(request):
+        return await _ndjson_response(
+            serwis.stream_ideas(after=after, limit=limit), naglowki
+        )
+
+    return await _list_response(serwis, response, None, after, limit, naglowki)
+
+
+@router.get("/kategoria/{kategoria}", response_model=List[Idea])
+@inject
+async def get_ideas_by_category(
+    kategoria: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Rozmiar strony"
+    ),
+    after: Optional[int] = Query(
+        None, description="Identyfikator ostatniego pomysłu poprzedniej strony"
+    ),
+    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
+) -> List[Idea] | Response:
+    """
+    Endpoint do pobierania pomysłów według kategorii.
+
+    Odpowiedź ma ETag wersji kategorii i obsługuje `If-None-Match`
+    tak samo jak lista wszystkich pomysłów.
+
+    Args:
+        kategoria (str): Nazwa kategorii.
+        request (Request): Przychodzące żądanie HTTP.
+        response (Response): Odpowiedź, do której dodawany jest kursor.
+        limit (Optional[int]): Maksymalna liczba pomysłów.
+        after (Optional[int]): Kursor – identyfikator ostatniego pomysłu.
+        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
+
+    Returns:
+        List[Idea] | Response: Lista, gotowa odpowiedź lub strumień pomysłów.
+    """
+    naglowki = await _cache_headers(serwis, request, kategoria, after, limit)
+    if _not_modified(request, naglowki["ETag"]):
+        return Response(status_code=304, headers=naglowki)
+
+    if _wants_ndjson(request):
+        return await _ndjson_response(
+            serwis.stream_ideas(category=kategoria, after=after, limit=limit),
+            naglowki,
+        )
+
+    return await _list_response(
+        serwis, response, kategoria, after, limit, naglowki
+    )
+
+
+@router.get("/tagi", response_model=List[Idea])
+@inject
+async def get_ideas_by_tags(
+    response: Response,
+    tag: List[str] = Query(..., min_length=1, description="Tagi pomysłu"),
+    mode: Literal["all", "any"] = Query(
+        "all", description="Czy pomysł musi mieć wszystkie tagi, czy dowolny"
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Rozmiar strony"
+    ),
+    after: Optional[int] = Query(
+        None, description="Identyfikator ostatniego pomysłu poprzedniej strony"
+    ),
+    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
+) -> List[Idea]:
+    """
+    Endpoint do pobierania pomysłów według tagów.
+
+    Args:
+        response (Response): Odpowiedź, do której dodawany jest kursor.
+        tag (List[str]): Tagi, według których filtrowane są pomysły.
+        mode (str): `all` – wszystkie tagi, `any` – co najmniej jeden z tagów.
+        limit (Optional[int]): Maksymalna liczba pomysłów.
+        after (Optional[int]): Kursor – identyfikator ostatniego pomysłu.
+        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
+
+    Returns:
+        List[Idea]: Lista pomysłów z podanymi tagami.
+    """
+    pomysly = list(
+        await serwis.get_ideas_by_tags(
+            tag,
+            match_all=mode == "all",
+            after=after,
+            limit=limit,
+        )
+    )
+    _set_next_cursor(response, pomysly, limit)
+    return pomysly
+
+
+@router.get("/tablica/{uzytkownik_id}", response_model=List[Idea])
+@inject
+async def get_feed(
+    uzytkownik_id: int,
+    response: Response,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="Rozmiar strony"),
+    before: Optional[int] = Query(
+        None, description="Identyfikator ostatniego pomysłu poprzedniej strony"
+    ),
+    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
+) -> List[Idea]:
+    """
+    Endpoint do pobierania tablicy z pomysłami obserwowanych użytkowników.
+
+    Pomysły są posortowane od najnowszych, a kolejna strona zaczyna się
+    od identyfikatora z nagłówka `X-Next-Before`.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        response (Response): Odpowiedź, do której dodawany jest kursor.
+        limit (int): Maksymalna liczba pomysłów.
+        before (Optional[int]): Kursor – identyfikator ostatniego pomysłu.
+        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
+
+    Returns:
+        List[Idea]: Lista pomysłów od najnowszych.
+    """
+    pomysly = await serwis.get_feed(uzytkownik_id, before, limit)
+    if len(pomysly) == limit:
+        response.headers["X-Next-Before"] = str(pomysly[-1].id)
+    return pomysly
+
+
+@router.get("/szukaj", response_model=List[Idea])
+@inject
+async def search_ideas(
+    q: str = Query(..., min_length=1, description="Szukana fraza"),
+    kategoria: Optional[str] = Query(None, description="Kategoria pomysłu"),
+    tag: Optional[List[str]] = Query(None, description="Wymagane tagi"),
+    prefix: bool = Query(
+        True, description="Czy ostatnie słowo frazy jest niedokończone"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Liczba wyników"),
+    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
+) -> List[Idea]:
+    """
+    Endpoint do wyszukiwania pomysłów po tytule, także z literówkami.
+
+    Args:
+        q (str): Szukana fraza, np. wpisywana na bieżąco przez użytkownika.
+        kategoria (Optional[str]): Kategoria, do której zawęża się wyniki.
+        tag (Optional[List[str]]): Tagi, które muszą mieć znalezione pomysły.
+        prefix (bool): Czy ostatnie słowo traktować jako początek słowa.
+        limit (int): Maksymalna liczba wyników.
+        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
+
+    Returns:
+        List[Idea]: Pomysły uporządkowane od najlepiej dopasowanych.
+    """
+    pomysly = await serwis.search_ideas(
+        q,
+        category=kategoria,
+        tags=tag,
+        prefix=prefix,
+        limit=limit,
+    )
+    return list(pomysly)
+
+
+@router.get("/{pomysl_id}/podobne", response_model=List[Idea])
+@inject
+async def get_similar_ideas(
+    pomysl_id: int,
+    limit: int = Query(10, ge=1, le=100, description="Liczba wyników"),
+    serwis: IIdeaService = Depends(Provide[Container.idea_service]),
+) -> List[Idea]:
+    """
+    Endpoint do pobierania pomysłów o najbardziej podobnych tagach.
+
+    Podobieństwo to współczynnik Jaccarda zbiorów tagów, a przy remisie
+    wyżej są pomysły z tej samej kategorii.
+
+    Args:
+        pomysl_id (int): Identyfikator pomysłu.
+        limit (int): Maksymalna liczba wyników.
+        serwis (IIdeaService): Wstrzyknięta zależność serwisu pomysłów.
+
+    Returns:
+        List[Idea]: Podobne pomysły, od najbardziej podobnych.
+    """
+    pomysly = await serwis.get_similar_ideas(pomysl_id, limit)
+    if pomysly is None:
+        raise HTTPException(status_code=404, detail="Pomysł nie został znaleziony")
+    return pomysly
@@ -0,0 +1,190 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import List, Optional
+from dependency_injector.wiring import Provide, inject
+
+from manage_free_time.infrastructure.container import Container
+from manage_free_time.core.domain.invitations import (
+    Invitation,
+    InvitationCounts,
+    InvitationIn,
+    InvitationJob,
+)
+from manage_free_time.infrastructure.services.iinvitations import IInvitationService
+
+router = APIRouter()
+
+MAX_INVITATIONS = 10_000
+MAX_PAGE_SIZE = 1000
+
+
+@router.post("/wyslij", response_model=InvitationJob, status_code=202)
+@inject
+async def send_invitations(
+    zaproszenia: List[InvitationIn],
+    serwis: IInvitationService = Depends(Provide[Container.invitation_service]),
+) -> InvitationJob:
+    """
+    Endpoint do wysyłania listy zaproszeń.
+
+    Zaproszenia trafiają do kolejki i są zapisywane oraz wysyłane w tle.
+    Stan wysyłki można sprawdzić pod adresem `/zadanie/{zadanie_id}`.
+
+    Args:
+        zaproszenia (List[InvitationIn]): Zaproszenia do wysłania.
+        serwis (IInvitationService): Wstrzyknięta zależność serwisu zaproszeń.
+
+    Returns:
+        InvitationJob: Zadanie wysyłki z identyfikatorem i licznikami.
+    """
+    if len(zaproszenia) > MAX_INVITATIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Można wysłać najwyżej {MAX_INVITATIONS} zaproszeń naraz",
+        )
+    return serwis.send_invitations(zaproszenia)
+
+
+@router.get("/zadanie/{zadanie_id}", response_model=InvitationJob)
+@inject
+async def get_job(
+    zadanie_id: str,
+    serwis: IInvitationService = Depends(Provide[Container.invitation_service]),
+) -> InvitationJob:
+    """
+    Endpoint do sprawdzania stanu wysyłki zaproszeń.
+
+    Args:
+        zadanie_id (str): Identyfikator zadania wysyłki.
+        serwis (IInvitationService): Wstrzyknięta zależność serwisu zaproszeń.
+
+    Returns:
+        InvitationJob: Stan zadania i liczniki zaproszeń.
+    """
+    zadanie = serwis.get_job(zadanie_id)
+    if not zadanie:
+        raise HTTPException(status_code=404, detail="Nie znaleziono zadania")
+    return zadanie
+
+
+@router.get("/uzytkownik/{uzytkownik_id}", response_model=List[Invitation])
+@inject
+async def get_invitations_by_user(
+    uzytkownik_id: int,
+    serwis: IInvitationService = Depends(Provide[Container.invitation_service]),
+) -> List[Invitation]:
+    """
+    Endpoint do pobierania zaproszeń wysłanych przez użytkownika.
+
+    Args:
+        uzytkownik_id (int): Identyfikator zapraszającego użytkownika.
+        serwis (IInvitationService): Wstrzyknięta zależność serwisu zaproszeń.
+
+    Returns:
+        List[Invitation]: Lista zaproszeń użytkownika.
+    """
+    return list(await serwis.get_invitations_by_user(uzytkownik_id))
+
+
+@router.get("/liczniki", response_model=InvitationCounts)
+@inject
+async def get_status_counts(
+    uzytkownik_id: Optional[int] = Query(
+        None, description="Identyfikator zapraszającego użytkownika"
+    ),
+    serwis: IInvitationService = Depends(Provide[Container.invitation_service]),
+) -> InvitationCounts:
+    """
+    Endpoint do pobierania liczby zaproszeń w każdym statusie.
+
+    Liczby są odczytywane z liczników, a nie z tabeli zaproszeń.
+
+    Args:
+        uzytkownik_id (Optional[int]): Identyfikator zapraszającego lub
+            brak dla wszystkich zaproszeń.
+        serwis (IInvitationService): Wstrzyknięta zależność serwisu zaproszeń.
+
+    Returns:
+        InvitationCounts: Liczby zaproszeń według statusu.
+    """
+    return await serwis.get_status_counts(uzytkownik_id)
+
+
+@router.get("/status/{status}", response_model=List[Invitation])
+@inject
+async def get_invitations_by_status(
+    status: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Rozmiar strony"),
+    after: Optional[int] = Query(
+        None, description="Identyfikator ostatniego zaproszenia poprzedniej strony"
+    ),
+    serwis: IInvitationService = Depends(Provide[Container.invitation_service]),
+) -> List[Invitation]:
+    """
+    Endpoint do pobierania strony zaproszeń o danym statusie.
+
+    Args:
+        status (str): Status zaproszeń.
+        response (Response): Odpowiedź, do której dodawany jest kursor.
+        limit (int): Maksymalna liczba zaproszeń.
+        after (Optional[int]): Kursor – identyfikator ostatniego zaproszenia.
+        serwis (IInvitationService): Wstrzyknięta zależność serwisu zaproszeń.
+
+    Returns:
+        List[Invitation]: Zaproszenia w kolejności rosnących identyfikatorów.
+    """
+    zaproszenia = [
+        zaproszenie
+        async for zaproszenie in serwis.get_invitations_by_status(
+            status, after, limit
+        )
+    ]
+    if len(zaproszenia) == limit:
+        response.headers["X-Next-After"] = str(zaproszenia[-1].id)
+    return zaproszenia
+
+
+@router.put("/{zaproszenie_id}/status", response_model=Invitation)
+@inject
+async def update_invitation_status(
+    zaproszenie_id: int,
+    status: str = Query(..., min_length=1, description="Nowy status zaproszenia"),
+    serwis: IInvitationService = Depends(Provide[Container.invitation_service]),
+) -> Invitation:
+    """
+    Endpoint do zmiany statusu zaproszenia, np. na `accepted` lub `declined`.
+
+    Args:
+        zaproszenie_id (int): Identyfikator zaproszenia.
+        status (str): Nowy status zaproszenia.
+        serwis (IInvitationService): Wstrzyknięta zależność serwisu zaproszeń.
+
+    Returns:
+        Invitation: Zaktualizowane zaproszenie.
+    """
+    zaproszenie = await serwis.update_invitation_status(zaproszenie_id, status)
+    if not zaproszenie:
+        raise HTTPException(status_code=404, detail="Nie znaleziono zaproszenia")
+    return zaproszenie
+
+
+@router.get("/{zaproszenie_id}", response_model=Invitation)
+@inject
+async def get_invitation(
+    zaproszenie_id: int,
+    serwis: IInvitationService = Depends(Provide[Container.invitation_service]),
+) -> Invitation:
+    """
+    Endpoint do pobierania zaproszenia.
+
+    Args:
+        zaproszenie_id (int): Identyfikator zaproszenia.
+        serwis (IInvitationService): Wstrzyknięta zależność serwisu zaproszeń.
+
+    Returns:
+        Invitation: Szczegóły zaproszenia.
+    """
+    zaproszenie = await serwis.get_invitation_by_id(zaproszenie_id)
+    if not zaproszenie:
+        raise HTTPException(status_code=404, detail="Nie znaleziono zaproszenia")
+    return zaproszenie
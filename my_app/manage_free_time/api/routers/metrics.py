@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+
+from manage_free_time.infrastructure.metrics import CONTENT_TYPE, registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """
+    Endpoint do pobierania metryk aplikacji w formacie tekstowym Prometheusa.
+
+    Returns:
+        Response: Opóźnienia żądań i metod, liczniki odpowiedzi, czas
+            oczekiwania na połączenie z puli oraz trafienia pamięci podręcznej.
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,355 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import List, Literal, Optional
+from dependency_injector.wiring import Provide, inject
+
+from manage_free_time.infrastructure.container import Container
+from manage_free_time.core.domain.user_profile import (
+    FollowCounts,
+    UserProfile,
+    UserProfileIn,
+    UserProfileWithIdeas,
+)
+from manage_free_time.infrastructure.loaders import IdeaLoader
+from manage_free_time.infrastructure.services.iuser_profile import IUserProfileService
+
+router = APIRouter()
+
+Expand = Optional[Literal["ideas"]]
+
+MAX_PAGE_SIZE = 1000
+
+
+async def _expand(
+    profil: UserProfile,
+    expand: Expand,
+    loader: IdeaLoader,
+) -> UserProfile | UserProfileWithIdeas:
+    """Dołącza pomysły użytkownika do profilu, jeśli klient o to poprosił."""
+    if expand != "ideas":
+        return profil
+    pomysly = await loader.load_many(profil.idea_ids)
+    return UserProfileWithIdeas(**profil.model_dump(), ideas=pomysly)
+
+
+def _set_next_cursor(
+    response: Response,
+    identyfikatory: List[int],
+    limit: Optional[int],
+) -> None:
+    """Ustawia nagłówek z kursorem następnej strony, jeśli strona jest pełna."""
+    if limit is not None and len(identyfikatory) == limit:
+        response.headers["X-Next-After"] = str(identyfikatory[-1])
+
+
+@router.get("/wszystkie", response_model=List[UserProfileWithIdeas | UserProfile])
+@inject
+async def get_all_profiles(
+    expand: Expand = Query(None, description="Dołącz pełne dane pomysłów"),
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+    loader: IdeaLoader = Depends(Provide[Container.idea_loader]),
+) -> List[UserProfile | UserProfileWithIdeas]:
+    """
+    Endpoint do pobierania wszystkich profili użytkowników.
+
+    Pomysły wszystkich profili są pobierane jednym zapytaniem.
+
+    Args:
+        expand (Expand): Wartość `ideas` dołącza pełne dane pomysłów.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+        loader (IdeaLoader): Wstrzyknięta zależność ładowania pomysłów.
+
+    Returns:
+        List[UserProfile | UserProfileWithIdeas]: Lista profili.
+    """
+    profile = await serwis.get_all_profiles()
+    return list(await asyncio.gather(
+        *(_expand(profil, expand, loader) for profil in profile)
+    ))
+
+
+@router.get("/nazwa/{nazwa}", response_model=UserProfileWithIdeas | UserProfile)
+@inject
+async def get_profile_by_username(
+    nazwa: str,
+    expand: Expand = Query(None, description="Dołącz pełne dane pomysłów"),
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+    loader: IdeaLoader = Depends(Provide[Container.idea_loader]),
+) -> UserProfile | UserProfileWithIdeas:
+    """
+    Endpoint do pobierania profilu po nazwie użytkownika.
+
+    Args:
+        nazwa (str): Nazwa użytkownika.
+        expand (Expand): Wartość `ideas` dołącza pełne dane pomysłów.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+        loader (IdeaLoader): Wstrzyknięta zależność ładowania pomysłów.
+
+    Returns:
+        UserProfile | UserProfileWithIdeas: Szczegóły profilu.
+    """
+    profil = await serwis.get_profile_by_username(nazwa)
+    if not profil:
+        raise HTTPException(status_code=404, detail="Nie znaleziono profilu")
+    return await _expand(profil, expand, loader)
+
+
+@router.get("/{uzytkownik_id}", response_model=UserProfileWithIdeas | UserProfile)
+@inject
+async def get_profile(
+    uzytkownik_id: int,
+    expand: Expand = Query(None, description="Dołącz pełne dane pomysłów"),
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+    loader: IdeaLoader = Depends(Provide[Container.idea_loader]),
+) -> UserProfile | UserProfileWithIdeas:
+    """
+    Endpoint do pobierania profilu użytkownika.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        expand (Expand): Wartość `ideas` dołącza pełne dane pomysłów.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+        loader (IdeaLoader): Wstrzyknięta zależność ładowania pomysłów.
+
+    Returns:
+        UserProfile | UserProfileWithIdeas: Szczegóły profilu.
+    """
+    profil = await serwis.get_profile_by_id(uzytkownik_id)
+    if not profil:
+        raise HTTPException(status_code=404, detail="Nie znaleziono profilu")
+    return await _expand(profil, expand, loader)
+
+
+@router.post("/dodaj", response_model=UserProfile, status_code=201)
+@inject
+async def create_profile(
+    nowy_profil: UserProfileIn,
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+) -> UserProfile:
+    """
+    Endpoint do tworzenia profilu użytkownika.
+
+    Args:
+        nowy_profil (UserProfileIn): Dane nowego profilu.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+
+    Returns:
+        UserProfile: Szczegóły utworzonego profilu.
+    """
+    if await serwis.get_profile_by_username(nowy_profil.username):
+        raise HTTPException(status_code=409, detail="Nazwa użytkownika jest zajęta")
+    return await serwis.create_profile(nowy_profil)
+
+
+@router.put("/{uzytkownik_id}", response_model=UserProfile)
+@inject
+async def update_profile(
+    uzytkownik_id: int,
+    profil: UserProfileIn,
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+) -> UserProfile:
+    """
+    Endpoint do aktualizacji profilu użytkownika.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        profil (UserProfileIn): Zaktualizowane dane profilu.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+
+    Returns:
+        UserProfile: Szczegóły zaktualizowanego profilu.
+    """
+    zaktualizowany = await serwis.update_profile(uzytkownik_id, profil)
+    if not zaktualizowany:
+        raise HTTPException(status_code=404, detail="Nie znaleziono profilu")
+    return zaktualizowany
+
+
+@router.delete("/{uzytkownik_id}", status_code=204)
+@inject
+async def delete_profile(
+    uzytkownik_id: int,
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+) -> None:
+    """
+    Endpoint do usuwania profilu użytkownika.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+    """
+    if not await serwis.delete_profile(uzytkownik_id):
+        raise HTTPException(status_code=404, detail="Nie znaleziono profilu")
+
+
+@router.post("/{uzytkownik_id}/obserwuj/{obserwowany_id}", status_code=204)
+@inject
+async def follow_user(
+    uzytkownik_id: int,
+    obserwowany_id: int,
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+) -> None:
+    """
+    Endpoint do obserwowania innego użytkownika.
+
+    Args:
+        uzytkownik_id (int): Identyfikator obserwującego użytkownika.
+        obserwowany_id (int): Identyfikator obserwowanego użytkownika.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+    """
+    if not await serwis.follow_user(uzytkownik_id, obserwowany_id):
+        raise HTTPException(
+            status_code=400,
+            detail="Nie udało się obserwować użytkownika",
+        )
+
+
+@router.delete("/{uzytkownik_id}/obserwuj/{obserwowany_id}", status_code=204)
+@inject
+async def unfollow_user(
+    uzytkownik_id: int,
+    obserwowany_id: int,
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+) -> None:
+    """
+    Endpoint do zakończenia obserwowania użytkownika.
+
+    Args:
+        uzytkownik_id (int): Identyfikator obserwującego użytkownika.
+        obserwowany_id (int): Identyfikator obserwowanego użytkownika.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+    """
+    if not await serwis.unfollow_user(uzytkownik_id, obserwowany_id):
+        raise HTTPException(status_code=404, detail="Użytkownik nie był obserwowany")
+
+
+@router.get("/{uzytkownik_id}/czy-obserwuje", response_model=dict[int, bool])
+@inject
+async def is_following(
+    uzytkownik_id: int,
+    id: List[int] = Query(
+        ...,
+        min_length=1,
+        max_length=MAX_PAGE_SIZE,
+        description="Identyfikatory sprawdzanych użytkowników",
+    ),
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+) -> dict[int, bool]:
+    """
+    Endpoint sprawdzający, których z podanych użytkowników obserwuje użytkownik.
+
+    Args:
+        uzytkownik_id (int): Identyfikator obserwującego użytkownika.
+        id (List[int]): Identyfikatory sprawdzanych użytkowników.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+
+    Returns:
+        dict[int, bool]: Informacja o obserwowaniu każdego z użytkowników.
+    """
+    return serwis.is_following(uzytkownik_id, id)
+
+
+@router.get("/{uzytkownik_id}/liczniki", response_model=FollowCounts)
+@inject
+async def get_follow_counts(
+    uzytkownik_id: int,
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+) -> FollowCounts:
+    """
+    Endpoint do pobierania liczby obserwujących i obserwowanych.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+
+    Returns:
+        FollowCounts: Liczba obserwujących i obserwowanych użytkowników.
+    """
+    return serwis.get_follow_counts(uzytkownik_id)
+
+
+@router.get("/{uzytkownik_id}/obserwujacy", response_model=List[int])
+@inject
+async def get_followers(
+    uzytkownik_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Rozmiar strony"),
+    after: Optional[int] = Query(
+        None, description="Identyfikator ostatniego użytkownika poprzedniej strony"
+    ),
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+) -> List[int]:
+    """
+    Endpoint do pobierania strony obserwujących użytkownika.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        response (Response): Odpowiedź, do której dodawany jest kursor.
+        limit (int): Maksymalna liczba identyfikatorów.
+        after (Optional[int]): Kursor – identyfikator ostatniego użytkownika.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+
+    Returns:
+        List[int]: Rosnące identyfikatory obserwujących.
+    """
+    obserwujacy = serwis.get_followers(uzytkownik_id, after, limit)
+    _set_next_cursor(response, obserwujacy, limit)
+    return obserwujacy
+
+
+@router.get("/{uzytkownik_id}/obserwowani", response_model=List[int])
+@inject
+async def get_following(
+    uzytkownik_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Rozmiar strony"),
+    after: Optional[int] = Query(
+        None, description="Identyfikator ostatniego użytkownika poprzedniej strony"
+    ),
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+) -> List[int]:
+    """
+    Endpoint do pobierania strony użytkowników obserwowanych przez użytkownika.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        response (Response): Odpowiedź, do której dodawany jest kursor.
+        limit (int): Maksymalna liczba identyfikatorów.
+        after (Optional[int]): Kursor – identyfikator ostatniego użytkownika.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+
+    Returns:
+        List[int]: Rosnące identyfikatory obserwowanych.
+    """
+    obserwowani = serwis.get_following(uzytkownik_id, after, limit)
+    _set_next_cursor(response, obserwowani, limit)
+    return obserwowani
+
+
+@router.get("/{uzytkownik_id}/wzajemni", response_model=List[int])
+@inject
+async def get_mutual_follows(
+    uzytkownik_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Rozmiar strony"),
+    after: Optional[int] = Query(
+        None, description="Identyfikator ostatniego użytkownika poprzedniej strony"
+    ),
+    serwis: IUserProfileService = Depends(Provide[Container.user_profile_service]),
+) -> List[int]:
+    """
+    Endpoint do pobierania użytkowników obserwujących się wzajemnie z użytkownikiem.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        response (Response): Odpowiedź, do której dodawany jest kursor.
+        limit (int): Maksymalna liczba identyfikatorów.
+        after (Optional[int]): Kursor – identyfikator ostatniego użytkownika.
+        serwis (IUserProfileService): Wstrzyknięta zależność serwisu profili.
+
+    Returns:
+        List[int]: Rosnące identyfikatory wzajemnie obserwujących.
+    """
+    wzajemni = serwis.get_mutual_follows(uzytkownik_id, after, limit)
+    _set_next_cursor(response, wzajemni, limit)
+    return wzajemni
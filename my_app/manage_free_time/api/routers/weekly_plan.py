@@ -0,0 +1,261 @@
+from datetime import date, timedelta
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query
+from typing import List, Literal, Optional
+from dependency_injector.wiring import Provide, inject
+
+from manage_free_time.infrastructure.container import Container
+from manage_free_time.core.domain.weekly_plan import (
+    WeeklyPlan,
+    WeeklyPlanIn,
+    WeeklyPlanWithIdeas,
+)
+from manage_free_time.infrastructure.loaders import IdeaLoader
+from manage_free_time.infrastructure.services.iweekly_plan import IWeeklyPlanService
+
+router = APIRouter()
+
+Expand = Optional[Literal["ideas"]]
+MAX_RANGE_DAYS = 366
+
+
+def _upcoming_monday() -> date:
+    """Zwraca najbliższy poniedziałek, licząc od dzisiaj włącznie."""
+    dzisiaj = date.today()
+    return dzisiaj + timedelta(days=-dzisiaj.weekday() % 7)
+
+
+async def _expand(
+    plan: WeeklyPlan,
+    expand: Expand,
+    loader: IdeaLoader,
+) -> WeeklyPlan | WeeklyPlanWithIdeas:
+    """Dołącza pomysły planu, jeśli klient o to poprosił."""
+    if expand != "ideas":
+        return plan
+    pomysly = await loader.load_many(plan.ideas_ids)
+    return WeeklyPlanWithIdeas(**plan.model_dump(), ideas=pomysly)
+
+
+@router.post("/generuj", status_code=202)
+@inject
+async def generate_all_plans(
+    zadania: BackgroundTasks,
+    tydzien: Optional[date] = Query(None, description="Pierwszy dzień tygodnia"),
+    serwis: IWeeklyPlanService = Depends(Provide[Container.weekly_plan_service]),
+) -> dict[str, str]:
+    """
+    Endpoint do generowania planów tygodniowych wszystkich użytkowników.
+
+    Plany są generowane w tle, po wysłaniu odpowiedzi.
+
+    Args:
+        zadania (BackgroundTasks): Zadania wykonywane po odpowiedzi.
+        tydzien (Optional[date]): Pierwszy dzień tygodnia, domyślnie
+            najbliższy poniedziałek.
+        serwis (IWeeklyPlanService): Wstrzyknięta zależność serwisu planów.
+
+    Returns:
+        dict[str, str]: Tydzień, dla którego generowane są plany.
+    """
+    tydzien = tydzien or _upcoming_monday()
+    zadania.add_task(serwis.generate_all_plans, tydzien)
+    return {"tydzien": tydzien.isoformat()}
+
+
+@router.post("/{uzytkownik_id}/generuj", response_model=WeeklyPlan)
+@inject
+async def generate_plan(
+    uzytkownik_id: int,
+    tydzien: Optional[date] = Query(None, description="Pierwszy dzień tygodnia"),
+    serwis: IWeeklyPlanService = Depends(Provide[Container.weekly_plan_service]),
+) -> WeeklyPlan:
+    """
+    Endpoint do generowania planu tygodniowego użytkownika z katalogu pomysłów.
+
+    Plan uwzględnia tagi pomysłów użytkownika, różnorodność kategorii
+    i nie powtarza pomysłów z poprzedniego planu. Plan na ten sam tydzień
+    jest zastępowany.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        tydzien (Optional[date]): Pierwszy dzień tygodnia, domyślnie
+            najbliższy poniedziałek.
+        serwis (IWeeklyPlanService): Wstrzyknięta zależność serwisu planów.
+
+    Returns:
+        WeeklyPlan: Wygenerowany plan.
+    """
+    plan = await serwis.generate_plan(uzytkownik_id, tydzien or _upcoming_monday())
+    if not plan:
+        raise HTTPException(
+            status_code=409, detail="Tydzień pokrywa się z innym planem"
+        )
+    return plan
+
+
+@router.get(
+    "/{uzytkownik_id}/dzien/{dzien}",
+    response_model=WeeklyPlanWithIdeas | WeeklyPlan,
+)
+@inject
+async def get_plan_covering(
+    uzytkownik_id: int,
+    dzien: date,
+    expand: Expand = Query(None, description="Dołącz pełne dane pomysłów"),
+    serwis: IWeeklyPlanService = Depends(Provide[Container.weekly_plan_service]),
+    loader: IdeaLoader = Depends(Provide[Container.idea_loader]),
+) -> WeeklyPlan | WeeklyPlanWithIdeas:
+    """
+    Endpoint do pobierania planu użytkownika obejmującego dany dzień.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        dzien (date): Dzień, którego dotyczy plan.
+        expand (Expand): Wartość `ideas` dołącza pełne dane pomysłów.
+        serwis (IWeeklyPlanService): Wstrzyknięta zależność serwisu planów.
+        loader (IdeaLoader): Wstrzyknięta zależność ładowania pomysłów.
+
+    Returns:
+        WeeklyPlan | WeeklyPlanWithIdeas: Szczegóły planu.
+    """
+    plan = await serwis.get_plan_covering(uzytkownik_id, dzien)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Nie znaleziono planu")
+    return await _expand(plan, expand, loader)
+
+
+@router.get("/{uzytkownik_id}/zakres", response_model=List[WeeklyPlan])
+@inject
+async def get_plans_in_range(
+    uzytkownik_id: int,
+    od: date = Query(..., description="Pierwszy dzień zakresu"),
+    koniec: date = Query(..., alias="do", description="Ostatni dzień zakresu"),
+    serwis: IWeeklyPlanService = Depends(Provide[Container.weekly_plan_service]),
+) -> List[WeeklyPlan]:
+    """
+    Endpoint do pobierania planów użytkownika z zakresu dat.
+
+    Zwracane są plany mające co najmniej jeden dzień wspólny z zakresem.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        od (date): Pierwszy dzień zakresu.
+        koniec (date): Ostatni dzień zakresu (parametr `do`).
+        serwis (IWeeklyPlanService): Wstrzyknięta zależność serwisu planów.
+
+    Returns:
+        List[WeeklyPlan]: Plany w kolejności tygodni.
+    """
+    if koniec < od:
+        raise HTTPException(
+            status_code=400, detail="Koniec zakresu poprzedza jego początek"
+        )
+    if (koniec - od).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Zakres może obejmować najwyżej {MAX_RANGE_DAYS} dni",
+        )
+    return await serwis.get_plans_in_range(uzytkownik_id, od, koniec)
+
+
+@router.get("/{uzytkownik_id}", response_model=WeeklyPlanWithIdeas | WeeklyPlan)
+@inject
+async def get_plan(
+    uzytkownik_id: int,
+    expand: Expand = Query(None, description="Dołącz pełne dane pomysłów"),
+    serwis: IWeeklyPlanService = Depends(Provide[Container.weekly_plan_service]),
+    loader: IdeaLoader = Depends(Provide[Container.idea_loader]),
+) -> WeeklyPlan | WeeklyPlanWithIdeas:
+    """
+    Endpoint do pobierania najnowszego planu tygodniowego użytkownika.
+
+    Z `expand=ideas` pomysły planu są pobierane jednym zapytaniem.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        expand (Expand): Wartość `ideas` dołącza pełne dane pomysłów.
+        serwis (IWeeklyPlanService): Wstrzyknięta zależność serwisu planów.
+        loader (IdeaLoader): Wstrzyknięta zależność ładowania pomysłów.
+
+    Returns:
+        WeeklyPlan | WeeklyPlanWithIdeas: Szczegóły planu.
+    """
+    plan = await serwis.get_plan_by_user(uzytkownik_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Nie znaleziono planu")
+    return await _expand(plan, expand, loader)
+
+
+@router.post("/{uzytkownik_id}", response_model=WeeklyPlan, status_code=201)
+@inject
+async def create_plan(
+    uzytkownik_id: int,
+    nowy_plan: WeeklyPlanIn,
+    serwis: IWeeklyPlanService = Depends(Provide[Container.weekly_plan_service]),
+) -> WeeklyPlan:
+    """
+    Endpoint do tworzenia planu tygodniowego użytkownika.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        nowy_plan (WeeklyPlanIn): Dane nowego planu.
+        serwis (IWeeklyPlanService): Wstrzyknięta zależność serwisu planów.
+
+    Returns:
+        WeeklyPlan: Szczegóły utworzonego planu.
+    """
+    plan = await serwis.create_plan(uzytkownik_id, nowy_plan)
+    if not plan:
+        raise HTTPException(
+            status_code=409, detail="Plan pokrywa się z innym planem użytkownika"
+        )
+    return plan
+
+
+@router.put("/{uzytkownik_id}/{tydzien}", response_model=WeeklyPlan)
+@inject
+async def update_plan(
+    uzytkownik_id: int,
+    tydzien: date,
+    plan: WeeklyPlanIn,
+    serwis: IWeeklyPlanService = Depends(Provide[Container.weekly_plan_service]),
+) -> WeeklyPlan:
+    """
+    Endpoint do aktualizacji planu tygodniowego użytkownika.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        tydzien (date): Pierwszy dzień aktualizowanego planu.
+        plan (WeeklyPlanIn): Zaktualizowane dane planu.
+        serwis (IWeeklyPlanService): Wstrzyknięta zależność serwisu planów.
+
+    Returns:
+        WeeklyPlan: Szczegóły zaktualizowanego planu.
+    """
+    if not await serwis.get_plan(uzytkownik_id, tydzien):
+        raise HTTPException(status_code=404, detail="Nie znaleziono planu")
+    zaktualizowany = await serwis.update_plan(uzytkownik_id, tydzien, plan)
+    if not zaktualizowany:
+        raise HTTPException(
+            status_code=409, detail="Plan pokrywa się z innym planem użytkownika"
+        )
+    return zaktualizowany
+
+
+@router.delete("/{uzytkownik_id}/{tydzien}", status_code=204)
+@inject
+async def delete_plan(
+    uzytkownik_id: int,
+    tydzien: date,
+    serwis: IWeeklyPlanService = Depends(Provide[Container.weekly_plan_service]),
+) -> None:
+    """
+    Endpoint do usuwania planu tygodniowego użytkownika.
+
+    Args:
+        uzytkownik_id (int): Identyfikator użytkownika.
+        tydzien (date): Pierwszy dzień usuwanego planu.
+        serwis (IWeeklyPlanService): Wstrzyknięta zależność serwisu planów.
+    """
+    if not await serwis.delete_plan(uzytkownik_id, tydzien):
+        raise HTTPException(status_code=404, detail="Nie znaleziono planu")
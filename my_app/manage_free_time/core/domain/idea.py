@@ -1,18 +1,29 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
-
-
-class IdeaIn(BaseModel):
-
-    title: str
-    category: str
-    tags: List[str]
-
-
-class Idea(IdeaIn):
-
-    id: int
-    user_id: int
-    model_config = ConfigDict(from_attributes=True, extra="ignore")
-
-
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+
+
+class IdeaIn(BaseModel):
+
+    title: str
+    category: str
+    tags: List[str]
+
+
+class Idea(IdeaIn):
+
+    id: int
+    user_id: int
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+
+class IdeaImportError(BaseModel):
+
+    line: int
+    error: str
+
+
+class IdeaImportReport(BaseModel):
+
+    imported: int = 0
+    failed: int = 0
+    errors: List[IdeaImportError] = []
@@ -1,13 +1,30 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
-
-
-class InvitationIn(BaseModel):
-    inviter_id: int
-    invitee_email: str
-    message: Optional[str] = None
-
-
-class Invitation(InvitationIn):
-    id: int
-    model_config = ConfigDict(from_attributes=True, extra="ignore")
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Optional
+
+
+class InvitationIn(BaseModel):
+    inviter_id: int
+    invitee_email: str
+    message: Optional[str] = None
+    event_id: Optional[int] = None
+
+
+class Invitation(InvitationIn):
+    id: int
+    status: str = "pending"
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+
+class InvitationJob(BaseModel):
+    id: str
+    status: str = "queued"
+    total: int
+    duplicates: int = 0
+    sent: int = 0
+    failed: int = 0
+
+
+class InvitationCounts(BaseModel):
+    inviter_id: Optional[int] = None
+    total: int
+    statuses: Dict[str, int]
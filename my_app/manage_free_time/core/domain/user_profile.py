@@ -1,16 +1,25 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
-
-class UserProfileIn(BaseModel):
-
-    username: str
-    bio: Optional[str]
-
-
-class UserProfile(UserProfileIn):
-    id: int
-    idea_ids: List[int]
-
-    model_config = ConfigDict(from_attributes=True, extra="ignore")
-
-
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+
+from manage_free_time.core.domain.idea import Idea
+
+class UserProfileIn(BaseModel):
+
+    username: str
+    bio: Optional[str]
+
+
+class UserProfile(UserProfileIn):
+    id: int
+    idea_ids: List[int]
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+
+class UserProfileWithIdeas(UserProfile):
+    ideas: List[Idea]
+
+
+class FollowCounts(BaseModel):
+    followers: int
+    following: int
@@ -1,14 +1,25 @@
-from datetime import date
-from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
-
-class WeeklyPlan(BaseModel):
-    user_id: int
-    week_start_date: str
-    week_end_date: str
-    ideas_ids: List[int]
-
-class WeeklyPlanIn(BaseModel):
-    week_start_date: str
-    week_end_date: str
-    ideas_ids: List[int]
\ No newline at end of file
+from datetime import date
+from pydantic import BaseModel, model_validator
+from typing import List, Optional
+
+from manage_free_time.core.domain.idea import Idea
+
+class WeeklyPlan(BaseModel):
+    user_id: int
+    week_start_date: date
+    week_end_date: date
+    ideas_ids: List[int]
+
+class WeeklyPlanIn(BaseModel):
+    week_start_date: date
+    week_end_date: date
+    ideas_ids: List[int]
+
+    @model_validator(mode="after")
+    def check_dates(self) -> "WeeklyPlanIn":
+        if self.week_end_date < self.week_start_date:
+            raise ValueError("week_end_date must not precede week_start_date")
+        return self
+
+class WeeklyPlanWithIdeas(WeeklyPlan):
+    ideas: List[Idea]
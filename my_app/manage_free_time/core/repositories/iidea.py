@@ -1,148 +1,282 @@
-from abc import ABC, abstractmethod
-from typing import Iterable
-from manage_free_time.core.domain.idea import Idea, IdeaIn
-from manage_free_time.core.domain.user_profile import UserProfile, UserProfileIn
-
-
-class IIdeaRepository(ABC):
-    """An abstract class representing protocol of idea repository."""
-
-    @abstractmethod
-    async def get_all_ideas(self) -> Iterable[Idea]:
-        """Retrieve all ideas from the data storage.
-
-        Returns:
-            Iterable[Idea]: Collection of ideas in the data storage.
-        """
-
-    @abstractmethod
-    async def get_by_category(self, category: str) -> Iterable[Idea]:
-        """Retrieve ideas filtered by category.
-
-        Args:
-            category (str): The category to filter by.
-
-        Returns:
-            Iterable[Idea]: Collection of ideas in the given category.
-        """
-
-    @abstractmethod
-    async def get_by_tags(self, tags: list[str]) -> Iterable[Idea]:
-        """Retrieve ideas filtered by tags.
-
-        Args:
-            tags (list[str]): List of tags to filter by.
-
-        Returns:
-            Iterable[Idea]: Collection of ideas matching the given tags.
-        """
-
-    @abstractmethod
-    async def get_by_user(self, user_id: int) -> Iterable[Idea]:
-        """Retrieve ideas created by a specific user.
-
-        Args:
-            user_id (int): The id of the user.
-
-        Returns:
-            Iterable[Idea]: Collection of user's ideas.
-        """
-
-    @abstractmethod
-    async def get_by_id(self, idea_id: int) -> Idea | None:
-        """Retrieve an idea by its id.
-
-        Args:
-            idea_id (int): The id of the idea.
-
-        Returns:
-            Idea | None: The details of the idea, or None if not found.
-        """
-
-    @abstractmethod
-    async def add_idea(self, data: IdeaIn, user_id: int) -> None:
-        """Add a new idea to the data storage.
-
-        Args:
-            data (IdeaIn): The details of the new idea.
-            user_id (int): The id of the user adding the idea.
-        """
-
-    @abstractmethod
-    async def update_idea(self, idea_id: int, data: IdeaIn) -> Idea | None:
-        """Update an existing idea in the data storage.
-
-        Args:
-            idea_id (int): The id of the idea.
-            data (IdeaIn): The updated details of the idea.
-
-        Returns:
-            Idea | None: The updated idea details, or None if not found.
-        """
-
-    @abstractmethod
-    async def delete_idea(self, idea_id: int) -> bool:
-        """Remove an idea from the data storage.
-
-        Args:
-            idea_id (int): The id of the idea.
-
-        Returns:
-            bool: Success of the operation.
-        """
-
-
-class IUserRepository(ABC):
-    """An abstract class representing protocol of user repository."""
-
-    @abstractmethod
-    async def get_all_users(self) -> Iterable[UserProfile]:
-        """Retrieve all user profiles from the data storage.
-
-        Returns:
-            Iterable[UserProfile]: Collection of user profiles.
-        """
-
-    @abstractmethod
-    async def get_user_by_id(self, user_id: int) -> UserProfile | None:
-        """Retrieve a user profile by id.
-
-        Args:
-            user_id (int): The id of the user.
-
-        Returns:
-            UserProfile | None: The user profile details, or None if not found.
-        """
-
-    @abstractmethod
-    async def add_user(self, data: UserProfileIn) -> None:
-        """Add a new user profile to the data storage.
-
-        Args:
-            data (UserProfileIn): The details of the new user profile.
-        """
-
-    @abstractmethod
-    async def update_user(
-        self, user_id: int, data: UserProfileIn
-    ) -> UserProfile | None:
-        """Update an existing user profile in the data storage.
-
-        Args:
-            user_id (int): The id of the user.
-            data (UserProfileIn): The updated user profile details.
-
-        Returns:
-            UserProfile | None: The updated profile, or None if not found.
-        """
-
-    @abstractmethod
-    async def delete_user(self, user_id: int) -> bool:
-        """Remove a user profile from the data storage.
-
-        Args:
-            user_id (int): The id of the user.
-
-        Returns:
-        bool: Success of the operation.
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterable
+from manage_free_time.core.domain.idea import Idea, IdeaIn
+from manage_free_time.core.domain.user_profile import UserProfile, UserProfileIn
+
+
+class IIdeaRepository(ABC):
+    """An abstract class representing protocol of idea repository."""
+
+    @abstractmethod
+    async def get_all_ideas(
+        self, after: int | None = None, limit: int | None = None
+    ) -> Iterable[Idea]:
+        """Retrieve all ideas from the data storage, ordered by id.
+
+        Args:
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Collection of ideas in the data storage.
+        """
+
+    @abstractmethod
+    async def get_by_category(
+        self, category: str, after: int | None = None, limit: int | None = None
+    ) -> Iterable[Idea]:
+        """Retrieve ideas filtered by category, ordered by id.
+
+        Args:
+            category (str): The category to filter by.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Collection of ideas in the given category.
+        """
+
+    @abstractmethod
+    def iter_ideas(
+        self,
+        category: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[Idea]:
+        """Stream ideas ordered by id without loading them all at once.
+
+        Args:
+            category (str | None): The category to filter by.
+            after (int | None): Only ideas with a greater id are yielded.
+            limit (int | None): The maximal number of yielded ideas.
+
+        Returns:
+            AsyncIterator[Idea]: Ideas yielded one by one.
+        """
+
+    @abstractmethod
+    async def get_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool = True,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> Iterable[Idea]:
+        """Retrieve ideas filtered by tags, ordered by id.
+
+        Args:
+            tags (list[str]): List of tags to filter by.
+            match_all (bool): Whether ideas must have all tags or any of them.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Collection of ideas matching the given tags.
+        """
+
+    @abstractmethod
+    async def search_by_title(
+        self,
+        query: str,
+        category: str | None = None,
+        tags: list[str] | None = None,
+        limit: int = 20,
+    ) -> Iterable[Idea]:
+        """Retrieve ideas whose titles contain the query.
+
+        Args:
+            query (str): The searched text.
+            category (str | None): The category to filter by.
+            tags (list[str] | None): Tags the ideas must all have.
+            limit (int): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Collection of matching ideas.
+        """
+
+    @abstractmethod
+    async def get_by_user(self, user_id: int) -> Iterable[Idea]:
+        """Retrieve ideas created by a specific user.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Iterable[Idea]: Collection of user's ideas.
+        """
+
+    @abstractmethod
+    async def get_by_id(self, idea_id: int) -> Idea | None:
+        """Retrieve an idea by its id.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            Idea | None: The details of the idea, or None if not found.
+        """
+
+    @abstractmethod
+    async def get_by_ids(self, idea_ids: list[int]) -> Iterable[Idea]:
+        """Retrieve ideas with the given ids, ordered by id.
+
+        Args:
+            idea_ids (list[int]): The ids of the ideas.
+
+        Returns:
+            Iterable[Idea]: The existing ideas among the requested ones.
+        """
+
+    @abstractmethod
+    async def get_random_idea(self, category: str | None = None) -> Idea | None:
+        """Retrieve a random idea, optionally from the given category.
+
+        Args:
+            category (str | None): The category to pick from.
+
+        Returns:
+            Idea | None: A random idea, or None if there are no ideas.
+        """
+
+    @abstractmethod
+    async def add_idea(self, data: IdeaIn, user_id: int) -> Idea | None:
+        """Add a new idea to the data storage.
+
+        Args:
+            data (IdeaIn): The details of the new idea.
+            user_id (int): The id of the user adding the idea.
+
+        Returns:
+            Idea | None: The newly added idea.
+        """
+
+    @abstractmethod
+    async def add_ideas(
+        self, data: list[IdeaIn], user_id: int
+    ) -> list[Idea | None]:
+        """Add many ideas to the data storage at once.
+
+        A row which cannot be stored does not prevent storing the others.
+
+        Args:
+            data (list[IdeaIn]): The details of the new ideas.
+            user_id (int): The id of the user adding the ideas.
+
+        Returns:
+            list[Idea | None]: The added ideas in the order of `data`,
+                with None in place of rows which failed.
+        """
+
+    @abstractmethod
+    async def add_ideas_by_users(
+        self, rows: list[tuple[IdeaIn, int]]
+    ) -> list[Idea | None]:
+        """Add many ideas of different users to the data storage at once.
+
+        A row which cannot be stored does not prevent storing the others.
+
+        Args:
+            rows (list[tuple[IdeaIn, int]]): The details of the new ideas
+                with the ids of the users adding them.
+
+        Returns:
+            list[Idea | None]: The added ideas in the order of `rows`,
+                None for rows which could not be stored.
+        """
+
+    @abstractmethod
+    async def update_idea(self, idea_id: int, data: IdeaIn) -> Idea | None:
+        """Update an existing idea in the data storage.
+
+        Args:
+            idea_id (int): The id of the idea.
+            data (IdeaIn): The updated details of the idea.
+
+        Returns:
+            Idea | None: The updated idea details, or None if not found.
+        """
+
+    @abstractmethod
+    async def update_ideas(
+        self, rows: list[tuple[int, IdeaIn]]
+    ) -> list[Idea | None]:
+        """Update many ideas in the data storage at once.
+
+        Rows are applied in order, so the last update of an idea wins.
+        A row which cannot be stored does not prevent storing the others.
+
+        Args:
+            rows (list[tuple[int, IdeaIn]]): The ids of the ideas with
+                their updated details.
+
+        Returns:
+            list[Idea | None]: The ideas as updated by each row, None for
+                missing ideas and rows which could not be stored.
+        """
+
+    @abstractmethod
+    async def delete_idea(self, idea_id: int) -> bool:
+        """Remove an idea from the data storage.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            bool: Success of the operation.
+        """
+
+
+class IUserRepository(ABC):
+    """An abstract class representing protocol of user repository."""
+
+    @abstractmethod
+    async def get_all_users(self) -> Iterable[UserProfile]:
+        """Retrieve all user profiles from the data storage.
+
+        Returns:
+            Iterable[UserProfile]: Collection of user profiles.
+        """
+
+    @abstractmethod
+    async def get_user_by_id(self, user_id: int) -> UserProfile | None:
+        """Retrieve a user profile by id.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            UserProfile | None: The user profile details, or None if not found.
+        """
+
+    @abstractmethod
+    async def add_user(self, data: UserProfileIn) -> None:
+        """Add a new user profile to the data storage.
+
+        Args:
+            data (UserProfileIn): The details of the new user profile.
+        """
+
+    @abstractmethod
+    async def update_user(
+        self, user_id: int, data: UserProfileIn
+    ) -> UserProfile | None:
+        """Update an existing user profile in the data storage.
+
+        Args:
+            user_id (int): The id of the user.
+            data (UserProfileIn): The updated user profile details.
+
+        Returns:
+            UserProfile | None: The updated profile, or None if not found.
+        """
+
+    @abstractmethod
+    async def delete_user(self, user_id: int) -> bool:
+        """Remove a user profile from the data storage.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+        bool: Success of the operation.
                 """
\ No newline at end of file
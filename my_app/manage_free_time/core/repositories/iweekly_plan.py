@@ -1,28 +1,56 @@
-from abc import ABC, abstractmethod
-from typing import Optional, Iterable
-from manage_free_time.core.domain.weekly_plan import WeeklyPlan, WeeklyPlanIn
-
-class IWeeklyPlanRepository(ABC):
-    """Abstrakcyjna klasa reprezentująca repozytorium planów na tydzień."""
-
-    @abstractmethod
-    async def get_plan_by_user(self, user_id: int) -> Optional[WeeklyPlan]:
-        """Pobiera plan na tydzień dla danego użytkownika."""
-        pass
-
-    @abstractmethod
-    async def create_weekly_plan(self, user_id: int, data: WeeklyPlanIn) -> WeeklyPlan:
-        """Tworzy nowy plan rozrywki na tydzień dla użytkownika."""
-        pass
-
-    @abstractmethod
-    async def update_weekly_plan(
-        self, user_id: int, data: WeeklyPlanIn
-    ) -> Optional[WeeklyPlan]:
-        """Aktualizuje plan rozrywki na tydzień dla użytkownika."""
-        pass
-
-    @abstractmethod
-    async def delete_weekly_plan(self, user_id: int) -> bool:
-        """Usuwa plan rozrywki na tydzień dla użytkownika."""
-        pass
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import AsyncIterator, Optional, Iterable
+from manage_free_time.core.domain.weekly_plan import WeeklyPlan, WeeklyPlanIn
+
+class IWeeklyPlanRepository(ABC):
+    """Abstrakcyjna klasa reprezentująca repozytorium planów na tydzień."""
+
+    @abstractmethod
+    async def get_plan_by_user(self, user_id: int) -> Optional[WeeklyPlan]:
+        """Pobiera najnowszy plan na tydzień dla danego użytkownika."""
+        pass
+
+    @abstractmethod
+    async def get_plan(self, user_id: int, week_start: date) -> Optional[WeeklyPlan]:
+        """Pobiera plan użytkownika zaczynający się w danym dniu."""
+        pass
+
+    @abstractmethod
+    async def get_plans(
+        self, user_id: int, week_starts: list[date]
+    ) -> Iterable[WeeklyPlan]:
+        """Pobiera plany użytkownika zaczynające się w danych dniach."""
+        pass
+
+    @abstractmethod
+    async def get_latest_plans(self, before: date) -> Iterable[WeeklyPlan]:
+        """Pobiera ostatni plan każdego użytkownika zaczynający się przed danym dniem."""
+        pass
+
+    @abstractmethod
+    def iter_plan_weeks(self) -> AsyncIterator[tuple[int, date, date]]:
+        """Strumieniuje identyfikatory użytkowników oraz zakresy dat wszystkich planów."""
+        pass
+
+    @abstractmethod
+    async def create_weekly_plan(self, user_id: int, data: WeeklyPlanIn) -> WeeklyPlan:
+        """Tworzy nowy plan rozrywki na tydzień dla użytkownika."""
+        pass
+
+    @abstractmethod
+    async def update_weekly_plan(
+        self, user_id: int, week_start: date, data: WeeklyPlanIn
+    ) -> Optional[WeeklyPlan]:
+        """Aktualizuje plan rozrywki użytkownika zaczynający się w danym dniu."""
+        pass
+
+    @abstractmethod
+    async def delete_weekly_plan(self, user_id: int, week_start: date) -> bool:
+        """Usuwa plan rozrywki użytkownika zaczynający się w danym dniu."""
+        pass
+
+    @abstractmethod
+    async def save_weekly_plans(self, plans: list[WeeklyPlan]) -> None:
+        """Zapisuje plany wielu użytkowników, zastępując plany na te same tygodnie."""
+        pass
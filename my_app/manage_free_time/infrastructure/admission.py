@@ -0,0 +1,436 @@
+"""Module containing the admission control of requests and repository calls.
+
+Requests of the rate limited routes take a token from the bucket of their
+client address and are rejected with 429 once it is empty. Repository
+calls and streams take one of a fixed number of slots; a call waiting
+longer than the deadline for a slot raises `Overloaded`, answered with
+503, instead of queueing for the pool until the client times out. Both
+answers carry `Retry-After`. Background tasks started within
+`ConcurrencyLimiter.exempt` do not take slots, so they never drop work
+because of requests.
+"""
+
+import asyncio
+import inspect
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Hashable,
+    Iterator,
+    Optional,
+    TypeVar,
+)
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from manage_free_time.infrastructure.config import config
+from manage_free_time.infrastructure.metrics import admission_rejections
+
+T = TypeVar("T")
+
+
+class Overloaded(Exception):
+    """An exception raised when a call waited too long for a free slot."""
+
+    retry_after: int
+
+    def __init__(self, retry_after: int) -> None:
+        """The initializer of the `Overloaded`.
+
+        Args:
+            retry_after (int): Seconds after which the client may retry.
+        """
+        super().__init__("no free slot within the deadline")
+        self.retry_after = retry_after
+
+
+class TokenBuckets:
+    """A class limiting the rate of events per key with token buckets.
+
+    A bucket holds up to `burst` tokens and gains `rate` tokens per second;
+    an event takes one token. Buckets are kept in the order of their last
+    use, so the least recently used one is checked and dropped in O(1).
+    A bucket idle long enough to refill completely is the same as a new
+    one and is dropped when a new key arrives, as is the oldest bucket
+    once there are `max_keys` of them.
+    """
+
+    _rate: float
+    _burst: float
+    _max_keys: int
+    _refill_time: float
+    _buckets: OrderedDict[Hashable, list[float]]
+
+    def __init__(self, rate: float, burst: float, max_keys: int) -> None:
+        """The initializer of the `TokenBuckets`.
+
+        Args:
+            rate (float): Tokens gained per second.
+            burst (float): The capacity of a bucket.
+            max_keys (int): The maximal number of buckets kept.
+        """
+        self._rate = rate
+        self._burst = burst
+        self._max_keys = max_keys
+        self._refill_time = burst / rate
+        self._buckets = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: Hashable, now: float) -> float:
+        """The method taking a token from the bucket of a key.
+
+        Args:
+            key (Hashable): The key, e.g. the user sending a request.
+            now (float): The current time in seconds of a monotonic clock.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until the
+                bucket has one.
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._evict(now)
+            bucket = self._buckets[key] = [self._burst, now]
+        else:
+            self._buckets.move_to_end(key)
+
+        tokens = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+        bucket[1] = now
+        if tokens < 1.0:
+            bucket[0] = tokens
+            return (1.0 - tokens) / self._rate
+
+        bucket[0] = tokens - 1.0
+        return 0.0
+
+    def _evict(self, now: float) -> None:
+        """Drop the buckets that refilled and make room for a new one.
+
+        Args:
+            now (float): The current time.
+        """
+        buckets = self._buckets
+        while buckets:
+            _, updated = next(iter(buckets.values()))
+            if len(buckets) < self._max_keys and now - updated < self._refill_time:
+                return
+            buckets.popitem(last=False)
+
+
+class ConcurrencyLimiter:
+    """A class bounding the number of calls running at once.
+
+    Calls beyond `limit` wait in FIFO order, a finished call hands its slot
+    straight to the first waiter. A waiter still queued after `max_wait`
+    seconds fails with `Overloaded`. A call made while its task already
+    holds a slot, e.g. a repository method calling another one, runs
+    without taking a second slot, so nested calls cannot deadlock. The
+    same applies within `exempt`, which tasks created there inherit.
+    """
+
+    _limit: int
+    _max_wait: float
+    _retry_after: int
+    _busy: int
+    _waiters: deque[asyncio.Future]
+    _holding: ContextVar[bool]
+
+    def __init__(self, limit: int, max_wait: float, retry_after: int = 1) -> None:
+        """The initializer of the `ConcurrencyLimiter`.
+
+        Args:
+            limit (int): The maximal number of calls running at once.
+            max_wait (float): Seconds a call may wait for a slot.
+            retry_after (int): Seconds suggested to rejected clients.
+        """
+        self._limit = limit
+        self._max_wait = max_wait
+        self._retry_after = retry_after
+        self._busy = 0
+        self._waiters = deque()
+        self._holding = ContextVar(f"holding_{id(self)}", default=False)
+
+    def stats(self) -> tuple[int, int]:
+        """The method getting the numbers of running and waiting calls.
+
+        Returns:
+            tuple[int, int]: The busy slots and the queued calls.
+        """
+        return self._busy, sum(not waiter.done() for waiter in self._waiters)
+
+    async def run(self, call: Callable[[], Any]) -> Any:
+        """The method running a call once a slot is free.
+
+        Args:
+            call (Callable[[], Any]): The function starting the call.
+
+        Returns:
+            Any: The result of the call.
+
+        Raises:
+            Overloaded: If no slot got free within `max_wait` seconds.
+        """
+        if self._holding.get():
+            return await call()
+
+        await self._acquire()
+        token = self._holding.set(True)
+        try:
+            return await call()
+        finally:
+            self._holding.reset(token)
+            self._release()
+
+    async def stream(
+        self, call: Callable[[], AsyncIterator[T]]
+    ) -> AsyncIterator[T]:
+        """The method iterating a stream in a slot held until it ends.
+
+        The slot is taken when the first item is requested and released
+        once the stream is exhausted or closed.
+
+        Args:
+            call (Callable[[], AsyncIterator[T]]): The function starting
+                the stream.
+
+        Yields:
+            T: The items of the stream.
+
+        Raises:
+            Overloaded: If no slot got free within `max_wait` seconds.
+        """
+        if self._holding.get():
+            async for item in call():
+                yield item
+            return
+
+        await self._acquire()
+        try:
+            async for item in call():
+                yield item
+        finally:
+            self._release()
+
+    @contextmanager
+    def exempt(self) -> Iterator[None]:
+        """The method letting calls of the current context skip the slots.
+
+        Meant for starting background tasks, e.g. queues flushing to the
+        database: they bound their own concurrency, and failing them with
+        `Overloaded` while requests hold the slots would drop their work.
+        """
+        token = self._holding.set(True)
+        try:
+            yield
+        finally:
+            self._holding.reset(token)
+
+    async def _acquire(self) -> None:
+        """Take a slot, waiting for one at most `max_wait` seconds."""
+        waiters = self._waiters
+        while waiters and waiters[0].done():
+            waiters.popleft()
+        if self._busy < self._limit and not waiters:
+            self._busy += 1
+            return
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        waiters.append(waiter)
+        timer = loop.call_later(self._max_wait, self._expire, waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            granted = (
+                waiter.done()
+                and not waiter.cancelled()
+                and waiter.exception() is None
+            )
+            if granted:
+                self._release()
+            raise
+        finally:
+            timer.cancel()
+
+    def _release(self) -> None:
+        """Hand the slot to the first waiter or free it."""
+        waiters = self._waiters
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self._busy -= 1
+
+    def _expire(self, waiter: asyncio.Future) -> None:
+        """Fail a waiter still queued at its deadline.
+
+        Args:
+            waiter (asyncio.Future): The future of the waiting call.
+        """
+        if not waiter.done():
+            admission_rejections.labels("overload").inc()
+            waiter.set_exception(Overloaded(self._retry_after))
+
+
+def limited(cls: type[T], limiter: ConcurrencyLimiter) -> type[T]:
+    """Create a subclass running every public coroutine method in a slot.
+
+    Public async generators hold a slot for the whole iteration.
+
+    Args:
+        cls (type[T]): The class of a repository.
+        limiter (ConcurrencyLimiter): The limiter shared by repositories.
+
+    Returns:
+        type[T]: The subclass with the same name.
+    """
+    namespace: dict[str, Any] = {
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "__doc__": cls.__doc__,
+    }
+    for name, function in inspect.getmembers(cls, inspect.isfunction):
+        if name.startswith("_"):
+            continue
+        if isinstance(inspect.getattr_static(cls, name), (staticmethod, classmethod)):
+            continue
+
+        if inspect.iscoroutinefunction(function):
+            namespace[name] = _in_slot(function, limiter)
+        elif inspect.isasyncgenfunction(function):
+            namespace[name] = _stream_in_slot(function, limiter)
+
+    return type(cls.__name__, (cls,), namespace)
+
+
+def _in_slot(function: Callable, limiter: ConcurrencyLimiter) -> Callable:
+    """Wrap a coroutine method to run in a slot of the limiter.
+
+    Args:
+        function (Callable): The method.
+        limiter (ConcurrencyLimiter): The limiter.
+
+    Returns:
+        Callable: The wrapper.
+    """
+    @wraps(function)
+    async def in_slot(*args: Any, **kwargs: Any) -> Any:
+        return await limiter.run(lambda: function(*args, **kwargs))
+
+    return in_slot
+
+
+def _stream_in_slot(function: Callable, limiter: ConcurrencyLimiter) -> Callable:
+    """Wrap an async generator method to iterate in a slot of the limiter.
+
+    Args:
+        function (Callable): The method.
+        limiter (ConcurrencyLimiter): The limiter.
+
+    Returns:
+        Callable: The wrapper.
+    """
+    @wraps(function)
+    def stream_in_slot(*args: Any, **kwargs: Any) -> AsyncIterator:
+        return limiter.stream(lambda: function(*args, **kwargs))
+
+    return stream_in_slot
+
+
+class RateLimitMiddleware:
+    """An ASGI middleware limiting the rate of requests per user and route.
+
+    The limits are read from `RATE_LIMITS`, keyed by the method and the
+    path of a route, e.g. `GET /idea/losowy`, with the number of requests
+    per second and the burst of every client. A client is the address of
+    the connection: the `uzytkownik_id` query parameter is chosen by the
+    caller, so keying on it would let a client escape its limit by
+    changing it or spend the budget of another user. Behind a reverse
+    proxy uvicorn must be run with `--proxy-headers` and
+    `--forwarded-allow-ips`, otherwise all clients share the address of
+    the proxy. Requests to other paths pass through untouched.
+    """
+
+    _app: ASGIApp
+    _max_keys: int
+    _routes: dict[str, tuple[tuple[float, float], TokenBuckets, Any]]
+
+    def __init__(self, app: ASGIApp, max_keys: int = 100_000) -> None:
+        """The initializer of the `RateLimitMiddleware`.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            max_keys (int): The maximal number of clients kept per route.
+        """
+        self._app = app
+        self._max_keys = max_keys
+        self._routes = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            route = f"{scope['method']} {scope['path']}"
+            limit = config.RATE_LIMITS.get(route)
+            if limit is not None:
+                wait = self._take(route, tuple(limit), scope)
+                if wait:
+                    response = JSONResponse(
+                        {"detail": "Zbyt wiele żądań, spróbuj ponownie później"},
+                        status_code=429,
+                        headers={"Retry-After": str(max(1, math.ceil(wait)))},
+                    )
+                    await response(scope, receive, send)
+                    return
+
+        await self._app(scope, receive, send)
+
+    def _take(
+        self, route: str, limit: tuple[float, float], scope: Scope
+    ) -> float:
+        """Take a token of the client sending a request.
+
+        Args:
+            route (str): The method and the path of the request.
+            limit (tuple[float, float]): The rate and the burst of the route.
+            scope (Scope): The scope of the request.
+
+        Returns:
+            float: 0 if the request is admitted, otherwise seconds to wait.
+        """
+        entry = self._routes.get(route)
+        if entry is None or entry[0] != limit:
+            entry = self._routes[route] = (
+                limit,
+                TokenBuckets(*limit, max_keys=self._max_keys),
+                admission_rejections.labels("rate_limit"),
+            )
+
+        _, buckets, rejections = entry
+        wait = buckets.take(_client(scope), time.monotonic())
+        if wait:
+            rejections.inc()
+        return wait
+
+
+def _client(scope: Scope) -> Hashable:
+    """Identify the client sending a request.
+
+    Args:
+        scope (Scope): The scope of the request.
+
+    Returns:
+        Hashable: The address of the client.
+    """
+    client: Optional[tuple[str, int]] = scope.get("client")
+    return client[0] if client else ""
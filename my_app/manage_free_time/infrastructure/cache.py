@@ -0,0 +1,290 @@
+"""A module providing the in-process cache used by repository decorators."""
+
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional
+
+from manage_free_time.infrastructure.metrics import cache_requests
+
+MISSING = object()
+
+
+class LRUCache:
+    """A class implementing a bounded LRU cache with TTLs and tags.
+
+    Every entry may be labelled with tags, e.g. `idea:7` or `category:sport`.
+    Invalidating a tag drops exactly the entries labelled with it, which
+    lets write paths evict only the results they may have changed.
+
+    A result loaded while one of its tags is invalidated may predate the
+    write, so loads are bracketed by `start_load` and `finish_load` and
+    `set` skips a value with a tag invalidated since its load started.
+    Invalidations are only remembered while a load is in flight.
+    """
+
+    _entries: OrderedDict[Hashable, tuple[float, Any, tuple[str, ...]]]
+    _keys_by_tag: defaultdict[str, set[Hashable]]
+    _max_entries: int
+    _generation: int
+    _invalidated_at: dict[str, int]
+    _cleared_at: int
+    _loads: int
+
+    def __init__(self, max_entries: int) -> None:
+        """The initializer of the `LRUCache`.
+
+        Args:
+            max_entries (int): The maximal number of stored entries.
+        """
+        self._entries = OrderedDict()
+        self._keys_by_tag = defaultdict(set)
+        self._max_entries = max_entries
+        self._generation = 0
+        self._invalidated_at = {}
+        self._cleared_at = 0
+        self._loads = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """The method getting a fresh value from the cache.
+
+        Args:
+            key (Hashable): The key of the entry.
+
+        Returns:
+            Any: The cached value (possibly None) or `MISSING`.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        expires_at, value, _ = entry
+        if expires_at < time.monotonic():
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: float,
+        tags: Iterable[str] = (),
+        since: Optional[int] = None,
+    ) -> None:
+        """The method storing a value, evicting the least recently used one.
+
+        Args:
+            key (Hashable): The key of the entry.
+            value (Any): The value to store.
+            ttl (float): Time to live of the entry in seconds.
+            tags (Iterable[str]): Labels used for invalidation.
+            since (Optional[int]): The generation returned by `start_load`
+                before the value was loaded; the value is not stored if
+                any of its tags was invalidated after it.
+        """
+        if ttl <= 0 or self._max_entries <= 0:
+            return
+
+        tags = tuple(tags)
+        if since is not None and (
+            self._cleared_at > since
+            or any(self._invalidated_at.get(tag, -1) > since for tag in tags)
+        ):
+            return
+
+        if key in self._entries:
+            self._drop(key)
+
+        self._entries[key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self._keys_by_tag[tag].add(key)
+
+        while len(self._entries) > self._max_entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, *tags: str) -> int:
+        """The method removing all entries labelled with any of the tags.
+
+        Args:
+            *tags (str): The tags to invalidate.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        self._generation += 1
+        removed = 0
+        for tag in tags:
+            if self._loads:
+                self._invalidated_at[tag] = self._generation
+            for key in self._keys_by_tag.pop(tag, ()):
+                if key in self._entries:
+                    self._drop(key)
+                    removed += 1
+
+        self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        """The method removing all entries."""
+        self._generation += 1
+        self._cleared_at = self._generation
+        self._entries.clear()
+        self._keys_by_tag.clear()
+
+    def start_load(self) -> int:
+        """The method marking the start of loading a value to store.
+
+        Every call must be followed by a call of `finish_load`.
+
+        Returns:
+            int: The generation to pass to `set` as `since`.
+        """
+        self._loads += 1
+        return self._generation
+
+    def finish_load(self) -> None:
+        """The method marking the end of loading a value."""
+        self._loads -= 1
+        if not self._loads:
+            self._invalidated_at.clear()
+
+    def stats(self) -> dict[str, int]:
+        """The method getting the counters of the cache.
+
+        Returns:
+            dict[str, int]: Sizes and hit, miss and eviction counters.
+        """
+        return {
+            "entries": len(self._entries),
+            "max_entries": self._max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _drop(self, key: Hashable) -> None:
+        """Remove an entry together with its tag references.
+
+        Args:
+            key (Hashable): The key of the entry.
+        """
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tag[tag]
+
+
+class CachingRepository:
+    """A base class of read-through caching decorators of repositories.
+
+    Subclasses implement a repository interface by delegating to the
+    wrapped repository through `_read` and invalidating tags on writes.
+    """
+
+    namespace: str = ""
+
+    _cache: LRUCache
+    _ttls: dict[str, float]
+    _default_ttl: float
+    _negative_ttl: float
+    _counters: dict[str, tuple[Any, Any]]
+
+    def __init__(
+        self,
+        cache: LRUCache,
+        ttls: dict[str, float],
+        default_ttl: float,
+        negative_ttl: float,
+    ) -> None:
+        """The initializer of the `CachingRepository`.
+
+        Args:
+            cache (LRUCache): The cache shared by the decorators.
+            ttls (dict[str, float]): TTLs by `<namespace>.<method>`; 0
+                disables caching of the method.
+            default_ttl (float): TTL of methods missing in `ttls`.
+            negative_ttl (float): TTL of cached "not found" results.
+        """
+        self._cache = cache
+        self._ttls = ttls
+        self._default_ttl = default_ttl
+        self._negative_ttl = negative_ttl
+        self._counters = {}
+
+    def _ttl(self, method: str) -> float:
+        """Get the TTL configured for a method of this repository.
+
+        Args:
+            method (str): The name of the method.
+
+        Returns:
+            float: The TTL in seconds.
+        """
+        return self._ttls.get(f"{self.namespace}.{method}", self._default_ttl)
+
+    async def _read(
+        self,
+        method: str,
+        arguments: tuple,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Callable[[Any], Iterable[str]],
+    ) -> Any:
+        """Return a cached result or load and cache it.
+
+        Args:
+            method (str): The name of the repository method.
+            arguments (tuple): Hashable arguments of the call.
+            loader (Callable[[], Awaitable[Any]]): Loads the result on a miss.
+            tags (Callable[[Any], Iterable[str]]): Tags of the loaded result.
+
+        Returns:
+            Any: The result of the method.
+        """
+        ttl = self._ttl(method)
+        if ttl <= 0:
+            return await loader()
+
+        counters = self._counters.get(method)
+        if counters is None:
+            counters = self._counters[method] = (
+                cache_requests.labels(self.namespace, method, "hit"),
+                cache_requests.labels(self.namespace, method, "miss"),
+            )
+
+        key = (self.namespace, method, arguments)
+        value = self._cache.get(key)
+        if value is not MISSING:
+            counters[0].inc()
+            return value
+
+        counters[1].inc()
+        since = self._cache.start_load()
+        try:
+            value = await loader()
+            if value is None:
+                ttl = min(ttl, self._negative_ttl)
+            self._cache.set(key, value, ttl, tags(value), since)
+        finally:
+            self._cache.finish_load()
+        return value
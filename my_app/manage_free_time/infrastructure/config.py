@@ -1,20 +1,110 @@
-"""A module providing configuration variables."""
-
-from typing import Optional
-from pydantic_settings import BaseSettings, SettingsConfigDict
-
-
-class BaseConfig(BaseSettings):
-    """A class containing base settings configuration."""
-    model_config = SettingsConfigDict(extra="ignore")
-
-
-class AppConfig(BaseConfig):
-    """A class containing app's configuration."""
-    DB_HOST: Optional[str] = None
-    DB_NAME: Optional[str] = None
-    DB_USER: Optional[str] = None
-    DB_PASSWORD: Optional[str] = None
-
-
+"""A module providing configuration variables."""
+
+from typing import Literal, Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class BaseConfig(BaseSettings):
+    """A class containing base settings configuration."""
+    model_config = SettingsConfigDict(extra="ignore")
+
+
+class AppConfig(BaseConfig):
+    """A class containing app's configuration."""
+    DB_HOST: Optional[str] = None
+    DB_NAME: Optional[str] = None
+    DB_USER: Optional[str] = None
+    DB_PASSWORD: Optional[str] = None
+
+    DB_POOL_MIN_SIZE: int = 5
+    DB_POOL_MAX_SIZE: int = 20
+    DB_STATEMENT_CACHE_SIZE: int = 1024
+    DB_COMMAND_TIMEOUT: float = 10.0
+
+    # "columnar" keeps ideas only in the memory of a single process, e.g. for
+    # demos: it starts empty and the ideas listed in user profiles still come
+    # from the database. Every worker would have its own store assigning the
+    # same ids, so a worker refuses to start while another process of the
+    # host holds IDEA_STORE_LOCK_PATH; run uvicorn without --workers.
+    IDEA_STORE: Literal["postgres", "columnar"] = "postgres"
+    IDEA_STORE_LOCK_PATH: str = "/tmp/manage_free_time/columnar.lock"
+
+    IMPORT_BATCH_SIZE: int = 5_000
+    # Write-behind mode: concurrent adds and updates of ideas are stored
+    # together, at most IDEA_WRITE_BATCH_SIZE rows or every
+    # IDEA_WRITE_BATCH_WAIT seconds.
+    IDEA_WRITE_BEHIND: bool = False
+    IDEA_WRITE_BATCH_SIZE: int = 200
+    IDEA_WRITE_BATCH_WAIT: float = 0.005
+    IDEA_LIST_RESPONSE: Literal["validated", "models", "rows"] = "models"
+    IDEA_LIST_MAX_AGE: int = 0
+    # File the indexes are loaded from at startup, shared by the workers of
+    # a host; only ideas changed since it was written are read from the
+    # database. Every IDEA_SNAPSHOT_INTERVAL seconds it is written again if
+    # IDEA_SNAPSHOT_MAX_CHANGES ideas changed since, pruning the change log,
+    # by the one worker holding the lock file next to it. Off by default;
+    # the log of changed ideas is only kept while a path is set.
+    IDEA_SNAPSHOT_PATH: Optional[str] = None
+    IDEA_SNAPSHOT_MAX_CHANGES: int = 10_000
+    IDEA_SNAPSHOT_PRUNE: bool = True
+    IDEA_SNAPSHOT_INTERVAL: float = 600.0
+
+    RANDOM_AFFINITY_BOOST: float = 4.0
+    RANDOM_AFFINITY_MAX_TAGS: int = 32
+    RANDOM_RECENT_SIZE: int = 50
+    RANDOM_MAX_USERS: int = 100_000
+    RANDOM_TABLE_MAX_AGE: float = 5.0
+
+    SIMILAR_BANDS: int = 16
+    SIMILAR_ROWS: int = 2
+    SIMILAR_CANDIDATES_PER_BAND: int = 200
+    SIMILAR_MAX_CANDIDATES: int = 2_000
+
+    FEED_TIMELINE_SIZE: int = 300
+    FEED_FANOUT_THRESHOLD: int = 10_000
+
+    INVITATION_SENDER: Literal["smtp", "memory"] = "memory"
+    INVITATION_BATCH_SIZE: int = 500
+    INVITATION_BATCH_WAIT: float = 0.05
+    INVITATION_CONCURRENCY: int = 20
+    INVITATION_MAX_ATTEMPTS: int = 5
+    INVITATION_RETRY_DELAY: float = 0.5
+    INVITATION_MAX_JOBS: int = 10_000
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_SENDER: str = "noreply@managefreetime.local"
+    SMTP_USER: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+
+    PLAN_SIZE: int = 7
+    PLAN_FEATURES_MAX_AGE: float = 600.0
+    PLAN_SAVE_BATCH_SIZE: int = 1_000
+
+    METRICS_ENABLED: bool = True
+
+    # Requests per second and the burst allowed to every client of a route,
+    # keyed by "METHOD /path"; an empty dict turns rate limiting off.
+    RATE_LIMITS: dict[str, tuple[float, float]] = {
+        "POST /idea/dodaj": (2.0, 10.0),
+        "GET /idea/losowy": (20.0, 40.0),
+    }
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    # Database repository calls running at once, 0 for no limit. A call
+    # waiting longer than REPOSITORY_MAX_WAIT seconds is answered with 503.
+    REPOSITORY_MAX_CONCURRENCY: int = 20
+    REPOSITORY_MAX_WAIT: float = 2.0
+    OVERLOAD_RETRY_AFTER: int = 1
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_DEFAULT_TTL: float = 30.0
+    CACHE_NEGATIVE_TTL: float = 5.0
+    CACHE_TTLS: dict[str, float] = {
+        "ideas.get_all_ideas": 0.0,
+        "ideas.get_by_id": 300.0,
+        "profiles.get_by_id": 120.0,
+        "profiles.get_by_username": 120.0,
+    }
+
+
 config = AppConfig()
\ No newline at end of file
@@ -1,35 +1,236 @@
-
-"""Module providing containers injecting dependencies."""
-
-from dependency_injector.containers import DeclarativeContainer
-from dependency_injector.providers import Factory, Singleton
-
-from manage_free_time.infrastructure.repositories.airportmock import \
-    AirportMockRepository
-from airportapi.infrastructure.repositories.continentmock import \
-    ContinentRepository
-from airportapi.infrastructure.repositories.countrymock import \
-    CountryMockRepository
-from airportapi.infrastructure.services.airport import AirportService
-from airportapi.infrastructure.services.continent import ContinentService
-from airportapi.infrastructure.services.country import CountryService
-
-
-class Container(DeclarativeContainer):
-    """Container class for dependency injecting purposes."""
-    continent_repository = Singleton(ContinentRepository)
-    country_repository = Singleton(CountryMockRepository)
-    airport_repository = Singleton(AirportMockRepository)
-
-    continent_service = Factory(
-        ContinentService,
-        repository=continent_repository,
-    )
-    country_service = Factory(
-        CountryService,
-        repository=country_repository,
-    )
-    airport_service = Factory(
-        AirportService,
-        repository=airport_repository,
-    )
+
+"""Module providing containers injecting dependencies."""
+
+from dependency_injector.containers import DeclarativeContainer
+from dependency_injector.providers import Factory, Object, Selector, Singleton
+
+from manage_free_time.infrastructure.admission import ConcurrencyLimiter, limited
+from manage_free_time.infrastructure.cache import LRUCache
+from manage_free_time.infrastructure.idea_writer import IdeaWriteQueue
+from manage_free_time.infrastructure.config import config
+from manage_free_time.infrastructure.indexes.category import CategoryIndex
+from manage_free_time.infrastructure.indexes.feed import FeedStore
+from manage_free_time.infrastructure.indexes.follows import FollowGraph
+from manage_free_time.infrastructure.indexes.picker import PersonalizedPicker
+from manage_free_time.infrastructure.indexes.plans import PlanIntervalIndex
+from manage_free_time.infrastructure.indexes.search import SearchIndex
+from manage_free_time.infrastructure.indexes.similar import SimilarityIndex
+from manage_free_time.infrastructure.indexes.tags import TagIndex
+from manage_free_time.infrastructure.indexes.versions import \
+    CollectionVersions
+from manage_free_time.infrastructure.invitation_queue import InvitationQueue
+from manage_free_time.infrastructure.loaders import IdeaLoader
+from manage_free_time.infrastructure.metrics import instrumented
+from manage_free_time.infrastructure.planning import PlanGenerator
+from manage_free_time.infrastructure.repositories.ideacached import \
+    CachedIdeaRepository
+from manage_free_time.infrastructure.repositories.ideacolumnar import \
+    ColumnarIdeaRepository
+from manage_free_time.infrastructure.repositories.idea_versionsdb import \
+    IdeaVersionRepository
+from manage_free_time.infrastructure.repositories.ideadb import IdeaRepository
+from manage_free_time.infrastructure.repositories.invitationsdb import \
+    InvitationRepository
+from manage_free_time.infrastructure.repositories.user_profilecached import \
+    CachedUserProfileRepository
+from manage_free_time.infrastructure.repositories.user_profiledb import \
+    UserProfileRepository
+from manage_free_time.infrastructure.repositories.weekly_plancached import \
+    CachedWeeklyPlanRepository
+from manage_free_time.infrastructure.repositories.weekly_plandb import \
+    WeeklyPlanRepository
+from manage_free_time.infrastructure.senders import (
+    MemoryInvitationSender,
+    SmtpInvitationSender,
+)
+from manage_free_time.infrastructure.services.idea import IdeaService
+from manage_free_time.infrastructure.services.invitations import \
+    InvitationService
+from manage_free_time.infrastructure.services.user_profile import \
+    UserProfileService
+from manage_free_time.infrastructure.services.weekly_plan import \
+    WeeklyPlanService
+from manage_free_time.infrastructure.snapshot import IdeaSnapshots
+
+timed = instrumented if config.METRICS_ENABLED else lambda cls: cls
+
+repository_limiter = ConcurrencyLimiter(
+    limit=config.REPOSITORY_MAX_CONCURRENCY,
+    max_wait=config.REPOSITORY_MAX_WAIT,
+    retry_after=config.OVERLOAD_RETRY_AFTER,
+)
+
+
+def guarded(cls: type) -> type:
+    """Time a database repository and run its calls in shared slots."""
+    if not config.REPOSITORY_MAX_CONCURRENCY:
+        return timed(cls)
+
+    return limited(timed(cls), repository_limiter)
+
+
+# Lists are answered with ETags of versions shared by all workers, so a
+# page cached by one worker could be served under the version of a write
+# made through another; they are read from the database instead.
+IDEA_CACHE_TTLS = (
+    {
+        **config.CACHE_TTLS,
+        "ideas.get_all_ideas": 0.0,
+        "ideas.get_by_category": 0.0,
+        "ideas.get_ideas_json": 0.0,
+    }
+    if config.IDEA_STORE == "postgres"
+    else config.CACHE_TTLS
+)
+
+
+class Container(DeclarativeContainer):
+    """Container class for dependency injecting purposes."""
+    repository_cache = Singleton(LRUCache, max_entries=config.CACHE_MAX_ENTRIES)
+    repository_slots = Object(repository_limiter)
+
+    idea_store = Selector(
+        Object(config.IDEA_STORE),
+        postgres=Singleton(guarded(IdeaRepository)),
+        columnar=Singleton(timed(ColumnarIdeaRepository)),
+    )
+    idea_repository = Singleton(
+        timed(CachedIdeaRepository),
+        repository=idea_store,
+        cache=repository_cache,
+        ttls=IDEA_CACHE_TTLS,
+        default_ttl=config.CACHE_DEFAULT_TTL,
+        negative_ttl=config.CACHE_NEGATIVE_TTL,
+    )
+    user_profile_repository = Singleton(
+        timed(CachedUserProfileRepository),
+        repository=Singleton(guarded(UserProfileRepository)),
+        cache=repository_cache,
+        ttls=config.CACHE_TTLS,
+        default_ttl=config.CACHE_DEFAULT_TTL,
+        negative_ttl=config.CACHE_NEGATIVE_TTL,
+    )
+    weekly_plan_repository = Singleton(
+        timed(CachedWeeklyPlanRepository),
+        repository=Singleton(guarded(WeeklyPlanRepository)),
+        cache=repository_cache,
+        ttls=config.CACHE_TTLS,
+        default_ttl=config.CACHE_DEFAULT_TTL,
+        negative_ttl=config.CACHE_NEGATIVE_TTL,
+    )
+    invitation_repository = Singleton(guarded(InvitationRepository))
+    idea_writer = Singleton(
+        IdeaWriteQueue,
+        repository=idea_repository,
+        batch_size=config.IDEA_WRITE_BATCH_SIZE,
+        batch_wait=config.IDEA_WRITE_BATCH_WAIT,
+    )
+    idea_snapshots = Singleton(
+        IdeaSnapshots,
+        repository=idea_repository,
+        changes=idea_store,
+        path=config.IDEA_SNAPSHOT_PATH,
+        max_changes=config.IDEA_SNAPSHOT_MAX_CHANGES,
+        prune=config.IDEA_SNAPSHOT_PRUNE,
+        interval=config.IDEA_SNAPSHOT_INTERVAL,
+    )
+
+    category_index = Singleton(CategoryIndex)
+    tag_index = Singleton(TagIndex)
+    search_index = Singleton(SearchIndex)
+    random_picker = Singleton(
+        PersonalizedPicker,
+        category_index=category_index,
+        tag_index=tag_index,
+        boost=config.RANDOM_AFFINITY_BOOST,
+        max_tags=config.RANDOM_AFFINITY_MAX_TAGS,
+        recent_size=config.RANDOM_RECENT_SIZE,
+        max_users=config.RANDOM_MAX_USERS,
+        max_age=config.RANDOM_TABLE_MAX_AGE,
+    )
+    similarity_index = Singleton(
+        SimilarityIndex,
+        bands=config.SIMILAR_BANDS,
+        rows=config.SIMILAR_ROWS,
+        candidates_per_band=config.SIMILAR_CANDIDATES_PER_BAND,
+    )
+    collection_versions = Singleton(CollectionVersions)
+    # Ideas kept only in process memory are versioned in the process too.
+    idea_version_store = Selector(
+        Object(config.IDEA_STORE),
+        postgres=Singleton(guarded(IdeaVersionRepository)),
+        columnar=Object(None),
+    )
+    follow_graph = Singleton(FollowGraph)
+    feed = Singleton(
+        FeedStore,
+        follow_graph=follow_graph,
+        timeline_size=config.FEED_TIMELINE_SIZE,
+        fanout_threshold=config.FEED_FANOUT_THRESHOLD,
+    )
+    plan_generator = Singleton(PlanGenerator)
+    plan_index = Singleton(PlanIntervalIndex)
+
+    invitation_sender = Selector(
+        Object(config.INVITATION_SENDER),
+        smtp=Singleton(
+            SmtpInvitationSender,
+            host=config.SMTP_HOST,
+            port=config.SMTP_PORT,
+            sender=config.SMTP_SENDER,
+            username=config.SMTP_USER,
+            password=config.SMTP_PASSWORD,
+        ),
+        memory=Singleton(MemoryInvitationSender),
+    )
+    invitation_queue = Singleton(
+        InvitationQueue,
+        repository=invitation_repository,
+        sender=invitation_sender,
+        batch_size=config.INVITATION_BATCH_SIZE,
+        batch_wait=config.INVITATION_BATCH_WAIT,
+        concurrency=config.INVITATION_CONCURRENCY,
+        max_attempts=config.INVITATION_MAX_ATTEMPTS,
+        retry_delay=config.INVITATION_RETRY_DELAY,
+        max_jobs=config.INVITATION_MAX_JOBS,
+    )
+
+    idea_service = Factory(
+        timed(IdeaService),
+        repository=idea_repository,
+        category_index=category_index,
+        tag_index=tag_index,
+        search_index=search_index,
+        similarity_index=similarity_index,
+        random_picker=random_picker,
+        feed=feed,
+        versions=collection_versions,
+        shared_versions=idea_version_store,
+        writer=idea_writer if config.IDEA_WRITE_BEHIND else None,
+        snapshots=(
+            idea_snapshots
+            if config.IDEA_SNAPSHOT_PATH and config.IDEA_STORE == "postgres"
+            else None
+        ),
+        max_similar_candidates=config.SIMILAR_MAX_CANDIDATES,
+    )
+    idea_loader = Factory(IdeaLoader, repository=idea_repository)
+    user_profile_service = Factory(
+        timed(UserProfileService),
+        repository=user_profile_repository,
+        follow_graph=follow_graph,
+        feed=feed,
+    )
+    weekly_plan_service = Factory(
+        timed(WeeklyPlanService),
+        repository=weekly_plan_repository,
+        idea_repository=idea_repository,
+        user_profile_repository=user_profile_repository,
+        generator=plan_generator,
+        plan_index=plan_index,
+    )
+    invitation_service = Factory(
+        timed(InvitationService),
+        repository=invitation_repository,
+        queue=invitation_queue,
+    )
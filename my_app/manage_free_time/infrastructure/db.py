@@ -0,0 +1,398 @@
+"""A module providing database access."""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import databases
+import sqlalchemy
+from databases.backends.postgres import PostgresBackend, PostgresConnection
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import OperationalError, DatabaseError
+from sqlalchemy.ext.asyncio import create_async_engine
+from asyncpg.exceptions import (    # type: ignore
+    CannotConnectNowError,
+    ConnectionDoesNotExistError,
+)
+
+from manage_free_time.infrastructure.config import config
+from manage_free_time.infrastructure.metrics import db_pool_wait
+
+logger = logging.getLogger(__name__)
+
+metadata = sqlalchemy.MetaData()
+
+user_profile_table = sqlalchemy.Table(
+    "user_profiles",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("username", sqlalchemy.String, nullable=False, unique=True),
+    sqlalchemy.Column("bio", sqlalchemy.String, nullable=True),
+)
+
+idea_table = sqlalchemy.Table(
+    "ideas",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("title", sqlalchemy.String, nullable=False),
+    sqlalchemy.Column("category", sqlalchemy.String, nullable=False),
+    sqlalchemy.Column(
+        "tags",
+        ARRAY(sqlalchemy.String),
+        nullable=False,
+        server_default="{}",
+    ),
+    sqlalchemy.Column("user_id", sqlalchemy.Integer, nullable=False, index=True),
+    sqlalchemy.Index("ix_ideas_category_id", "category", "id"),
+    sqlalchemy.Index("ix_ideas_tags", "tags", postgresql_using="gin"),
+)
+
+follow_table = sqlalchemy.Table(
+    "follows",
+    metadata,
+    sqlalchemy.Column("follower_id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("followee_id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Index("ix_follows_followee_follower", "followee_id", "follower_id"),
+)
+
+weekly_plan_table = sqlalchemy.Table(
+    "weekly_plans",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("user_id", sqlalchemy.Integer, nullable=False),
+    sqlalchemy.Column("week_start_date", sqlalchemy.Date, nullable=False),
+    sqlalchemy.Column("week_end_date", sqlalchemy.Date, nullable=False),
+    sqlalchemy.Column(
+        "ideas_ids",
+        ARRAY(sqlalchemy.Integer),
+        nullable=False,
+        server_default="{}",
+    ),
+    sqlalchemy.UniqueConstraint(
+        "user_id",
+        "week_start_date",
+        name="uq_weekly_plans_user_week",
+    ),
+)
+
+invitation_table = sqlalchemy.Table(
+    "invitations",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("inviter_id", sqlalchemy.Integer, nullable=False, index=True),
+    sqlalchemy.Column("invitee_email", sqlalchemy.String, nullable=False),
+    sqlalchemy.Column("message", sqlalchemy.String, nullable=True),
+    sqlalchemy.Column("event_id", sqlalchemy.Integer, nullable=True, index=True),
+    sqlalchemy.Column(
+        "status",
+        sqlalchemy.String,
+        nullable=False,
+        server_default="pending",
+    ),
+    sqlalchemy.UniqueConstraint(
+        "inviter_id",
+        "invitee_email",
+        name="uq_invitations_inviter_email",
+    ),
+    sqlalchemy.Index("ix_invitations_status_id", "status", "id"),
+)
+
+# Numbers of invitations per status, kept in the same transaction as every
+# change of the invitations table, so dashboards never scan it.
+invitation_status_count_table = sqlalchemy.Table(
+    "invitation_status_counts",
+    metadata,
+    sqlalchemy.Column("status", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("count", sqlalchemy.BigInteger, nullable=False),
+)
+
+invitation_inviter_count_table = sqlalchemy.Table(
+    "invitation_inviter_counts",
+    metadata,
+    sqlalchemy.Column("inviter_id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("status", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("count", sqlalchemy.BigInteger, nullable=False),
+)
+
+# Ids of the ideas written by every transaction, appended by statement
+# triggers on the ideas table. Workers starting from a catalogue snapshot
+# fetch only the ideas changed by transactions the snapshot may have
+# missed, i.e. with an id not lower than the snapshot's xmin. The triggers
+# are only installed while snapshots are configured.
+idea_change_table = sqlalchemy.Table(
+    "idea_changes",
+    metadata,
+    sqlalchemy.Column(
+        "transaction_id",
+        sqlalchemy.BigInteger,
+        nullable=False,
+        index=True,
+        server_default=sqlalchemy.text("pg_current_xact_id()::text::bigint"),
+    ),
+    sqlalchemy.Column("idea_id", sqlalchemy.Integer, nullable=False),
+)
+
+# The transaction id below which the changes were pruned, in a single row.
+idea_change_horizon_table = sqlalchemy.Table(
+    "idea_change_horizon",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.SmallInteger, primary_key=True),
+    sqlalchemy.Column("pruned_before", sqlalchemy.BigInteger, nullable=False),
+)
+
+IDEA_CHANGE_TRIGGERS = (
+    """
+    CREATE OR REPLACE FUNCTION log_idea_changes() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO idea_changes (idea_id) SELECT id FROM changed_ideas;
+        RETURN NULL;
+    END
+    $$
+    """,
+    *(
+        f"""
+        CREATE OR REPLACE TRIGGER ideas_log_{event.lower()}
+        AFTER {event} ON ideas
+        REFERENCING {rows} TABLE AS changed_ideas
+        FOR EACH STATEMENT EXECUTE FUNCTION log_idea_changes()
+        """
+        for event, rows in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+    ),
+)
+
+# Without snapshots nothing reads or prunes the log, so the triggers are
+# dropped. The log is emptied and marked as pruned, so snapshots written
+# before are not replayed with the changes made meanwhile missing.
+DROP_IDEA_CHANGE_TRIGGERS = (
+    *(
+        f"DROP TRIGGER IF EXISTS ideas_log_{event} ON ideas"
+        for event in ("insert", "update", "delete")
+    ),
+    "DROP FUNCTION IF EXISTS log_idea_changes()",
+    """
+    INSERT INTO idea_change_horizon (id, pruned_before)
+    VALUES (1, pg_current_xact_id()::text::bigint)
+    ON CONFLICT (id) DO UPDATE SET pruned_before = excluded.pruned_before
+    """,
+    "TRUNCATE idea_changes",
+)
+
+# The version of every category ("c:<name>") and author ("u:<id>") of
+# ideas, replaced by a random one whenever an idea of it changes, so all
+# workers derive the same ETags of the lists.
+idea_version_table = sqlalchemy.Table(
+    "idea_versions",
+    metadata,
+    sqlalchemy.Column("collection", sqlalchemy.Text, primary_key=True),
+    sqlalchemy.Column("version", sqlalchemy.Text, nullable=False),
+)
+
+
+def _idea_collections(table: str) -> str:
+    """Select the keys of the categories and authors of ideas in a table.
+
+    Args:
+        table (str): The table or transition table of ideas.
+
+    Returns:
+        str: The query of distinct `collection` keys.
+    """
+    return (
+        f"SELECT 'c:' || category AS collection FROM {table}"
+        f" UNION SELECT 'u:' || user_id FROM {table}"
+    )
+
+
+def _set_idea_versions(collections: str, on_conflict: str) -> str:
+    """Give new random versions to collections of ideas.
+
+    Rows are locked in the order of their keys, so concurrent writes
+    cannot deadlock on them.
+
+    Args:
+        collections (str): The query of the keys of the collections.
+        on_conflict (str): The action for an existing version.
+
+    Returns:
+        str: The statement.
+    """
+    return (
+        "INSERT INTO idea_versions (collection, version)"
+        f" SELECT collection, gen_random_uuid()::text FROM ({collections}) c"
+        f" ORDER BY collection ON CONFLICT (collection) {on_conflict}"
+    )
+
+
+def _idea_version_triggers(event: str, tables: tuple[str, ...]) -> tuple[str, str]:
+    """Create the function and the trigger versioning ideas changed by an event.
+
+    Args:
+        event (str): The event, e.g. `UPDATE`.
+        tables (tuple[str, ...]): The transition tables of the event, `OLD`
+            and/or `NEW`.
+
+    Returns:
+        tuple[str, str]: The statements creating the function and the trigger.
+    """
+    name = event.lower()
+    changed = " UNION ".join(
+        _idea_collections(f"{table.lower()}_ideas") for table in tables
+    )
+    referencing = " ".join(
+        f"{table} TABLE AS {table.lower()}_ideas" for table in tables
+    )
+    bump = _set_idea_versions(changed, "DO UPDATE SET version = excluded.version")
+    return (
+        f"""
+        CREATE OR REPLACE FUNCTION bump_idea_versions_{name}() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            {bump};
+            RETURN NULL;
+        END
+        $$
+        """,
+        f"""
+        CREATE OR REPLACE TRIGGER ideas_version_{name}
+        AFTER {event} ON ideas
+        REFERENCING {referencing}
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_idea_versions_{name}()
+        """,
+    )
+
+
+IDEA_VERSION_TRIGGERS = tuple(
+    statement
+    for event, tables in (
+        ("INSERT", ("NEW",)),
+        ("UPDATE", ("OLD", "NEW")),
+        ("DELETE", ("OLD",)),
+    )
+    for statement in _idea_version_triggers(event, tables)
+)
+
+# Gives versions to the collections of ideas stored before the triggers.
+SEED_IDEA_VERSIONS = _set_idea_versions(_idea_collections("ideas"), "DO NOTHING")
+
+db_uri = (
+    f"postgresql+asyncpg://{config.DB_USER}:{config.DB_PASSWORD}"
+    f"@{config.DB_HOST}/{config.DB_NAME}"
+)
+
+engine = create_async_engine(
+    db_uri,
+    echo=False,
+    future=True,
+    pool_pre_ping=True,
+)
+
+
+class TimedPostgresConnection(PostgresConnection):
+    """A class of pool connections recording how long acquiring them took."""
+
+    async def acquire(self) -> None:
+        """The method taking a connection from the pool."""
+        started = time.perf_counter()
+        try:
+            await super().acquire()
+        finally:
+            db_pool_wait.observe(time.perf_counter() - started)
+
+
+class TimedPostgresBackend(PostgresBackend):
+    """A class of the asyncpg backend handing out timed connections."""
+
+    def connection(self) -> TimedPostgresConnection:
+        """The method creating a connection of the backend.
+
+        Returns:
+            TimedPostgresConnection: The connection, acquired on first use.
+        """
+        return TimedPostgresConnection(self, self._dialect)
+
+    def pool_stats(self) -> Optional[tuple[int, int]]:
+        """The method getting the sizes of the pool.
+
+        Returns:
+            Optional[tuple[int, int]]: The number of open and idle
+                connections, None when disconnected.
+        """
+        if self._pool is None:
+            return None
+
+        return self._pool.get_size(), self._pool.get_idle_size()
+
+
+class Database(databases.Database):
+    """A class of the connection pool using the timed asyncpg backend."""
+
+    SUPPORTED_BACKENDS = {
+        **databases.Database.SUPPORTED_BACKENDS,
+        "postgresql": f"{__name__}:TimedPostgresBackend",
+    }
+
+    def pool_stats(self) -> Optional[tuple[int, int]]:
+        """The method getting the sizes of the pool.
+
+        Returns:
+            Optional[tuple[int, int]]: The number of open and idle
+                connections, None when disconnected.
+        """
+        return self._backend.pool_stats()
+
+
+# The single connection pool shared by all repositories. asyncpg keeps
+# an LRU of prepared statements per connection keyed by the SQL text, so
+# queries built once at module level are prepared on first use and then
+# only bound and executed.
+database = Database(
+    db_uri,
+    min_size=config.DB_POOL_MIN_SIZE,
+    max_size=config.DB_POOL_MAX_SIZE,
+    statement_cache_size=config.DB_STATEMENT_CACHE_SIZE,
+    command_timeout=config.DB_COMMAND_TIMEOUT,
+)
+
+
+async def init_db(retries: int = 5, delay: int = 5) -> None:
+    """Function initializing the DB.
+
+    Args:
+        retries (int, optional): Number of retries of connect to DB.
+            Defaults to 5.
+        delay (int, optional): Delay of connect do DB. Defaults to 5.
+    """
+    for attempt in range(retries):
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(metadata.create_all)
+                installed = await conn.scalar(sqlalchemy.text(
+                    "SELECT to_regprocedure('bump_idea_versions_insert()')"
+                    " IS NOT NULL"
+                ))
+                logging = await conn.scalar(sqlalchemy.text(
+                    "SELECT to_regprocedure('log_idea_changes()') IS NOT NULL"
+                ))
+                if config.IDEA_SNAPSHOT_PATH and config.IDEA_STORE == "postgres":
+                    changes = IDEA_CHANGE_TRIGGERS
+                elif logging:
+                    changes = DROP_IDEA_CHANGE_TRIGGERS
+                else:
+                    changes = ()
+                for statement in (*changes, *IDEA_VERSION_TRIGGERS):
+                    await conn.execute(sqlalchemy.text(statement))
+                if not installed:
+                    await conn.execute(sqlalchemy.text(SEED_IDEA_VERSIONS))
+            return
+        except (
+            OperationalError,
+            DatabaseError,
+            CannotConnectNowError,
+            ConnectionDoesNotExistError,
+        ) as e:
+            logger.warning("Attempt %d to initialize the DB failed: %s", attempt + 1, e)
+            await asyncio.sleep(delay)
+
+    raise ConnectionError("Could not connect to DB after several retries.")
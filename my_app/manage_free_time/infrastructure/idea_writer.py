@@ -0,0 +1,193 @@
+"""Module containing the queue coalescing idea writes into batches."""
+
+import asyncio
+import logging
+from typing import Optional
+
+from manage_free_time.core.domain.idea import Idea, IdeaIn
+from manage_free_time.core.repositories.iidea import IIdeaRepository
+
+logger = logging.getLogger(__name__)
+
+Write = tuple[Optional[int], IdeaIn, int, "asyncio.Future[Idea | None]"]
+
+
+class IdeaWriteQueue:
+    """A class storing concurrent idea writes with shared statements.
+
+    Added and updated ideas are put on an `asyncio.Queue`. A dispatcher
+    takes up to `batch_size` of them, waiting at most `batch_wait` seconds
+    after the first one, and stores the batch with one bulk insert and
+    one bulk update. Every caller awaits a future resolved with its own
+    idea once the batch is committed. Rows the repository cannot store
+    resolve to None without affecting the rest of the batch; any other
+    error of a batch is raised to all of its callers.
+    """
+
+    _repository: IIdeaRepository
+    _batch_size: int
+    _batch_wait: float
+    _queue: Optional[asyncio.Queue]
+    _dispatcher: Optional[asyncio.Task]
+    _tasks: set[asyncio.Task]
+
+    def __init__(
+        self,
+        repository: IIdeaRepository,
+        batch_size: int,
+        batch_wait: float,
+    ) -> None:
+        """The initializer of the `IdeaWriteQueue`.
+
+        Args:
+            repository (IIdeaRepository): The reference to the repository.
+            batch_size (int): The maximal number of ideas stored at once.
+            batch_wait (float): Seconds to wait for a batch to fill up.
+        """
+        self._repository = repository
+        self._batch_size = batch_size
+        self._batch_wait = batch_wait
+        self._queue = None
+        self._dispatcher = None
+        self._tasks = set()
+
+    async def start(self) -> None:
+        """The method starting the dispatcher on the running event loop."""
+        if self._dispatcher is not None:
+            return
+
+        self._queue = asyncio.Queue()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """The method stopping the dispatcher after storing queued writes.
+
+        Args:
+            timeout (float): Seconds to wait for queued writes.
+        """
+        if self._dispatcher is None or self._queue is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("%d idea writes left in the queue", self._queue.qsize())
+
+        tasks = (self._dispatcher, *self._tasks)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._dispatcher = None
+
+    async def add_idea(self, data: IdeaIn, user_id: int) -> Idea | None:
+        """The method adding an idea with the next batch.
+
+        Args:
+            data (IdeaIn): The details of the new idea.
+            user_id (int): The id of the user adding the idea.
+
+        Returns:
+            Idea | None: The newly added idea.
+        """
+        return await self._submit(None, data, user_id)
+
+    async def update_idea(self, idea_id: int, data: IdeaIn) -> Idea | None:
+        """The method updating an idea with the next batch.
+
+        Args:
+            idea_id (int): The id of the idea.
+            data (IdeaIn): The updated details of the idea.
+
+        Returns:
+            Idea | None: The updated idea or None if not found.
+        """
+        return await self._submit(idea_id, data, 0)
+
+    async def _submit(
+        self, idea_id: Optional[int], data: IdeaIn, user_id: int
+    ) -> Idea | None:
+        """Queue a write and wait until its batch is stored.
+
+        Args:
+            idea_id (Optional[int]): The id of an updated idea, None for
+                a new one.
+            data (IdeaIn): The details of the idea.
+            user_id (int): The id of the user adding a new idea.
+
+        Returns:
+            Idea | None: The stored idea.
+        """
+        if self._queue is None:
+            raise RuntimeError("The idea write queue is not started")
+
+        future: asyncio.Future[Idea | None] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._queue.put_nowait((idea_id, data, user_id, future))
+        return await future
+
+    async def _dispatch(self) -> None:
+        """Take batches off the queue and store them concurrently."""
+        assert self._queue is not None
+        while True:
+            batch = [await self._queue.get()]
+            deadline = asyncio.get_running_loop().time() + self._batch_wait
+            while len(batch) < self._batch_size:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._process(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, batch: list[Write]) -> None:
+        """Store a batch of writes and resolve the futures of their callers.
+
+        Args:
+            batch (list[Write]): The queued writes.
+        """
+        assert self._queue is not None
+        added = [write for write in batch if write[0] is None]
+        updated = [write for write in batch if write[0] is not None]
+        try:
+            if added:
+                ideas = await self._repository.add_ideas_by_users(
+                    [(data, user_id) for _, data, user_id, _ in added]
+                )
+                self._resolve(added, ideas)
+            if updated:
+                ideas = await self._repository.update_ideas(
+                    [(idea_id, data) for idea_id, data, _, _ in updated]
+                )
+                self._resolve(updated, ideas)
+        except Exception as error:
+            logger.exception("Storing of %d ideas failed", len(batch))
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    @staticmethod
+    def _resolve(writes: list[Write], ideas: list[Idea | None]) -> None:
+        """Hand the stored ideas to the callers still waiting for them.
+
+        Args:
+            writes (list[Write]): The writes in the order they were stored.
+            ideas (list[Idea | None]): The stored ideas in the same order.
+        """
+        for (*_, future), idea in zip(writes, ideas):
+            if not future.done():
+                future.set_result(idea)
@@ -0,0 +1,164 @@
+"""Module containing an in-process index of idea ids per category."""
+
+import random
+from array import array
+from typing import Iterable, Optional
+
+from manage_free_time.core.domain.idea import Idea
+
+
+class CategoryIndex:
+    """A class keeping idea ids grouped by category in compact arrays.
+
+    Every id is stored once in the array of all ids and once in the array
+    of its category. Removal swaps the last element into the freed slot,
+    so adding, removing and picking a uniformly random id are O(1).
+    """
+
+    _all: array
+    _by_category: dict[str, array]
+    _slots: dict[int, tuple[str, int, int]]
+    _warm: bool
+
+    def __init__(self) -> None:
+        """The initializer of the `CategoryIndex`."""
+        self._all = array("q")
+        self._by_category = {}
+        self._slots = {}
+        self._warm = False
+
+    @property
+    def is_warm(self) -> bool:
+        """bool: Whether the index has been loaded from the data storage."""
+        return self._warm
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def load(self, ideas: Iterable[Idea]) -> None:
+        """The method (re)building the index from the given ideas.
+
+        Args:
+            ideas (Iterable[Idea]): All ideas in the data storage.
+        """
+        self.load_rows((idea.id, idea.category) for idea in ideas)
+
+    def load_rows(self, rows: Iterable[tuple[int, str]]) -> None:
+        """The method (re)building the index from ids and categories.
+
+        Args:
+            rows (Iterable[tuple[int, str]]): The id and the category of
+                every idea in the data storage.
+        """
+        self._all = array("q")
+        self._by_category = {}
+        self._slots = {}
+        for idea_id, category in rows:
+            self.add(idea_id, category)
+        self._warm = True
+
+    def add(self, idea_id: int, category: str) -> None:
+        """The method adding an idea to the index.
+
+        An idea which is already indexed is moved to the given category.
+
+        Args:
+            idea_id (int): The id of the idea.
+            category (str): The category of the idea.
+        """
+        slot = self._slots.get(idea_id)
+        if slot is not None:
+            if slot[0] == category:
+                return
+            self.remove(idea_id)
+
+        ids = self._by_category.setdefault(category, array("q"))
+        ids.append(idea_id)
+        self._all.append(idea_id)
+        self._slots[idea_id] = (category, len(ids) - 1, len(self._all) - 1)
+
+    def remove(self, idea_id: int) -> None:
+        """The method removing an idea from the index.
+
+        Args:
+            idea_id (int): The id of the idea.
+        """
+        slot = self._slots.pop(idea_id, None)
+        if slot is None:
+            return
+
+        category, category_position, all_position = slot
+        ids = self._by_category[category]
+
+        moved = self._swap_remove(ids, category_position)
+        if moved is not None:
+            moved_category, _, moved_all = self._slots[moved]
+            self._slots[moved] = (moved_category, category_position, moved_all)
+        if not ids:
+            del self._by_category[category]
+
+        moved = self._swap_remove(self._all, all_position)
+        if moved is not None:
+            moved_category, moved_position, _ = self._slots[moved]
+            self._slots[moved] = (moved_category, moved_position, all_position)
+
+    def ids(self, category: Optional[str] = None) -> array:
+        """The method getting the ids of a category, in no particular order.
+
+        The returned array is the index itself and must not be modified.
+
+        Args:
+            category (Optional[str]): The category, or None for all ideas.
+
+        Returns:
+            array: The ids of the ideas.
+        """
+        if not category:
+            return self._all
+
+        return self._by_category.get(category, array("q"))
+
+    def category_of(self, idea_id: int) -> Optional[str]:
+        """The method getting the category of an indexed idea.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            Optional[str]: The category or None if the idea is not indexed.
+        """
+        slot = self._slots.get(idea_id)
+        return slot[0] if slot is not None else None
+
+    def pick(self, category: Optional[str] = None) -> Optional[int]:
+        """The method picking a uniformly random idea id.
+
+        Args:
+            category (Optional[str]): The category to pick from.
+
+        Returns:
+            Optional[int]: The id of the idea or None if there are none.
+        """
+        ids = self._by_category.get(category) if category else self._all
+        if not ids:
+            return None
+
+        return ids[random.randrange(len(ids))]
+
+    @staticmethod
+    def _swap_remove(ids: array, position: int) -> Optional[int]:
+        """Remove the element at position by moving the last one into it.
+
+        Args:
+            ids (array): The array to remove from.
+            position (int): The position of the removed element.
+
+        Returns:
+            Optional[int]: The id moved into the position, if any.
+        """
+        last = ids.pop()
+        if position == len(ids):
+            return None
+
+        ids[position] = last
+        return last
@@ -0,0 +1,322 @@
+"""Module containing the in-process store of home feed timelines."""
+
+import heapq
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from manage_free_time.core.domain.idea import Idea
+from manage_free_time.infrastructure.indexes.follows import FollowGraph
+
+
+def _newest_first(ids: array, before: Optional[int]) -> Iterator[int]:
+    """Iterate over a sorted array of ids from the newest one.
+
+    Args:
+        ids (array): Ascending ids.
+        before (Optional[int]): Only ids lower than this one are yielded.
+
+    Yields:
+        int: The next id in descending order.
+    """
+    end = bisect_left(ids, before) if before is not None else len(ids)
+    for position in range(end - 1, -1, -1):
+        yield ids[position]
+
+
+class FeedStore:
+    """A class keeping bounded home timelines of idea ids.
+
+    Ideas of regular authors are pushed into the timelines of their
+    followers when they are added (fan-out on write). Ideas of authors
+    with at least `fanout_threshold` followers are only kept in the
+    author's list and merged into the feed when it is read (fan-out on
+    read), so a single idea never has to be written to millions of
+    timelines.
+
+    Timelines are materialized on the first read of a user from the
+    recent ideas of the followed authors, and kept current afterwards.
+    """
+
+    _follow_graph: FollowGraph
+    _timeline_size: int
+    _fanout_threshold: int
+    _timelines: dict[int, array]
+    _recent: dict[int, array]
+    _authors: dict[int, int]
+    _celebrities: set[int]
+
+    def __init__(
+        self,
+        follow_graph: FollowGraph,
+        timeline_size: int,
+        fanout_threshold: int,
+    ) -> None:
+        """The initializer of the `FeedStore`.
+
+        Args:
+            follow_graph (FollowGraph): The in-process follow graph.
+            timeline_size (int): The maximal number of ids in a timeline
+                and in the list of recent ideas of an author.
+            fanout_threshold (int): The number of followers from which
+                ideas of an author are merged at read time.
+        """
+        self._follow_graph = follow_graph
+        self._timeline_size = timeline_size
+        self._fanout_threshold = fanout_threshold
+        self._timelines = {}
+        self._recent = {}
+        self._authors = {}
+        self._celebrities = set()
+
+    def load(self, ideas: Iterable[Idea]) -> None:
+        """The method (re)building recent ideas of authors.
+
+        The follow graph should be loaded first, as authors are classified
+        by their current number of followers.
+
+        Args:
+            ideas (Iterable[Idea]): All ideas in the data storage, in
+                ascending order of ids.
+        """
+        self.load_rows((idea.id, idea.user_id) for idea in ideas)
+
+    def load_rows(self, rows: Iterable[tuple[int, int]]) -> None:
+        """The method (re)building recent ideas of authors from their ids.
+
+        Args:
+            rows (Iterable[tuple[int, int]]): The id and the author id of
+                every idea in the data storage, in ascending order of ids.
+        """
+        self._timelines = {}
+        self._recent = {}
+        self._authors = {}
+        for idea_id, author_id in rows:
+            self._remember(idea_id, author_id)
+        self._celebrities = {
+            author_id
+            for author_id in self._recent
+            if self._is_celebrity(author_id)
+        }
+
+    def publish(self, idea_id: int, author_id: int) -> None:
+        """The method distributing a new idea to the feeds of followers.
+
+        Args:
+            idea_id (int): The id of the idea.
+            author_id (int): The id of the author.
+        """
+        self._remember(idea_id, author_id)
+        if self._is_celebrity(author_id):
+            self._celebrities.add(author_id)
+        if author_id in self._celebrities:
+            return
+
+        for follower_id in self._follow_graph.followers(author_id):
+            timeline = self._timelines.get(follower_id)
+            if timeline is not None:
+                self._insert(timeline, idea_id)
+
+    def retract(self, idea_id: int) -> None:
+        """The method removing a deleted idea from the feeds.
+
+        Args:
+            idea_id (int): The id of the idea.
+        """
+        author_id = self._authors.pop(idea_id, None)
+        if author_id is None:
+            return
+
+        self._discard(self._recent[author_id], idea_id)
+        if author_id in self._celebrities:
+            return
+
+        for follower_id in self._follow_graph.followers(author_id):
+            timeline = self._timelines.get(follower_id)
+            if timeline is not None:
+                self._discard(timeline, idea_id)
+
+    def follow(self, follower_id: int, followee_id: int) -> None:
+        """The method adding recent ideas of a followed author to a feed.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_id (int): The id of the followed author.
+        """
+        if self._is_celebrity(followee_id):
+            self._celebrities.add(followee_id)
+        timeline = self._timelines.get(follower_id)
+        if timeline is None or followee_id in self._celebrities:
+            return
+
+        merged = heapq.merge(
+            _newest_first(timeline, None),
+            _newest_first(self._recent.get(followee_id, array("q")), None),
+            reverse=True,
+        )
+        self._timelines[follower_id] = self._build(merged)
+
+    def unfollow(self, follower_id: int, followee_id: int) -> None:
+        """The method removing ideas of an unfollowed author from a feed.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_id (int): The id of the unfollowed author.
+        """
+        timeline = self._timelines.get(follower_id)
+        if timeline is None:
+            return
+
+        self._timelines[follower_id] = array(
+            "q",
+            (idea_id for idea_id in timeline
+             if self._authors.get(idea_id) != followee_id),
+        )
+
+    def remove_user(self, user_id: int) -> None:
+        """The method dropping the timeline of a deleted user.
+
+        Args:
+            user_id (int): The id of the user.
+        """
+        self._timelines.pop(user_id, None)
+
+    def read(
+        self,
+        user_id: int,
+        before: Optional[int] = None,
+        limit: int = 20,
+    ) -> list[int]:
+        """The method getting a page of the feed of a user.
+
+        The page merges the user's timeline with the recent ideas of the
+        followed high-fan-out authors, newest first.
+
+        Args:
+            user_id (int): The id of the user.
+            before (Optional[int]): Only ids lower than this one are returned.
+            limit (int): The maximal number of returned ids.
+
+        Returns:
+            list[int]: Descending ids of the ideas in the feed.
+        """
+        timeline = self._timelines.get(user_id)
+        if timeline is None:
+            timeline = self._materialize(user_id)
+
+        sources = [_newest_first(timeline, before)]
+        sources.extend(
+            _newest_first(self._recent.get(author_id, array("q")), before)
+            for author_id in self._celebrities
+            if self._follow_graph.is_following(user_id, author_id)
+        )
+
+        result: list[int] = []
+        for idea_id in heapq.merge(*sources, reverse=True):
+            if result and result[-1] == idea_id:
+                continue
+            result.append(idea_id)
+            if len(result) == limit:
+                break
+
+        return result
+
+    def _materialize(self, user_id: int) -> array:
+        """Build the timeline of a user from recent ideas of followees.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            array: The new timeline.
+        """
+        merged = heapq.merge(
+            *(
+                _newest_first(self._recent[author_id], None)
+                for author_id in self._follow_graph.following(user_id)
+                if author_id in self._recent and author_id not in self._celebrities
+            ),
+            reverse=True,
+        )
+        timeline = self._build(merged)
+        self._timelines[user_id] = timeline
+
+        return timeline
+
+    def _build(self, newest_first: Iterable[int]) -> array:
+        """Build a bounded ascending timeline from descending ids.
+
+        Args:
+            newest_first (Iterable[int]): Descending ids, possibly repeated.
+
+        Returns:
+            array: Ascending unique ids, at most `timeline_size` of them.
+        """
+        ids = list(islice(dict.fromkeys(newest_first), self._timeline_size))
+        ids.reverse()
+
+        return array("q", ids)
+
+    def _remember(self, idea_id: int, author_id: int) -> None:
+        """Add an idea to the recent ideas of its author.
+
+        Args:
+            idea_id (int): The id of the idea.
+            author_id (int): The id of the author.
+        """
+        recent = self._recent.setdefault(author_id, array("q"))
+        self._authors[idea_id] = author_id
+        for dropped in self._insert(recent, idea_id):
+            self._authors.pop(dropped, None)
+
+    def _is_celebrity(self, author_id: int) -> bool:
+        """Check whether ideas of an author are merged at read time.
+
+        Args:
+            author_id (int): The id of the author.
+
+        Returns:
+            bool: Whether the author has at least `fanout_threshold`
+                followers.
+        """
+        return self._follow_graph.follower_count(author_id) >= self._fanout_threshold
+
+    def _insert(self, ids: array, idea_id: int) -> list[int]:
+        """Insert an id into a bounded ascending array.
+
+        Args:
+            ids (array): The ascending ids.
+            idea_id (int): The inserted id.
+
+        Returns:
+            list[int]: The oldest ids dropped to keep the bound.
+        """
+        if not ids or ids[-1] < idea_id:
+            ids.append(idea_id)
+        else:
+            position = bisect_left(ids, idea_id)
+            if ids[position] == idea_id:
+                return []
+            ids.insert(position, idea_id)
+
+        overflow = len(ids) - self._timeline_size
+        if overflow <= 0:
+            return []
+
+        dropped = ids[:overflow].tolist()
+        del ids[:overflow]
+
+        return dropped
+
+    @staticmethod
+    def _discard(ids: array, idea_id: int) -> None:
+        """Remove an id from an ascending array if present.
+
+        Args:
+            ids (array): The ascending ids.
+            idea_id (int): The removed id.
+        """
+        position = bisect_left(ids, idea_id)
+        if position < len(ids) and ids[position] == idea_id:
+            del ids[position]
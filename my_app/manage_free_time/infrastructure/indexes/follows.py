@@ -0,0 +1,317 @@
+"""Module containing an in-process store of the follow graph."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Optional
+
+
+class FollowGraph:
+    """A class keeping forward and reverse adjacency of the follow graph.
+
+    Every user has a sorted `array('q')` of the users they follow and of
+    their followers. Counts are the lengths of the arrays, membership is a
+    binary search and listings are keyset-paginated slices, so neither
+    depends on the size of the whole graph.
+    """
+
+    _following: dict[int, array]
+    _followers: dict[int, array]
+    _warm: bool
+
+    def __init__(self) -> None:
+        """The initializer of the `FollowGraph`."""
+        self._following = {}
+        self._followers = {}
+        self._warm = False
+
+    @property
+    def is_warm(self) -> bool:
+        """bool: Whether the graph has been loaded from the data storage."""
+        return self._warm
+
+    def load(self, edges: Iterable[tuple[int, int]]) -> None:
+        """The method (re)building the graph from the given edges.
+
+        Args:
+            edges (Iterable[tuple[int, int]]): Pairs of follower and
+                followee ids.
+        """
+        following: dict[int, array] = {}
+        followers: dict[int, array] = {}
+        for follower_id, followee_id in edges:
+            following.setdefault(follower_id, array("q")).append(followee_id)
+            followers.setdefault(followee_id, array("q")).append(follower_id)
+
+        self._following = {
+            user_id: array("q", sorted(set(ids)))
+            for user_id, ids in following.items()
+        }
+        self._followers = {
+            user_id: array("q", sorted(set(ids)))
+            for user_id, ids in followers.items()
+        }
+        self._warm = True
+
+    def add(self, follower_id: int, followee_id: int) -> bool:
+        """The method adding an edge to the graph.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_id (int): The id of the followed user.
+
+        Returns:
+            bool: Whether the edge was new.
+        """
+        if not self._insert(self._following, follower_id, followee_id):
+            return False
+        self._insert(self._followers, followee_id, follower_id)
+
+        return True
+
+    def remove(self, follower_id: int, followee_id: int) -> bool:
+        """The method removing an edge from the graph.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_id (int): The id of the followed user.
+
+        Returns:
+            bool: Whether the edge existed.
+        """
+        if not self._discard(self._following, follower_id, followee_id):
+            return False
+        self._discard(self._followers, followee_id, follower_id)
+
+        return True
+
+    def remove_user(self, user_id: int) -> None:
+        """The method removing all edges of a user.
+
+        Args:
+            user_id (int): The id of the user.
+        """
+        for followee_id in self._following.pop(user_id, ()):
+            self._discard(self._followers, followee_id, user_id)
+        for follower_id in self._followers.pop(user_id, ()):
+            self._discard(self._following, follower_id, user_id)
+
+    def is_following(self, follower_id: int, followee_id: int) -> bool:
+        """The method checking whether a user follows another one.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_id (int): The id of the followed user.
+
+        Returns:
+            bool: Whether the edge exists.
+        """
+        return self._contains(self._following.get(follower_id), followee_id)
+
+    def is_following_many(
+        self, follower_id: int, followee_ids: Iterable[int]
+    ) -> dict[int, bool]:
+        """The method checking which of the users are followed by a user.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_ids (Iterable[int]): The ids of the checked users.
+
+        Returns:
+            dict[int, bool]: Whether each of the users is followed.
+        """
+        following = self._following.get(follower_id)
+
+        return {
+            followee_id: self._contains(following, followee_id)
+            for followee_id in followee_ids
+        }
+
+    def follower_count(self, user_id: int) -> int:
+        """The method getting the number of followers of a user.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            int: The number of followers.
+        """
+        return len(self._followers.get(user_id, ()))
+
+    def following_count(self, user_id: int) -> int:
+        """The method getting the number of users a user follows.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            int: The number of followed users.
+        """
+        return len(self._following.get(user_id, ()))
+
+    def followers(
+        self,
+        user_id: int,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[int]:
+        """The method getting a page of followers of a user.
+
+        Args:
+            user_id (int): The id of the user.
+            after (Optional[int]): Only ids greater than this one are returned.
+            limit (Optional[int]): The maximal number of returned ids.
+
+        Returns:
+            list[int]: Ascending ids of the followers.
+        """
+        return self._page(self._followers.get(user_id), after, limit)
+
+    def following(
+        self,
+        user_id: int,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[int]:
+        """The method getting a page of users followed by a user.
+
+        Args:
+            user_id (int): The id of the user.
+            after (Optional[int]): Only ids greater than this one are returned.
+            limit (Optional[int]): The maximal number of returned ids.
+
+        Returns:
+            list[int]: Ascending ids of the followed users.
+        """
+        return self._page(self._following.get(user_id), after, limit)
+
+    def mutual(
+        self,
+        user_id: int,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[int]:
+        """The method getting a page of users following a user back.
+
+        The shorter adjacency array drives the scan and every candidate is
+        looked up in the longer one by binary search.
+
+        Args:
+            user_id (int): The id of the user.
+            after (Optional[int]): Only ids greater than this one are returned.
+            limit (Optional[int]): The maximal number of returned ids.
+
+        Returns:
+            list[int]: Ascending ids of users followed by and following
+                the user.
+        """
+        following = self._following.get(user_id)
+        followers = self._followers.get(user_id)
+        if not following or not followers:
+            return []
+
+        shorter, longer = sorted((following, followers), key=len)
+        start = bisect_right(shorter, after) if after is not None else 0
+        found = 0
+        result = []
+        for position in range(start, len(shorter)):
+            candidate = shorter[position]
+            found = bisect_left(longer, candidate, found)
+            if found == len(longer):
+                break
+            if longer[found] == candidate:
+                result.append(candidate)
+                if limit is not None and len(result) == limit:
+                    break
+
+        return result
+
+    @staticmethod
+    def _page(
+        ids: Optional[array],
+        after: Optional[int],
+        limit: Optional[int],
+    ) -> list[int]:
+        """Slice a page out of a sorted adjacency array.
+
+        Args:
+            ids (Optional[array]): The sorted ids.
+            after (Optional[int]): Only ids greater than this one are returned.
+            limit (Optional[int]): The maximal number of returned ids.
+
+        Returns:
+            list[int]: The ids of the page.
+        """
+        if not ids:
+            return []
+
+        start = bisect_right(ids, after) if after is not None else 0
+        end = start + limit if limit is not None else len(ids)
+
+        return ids[start:end].tolist()
+
+    @staticmethod
+    def _contains(ids: Optional[array], user_id: int) -> bool:
+        """Check whether a sorted adjacency array contains an id.
+
+        Args:
+            ids (Optional[array]): The sorted ids.
+            user_id (int): The searched id.
+
+        Returns:
+            bool: Whether the id is present.
+        """
+        if not ids:
+            return False
+
+        position = bisect_left(ids, user_id)
+        return position < len(ids) and ids[position] == user_id
+
+    @staticmethod
+    def _insert(adjacency: dict[int, array], user_id: int, other_id: int) -> bool:
+        """Insert an id into the adjacency array of a user keeping the order.
+
+        Args:
+            adjacency (dict[int, array]): The forward or reverse adjacency.
+            user_id (int): The id of the user owning the array.
+            other_id (int): The inserted id.
+
+        Returns:
+            bool: Whether the id was missing.
+        """
+        ids = adjacency.setdefault(user_id, array("q"))
+        if not ids or ids[-1] < other_id:
+            ids.append(other_id)
+            return True
+
+        position = bisect_left(ids, other_id)
+        if ids[position] == other_id:
+            return False
+
+        ids.insert(position, other_id)
+        return True
+
+    @staticmethod
+    def _discard(adjacency: dict[int, array], user_id: int, other_id: int) -> bool:
+        """Remove an id from the adjacency array of a user.
+
+        Args:
+            adjacency (dict[int, array]): The forward or reverse adjacency.
+            user_id (int): The id of the user owning the array.
+            other_id (int): The removed id.
+
+        Returns:
+            bool: Whether the id was present.
+        """
+        ids = adjacency.get(user_id)
+        if not ids:
+            return False
+
+        position = bisect_left(ids, other_id)
+        if position == len(ids) or ids[position] != other_id:
+            return False
+
+        del ids[position]
+        if not ids:
+            del adjacency[user_id]
+
+        return True
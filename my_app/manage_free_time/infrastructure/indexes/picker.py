@@ -0,0 +1,354 @@
+"""Module containing the personalized picking of random ideas."""
+
+import random
+import time
+from array import array
+from collections import OrderedDict, deque
+from typing import Iterable, Optional, Sequence
+
+from manage_free_time.core.domain.idea import Idea
+from manage_free_time.infrastructure.indexes.category import CategoryIndex
+from manage_free_time.infrastructure.indexes.tags import TagIndex
+
+
+class AliasTable:
+    """A class sampling from a discrete distribution in O(1) per draw.
+
+    The table is built with Vose's alias method in O(n): every slot keeps
+    the probability of its own outcome and the outcome filling the rest
+    of the slot, so a draw is one uniform slot and one biased coin.
+    """
+
+    _probabilities: array
+    _aliases: array
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        """The initializer of the `AliasTable`.
+
+        Args:
+            weights (Sequence[float]): Non-negative weights of the outcomes.
+
+        Raises:
+            ValueError: If no weight is positive.
+        """
+        count = len(weights)
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("at least one weight must be positive")
+
+        scaled = [weight * count / total for weight in weights]
+        self._probabilities = array("d", [1.0]) * count
+        self._aliases = array("I", range(count))
+        small = [outcome for outcome, share in enumerate(scaled) if share < 1.0]
+        large = [outcome for outcome, share in enumerate(scaled) if share >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probabilities[less] = scaled[less]
+            self._aliases[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def sample(self) -> int:
+        """The method drawing an outcome.
+
+        Returns:
+            int: The index of the outcome in the weights.
+        """
+        slot = random.randrange(len(self._aliases))
+        if random.random() < self._probabilities[slot]:
+            return slot
+
+        return self._aliases[slot]
+
+
+class CatalogueSnapshot:
+    """A class holding the ideas of one category with a given tag.
+
+    Snapshots are tied to a version of the category and filled lazily,
+    only for the tags some user has asked for.
+    """
+
+    version: str
+    built_at: float
+    by_tag: dict[str, array]
+
+    def __init__(self, version: str) -> None:
+        """The initializer of the `CatalogueSnapshot`.
+
+        Args:
+            version (str): The version of the category.
+        """
+        self.version = version
+        self.built_at = time.monotonic()
+        self.by_tag = {}
+
+
+class UserHistory:
+    """A class holding what a user likes and what they have just seen."""
+
+    version: Optional[str]
+    affinity: dict[str, float]
+    recent: deque[int]
+    mixtures: dict[Optional[str], tuple[CatalogueSnapshot, list[array], AliasTable]]
+
+    def __init__(self, recent_size: int) -> None:
+        """The initializer of the `UserHistory`.
+
+        Args:
+            recent_size (int): The number of remembered ideas.
+        """
+        self.version = None
+        self.affinity = {}
+        self.recent = deque(maxlen=recent_size)
+        self.mixtures = {}
+
+
+class PersonalizedPicker:
+    """A class picking random ideas weighted by the tags a user likes.
+
+    An idea gets the weight `1 + boost * sum(affinity[tag])`, where the
+    affinity of a tag is the share of the user's own ideas having it. The
+    weights are a mixture of one uniform component over the category and
+    one uniform component per liked tag over the ideas with the tag, so
+    a pick draws a component from an alias table and then a uniform id
+    from it. The alias tables are built per user and category and reused
+    until the version of either changes; the ideas of a category with
+    a tag are gathered once per version of the category, and not more
+    often than every `max_age` seconds. Ideas the user has recently been
+    shown are drawn again instead of being returned.
+    """
+
+    _category_index: CategoryIndex
+    _tag_index: TagIndex
+    _boost: float
+    _max_tags: int
+    _recent_size: int
+    _max_users: int
+    _max_age: float
+    _attempts: int
+    _snapshots: dict[Optional[str], CatalogueSnapshot]
+    _users: OrderedDict[int, UserHistory]
+
+    def __init__(
+        self,
+        category_index: CategoryIndex,
+        tag_index: TagIndex,
+        boost: float = 4.0,
+        max_tags: int = 32,
+        recent_size: int = 50,
+        max_users: int = 100_000,
+        max_age: float = 5.0,
+        attempts: int = 8,
+    ) -> None:
+        """The initializer of the `PersonalizedPicker`.
+
+        Args:
+            category_index (CategoryIndex): The index of idea ids per category.
+            tag_index (TagIndex): The inverted index of idea tags.
+            boost (float): The weight added by a tag on all of the user's ideas.
+            max_tags (int): The number of the user's most used tags considered.
+            recent_size (int): The number of ideas remembered per user.
+            max_users (int): The number of users remembered at once.
+            max_age (float): The minimal age in seconds of the ideas of
+                a category before they are gathered again.
+            attempts (int): The number of draws skipping recent ideas.
+        """
+        self._category_index = category_index
+        self._tag_index = tag_index
+        self._boost = boost
+        self._max_tags = max_tags
+        self._recent_size = recent_size
+        self._max_users = max_users
+        self._max_age = max_age
+        self._attempts = attempts
+        self._snapshots = {}
+        self._users = OrderedDict()
+
+    def knows(self, user_id: int, version: str) -> bool:
+        """The method checking whether the user's tastes are up to date.
+
+        Args:
+            user_id (int): The id of the user.
+            version (str): The version of the user's ideas.
+
+        Returns:
+            bool: Whether `learn` was called with this version.
+        """
+        history = self._users.get(user_id)
+        return history is not None and history.version == version
+
+    def learn(self, user_id: int, version: str, ideas: Iterable[Idea]) -> None:
+        """The method computing the tags a user likes from their ideas.
+
+        Args:
+            user_id (int): The id of the user.
+            version (str): The version of the user's ideas.
+            ideas (Iterable[Idea]): The ideas created by the user.
+        """
+        counts: dict[str, int] = {}
+        total = 0
+        for idea in ideas:
+            total += 1
+            for tag in set(idea.tags):
+                counts[tag] = counts.get(tag, 0) + 1
+
+        liked = sorted(counts, key=counts.__getitem__, reverse=True)
+        history = self._history(user_id)
+        history.version = version
+        history.affinity = {
+            tag: counts[tag] / total for tag in liked[:self._max_tags]
+        }
+        history.mixtures.clear()
+
+    def pick(
+        self,
+        user_id: int,
+        category: Optional[str],
+        version: str,
+    ) -> Optional[int]:
+        """The method picking an idea id for a user.
+
+        Args:
+            user_id (int): The id of the user.
+            category (Optional[str]): The category to pick from.
+            version (str): The version of the category.
+
+        Returns:
+            Optional[int]: The id of the idea or None if there are none.
+        """
+        category = category or None
+        if not self._category_index.ids(category):
+            return None
+
+        history = self._history(user_id)
+        components, table = self._mixture(history, category, version)
+        idea_id = None
+        for _ in range(self._attempts):
+            ids = components[table.sample()]
+            if not ids:
+                continue
+            idea_id = ids[random.randrange(len(ids))]
+            if idea_id not in history.recent:
+                return idea_id
+
+        if idea_id is None:
+            return self._category_index.pick(category)
+
+        return idea_id
+
+    def mark_seen(self, user_id: int, idea_id: int) -> None:
+        """The method remembering that an idea was shown to a user.
+
+        Args:
+            user_id (int): The id of the user.
+            idea_id (int): The id of the idea.
+        """
+        self._history(user_id).recent.append(idea_id)
+
+    def _history(self, user_id: int) -> UserHistory:
+        """Get the history of a user, forgetting the least recent user.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            UserHistory: The history, empty for a new user.
+        """
+        history = self._users.get(user_id)
+        if history is None:
+            history = self._users[user_id] = UserHistory(self._recent_size)
+            if len(self._users) > self._max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+
+        return history
+
+    def _snapshot(self, category: Optional[str], version: str) -> CatalogueSnapshot:
+        """Get the snapshot of a category, replacing an outdated one.
+
+        Args:
+            category (Optional[str]): The category, or None for all ideas.
+            version (str): The current version of the category.
+
+        Returns:
+            CatalogueSnapshot: The snapshot.
+        """
+        snapshot = self._snapshots.get(category)
+        if snapshot is None or (
+            snapshot.version != version
+            and time.monotonic() - snapshot.built_at >= self._max_age
+        ):
+            snapshot = self._snapshots[category] = CatalogueSnapshot(version)
+
+        return snapshot
+
+    def _mixture(
+        self,
+        history: UserHistory,
+        category: Optional[str],
+        version: str,
+    ) -> tuple[list[array], AliasTable]:
+        """Get the components of the user's distribution and their alias table.
+
+        Args:
+            history (UserHistory): The history of the user.
+            category (Optional[str]): The category, or None for all ideas.
+            version (str): The current version of the category.
+
+        Returns:
+            tuple[list[array], AliasTable]: Arrays of idea ids and the
+                table drawing one of them. The arrays may have been
+                emptied since.
+        """
+        snapshot = self._snapshot(category, version)
+        cached = history.mixtures.get(category)
+        if cached is not None and cached[0] is snapshot:
+            return cached[1], cached[2]
+
+        ids = self._category_index.ids(category)
+        components, weights = [ids], [float(len(ids))]
+        for tag, affinity in history.affinity.items():
+            tagged = self._tagged(snapshot, category, tag)
+            if tagged:
+                components.append(tagged)
+                weights.append(self._boost * affinity * len(tagged))
+
+        table = AliasTable(weights)
+        history.mixtures[category] = (snapshot, components, table)
+        return components, table
+
+    def _tagged(
+        self,
+        snapshot: CatalogueSnapshot,
+        category: Optional[str],
+        tag: str,
+    ) -> array:
+        """Get the ids of the ideas of a category with a tag.
+
+        For all ideas this is the posting of the tag index itself.
+
+        Args:
+            snapshot (CatalogueSnapshot): The snapshot of the category.
+            category (Optional[str]): The category, or None for all ideas.
+            tag (str): The tag.
+
+        Returns:
+            array: The ids of the ideas.
+        """
+        tagged = snapshot.by_tag.get(tag)
+        if tagged is None:
+            tagged = self._tag_index.posting(tag)
+            if category is not None:
+                category_of = self._category_index.category_of
+                tagged = array(
+                    "q",
+                    (idea_id for idea_id in tagged
+                     if category_of(idea_id) == category),
+                )
+            snapshot.by_tag[tag] = tagged
+
+        return tagged
@@ -0,0 +1,167 @@
+"""Module containing an in-process interval index of weekly plans."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Iterable, Optional
+
+
+class PlanIntervalIndex:
+    """A class keeping the date ranges of weekly plans of every user.
+
+    Plans of a user never overlap, so ordering them by the first day
+    orders them by the last day as well. Every user has two parallel
+    `array('i')` of day ordinals, the first and the last days, and every
+    lookup is a binary search on one of them.
+    """
+
+    _starts: dict[int, array]
+    _ends: dict[int, array]
+    _warm: bool
+
+    def __init__(self) -> None:
+        """The initializer of the `PlanIntervalIndex`."""
+        self._starts = {}
+        self._ends = {}
+        self._warm = False
+
+    @property
+    def is_warm(self) -> bool:
+        """bool: Whether the index has been loaded from the data storage."""
+        return self._warm
+
+    def load(self, intervals: Iterable[tuple[int, date, date]]) -> None:
+        """The method (re)building the index from the given date ranges.
+
+        Args:
+            intervals (Iterable[tuple[int, date, date]]): The user ids with
+                the first and the last days of their plans.
+        """
+        plans: dict[int, list[tuple[int, int]]] = {}
+        for user_id, start, end in intervals:
+            plans.setdefault(user_id, []).append(
+                (start.toordinal(), end.toordinal())
+            )
+
+        self._starts = {}
+        self._ends = {}
+        for user_id, ranges in plans.items():
+            ranges.sort()
+            self._starts[user_id] = array("i", (start for start, _ in ranges))
+            self._ends[user_id] = array("i", (end for _, end in ranges))
+        self._warm = True
+
+    def add(self, user_id: int, start: date, end: date) -> None:
+        """The method adding the date range of a plan.
+
+        A plan starting on the same day is replaced. The range should not
+        overlap other plans of the user.
+
+        Args:
+            user_id (int): The id of the user.
+            start (date): The first day of the plan.
+            end (date): The last day of the plan.
+        """
+        starts = self._starts.setdefault(user_id, array("i"))
+        ends = self._ends.setdefault(user_id, array("i"))
+        first, last = start.toordinal(), end.toordinal()
+
+        position = bisect_left(starts, first)
+        if position < len(starts) and starts[position] == first:
+            ends[position] = last
+        else:
+            starts.insert(position, first)
+            ends.insert(position, last)
+
+    def remove(self, user_id: int, start: date) -> bool:
+        """The method removing the plan starting on the given day.
+
+        Args:
+            user_id (int): The id of the user.
+            start (date): The first day of the plan.
+
+        Returns:
+            bool: Whether the plan was indexed.
+        """
+        starts = self._starts.get(user_id)
+        if not starts:
+            return False
+
+        first = start.toordinal()
+        position = bisect_left(starts, first)
+        if position == len(starts) or starts[position] != first:
+            return False
+
+        del starts[position]
+        del self._ends[user_id][position]
+        if not starts:
+            del self._starts[user_id]
+            del self._ends[user_id]
+
+        return True
+
+    def remove_user(self, user_id: int) -> None:
+        """The method removing all plans of a user.
+
+        Args:
+            user_id (int): The id of the user.
+        """
+        self._starts.pop(user_id, None)
+        self._ends.pop(user_id, None)
+
+    def overlapping(self, user_id: int, first: date, last: date) -> list[date]:
+        """The method getting the plans sharing a day with the date range.
+
+        Args:
+            user_id (int): The id of the user.
+            first (date): The first day of the range.
+            last (date): The last day of the range.
+
+        Returns:
+            list[date]: Ascending first days of the plans.
+        """
+        starts = self._starts.get(user_id)
+        if not starts:
+            return []
+
+        begin = bisect_left(self._ends[user_id], first.toordinal())
+        end = bisect_right(starts, last.toordinal(), begin)
+
+        return [date.fromordinal(start) for start in starts[begin:end]]
+
+    def covering(self, user_id: int, day: date) -> Optional[date]:
+        """The method getting the plan a day belongs to.
+
+        Args:
+            user_id (int): The id of the user.
+            day (date): The day.
+
+        Returns:
+            Optional[date]: The first day of the plan if there is one.
+        """
+        starts = self._starts.get(user_id)
+        if not starts:
+            return None
+
+        position = bisect_right(starts, day.toordinal()) - 1
+        if position < 0 or self._ends[user_id][position] < day.toordinal():
+            return None
+
+        return date.fromordinal(starts[position])
+
+    def previous(self, user_id: int, day: date) -> Optional[date]:
+        """The method getting the last plan starting before the day.
+
+        Args:
+            user_id (int): The id of the user.
+            day (date): The day.
+
+        Returns:
+            Optional[date]: The first day of the plan if there is one.
+        """
+        starts = self._starts.get(user_id)
+        if not starts:
+            return None
+
+        position = bisect_left(starts, day.toordinal()) - 1
+        return date.fromordinal(starts[position]) if position >= 0 else None
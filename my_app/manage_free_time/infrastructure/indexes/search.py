@@ -0,0 +1,308 @@
+"""Module containing an in-process full-text index of idea titles."""
+
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from manage_free_time.core.domain.idea import Idea
+
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.75
+FUZZY_SCORE = 0.6
+MIN_FUZZY_SIMILARITY = 0.3
+MIN_FUZZY_LENGTH = 3
+MAX_EXPANSIONS = 50
+MIN_PREFIX_LENGTH = 2
+MAX_EXPANSION_POSTINGS = 500
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_TRANSLITERATION = str.maketrans({"ł": "l", "ß": "ss", "ø": "o", "đ": "d"})
+
+
+def normalize(text: str) -> str:
+    """Lowercase the text and strip diacritics from it.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    text = text.lower().translate(_TRANSLITERATION)
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> list[str]:
+    """Split the text into normalized tokens.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        list[str]: The tokens in order of appearance.
+    """
+    return _TOKEN_PATTERN.findall(normalize(text))
+
+
+def trigrams(token: str) -> set[str]:
+    """Get the padded trigrams of a token.
+
+    Args:
+        token (str): The normalized token.
+
+    Returns:
+        set[str]: The trigrams of the token.
+    """
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """A class indexing idea titles for ranked and typo-tolerant search.
+
+    Titles are split into tokens with an ascending posting list of idea
+    ids per token. The sorted vocabulary answers prefix queries with
+    binary search, and a trigram index over the vocabulary (not over the
+    ideas) finds misspelled tokens, so a query touches only the postings
+    of matching tokens. Of a token matched by prefix or by similarity only
+    the `MAX_EXPANSION_POSTINGS` newest ideas are scored, which bounds the
+    work of short queries regardless of the size of the catalogue.
+    """
+
+    _postings: dict[str, array]
+    _vocabulary: list[str]
+    _trigrams: defaultdict[str, set[str]]
+    _trigram_counts: dict[str, int]
+    _documents: dict[int, tuple[tuple[str, ...], str, frozenset[str]]]
+    _warm: bool
+
+    def __init__(self) -> None:
+        """The initializer of the `SearchIndex`."""
+        self._reset()
+        self._warm = False
+
+    @property
+    def is_warm(self) -> bool:
+        """bool: Whether the index has been loaded from the data storage."""
+        return self._warm
+
+    def load(self, ideas: Iterable[Idea]) -> None:
+        """The method (re)building the index from the given ideas.
+
+        Args:
+            ideas (Iterable[Idea]): All ideas in the data storage.
+        """
+        self.load_rows(
+            (idea.id, idea.title, idea.category, idea.tags) for idea in ideas
+        )
+
+    def load_rows(
+        self, rows: Iterable[tuple[int, str, str, Iterable[str]]]
+    ) -> None:
+        """The method (re)building the index from the fields of ideas.
+
+        Titles repeated by several ideas are tokenized once.
+
+        Args:
+            rows (Iterable[tuple[int, str, str, Iterable[str]]]): The id,
+                the title, the category and the tags of every idea in the
+                data storage.
+        """
+        self._reset()
+        tokens_by_title: dict[str, tuple[str, ...]] = {}
+        for idea_id, title, category, tags in rows:
+            tokens = tokens_by_title.get(title)
+            if tokens is None:
+                tokens = tokens_by_title[title] = tuple(dict.fromkeys(tokenize(title)))
+            self._index(idea_id, tokens, category, frozenset(tags))
+        self._warm = True
+
+    def add(self, idea: Idea) -> None:
+        """The method indexing an idea, replacing its previous version.
+
+        Args:
+            idea (Idea): The idea to index.
+        """
+        self.remove(idea.id)
+        tokens = tuple(dict.fromkeys(tokenize(idea.title)))
+        self._index(idea.id, tokens, idea.category, frozenset(idea.tags))
+
+    def remove(self, idea_id: int) -> None:
+        """The method removing an idea from the index.
+
+        Args:
+            idea_id (int): The id of the idea.
+        """
+        document = self._documents.pop(idea_id, None)
+        if document is None:
+            return
+
+        for token in document[0]:
+            posting = self._postings[token]
+            position = bisect_left(posting, idea_id)
+            if position < len(posting) and posting[position] == idea_id:
+                del posting[position]
+            if posting:
+                continue
+
+            del self._postings[token]
+            del self._trigram_counts[token]
+            del self._vocabulary[bisect_left(self._vocabulary, token)]
+            for trigram in trigrams(token):
+                tokens = self._trigrams[trigram]
+                tokens.discard(token)
+                if not tokens:
+                    del self._trigrams[trigram]
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+        prefix: bool = True,
+        limit: int = 20,
+    ) -> list[int]:
+        """The method finding ideas whose titles match the query.
+
+        Every query token adds the score of its best match in a title:
+        an exact token, a token it is a prefix of (only the last query
+        token when `prefix` is set, as the user is still typing it, and at
+        least `MIN_PREFIX_LENGTH` characters long) or a similar token by
+        trigram Jaccard similarity.
+
+        Args:
+            query (str): The searched text.
+            category (Optional[str]): The category the ideas must belong to.
+            tags (Optional[Iterable[str]]): Tags the ideas must all have.
+            prefix (bool): Whether the last query token is incomplete.
+            limit (int): The maximal number of returned ids.
+
+        Returns:
+            list[int]: Ids of matching ideas, best matches first.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        scores: defaultdict[int, float] = defaultdict(float)
+        for position, token in enumerate(tokens):
+            is_prefix = prefix and position == len(tokens) - 1
+            best: dict[int, float] = {}
+            for variant, score in self._expand(token, is_prefix):
+                posting = self._postings[variant]
+                if variant != token:
+                    posting = posting[-MAX_EXPANSION_POSTINGS:]
+                for idea_id in posting:
+                    if score > best.get(idea_id, 0.0):
+                        best[idea_id] = score
+            for idea_id, score in best.items():
+                scores[idea_id] += score
+
+        required_tags = frozenset(tags or ())
+        candidates = []
+        for idea_id, score in scores.items():
+            title_tokens, idea_category, idea_tags = self._documents[idea_id]
+            if category is not None and idea_category != category:
+                continue
+            if not required_tags <= idea_tags:
+                continue
+            # Shorter titles win ties, as the query covers more of them.
+            candidates.append((score / (1 + 0.01 * len(title_tokens)), idea_id))
+
+        ranked = heapq.nsmallest(
+            limit,
+            candidates,
+            key=lambda candidate: (-candidate[0], candidate[1]),
+        )
+        return [idea_id for _, idea_id in ranked]
+
+    def _expand(self, token: str, is_prefix: bool) -> list[tuple[str, float]]:
+        """Find vocabulary tokens matching a query token with their scores.
+
+        Args:
+            token (str): The normalized query token.
+            is_prefix (bool): Whether longer tokens starting with it match.
+
+        Returns:
+            list[tuple[str, float]]: The matching tokens and their scores.
+        """
+        variants: dict[str, float] = {}
+        if token in self._postings:
+            variants[token] = EXACT_SCORE
+
+        if is_prefix and len(token) >= MIN_PREFIX_LENGTH:
+            position = bisect_left(self._vocabulary, token)
+            for candidate in self._vocabulary[position:position + MAX_EXPANSIONS]:
+                if not candidate.startswith(token):
+                    break
+                variants.setdefault(candidate, PREFIX_SCORE)
+
+        if len(token) >= MIN_FUZZY_LENGTH:
+            query_trigrams = trigrams(token)
+            shared: defaultdict[str, int] = defaultdict(int)
+            for trigram in query_trigrams:
+                for candidate in self._trigrams.get(trigram, ()):
+                    shared[candidate] += 1
+            similar = heapq.nlargest(
+                MAX_EXPANSIONS,
+                (
+                    (
+                        count / (
+                            len(query_trigrams)
+                            + self._trigram_counts[candidate]
+                            - count
+                        ),
+                        candidate,
+                    )
+                    for candidate, count in shared.items()
+                    if candidate not in variants
+                ),
+            )
+            for similarity, candidate in similar:
+                if similarity >= MIN_FUZZY_SIMILARITY:
+                    variants[candidate] = FUZZY_SCORE * similarity
+
+        return list(variants.items())
+
+    def _index(
+        self,
+        idea_id: int,
+        tokens: tuple[str, ...],
+        category: str,
+        tags: frozenset[str],
+    ) -> None:
+        """Index an idea which is not indexed yet.
+
+        Args:
+            idea_id (int): The id of the idea.
+            tokens (tuple[str, ...]): The distinct tokens of the title.
+            category (str): The category of the idea.
+            tags (frozenset[str]): The tags of the idea.
+        """
+        self._documents[idea_id] = (tokens, category, tags)
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = array("q")
+                insort(self._vocabulary, token)
+                token_trigrams = trigrams(token)
+                self._trigram_counts[token] = len(token_trigrams)
+                for trigram in token_trigrams:
+                    self._trigrams[trigram].add(token)
+            if posting and posting[-1] > idea_id:
+                insort(posting, idea_id)
+            else:
+                posting.append(idea_id)
+
+    def _reset(self) -> None:
+        """Drop all indexed data."""
+        self._postings = {}
+        self._vocabulary = []
+        self._trigrams = defaultdict(set)
+        self._trigram_counts = {}
+        self._documents = {}
@@ -0,0 +1,310 @@
+"""Module containing an in-process index of ideas with similar tags."""
+
+import hashlib
+import heapq
+import random
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+from manage_free_time.core.domain.idea import Idea
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+TAG_HASHES_CACHE_SIZE = 100_000
+
+
+def jaccard(first: frozenset[str], second: frozenset[str]) -> float:
+    """Get the Jaccard similarity of two sets of tags.
+
+    Args:
+        first (frozenset[str]): The tags of one idea.
+        second (frozenset[str]): The tags of the other idea.
+
+    Returns:
+        float: The size of the intersection divided by the size of the union.
+    """
+    if not first or not second:
+        return 0.0
+
+    common = len(first & second)
+    return common / (len(first) + len(second) - common)
+
+
+def tag_hash(tag: str) -> int:
+    """Hash a tag to 61 bits, the same way in every process.
+
+    Args:
+        tag (str): The tag.
+
+    Returns:
+        int: The hash smaller than `MERSENNE_PRIME`.
+    """
+    digest = hashlib.blake2b(tag.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % MERSENNE_PRIME
+
+
+class SimilarityIndex:
+    """A class finding ideas whose tags overlap the most with an idea.
+
+    Every idea gets a MinHash signature of `bands * rows` values. Two
+    signatures agree on a value with the probability equal to the Jaccard
+    similarity of the tag sets, so the signature is split into bands and
+    ideas agreeing on a whole band land in the same bucket. A query reads
+    only the buckets of the idea, at most `candidates_per_band` newest ids
+    from each, and ranks these candidates by their exact similarity.
+
+    With `rows` values per band an idea of similarity `s` becomes
+    a candidate with the probability `1 - (1 - s ** rows) ** bands`.
+    Buckets are sorted `array('q')` buffers like the postings of
+    `TagIndex`, so new ideas are appended.
+    """
+
+    _bands: int
+    _rows: int
+    _candidates_per_band: int
+    _coefficients: list[tuple[int, int]]
+    _tag_hashes: dict[str, tuple[int, ...]]
+    _buckets: list[dict[int, array]]
+    _documents: dict[int, tuple[frozenset[str], str, array]]
+    _warm: bool
+
+    def __init__(
+        self,
+        bands: int = 16,
+        rows: int = 2,
+        candidates_per_band: int = 200,
+        seed: int = 1,
+    ) -> None:
+        """The initializer of the `SimilarityIndex`.
+
+        Args:
+            bands (int): The number of LSH bands.
+            rows (int): The number of signature values in a band.
+            candidates_per_band (int): The maximal number of ids read from
+                a single bucket by a query.
+            seed (int): The seed of the hash functions.
+        """
+        self._bands = bands
+        self._rows = rows
+        self._candidates_per_band = candidates_per_band
+        rng = random.Random(seed)
+        self._coefficients = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(MERSENNE_PRIME))
+            for _ in range(bands * rows)
+        ]
+        self._tag_hashes = {}
+        self._reset()
+        self._warm = False
+
+    @property
+    def is_warm(self) -> bool:
+        """bool: Whether the index has been loaded from the data storage."""
+        return self._warm
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, idea_id: int) -> bool:
+        return idea_id in self._documents
+
+    def load(self, ideas: Iterable[Idea]) -> None:
+        """The method (re)building the index from the given ideas.
+
+        Args:
+            ideas (Iterable[Idea]): All ideas in the data storage, in
+                ascending order of ids.
+        """
+        self.load_rows((idea.id, idea.tags, idea.category) for idea in ideas)
+
+    def load_rows(
+        self, rows: Iterable[tuple[int, Iterable[str], str]]
+    ) -> None:
+        """The method (re)building the index from the tags of ideas.
+
+        Ideas with the same set of tags share its signature and bucket
+        keys, which are computed once.
+
+        Args:
+            rows (Iterable[tuple[int, Iterable[str], str]]): The id, the
+                tags and the category of every idea in the data storage,
+                in ascending order of ids.
+        """
+        self._reset()
+        signed: dict[frozenset[str], tuple[frozenset[str], array, list[int]]] = {}
+        for idea_id, idea_tags, category in rows:
+            tags = frozenset(idea_tags)
+            if not tags:
+                continue
+
+            entry = signed.get(tags)
+            if entry is None:
+                signature = self._signature(tags)
+                entry = signed[tags] = (tags, signature, self._band_keys(signature))
+            tags, signature, keys = entry
+            self._documents[idea_id] = (tags, category, signature)
+            for band, key in enumerate(keys):
+                self._insert(band, key, idea_id)
+        self._warm = True
+
+    def add(self, idea: Idea) -> None:
+        """The method indexing an idea, replacing its previous version.
+
+        Ideas without tags are not indexed.
+
+        Args:
+            idea (Idea): The idea to index.
+        """
+        tags = frozenset(idea.tags)
+        document = self._documents.get(idea.id)
+        if document is not None and document[0] == tags:
+            self._documents[idea.id] = (tags, idea.category, document[2])
+            return
+
+        self.remove(idea.id)
+        if not tags:
+            return
+
+        signature = self._signature(tags)
+        self._documents[idea.id] = (tags, idea.category, signature)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._insert(band, key, idea.id)
+
+    def remove(self, idea_id: int) -> None:
+        """The method removing an idea from the index.
+
+        Args:
+            idea_id (int): The id of the idea.
+        """
+        document = self._documents.pop(idea_id, None)
+        if document is None:
+            return
+
+        for band, key in enumerate(self._band_keys(document[2])):
+            self._discard(band, key, idea_id)
+
+    def similar(self, idea_id: int, limit: int = 10) -> list[int]:
+        """The method getting ids of ideas with the most similar tags.
+
+        Candidates are ranked by the Jaccard similarity of their tags,
+        then by sharing the category of the idea, newer ideas first.
+
+        Args:
+            idea_id (int): The id of the idea.
+            limit (int): The maximal number of returned ids.
+
+        Returns:
+            list[int]: Ids of similar ideas, the most similar first.
+        """
+        document = self._documents.get(idea_id)
+        if document is None:
+            return []
+
+        tags, category, signature = document
+        candidates: set[int] = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                candidates.update(bucket[-self._candidates_per_band:])
+        candidates.discard(idea_id)
+
+        ranked = []
+        for candidate in candidates:
+            other_tags, other_category, _ = self._documents[candidate]
+            ranked.append((
+                jaccard(tags, other_tags),
+                other_category == category,
+                candidate,
+            ))
+
+        return [entry[2] for entry in heapq.nlargest(limit, ranked)]
+
+    def _signature(self, tags: frozenset[str]) -> array:
+        """Compute the MinHash signature of a set of tags.
+
+        Args:
+            tags (frozenset[str]): The non-empty set of tags.
+
+        Returns:
+            array: The minimum of every hash function over the tags.
+        """
+        hashes = list(map(self._hashes, tags))
+        if len(hashes) == 1:
+            return array("I", hashes[0])
+
+        return array("I", map(min, *hashes))
+
+    def _hashes(self, tag: str) -> tuple[int, ...]:
+        """Get the values of all hash functions for a tag.
+
+        The values of recently used tags are cached, the cache is cleared
+        once it holds `TAG_HASHES_CACHE_SIZE` tags.
+
+        Args:
+            tag (str): The tag.
+
+        Returns:
+            tuple[int, ...]: The 32-bit value of every hash function.
+        """
+        hashes = self._tag_hashes.get(tag)
+        if hashes is None:
+            if len(self._tag_hashes) >= TAG_HASHES_CACHE_SIZE:
+                self._tag_hashes.clear()
+            value = tag_hash(tag)
+            hashes = self._tag_hashes[tag] = tuple(
+                (a * value + b) % MERSENNE_PRIME & MAX_HASH
+                for a, b in self._coefficients
+            )
+
+        return hashes
+
+    def _band_keys(self, signature: array) -> list[int]:
+        """Split a signature into bands and hash each of them.
+
+        Args:
+            signature (array): The MinHash signature.
+
+        Returns:
+            list[int]: The bucket key of every band.
+        """
+        values = iter(signature.tolist())
+        return list(map(hash, zip(*[values] * self._rows)))
+
+    def _insert(self, band: int, key: int, idea_id: int) -> None:
+        """Insert an id into a bucket keeping the order.
+
+        Args:
+            band (int): The number of the band.
+            key (int): The key of the bucket.
+            idea_id (int): The id of the idea.
+        """
+        bucket = self._buckets[band].get(key)
+        if bucket is None:
+            self._buckets[band][key] = array("q", (idea_id,))
+        elif bucket[-1] < idea_id:
+            bucket.append(idea_id)
+        else:
+            bucket.insert(bisect_left(bucket, idea_id), idea_id)
+
+    def _discard(self, band: int, key: int, idea_id: int) -> None:
+        """Remove an id from a bucket if present.
+
+        Args:
+            band (int): The number of the band.
+            key (int): The key of the bucket.
+            idea_id (int): The id of the idea.
+        """
+        bucket: Optional[array] = self._buckets[band].get(key)
+        if bucket is None:
+            return
+
+        position = bisect_left(bucket, idea_id)
+        if position < len(bucket) and bucket[position] == idea_id:
+            del bucket[position]
+        if not bucket:
+            del self._buckets[band][key]
+
+    def _reset(self) -> None:
+        """Drop all indexed ideas."""
+        self._buckets = [{} for _ in range(self._bands)]
+        self._documents = {}
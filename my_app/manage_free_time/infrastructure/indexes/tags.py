@@ -0,0 +1,239 @@
+"""Module containing an in-process inverted index of idea tags."""
+
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Optional
+
+from manage_free_time.core.domain.idea import Idea
+
+
+class TagIndex:
+    """A class mapping every tag to a sorted posting list of idea ids.
+
+    Posting lists are `array('q')` buffers kept in ascending order. New
+    ideas usually get the highest id, so adding one is an append in the
+    common case and a binary-search insert otherwise.
+    """
+
+    _postings: dict[str, array]
+    _tags_by_id: dict[int, tuple[str, ...]]
+    _warm: bool
+
+    def __init__(self) -> None:
+        """The initializer of the `TagIndex`."""
+        self._postings = {}
+        self._tags_by_id = {}
+        self._warm = False
+
+    @property
+    def is_warm(self) -> bool:
+        """bool: Whether the index has been loaded from the data storage."""
+        return self._warm
+
+    def load(self, ideas: Iterable[Idea]) -> None:
+        """The method (re)building the index from the given ideas.
+
+        Args:
+            ideas (Iterable[Idea]): All ideas in the data storage, in
+                ascending order of ids.
+        """
+        self.load_rows((idea.id, idea.tags) for idea in ideas)
+
+    def load_rows(self, rows: Iterable[tuple[int, Iterable[str]]]) -> None:
+        """The method (re)building the index from ids and tags.
+
+        Args:
+            rows (Iterable[tuple[int, Iterable[str]]]): The id and the tags
+                of every idea in the data storage, in ascending order of
+                ids.
+        """
+        self._postings = {}
+        self._tags_by_id = {}
+        for idea_id, tags in rows:
+            self.add(idea_id, tags)
+        self._warm = True
+
+    def add(self, idea_id: int, tags: Iterable[str]) -> None:
+        """The method indexing the tags of an idea.
+
+        Tags indexed earlier for the same idea are replaced.
+
+        Args:
+            idea_id (int): The id of the idea.
+            tags (Iterable[str]): The tags of the idea.
+        """
+        new_tags = tuple(dict.fromkeys(tags))
+        old_tags = self._tags_by_id.get(idea_id, ())
+        if new_tags == old_tags:
+            return
+
+        for tag in set(old_tags).difference(new_tags):
+            self._discard(tag, idea_id)
+        for tag in set(new_tags).difference(old_tags):
+            self._insert(tag, idea_id)
+
+        if new_tags:
+            self._tags_by_id[idea_id] = new_tags
+        else:
+            self._tags_by_id.pop(idea_id, None)
+
+    def remove(self, idea_id: int) -> None:
+        """The method removing an idea from the index.
+
+        Args:
+            idea_id (int): The id of the idea.
+        """
+        for tag in self._tags_by_id.pop(idea_id, ()):
+            self._discard(tag, idea_id)
+
+    def posting(self, tag: str) -> array:
+        """The method getting the ascending ids of ideas with a tag.
+
+        The returned array is the index itself and must not be modified.
+
+        Args:
+            tag (str): The tag.
+
+        Returns:
+            array: The ids of the ideas.
+        """
+        return self._postings.get(tag, array("q"))
+
+    def query(
+        self,
+        tags: Iterable[str],
+        match_all: bool = True,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[int]:
+        """The method getting ids of ideas matching the tags.
+
+        Args:
+            tags (Iterable[str]): The tags to match.
+            match_all (bool): Whether all tags (AND) or any tag (OR) must match.
+            after (Optional[int]): Only ids greater than this one are returned.
+            limit (Optional[int]): The maximal number of returned ids.
+
+        Returns:
+            list[int]: Ascending ids of matching ideas.
+        """
+        tags = set(tags)
+        if not tags:
+            return []
+
+        if match_all:
+            postings = [self._postings.get(tag) for tag in tags]
+            if not all(postings):
+                return []
+            return self._intersect(postings, after, limit)
+
+        postings = [self._postings[tag] for tag in tags if tag in self._postings]
+        return self._union(postings, after, limit)
+
+    @staticmethod
+    def _intersect(
+        postings: list[array],
+        after: Optional[int],
+        limit: Optional[int],
+    ) -> list[int]:
+        """Intersect posting lists, driving the scan by the shortest one.
+
+        Every candidate from the shortest list is looked up in the longer
+        ones by binary search. The search start in each list only moves
+        forward, so the cost is O(k * m * log n) for the shortest list of
+        length m.
+
+        Args:
+            postings (list[array]): Non-empty sorted posting lists.
+            after (Optional[int]): Only ids greater than this one are returned.
+            limit (Optional[int]): The maximal number of returned ids.
+
+        Returns:
+            list[int]: Ascending ids present in every posting list.
+        """
+        postings = sorted(postings, key=len)
+        shortest, others = postings[0], postings[1:]
+        starts = [0] * len(others)
+        start = bisect_right(shortest, after) if after is not None else 0
+
+        result = []
+        for position in range(start, len(shortest)):
+            candidate = shortest[position]
+            for number, posting in enumerate(others):
+                found = bisect_left(posting, candidate, starts[number])
+                starts[number] = found
+                if found == len(posting):
+                    return result
+                if posting[found] != candidate:
+                    break
+            else:
+                result.append(candidate)
+                if limit is not None and len(result) == limit:
+                    break
+
+        return result
+
+    @staticmethod
+    def _union(
+        postings: list[array],
+        after: Optional[int],
+        limit: Optional[int],
+    ) -> list[int]:
+        """Merge posting lists into one sorted list without duplicates.
+
+        Args:
+            postings (list[array]): Sorted posting lists.
+            after (Optional[int]): Only ids greater than this one are returned.
+            limit (Optional[int]): The maximal number of returned ids.
+
+        Returns:
+            list[int]: Ascending ids present in any posting list.
+        """
+        if after is not None:
+            postings = [
+                posting[bisect_right(posting, after):] for posting in postings
+            ]
+
+        result: list[int] = []
+        for idea_id in heapq.merge(*postings):
+            if result and result[-1] == idea_id:
+                continue
+            result.append(idea_id)
+            if limit is not None and len(result) == limit:
+                break
+
+        return result
+
+    def _insert(self, tag: str, idea_id: int) -> None:
+        """Insert an id into the posting list of the tag keeping the order.
+
+        Args:
+            tag (str): The tag.
+            idea_id (int): The id of the idea.
+        """
+        posting = self._postings.setdefault(tag, array("q"))
+        if not posting or posting[-1] < idea_id:
+            posting.append(idea_id)
+            return
+
+        position = bisect_left(posting, idea_id)
+        if position == len(posting) or posting[position] != idea_id:
+            posting.insert(position, idea_id)
+
+    def _discard(self, tag: str, idea_id: int) -> None:
+        """Remove an id from the posting list of the tag if present.
+
+        Args:
+            tag (str): The tag.
+            idea_id (int): The id of the idea.
+        """
+        posting = self._postings.get(tag)
+        if posting is None:
+            return
+
+        position = bisect_left(posting, idea_id)
+        if position < len(posting) and posting[position] == idea_id:
+            del posting[position]
+        if not posting:
+            del self._postings[tag]
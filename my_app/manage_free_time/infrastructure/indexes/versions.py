@@ -0,0 +1,64 @@
+"""Module containing in-process version counters of idea collections."""
+
+import secrets
+from typing import Optional
+
+
+class CollectionVersions:
+    """A class counting changes of the idea collections.
+
+    There is a counter of all ideas, one per category and one per user.
+    A write bumps the global counter and the counters of the category and
+    the author of the idea, so a collection keeps its version for as long
+    as none of its ideas changes. The counters start from zero in every
+    process, hence their tokens carry a random epoch drawn at startup and
+    a restart never repeats a token handed out before. They only count
+    the writes of their own process, so the ETags of lists stored in the
+    database come from `IdeaVersionRepository`, shared by all workers.
+    """
+
+    _epoch: str
+    _all: int
+    _by_category: dict[str, int]
+    _by_user: dict[int, int]
+
+    def __init__(self) -> None:
+        """The initializer of the `CollectionVersions`."""
+        self._epoch = secrets.token_hex(4)
+        self._all = 0
+        self._by_category = {}
+        self._by_user = {}
+
+    def bump(self, category: str, user_id: int) -> None:
+        """The method recording a change of an idea.
+
+        Args:
+            category (str): The category of the idea.
+            user_id (int): The id of the author of the idea.
+        """
+        self._all += 1
+        self._by_category[category] = self._by_category.get(category, 0) + 1
+        self._by_user[user_id] = self._by_user.get(user_id, 0) + 1
+
+    def token(
+        self,
+        category: Optional[str] = None,
+        user_id: Optional[int] = None,
+    ) -> str:
+        """The method getting the current version of a collection.
+
+        Args:
+            category (Optional[str]): The category of the collection.
+            user_id (Optional[int]): The author of the collection, used
+                when no category is given.
+
+        Returns:
+            str: The version, e.g. `3f9a01c2.c.17`, or the version of all
+                ideas when neither the category nor the user is given.
+        """
+        if category is not None:
+            return f"{self._epoch}.c.{self._by_category.get(category, 0)}"
+        if user_id is not None:
+            return f"{self._epoch}.u.{self._by_user.get(user_id, 0)}"
+
+        return f"{self._epoch}.a.{self._all}"
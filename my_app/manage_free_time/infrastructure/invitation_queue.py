@@ -0,0 +1,324 @@
+"""Module containing the background queue dispatching invitations."""
+
+import asyncio
+import logging
+import random
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from manage_free_time.core.domain.invitations import (
+    Invitation,
+    InvitationIn,
+    InvitationJob,
+)
+from manage_free_time.core.repositories.iinvitations import IInvitationRepository
+from manage_free_time.infrastructure.senders import IInvitationSender
+
+logger = logging.getLogger(__name__)
+
+InvitationKey = tuple[int, str]
+
+
+def invitation_key(invitation: InvitationIn) -> InvitationKey:
+    """Get the deduplication key of an invitation.
+
+    Args:
+        invitation (InvitationIn): The invitation.
+
+    Returns:
+        InvitationKey: The inviter id and the normalized email.
+    """
+    return invitation.inviter_id, invitation.invitee_email.strip().lower()
+
+
+class InvitationQueue:
+    """A class storing and delivering invitations outside the request path.
+
+    Submitted invitations are put on an `asyncio.Queue`. A dispatcher
+    takes up to `batch_size` of them at once, stores them with a single
+    insert and delivers the new ones through the sender with at most
+    `concurrency` deliveries in flight. Failed deliveries are retried
+    with exponential backoff. An invitation is sent once per inviter
+    and email, both within the queue and against the data storage.
+    """
+
+    _repository: IInvitationRepository
+    _sender: IInvitationSender
+    _batch_size: int
+    _batch_wait: float
+    _max_attempts: int
+    _retry_delay: float
+    _max_jobs: int
+    _queue: Optional[asyncio.Queue]
+    _deliveries: Optional[asyncio.Semaphore]
+    _concurrency: int
+    _jobs: OrderedDict[str, InvitationJob]
+    _in_flight: set[InvitationKey]
+    _dispatcher: Optional[asyncio.Task]
+    _tasks: set[asyncio.Task]
+
+    def __init__(
+        self,
+        repository: IInvitationRepository,
+        sender: IInvitationSender,
+        batch_size: int,
+        batch_wait: float,
+        concurrency: int,
+        max_attempts: int,
+        retry_delay: float,
+        max_jobs: int,
+    ) -> None:
+        """The initializer of the `InvitationQueue`.
+
+        Args:
+            repository (IInvitationRepository): The reference to the repository.
+            sender (IInvitationSender): The channel delivering invitations.
+            batch_size (int): The maximal number of invitations stored at once.
+            batch_wait (float): Seconds to wait for a batch to fill up.
+            concurrency (int): The maximal number of deliveries in flight.
+            max_attempts (int): The number of delivery attempts.
+            retry_delay (float): The delay before the first retry in seconds.
+            max_jobs (int): The number of jobs whose status is remembered.
+        """
+        self._repository = repository
+        self._sender = sender
+        self._batch_size = batch_size
+        self._batch_wait = batch_wait
+        self._concurrency = concurrency
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+        self._max_jobs = max_jobs
+        self._queue = None
+        self._deliveries = None
+        self._jobs = OrderedDict()
+        self._in_flight = set()
+        self._dispatcher = None
+        self._tasks = set()
+
+    async def start(self) -> None:
+        """The method starting the dispatcher on the running event loop."""
+        if self._dispatcher is not None:
+            return
+
+        self._queue = asyncio.Queue()
+        self._deliveries = asyncio.Semaphore(self._concurrency)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """The method stopping the dispatcher after draining the queue.
+
+        Args:
+            timeout (float): Seconds to wait for queued invitations.
+        """
+        if self._dispatcher is None or self._queue is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("%d invitations left in the queue", self._queue.qsize())
+
+        tasks = (self._dispatcher, *self._tasks)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._dispatcher = None
+
+    def submit(self, invitations: list[InvitationIn]) -> InvitationJob:
+        """The method queueing invitations and returning their job.
+
+        Repeated invitations and ones already waiting in the queue are
+        counted as duplicates and skipped.
+
+        Args:
+            invitations (list[InvitationIn]): The invitations to send.
+
+        Returns:
+            InvitationJob: The job tracking the invitations.
+        """
+        if self._queue is None:
+            raise RuntimeError("The invitation queue is not started")
+
+        job = InvitationJob(id=uuid.uuid4().hex, total=len(invitations))
+        self._remember(job)
+
+        for invitation in invitations:
+            key = invitation_key(invitation)
+            if key in self._in_flight:
+                job.duplicates += 1
+                continue
+
+            self._in_flight.add(key)
+            self._queue.put_nowait(
+                (job.id, invitation.model_copy(update={"invitee_email": key[1]}))
+            )
+
+        self._finish_if_done(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[InvitationJob]:
+        """The method getting a job by id.
+
+        Args:
+            job_id (str): The id of the job.
+
+        Returns:
+            Optional[InvitationJob]: The job if it is still remembered.
+        """
+        return self._jobs.get(job_id)
+
+    async def _dispatch(self) -> None:
+        """Take batches off the queue and process them concurrently."""
+        assert self._queue is not None
+        while True:
+            batch = [await self._queue.get()]
+            deadline = asyncio.get_running_loop().time() + self._batch_wait
+            while len(batch) < self._batch_size:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._process(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, batch: list[tuple[str, InvitationIn]]) -> None:
+        """Store a batch of invitations and deliver the new ones.
+
+        Args:
+            batch (list[tuple[str, InvitationIn]]): Job ids and invitations.
+        """
+        assert self._queue is not None
+        pending = {invitation_key(data): job_id for job_id, data in batch}
+        try:
+            stored = await self._store([data for _, data in batch])
+            stored_keys = {invitation_key(invitation) for invitation in stored}
+            for key in set(pending).difference(stored_keys):
+                self._count(pending.pop(key), "duplicates")
+
+            delivered = await asyncio.gather(
+                *(self._deliver(invitation) for invitation in stored)
+            )
+            await self._repository.update_statuses(
+                [invitation.id for invitation, ok in zip(stored, delivered) if ok],
+                "sent",
+            )
+            await self._repository.update_statuses(
+                [invitation.id for invitation, ok in zip(stored, delivered) if not ok],
+                "failed",
+            )
+            for invitation, ok in zip(stored, delivered):
+                job_id = pending.pop(invitation_key(invitation))
+                self._count(job_id, "sent" if ok else "failed")
+        except Exception:
+            logger.exception("Processing of %d invitations failed", len(batch))
+            for job_id in pending.values():
+                self._count(job_id, "failed")
+        finally:
+            self._in_flight.difference_update(
+                invitation_key(data) for _, data in batch
+            )
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _store(self, data: list[InvitationIn]) -> list[Invitation]:
+        """Insert a batch of invitations, retrying with backoff.
+
+        Args:
+            data (list[InvitationIn]): The invitations.
+
+        Returns:
+            list[Invitation]: The stored invitations, without duplicates.
+        """
+        for attempt in range(self._max_attempts):
+            try:
+                return await self._repository.add_invitations(data)
+            except Exception:
+                if attempt == self._max_attempts - 1:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+
+        return []
+
+    async def _deliver(self, invitation: Invitation) -> bool:
+        """Deliver an invitation, retrying with backoff.
+
+        Args:
+            invitation (Invitation): The stored invitation.
+
+        Returns:
+            bool: Whether the invitation was delivered.
+        """
+        assert self._deliveries is not None
+        for attempt in range(self._max_attempts):
+            try:
+                async with self._deliveries:
+                    await self._sender.send(invitation)
+                return True
+            except Exception as error:
+                logger.warning(
+                    "Delivery of invitation %d failed (attempt %d): %s",
+                    invitation.id,
+                    attempt + 1,
+                    error,
+                )
+                if attempt < self._max_attempts - 1:
+                    await asyncio.sleep(self._backoff(attempt))
+
+        return False
+
+    def _backoff(self, attempt: int) -> float:
+        """Get the delay before the next attempt with full jitter.
+
+        Args:
+            attempt (int): The number of the failed attempt, from 0.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        return random.uniform(0, self._retry_delay * 2 ** attempt)
+
+    def _count(self, job_id: str, counter: str) -> None:
+        """Increment a counter of a job.
+
+        Args:
+            job_id (str): The id of the job.
+            counter (str): The name of the counter.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+
+        setattr(job, counter, getattr(job, counter) + 1)
+        job.status = "processing"
+        self._finish_if_done(job)
+
+    def _finish_if_done(self, job: InvitationJob) -> None:
+        """Mark a job as done when all its invitations are accounted for.
+
+        Args:
+            job (InvitationJob): The job.
+        """
+        if job.duplicates + job.sent + job.failed == job.total:
+            job.status = "done"
+
+    def _remember(self, job: InvitationJob) -> None:
+        """Keep a job, forgetting the oldest ones above `max_jobs`.
+
+        Args:
+            job (InvitationJob): The job.
+        """
+        self._jobs[job.id] = job
+        while len(self._jobs) > self._max_jobs:
+            self._jobs.popitem(last=False)
@@ -0,0 +1,110 @@
+"""Module containing per-request loaders batching repository lookups."""
+
+import asyncio
+from typing import Awaitable, Iterable
+
+from manage_free_time.core.domain.idea import Idea
+from manage_free_time.core.repositories.iidea import IIdeaRepository
+
+
+class IdeaLoader:
+    """A class coalescing lookups of ideas by id into batched queries.
+
+    Ids requested during one iteration of the event loop are collected and
+    loaded with a single `get_by_ids` call once the loop gets back to the
+    scheduled dispatch. Results are memoized, so an instance should live
+    no longer than one request.
+    """
+
+    _repository: IIdeaRepository
+    _max_batch_size: int
+    _futures: dict[int, asyncio.Future]
+    _queue: list[int]
+    _tasks: set[asyncio.Task]
+
+    def __init__(
+        self,
+        repository: IIdeaRepository,
+        max_batch_size: int = 1000,
+    ) -> None:
+        """The initializer of the `IdeaLoader`.
+
+        Args:
+            repository (IIdeaRepository): The reference to the repository.
+            max_batch_size (int): The maximal number of ids in one query.
+        """
+        self._repository = repository
+        self._max_batch_size = max_batch_size
+        self._futures = {}
+        self._queue = []
+        self._tasks = set()
+        self.batches = 0
+
+    def load(self, idea_id: int) -> Awaitable[Idea | None]:
+        """The method scheduling a lookup of one idea.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            Awaitable[Idea | None]: The idea if exists.
+        """
+        future = self._futures.get(idea_id)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[idea_id] = future
+        if not self._queue:
+            loop.call_soon(self._dispatch)
+        self._queue.append(idea_id)
+
+        return future
+
+    async def load_many(self, idea_ids: Iterable[int]) -> list[Idea]:
+        """The method getting many ideas, skipping the missing ones.
+
+        Args:
+            idea_ids (Iterable[int]): The ids of the ideas.
+
+        Returns:
+            list[Idea]: The existing ideas in the order of `idea_ids`.
+        """
+        ideas = await asyncio.gather(*(self.load(idea_id) for idea_id in idea_ids))
+
+        return [idea for idea in ideas if idea is not None]
+
+    def _dispatch(self) -> None:
+        """Start loading the ids queued since the previous dispatch."""
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), self._max_batch_size):
+            task = asyncio.ensure_future(
+                self._load_batch(queue[start:start + self._max_batch_size])
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, idea_ids: list[int]) -> None:
+        """Load a batch of ideas and resolve their futures.
+
+        Args:
+            idea_ids (list[int]): The ids of the ideas.
+        """
+        self.batches += 1
+        try:
+            ideas = {
+                idea.id: idea
+                for idea in await self._repository.get_by_ids(idea_ids)
+            }
+        except Exception as error:
+            for idea_id in idea_ids:
+                future = self._futures.pop(idea_id)
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for idea_id in idea_ids:
+            future = self._futures[idea_id]
+            if not future.done():
+                future.set_result(ideas.get(idea_id))
@@ -0,0 +1,62 @@
+"""Module containing locks shared by the worker processes of a host."""
+
+import fcntl
+import os
+from pathlib import Path
+from typing import Optional
+
+
+class ProcessLock:
+    """A class holding an exclusive lock on a file.
+
+    The lock is an advisory `flock`, so at most one process of a host
+    holds it at a time, and the kernel releases it when the holder exits
+    without releasing it, e.g. when it is killed.
+    """
+
+    _path: Path
+    _descriptor: Optional[int]
+
+    def __init__(self, path: str) -> None:
+        """The initializer of the `ProcessLock`.
+
+        Args:
+            path (str): The path of the lock file, created if missing.
+        """
+        self._path = Path(path)
+        self._descriptor = None
+
+    @property
+    def held(self) -> bool:
+        """bool: Whether this process holds the lock."""
+        return self._descriptor is not None
+
+    def acquire(self) -> bool:
+        """The method taking the lock without waiting for it.
+
+        Returns:
+            bool: Whether the lock is held now; False if another process
+                holds it.
+        """
+        if self._descriptor is not None:
+            return True
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(descriptor)
+            return False
+
+        self._descriptor = descriptor
+        return True
+
+    def release(self) -> None:
+        """The method releasing the lock if this process holds it."""
+        if self._descriptor is None:
+            return
+
+        fcntl.flock(self._descriptor, fcntl.LOCK_UN)
+        os.close(self._descriptor)
+        self._descriptor = None
@@ -1,38 +1,131 @@
-"""Main module of the app"""
-
-from fastapi import FastAPI, HTTPException, Request, Response
-from fastapi.exception_handlers import http_exception_handler
-
-from airportapi.container import Container
-from airportapi.api.routers.airport import router as airport_router
-from airportapi.api.routers.continent import router as continent_router
-from airportapi.api.routers.country import router as country_router
-
-container = Container()
-container.wire(modules=[
-    "manage_free_time.api.routers.idea",
-    "manage_free_time.api.routers.country",
-    "manage_free_time.api.routers.airport",
-])
-
-app = FastAPI()
-app.include_router(idea_router, prefix="/airport")
-app.include_router(continent_router, prefix="/continent")
-app.include_router(country_router, prefix="/country")
-
-
-@app.exception_handler(HTTPException)
-async def http_exception_handle_logging(
-    request: Request,
-    exception: HTTPException,
-) -> Response:
-    """A function handling http exceptions for logging purposes.
-
-    Args:
-        request (Request): The incoming HTTP request.
-        exception (HTTPException): A related exception.
-
-    Returns:
-        Response: The HTTP response.
-    """
-    return await http_exception_handler(request, exception)
+"""Main module of the app"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import JSONResponse
+
+from manage_free_time.api.routers.cache import router as cache_router
+from manage_free_time.api.routers.idea import router as idea_router
+from manage_free_time.api.routers.invitations import router as invitation_router
+from manage_free_time.api.routers.metrics import router as metrics_router
+from manage_free_time.api.routers.user_profile import router as profile_router
+from manage_free_time.api.routers.weekly_plan import router as plan_router
+from manage_free_time.infrastructure.admission import (
+    Overloaded,
+    RateLimitMiddleware,
+)
+from manage_free_time.infrastructure.config import config
+from manage_free_time.infrastructure.container import Container
+from manage_free_time.infrastructure.db import database, init_db
+from manage_free_time.infrastructure.locks import ProcessLock
+from manage_free_time.infrastructure.metrics import (
+    MetricsMiddleware,
+    register_cache,
+    register_pool,
+    register_slots,
+)
+
+container = Container()
+columnar_lock = ProcessLock(config.IDEA_STORE_LOCK_PATH)
+container.wire(modules=[
+    "manage_free_time.api.routers.idea",
+    "manage_free_time.api.routers.cache",
+    "manage_free_time.api.routers.invitations",
+    "manage_free_time.api.routers.user_profile",
+    "manage_free_time.api.routers.weekly_plan",
+])
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncGenerator:
+    """Lifespan function working on app startup and shutdown.
+
+    With the columnar idea store it first makes sure no other process
+    of the host serves it. Opens the connection pool shared by all
+    repositories, loads the in-process indexes, the follow graph and the
+    plan index, builds missing invitation counters and starts the
+    invitation queue, in write-behind mode the idea write queue and,
+    with a catalogue snapshot, its periodic refresh; their tasks do not
+    take repository slots. On shutdown the queues are drained before
+    the pool is closed.
+    """
+    if config.IDEA_STORE == "columnar" and not columnar_lock.acquire():
+        raise RuntimeError(
+            "IDEA_STORE=columnar keeps ideas in the memory of one process and "
+            f"another one holds {config.IDEA_STORE_LOCK_PATH}; run one worker"
+        )
+    await init_db()
+    await database.connect()
+    await container.user_profile_service().load_follow_graph()
+    await container.idea_service().load_indexes()
+    await container.weekly_plan_service().load_plan_index()
+    await container.invitation_service().ensure_status_counts()
+    with container.repository_slots().exempt():
+        await container.invitation_queue().start()
+        if config.IDEA_WRITE_BEHIND:
+            await container.idea_writer().start()
+        if config.IDEA_SNAPSHOT_PATH and config.IDEA_STORE == "postgres":
+            await container.idea_snapshots().start()
+    yield
+    if config.IDEA_SNAPSHOT_PATH and config.IDEA_STORE == "postgres":
+        await container.idea_snapshots().stop()
+    if config.IDEA_WRITE_BEHIND:
+        await container.idea_writer().stop()
+    await container.invitation_queue().stop()
+    await database.disconnect()
+    columnar_lock.release()
+
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(idea_router, prefix="/idea")
+app.include_router(cache_router, prefix="/cache")
+app.include_router(profile_router, prefix="/profile")
+app.include_router(plan_router, prefix="/plan")
+app.include_router(invitation_router, prefix="/invitation")
+
+app.add_middleware(RateLimitMiddleware, max_keys=config.RATE_LIMIT_MAX_KEYS)
+
+if config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+    register_cache(container.repository_cache().stats)
+    register_pool(database.pool_stats)
+    register_slots(container.repository_slots().stats)
+
+
+@app.exception_handler(HTTPException)
+async def http_exception_handle_logging(
+    request: Request,
+    exception: HTTPException,
+) -> Response:
+    """A function handling http exceptions for logging purposes.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        exception (HTTPException): A related exception.
+
+    Returns:
+        Response: The HTTP response.
+    """
+    return await http_exception_handler(request, exception)
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handle(_: Request, exception: Overloaded) -> Response:
+    """A function shedding requests waiting too long for the database.
+
+    Args:
+        _ (Request): The incoming HTTP request.
+        exception (Overloaded): The rejection of a repository call.
+
+    Returns:
+        Response: The 503 response telling the client when to retry.
+    """
+    return JSONResponse(
+        {"detail": "Serwer jest przeciążony, spróbuj ponownie później"},
+        status_code=503,
+        headers={"Retry-After": str(exception.retry_after)},
+    )
@@ -0,0 +1,573 @@
+"""A module providing in-process metrics exported in the Prometheus format.
+
+Metrics live in the module-level `registry` of the worker process and are
+updated without locks: the app runs on a single event loop, and a sample
+is recorded by incrementing preallocated counters of a child resolved
+once per label set. Every worker exports its own series, which
+Prometheus aggregates across scrape targets.
+"""
+
+import inspect
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+T = TypeVar("T")
+Samples = Iterable[tuple[tuple[str, ...], float]]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value of the text exposition format.
+
+    Args:
+        value (str): The raw value.
+
+    Returns:
+        str: The escaped value.
+    """
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    """Render a label set.
+
+    Args:
+        names (tuple[str, ...]): The label names.
+        values (tuple[str, ...]): The label values.
+
+    Returns:
+        str: The label set in braces or an empty string.
+    """
+    if not names:
+        return ""
+
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}"
+
+
+def _number(value: float) -> str:
+    """Render a sample value.
+
+    Args:
+        value (float): The value.
+
+    Returns:
+        str: The value, integral ones without a fraction.
+    """
+    if value == float("inf"):
+        return "+Inf"
+
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """A base class of metric families with children per label set."""
+
+    kind: str = "untyped"
+
+    name: str
+    documentation: str
+    labelnames: tuple[str, ...]
+    _children: dict[tuple[str, ...], Any]
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+    ) -> None:
+        """The initializer of the `Metric`.
+
+        Args:
+            name (str): The name of the family.
+            documentation (str): The help text.
+            labelnames (Iterable[str]): The names of the labels.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+
+    def labels(self, *values: str) -> Any:
+        """The method getting the child of a label set.
+
+        Callers on hot paths should keep the child instead of resolving
+        it on every sample.
+
+        Args:
+            *values (str): The label values in the order of the names.
+
+        Returns:
+            Any: The child recording samples of the label set.
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._child()
+
+        return child
+
+    def _child(self) -> Any:
+        """Create the child of a new label set.
+
+        Returns:
+            Any: The child.
+        """
+        raise NotImplementedError
+
+    def collect(self) -> Iterable[str]:
+        """The method rendering the samples of the family.
+
+        Yields:
+            str: Lines of the text exposition format.
+        """
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, child in list(self._children.items()):
+            yield from self._render(values, child)
+
+    def _render(self, values: tuple[str, ...], child: Any) -> Iterable[str]:
+        """Render the samples of a child.
+
+        Args:
+            values (tuple[str, ...]): The label values.
+            child (Any): The child.
+
+        Yields:
+            str: Lines of the text exposition format.
+        """
+        yield f"{self.name}{_labels(self.labelnames, values)} {_number(child.value)}"
+
+
+class _Value:
+    """A child of counters and gauges holding a single number."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the value.
+
+        Args:
+            amount (float): The increment.
+        """
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrease the value.
+
+        Args:
+            amount (float): The decrement.
+        """
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        """Replace the value.
+
+        Args:
+            value (float): The new value.
+        """
+        self.value = value
+
+
+class Counter(Metric):
+    """A class of monotonically increasing counters."""
+
+    kind = "counter"
+
+    def _child(self) -> _Value:
+        return _Value()
+
+
+class Gauge(Metric):
+    """A class of values going up and down."""
+
+    kind = "gauge"
+
+    def _child(self) -> _Value:
+        return _Value()
+
+
+class _Buckets:
+    """A child of histograms counting samples per bucket."""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a sample.
+
+        Args:
+            value (float): The sample.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(Metric):
+    """A class of distributions counted in fixed buckets.
+
+    The counts of the buckets are kept non-cumulative, so a sample
+    increments a single preallocated slot; they are summed up only when
+    rendered.
+    """
+
+    kind = "histogram"
+
+    buckets: tuple[float, ...]
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        """The initializer of the `Histogram`.
+
+        Args:
+            name (str): The name of the family.
+            documentation (str): The help text.
+            labelnames (Iterable[str]): The names of the labels.
+            buckets (Iterable[float]): The upper bounds of the buckets.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def _render(self, values: tuple[str, ...], child: _Buckets) -> Iterable[str]:
+        names = (*self.labelnames, "le")
+        total = 0
+        for bound, count in zip((*self.buckets, float("inf")), child.counts):
+            total += count
+            labels = _labels(names, (*values, _number(bound)))
+            yield f"{self.name}_bucket{labels} {total}"
+
+        labels = _labels(self.labelnames, values)
+        yield f"{self.name}_sum{labels} {_number(child.sum)}"
+        yield f"{self.name}_count{labels} {total}"
+
+
+class CallbackMetric(Metric):
+    """A class of metrics read from their source only when scraped."""
+
+    _callback: Callable[[], Samples]
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        callback: Callable[[], Samples],
+        labelnames: Iterable[str] = (),
+    ) -> None:
+        """The initializer of the `CallbackMetric`.
+
+        Args:
+            name (str): The name of the family.
+            documentation (str): The help text.
+            kind (str): The Prometheus type, e.g. `gauge` or `counter`.
+            callback (Callable[[], Samples]): Returns the label values and
+                the value of every sample.
+            labelnames (Iterable[str]): The names of the labels.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._callback = callback
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, value in self._callback():
+            yield f"{self.name}{_labels(self.labelnames, values)} {_number(value)}"
+
+
+class MetricsRegistry:
+    """A class collecting the metric families exported by the worker."""
+
+    _metrics: dict[str, Metric]
+
+    def __init__(self) -> None:
+        """The initializer of the `MetricsRegistry`."""
+        self._metrics = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """The method adding a family, replacing one with the same name.
+
+        Args:
+            metric (Metric): The family.
+
+        Returns:
+            Metric: The registered family.
+        """
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """The method rendering all families in the text exposition format.
+
+        Returns:
+            str: The exposition.
+        """
+        lines = [line for metric in self._metrics.values() for line in metric.collect()]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total",
+    "Finished HTTP requests by route and status code.",
+    ("method", "route", "status"),
+))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests by route.",
+    ("method", "route"),
+))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled.",
+)).labels()
+call_latency = registry.register(Histogram(
+    "app_call_duration_seconds",
+    "Latency of repository and service methods.",
+    ("component", "method"),
+))
+db_pool_wait = registry.register(Histogram(
+    "db_pool_acquire_duration_seconds",
+    "Time spent waiting for a connection of the pool.",
+)).labels()
+cache_requests = registry.register(Counter(
+    "cache_requests_total",
+    "Cached repository reads by method and result.",
+    ("namespace", "method", "result"),
+))
+admission_rejections = registry.register(Counter(
+    "app_admission_rejections_total",
+    "Requests and repository calls rejected by admission control by reason.",
+    ("reason",),
+))
+single_flight_calls = registry.register(Counter(
+    "app_single_flight_calls_total",
+    "Calls of coalesced methods starting a call or joining one in flight.",
+    ("component", "method", "result"),
+))
+
+
+def instrumented(cls: type[T]) -> type[T]:
+    """Create a subclass timing every public method of the class.
+
+    Coroutine and plain methods record their latency in
+    `app_call_duration_seconds` labelled with the class and method names;
+    async generators are left alone. The histogram child is resolved once
+    per method, so a call costs two clock reads and one bucket increment.
+
+    Args:
+        cls (type[T]): The class of a repository or a service.
+
+    Returns:
+        type[T]: The subclass with the same name.
+    """
+    namespace: dict[str, Any] = {
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "__doc__": cls.__doc__,
+    }
+    for name, function in inspect.getmembers(cls, inspect.isfunction):
+        if name.startswith("_") or inspect.isasyncgenfunction(function):
+            continue
+        if isinstance(inspect.getattr_static(cls, name), (staticmethod, classmethod)):
+            continue
+
+        namespace[name] = _timed(function, call_latency.labels(cls.__name__, name))
+
+    return type(cls.__name__, (cls,), namespace)
+
+
+def _timed(function: Callable, buckets: _Buckets) -> Callable:
+    """Wrap a method to record its latency.
+
+    Args:
+        function (Callable): The method.
+        buckets (_Buckets): The histogram child of the method.
+
+    Returns:
+        Callable: The wrapper.
+    """
+    clock = time.perf_counter
+
+    if inspect.iscoroutinefunction(function):
+        @wraps(function)
+        async def timed_coroutine(*args: Any, **kwargs: Any) -> Any:
+            started = clock()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                buckets.observe(clock() - started)
+
+        return timed_coroutine
+
+    @wraps(function)
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        started = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            buckets.observe(clock() - started)
+
+    return timed
+
+
+class MetricsMiddleware:
+    """An ASGI middleware recording the latency and status of HTTP requests.
+
+    Requests are labelled with the path template of the matched route,
+    e.g. `/idea/kategoria/{kategoria}`, so the number of series stays
+    bounded; requests matching no route are labelled `unmatched`.
+    """
+
+    _app: ASGIApp
+    _routes: dict[tuple[str, str], tuple[_Buckets, dict[int, Any]]]
+
+    def __init__(self, app: ASGIApp) -> None:
+        """The initializer of the `MetricsMiddleware`.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+        """
+        self._app = app
+        self._routes = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self._app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            self._record(scope, status, elapsed)
+
+    def _record(self, scope: Scope, status: int, elapsed: float) -> None:
+        """Record a finished request.
+
+        Args:
+            scope (Scope): The scope of the request.
+            status (int): The status code of the response.
+            elapsed (float): The latency in seconds.
+        """
+        route = scope.get("route")
+        key = (scope["method"], getattr(route, "path", "unmatched"))
+        children = self._routes.get(key)
+        if children is None:
+            children = self._routes[key] = (http_latency.labels(*key), {})
+
+        buckets, statuses = children
+        buckets.observe(elapsed)
+        counter = statuses.get(status)
+        if counter is None:
+            counter = statuses[status] = http_requests.labels(*key, str(status))
+        counter.inc()
+
+
+def register_cache(stats: Callable[[], dict[str, int]]) -> None:
+    """Export the counters of a cache, read when scraped.
+
+    Args:
+        stats (Callable[[], dict[str, int]]): Returns the counters, e.g.
+            `LRUCache.stats`.
+    """
+    registry.register(CallbackMetric(
+        "cache_entries",
+        "Entries stored in the repository cache.",
+        "gauge",
+        lambda: [((), stats()["entries"])],
+    ))
+    registry.register(CallbackMetric(
+        "cache_removals_total",
+        "Entries removed from the repository cache by reason.",
+        "counter",
+        lambda: [
+            ((reason,), stats()[f"{reason}s"])
+            for reason in ("eviction", "expiration", "invalidation")
+        ],
+        ("reason",),
+    ))
+
+
+def register_pool(stats: Callable[[], Optional[tuple[int, int]]]) -> None:
+    """Export the connections of a database pool, read when scraped.
+
+    Args:
+        stats (Callable[[], Optional[tuple[int, int]]]): Returns the number
+            of open and idle connections, None when disconnected.
+    """
+    def samples() -> Samples:
+        sizes = stats()
+        if sizes is None:
+            return []
+
+        size, idle = sizes
+        return [(("busy",), size - idle), (("idle",), idle)]
+
+    registry.register(CallbackMetric(
+        "db_pool_connections",
+        "Open connections of the database pool by state.",
+        "gauge",
+        samples,
+        ("state",),
+    ))
+
+
+def register_slots(stats: Callable[[], tuple[int, int]]) -> None:
+    """Export the slots of a concurrency limiter, read when scraped.
+
+    Args:
+        stats (Callable[[], tuple[int, int]]): Returns the number of busy
+            slots and of calls waiting for one, e.g.
+            `ConcurrencyLimiter.stats`.
+    """
+    def samples() -> Samples:
+        busy, waiting = stats()
+        return [(("busy",), busy), (("waiting",), waiting)]
+
+    registry.register(CallbackMetric(
+        "app_repository_slots",
+        "Repository calls holding or waiting for a slot by state.",
+        "gauge",
+        samples,
+        ("state",),
+    ))
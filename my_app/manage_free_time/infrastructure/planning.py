@@ -0,0 +1,290 @@
+"""Module containing the vectorized generator of weekly plans."""
+
+import time
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from manage_free_time.core.domain.idea import Idea
+
+TAG_WEIGHT = 1.0
+DIVERSITY_PENALTY = 0.5
+JITTER = 0.05
+SHORTLIST_FACTOR = 8
+
+
+def _ragged(offsets: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Get the flat positions of the selected rows of a CSR-like layout.
+
+    Args:
+        offsets (np.ndarray): Row boundaries, `len(rows) + 1` long.
+        rows (np.ndarray): The selected rows.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The flat positions and the index of
+            the selected row each position belongs to.
+    """
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+    owners = np.repeat(np.arange(len(rows)), lengths)
+    if not len(owners):
+        return owners, owners
+
+    first = np.cumsum(lengths) - lengths
+    positions = np.arange(len(owners)) - first[owners] + starts[owners]
+
+    return positions, owners
+
+
+class IdeaFeatures:
+    """A class keeping the idea catalogue as a sparse feature matrix.
+
+    Ideas are rows ordered by id. Tags are kept twice, as per-idea tag
+    codes and as per-tag idea positions, so both the tags of a user's
+    ideas and the ideas having a tag are plain array slices.
+    """
+
+    ids: np.ndarray
+    categories: np.ndarray
+    tag_offsets: np.ndarray
+    tag_codes: np.ndarray
+    posting_offsets: np.ndarray
+    postings: np.ndarray
+    users: np.ndarray
+    user_offsets: np.ndarray
+    user_ideas: np.ndarray
+
+    def __init__(self, ideas: Iterable[Idea]) -> None:
+        """The initializer of the `IdeaFeatures`.
+
+        Args:
+            ideas (Iterable[Idea]): The idea catalogue.
+        """
+        ideas = sorted(ideas, key=lambda idea: idea.id)
+        category_codes: dict[str, int] = {}
+        tag_codes: dict[str, int] = {}
+
+        self.ids = np.fromiter((idea.id for idea in ideas), np.int64, len(ideas))
+        self.categories = np.fromiter(
+            (category_codes.setdefault(idea.category, len(category_codes))
+             for idea in ideas),
+            np.int32,
+            len(ideas),
+        )
+        lengths = np.fromiter(
+            (len(set(idea.tags)) for idea in ideas), np.int64, len(ideas)
+        )
+        self.tag_offsets = np.concatenate(([0], np.cumsum(lengths)))
+        self.tag_codes = np.fromiter(
+            (tag_codes.setdefault(tag, len(tag_codes))
+             for idea in ideas for tag in dict.fromkeys(idea.tags)),
+            np.int32,
+            int(self.tag_offsets[-1]),
+        )
+
+        owners = np.repeat(np.arange(len(ideas)), lengths)
+        order = np.argsort(self.tag_codes, kind="stable")
+        self.postings = owners[order]
+        self.posting_offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.tag_codes, minlength=len(tag_codes))))
+        )
+
+        user_ids = np.fromiter((idea.user_id for idea in ideas), np.int64, len(ideas))
+        self.user_ideas = np.argsort(user_ids, kind="stable")
+        self.users, starts = np.unique(user_ids[self.user_ideas], return_index=True)
+        self.user_offsets = np.concatenate((starts, [len(ideas)]))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def positions(self, idea_ids: Iterable[int]) -> np.ndarray:
+        """Get the rows of the ideas which are in the catalogue.
+
+        Args:
+            idea_ids (Iterable[int]): The ids of the ideas.
+
+        Returns:
+            np.ndarray: The rows of the known ideas.
+        """
+        idea_ids = np.fromiter(idea_ids, np.int64)
+        rows = np.searchsorted(self.ids, idea_ids)
+        known = rows < len(self.ids)
+        known[known] = self.ids[rows[known]] == idea_ids[known]
+
+        return rows[known]
+
+    def tag_preferences(self, user_ids: np.ndarray) -> tuple[np.ndarray, ...]:
+        """Get the tag weights of users derived from their own ideas.
+
+        The weight of a tag is its share among the tags of the user's ideas.
+
+        Args:
+            user_ids (np.ndarray): The ids of the users.
+
+        Returns:
+            tuple[np.ndarray, ...]: The index of the user, the tag code and
+                the weight of every preferred tag.
+        """
+        slots = np.searchsorted(self.users, user_ids)
+        known = slots < len(self.users)
+        known[known] = self.users[slots[known]] == user_ids[known]
+        rows = np.flatnonzero(known)
+
+        idea_positions, idea_owners = _ragged(self.user_offsets, slots[rows])
+        ideas = self.user_ideas[idea_positions]
+        tag_positions, tag_owners = _ragged(self.tag_offsets, ideas)
+        users = rows[idea_owners[tag_owners]]
+        tags = self.tag_codes[tag_positions]
+
+        pairs, counts = np.unique(
+            np.stack((users, tags)), axis=1, return_counts=True
+        )
+        totals = np.bincount(users, minlength=len(user_ids))
+
+        return pairs[0], pairs[1], counts / totals[pairs[0]]
+
+
+class PlanGenerator:
+    """A class generating weekly plans for blocks of users at once.
+
+    Every user gets a score for every idea: the weights of the user's
+    preferred tags the idea carries plus a little random jitter. Ideas
+    from the previous plan are excluded. The best-scored ideas are then
+    picked greedily, lowering the scores of the categories already in
+    the plan. All steps operate on whole `users × ideas` blocks.
+    """
+
+    _features: IdeaFeatures | None
+    _built_at: float
+    _block_size: int
+
+    def __init__(self, block_size: int = 64) -> None:
+        """The initializer of the `PlanGenerator`.
+
+        Args:
+            block_size (int): The number of users scored at once.
+        """
+        self._features = None
+        self._built_at = 0.0
+        self._block_size = block_size
+
+    def is_stale(self, max_age: float) -> bool:
+        """The method checking whether the catalogue should be reloaded.
+
+        Args:
+            max_age (float): The maximal age of the catalogue in seconds.
+
+        Returns:
+            bool: Whether the catalogue is missing or older than `max_age`.
+        """
+        return (
+            self._features is None
+            or time.monotonic() - self._built_at > max_age
+        )
+
+    def load(self, ideas: Iterable[Idea]) -> None:
+        """The method (re)building the feature matrix of the catalogue.
+
+        Args:
+            ideas (Iterable[Idea]): The idea catalogue.
+        """
+        self._features = IdeaFeatures(ideas)
+        self._built_at = time.monotonic()
+
+    def generate(
+        self,
+        user_ids: Sequence[int],
+        previous: Sequence[Iterable[int]],
+        plan_size: int,
+        seed: int | None = None,
+    ) -> list[list[int]]:
+        """The method generating plans for the users.
+
+        Args:
+            user_ids (Sequence[int]): The ids of the users.
+            previous (Sequence[Iterable[int]]): Ideas of the users' previous
+                plans, which are not repeated.
+            plan_size (int): The number of ideas in a plan.
+            seed (int | None): The seed of the jitter.
+
+        Returns:
+            list[list[int]]: Idea ids of the plans, in the order of users.
+        """
+        features = self._features
+        if features is None or not len(features) or plan_size <= 0:
+            return [[] for _ in user_ids]
+
+        rng = np.random.default_rng(seed)
+        plans: list[list[int]] = []
+        for start in range(0, len(user_ids), self._block_size):
+            plans.extend(self._generate_block(
+                features,
+                np.asarray(user_ids[start:start + self._block_size], np.int64),
+                previous[start:start + self._block_size],
+                plan_size,
+                rng,
+            ))
+
+        return plans
+
+    def _generate_block(
+        self,
+        features: IdeaFeatures,
+        user_ids: np.ndarray,
+        previous: Sequence[Iterable[int]],
+        plan_size: int,
+        rng: np.random.Generator,
+    ) -> list[list[int]]:
+        """Generate the plans of one block of users.
+
+        Args:
+            features (IdeaFeatures): The idea catalogue.
+            user_ids (np.ndarray): The ids of the users.
+            previous (Sequence[Iterable[int]]): Ideas of previous plans.
+            plan_size (int): The number of ideas in a plan.
+            rng (np.random.Generator): The source of the jitter.
+
+        Returns:
+            list[list[int]]: Idea ids of the plans.
+        """
+        users = len(user_ids)
+        scores = rng.random((users, len(features)), dtype=np.float32)
+        scores *= JITTER
+
+        owners, tags, weights = features.tag_preferences(user_ids)
+        positions, entries = _ragged(features.posting_offsets, tags)
+        np.add.at(
+            scores,
+            (owners[entries], features.postings[positions]),
+            (TAG_WEIGHT * weights[entries]).astype(np.float32),
+        )
+
+        for row, idea_ids in enumerate(previous):
+            scores[row, features.positions(idea_ids)] = -np.inf
+
+        shortlist = min(len(features), plan_size * SHORTLIST_FACTOR)
+        candidates = np.argpartition(
+            scores, len(features) - shortlist, axis=1
+        )[:, len(features) - shortlist:]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        candidate_categories = features.categories[candidates]
+
+        rows = np.arange(users)
+        picks = np.empty((users, min(plan_size, shortlist)), np.int64)
+        picked_scores = np.empty(picks.shape, np.float32)
+        for step in range(picks.shape[1]):
+            repeats = (
+                candidate_categories[:, :, None]
+                == features.categories[picks[:, None, :step]]
+            ).sum(axis=2)
+            adjusted = candidate_scores - DIVERSITY_PENALTY * repeats
+            best = adjusted.argmax(axis=1)
+            picks[:, step] = candidates[rows, best]
+            picked_scores[:, step] = candidate_scores[rows, best]
+            candidate_scores[rows, best] = -np.inf
+
+        picked_ids = features.ids[picks]
+        return [
+            picked_ids[row][np.isfinite(picked_scores[row])].tolist()
+            for row in range(users)
+        ]
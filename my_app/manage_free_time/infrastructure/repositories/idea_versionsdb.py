@@ -0,0 +1,53 @@
+"""Module containing the database implementation of idea versions."""
+
+from typing import Optional
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from manage_free_time.infrastructure.db import database, idea_version_table
+from manage_free_time.infrastructure.repositories.iidea_versions import \
+    IIdeaVersionRepository
+
+_collection = idea_version_table.c.collection
+_select_version = select(idea_version_table.c.version)
+# All ideas change exactly when a category changes, so their version is
+# a digest of the versions of the categories.
+_select_all_version = select(
+    func.md5(func.coalesce(
+        func.string_agg(
+            _collection + literal("=") + idea_version_table.c.version,
+            aggregate_order_by(literal(","), _collection),
+        ),
+        literal(""),
+    ))
+).where(_collection.startswith("c:"))
+
+
+class IdeaVersionRepository(IIdeaVersionRepository):
+    """A class reading the versions kept up to date by database triggers."""
+
+    async def get_version(
+        self,
+        category: Optional[str] = None,
+        user_id: Optional[int] = None,
+    ) -> str:
+        """The method getting the version of a collection of ideas.
+
+        Args:
+            category (Optional[str]): The category of the collection.
+            user_id (Optional[int]): The author of the collection, used
+                when no category is given.
+
+        Returns:
+            str: The version; collections never written have version `0`.
+        """
+        if category is not None:
+            key = f"c:{category}"
+        elif user_id is not None:
+            key = f"u:{user_id}"
+        else:
+            return f"a.{await database.fetch_val(_select_all_version)}"
+
+        version = await database.fetch_val(_select_version.where(_collection == key))
+        return f"{key}.{version or 0}"
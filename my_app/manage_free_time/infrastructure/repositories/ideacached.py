@@ -0,0 +1,420 @@
+"""Module containing the caching decorator of the idea repository."""
+
+from typing import AsyncIterator, Iterable
+
+from manage_free_time.core.domain.idea import Idea, IdeaIn
+from manage_free_time.core.repositories.iidea import IIdeaRepository
+from manage_free_time.infrastructure.cache import MISSING, CachingRepository, LRUCache
+from manage_free_time.infrastructure.repositories.iidea_pages import (
+    IdeaPageJson,
+    IIdeaPageRepository,
+    fetch_page_json,
+)
+
+
+def idea_tags(idea: Idea) -> list[str]:
+    """Get the cache tags of every result an idea can be part of.
+
+    Args:
+        idea (Idea): The idea.
+
+    Returns:
+        list[str]: The tags of the idea.
+    """
+    return [
+        f"idea:{idea.id}",
+        f"category:{idea.category}",
+        f"user:{idea.user_id}",
+        *(f"tag:{tag}" for tag in idea.tags),
+    ]
+
+
+class CachedIdeaRepository(
+    CachingRepository, IIdeaRepository, IIdeaPageRepository
+):
+    """A class caching reads of the wrapped idea repository.
+
+    Writes evict the entries of the changed idea, of its old and new
+    category, user and tags, and the unfiltered listings.
+    """
+
+    namespace = "ideas"
+
+    _repository: IIdeaRepository
+
+    def __init__(
+        self,
+        repository: IIdeaRepository,
+        cache: LRUCache,
+        ttls: dict[str, float],
+        default_ttl: float,
+        negative_ttl: float,
+    ) -> None:
+        """The initializer of the `CachedIdeaRepository`.
+
+        Args:
+            repository (IIdeaRepository): The wrapped repository.
+            cache (LRUCache): The cache shared by the decorators.
+            ttls (dict[str, float]): TTLs by `ideas.<method>`.
+            default_ttl (float): TTL of methods missing in `ttls`.
+            negative_ttl (float): TTL of cached "not found" results.
+        """
+        super().__init__(cache, ttls, default_ttl, negative_ttl)
+        self._repository = repository
+
+    async def get_all_ideas(
+        self, after: int | None = None, limit: int | None = None
+    ) -> Iterable[Idea]:
+        """The method getting all ideas through the cache.
+
+        Args:
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Ideas in the data storage.
+        """
+        async def load() -> tuple[Idea, ...]:
+            return tuple(await self._repository.get_all_ideas(after, limit))
+
+        return await self._read(
+            "get_all_ideas",
+            (after, limit),
+            load,
+            lambda _: ["ideas"],
+        )
+
+    async def get_by_category(
+        self, category: str, after: int | None = None, limit: int | None = None
+    ) -> Iterable[Idea]:
+        """The method getting ideas of a category through the cache.
+
+        Args:
+            category (str): The name of the category.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Ideas assigned to the category.
+        """
+        async def load() -> tuple[Idea, ...]:
+            return tuple(
+                await self._repository.get_by_category(category, after, limit)
+            )
+
+        return await self._read(
+            "get_by_category",
+            (category, after, limit),
+            load,
+            lambda _: [f"category:{category}"],
+        )
+
+    async def get_ideas_json(
+        self,
+        category: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> IdeaPageJson:
+        """The method getting serialized ideas through the cache.
+
+        Unlimited listings are not cached, like `get_all_ideas`, so no
+        worker keeps a copy of the whole catalogue as bytes.
+
+        Args:
+            category (str | None): The name of the category.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            IdeaPageJson: The JSON array of the ideas ordered by id.
+        """
+        if limit is None:
+            return await fetch_page_json(self._repository, category, after, limit)
+
+        return await self._read(
+            "get_ideas_json",
+            (category, after, limit),
+            lambda: fetch_page_json(self._repository, category, after, limit),
+            lambda _: [f"category:{category}" if category else "ideas"],
+        )
+
+    def iter_ideas(
+        self,
+        category: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[Idea]:
+        """The method streaming ideas straight from the wrapped repository.
+
+        Args:
+            category (str | None): The name of the category.
+            after (int | None): Only ideas with a greater id are yielded.
+            limit (int | None): The maximal number of yielded ideas.
+
+        Returns:
+            AsyncIterator[Idea]: Ideas ordered by id.
+        """
+        return self._repository.iter_ideas(category, after, limit)
+
+    async def get_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool = True,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> Iterable[Idea]:
+        """The method getting ideas by tags through the cache.
+
+        Args:
+            tags (list[str]): The tags to filter by.
+            match_all (bool): Whether ideas must have all tags or any of them.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Ideas matching the tags.
+        """
+        async def load() -> tuple[Idea, ...]:
+            return tuple(
+                await self._repository.get_by_tags(tags, match_all, after, limit)
+            )
+
+        return await self._read(
+            "get_by_tags",
+            (tuple(sorted(set(tags))), match_all, after, limit),
+            load,
+            lambda _: [f"tag:{tag}" for tag in tags],
+        )
+
+    async def get_by_ids(self, idea_ids: list[int]) -> Iterable[Idea]:
+        """The method getting ideas by ids, loading only uncached ones.
+
+        The ideas share their cache entries with `get_by_id`.
+
+        Args:
+            idea_ids (list[int]): The ids of the ideas.
+
+        Returns:
+            Iterable[Idea]: The existing ideas ordered by id.
+        """
+        ttl = self._ttl("get_by_id")
+        if ttl <= 0:
+            return await self._repository.get_by_ids(idea_ids)
+
+        found: dict[int, Idea] = {}
+        missing = []
+        for idea_id in dict.fromkeys(idea_ids):
+            idea = self._cache.get((self.namespace, "get_by_id", (idea_id,)))
+            if idea is MISSING:
+                missing.append(idea_id)
+            elif idea is not None:
+                found[idea_id] = idea
+
+        if missing:
+            since = self._cache.start_load()
+            try:
+                loaded = {
+                    idea.id: idea
+                    for idea in await self._repository.get_by_ids(missing)
+                }
+                for idea_id in missing:
+                    idea = loaded.get(idea_id)
+                    self._cache.set(
+                        (self.namespace, "get_by_id", (idea_id,)),
+                        idea,
+                        ttl if idea else min(ttl, self._negative_ttl),
+                        [f"idea:{idea_id}"],
+                        since,
+                    )
+            finally:
+                self._cache.finish_load()
+            found.update(loaded)
+
+        return [found[idea_id] for idea_id in sorted(found)]
+
+    async def search_by_title(
+        self,
+        query: str,
+        category: str | None = None,
+        tags: list[str] | None = None,
+        limit: int = 20,
+    ) -> Iterable[Idea]:
+        """The method searching titles in the wrapped repository.
+
+        Args:
+            query (str): The searched text.
+            category (str | None): The category to filter by.
+            tags (list[str] | None): Tags the ideas must all have.
+            limit (int): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Matching ideas.
+        """
+        return await self._repository.search_by_title(query, category, tags, limit)
+
+    async def get_by_user(self, user_id: int) -> Iterable[Idea]:
+        """The method getting ideas of a user through the cache.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Iterable[Idea]: Ideas created by the user.
+        """
+        async def load() -> tuple[Idea, ...]:
+            return tuple(await self._repository.get_by_user(user_id))
+
+        return await self._read(
+            "get_by_user",
+            (user_id,),
+            load,
+            lambda _: [f"user:{user_id}"],
+        )
+
+    async def get_by_id(self, idea_id: int) -> Idea | None:
+        """The method getting an idea by id through the cache.
+
+        Missing ideas are cached as well, for the negative TTL.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            Idea | None: The idea details if exists.
+        """
+        return await self._read(
+            "get_by_id",
+            (idea_id,),
+            lambda: self._repository.get_by_id(idea_id),
+            lambda _: [f"idea:{idea_id}"],
+        )
+
+    async def get_random_idea(self, category: str | None = None) -> Idea | None:
+        """The method getting a random idea from the wrapped repository.
+
+        Args:
+            category (str | None): The category to pick from.
+
+        Returns:
+            Idea | None: A random idea if any exists.
+        """
+        return await self._repository.get_random_idea(category)
+
+    async def add_idea(self, data: IdeaIn, user_id: int) -> Idea | None:
+        """The method adding an idea and evicting results it changes.
+
+        Args:
+            data (IdeaIn): The details of the new idea.
+            user_id (int): The id of the user adding the idea.
+
+        Returns:
+            Idea | None: The newly added idea.
+        """
+        idea = await self._repository.add_idea(data, user_id)
+        if idea:
+            self._cache.invalidate("ideas", *idea_tags(idea))
+
+        return idea
+
+    async def add_ideas(
+        self, data: list[IdeaIn], user_id: int
+    ) -> list[Idea | None]:
+        """The method adding many ideas and evicting results they change.
+
+        Args:
+            data (list[IdeaIn]): The details of the new ideas.
+            user_id (int): The id of the user adding the ideas.
+
+        Returns:
+            list[Idea | None]: The added ideas, None for failed rows.
+        """
+        ideas = await self._repository.add_ideas(data, user_id)
+        tags = {tag for idea in ideas if idea for tag in idea_tags(idea)}
+        self._cache.invalidate("ideas", *tags)
+
+        return ideas
+
+    async def add_ideas_by_users(
+        self, rows: list[tuple[IdeaIn, int]]
+    ) -> list[Idea | None]:
+        """The method adding ideas of many users and evicting results they change.
+
+        Args:
+            rows (list[tuple[IdeaIn, int]]): The details of the new ideas
+                with the ids of the users adding them.
+
+        Returns:
+            list[Idea | None]: The added ideas, None for failed rows.
+        """
+        ideas = await self._repository.add_ideas_by_users(rows)
+        tags = {tag for idea in ideas if idea for tag in idea_tags(idea)}
+        self._cache.invalidate("ideas", *tags)
+
+        return ideas
+
+    async def update_idea(self, idea_id: int, data: IdeaIn) -> Idea | None:
+        """The method updating an idea and evicting results it changes.
+
+        Args:
+            idea_id (int): The id of the idea.
+            data (IdeaIn): The updated details of the idea.
+
+        Returns:
+            Idea | None: The updated idea details if exists.
+        """
+        previous = await self.get_by_id(idea_id)
+        idea = await self._repository.update_idea(idea_id, data)
+        self._cache.invalidate(
+            "ideas",
+            f"idea:{idea_id}",
+            *(idea_tags(previous) if previous else ()),
+            *(idea_tags(idea) if idea else ()),
+        )
+
+        return idea
+
+    async def update_ideas(
+        self, rows: list[tuple[int, IdeaIn]]
+    ) -> list[Idea | None]:
+        """The method updating many ideas and evicting results they change.
+
+        Args:
+            rows (list[tuple[int, IdeaIn]]): The ids of the ideas with
+                their updated details.
+
+        Returns:
+            list[Idea | None]: The ideas as updated by each row.
+        """
+        idea_ids = [idea_id for idea_id, _ in rows]
+        previous = await self.get_by_ids(idea_ids)
+        ideas = await self._repository.update_ideas(rows)
+        self._cache.invalidate(
+            "ideas",
+            *{f"idea:{idea_id}" for idea_id in idea_ids},
+            *{
+                tag
+                for idea in (*previous, *ideas) if idea
+                for tag in idea_tags(idea)
+            },
+        )
+
+        return ideas
+
+    async def delete_idea(self, idea_id: int) -> bool:
+        """The method removing an idea and evicting results it changes.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        previous = await self.get_by_id(idea_id)
+        deleted = await self._repository.delete_idea(idea_id)
+        self._cache.invalidate(
+            "ideas",
+            f"idea:{idea_id}",
+            *(idea_tags(previous) if previous else ()),
+        )
+
+        return deleted
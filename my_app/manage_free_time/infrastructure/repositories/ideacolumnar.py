@@ -0,0 +1,791 @@
+"""Module containing the columnar in-memory idea repository implementation."""
+
+import random
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+from typing import AsyncIterator, Iterable, Iterator, Optional, Sequence
+
+from manage_free_time.core.domain.idea import Idea, IdeaIn
+from manage_free_time.core.repositories.iidea import IIdeaRepository
+from manage_free_time.infrastructure.repositories.iidea_pages import (
+    IdeaPageJson,
+    IIdeaPageRepository,
+    page_json,
+)
+
+RANDOM_PICK_ATTEMPTS = 32
+STREAM_PAGE_SIZE = 500
+
+
+class ColumnarIdeaRepository(IIdeaRepository, IIdeaPageRepository):
+    """A class keeping ideas in memory column by column.
+
+    Every attribute of the ideas is a separate typed array indexed by row
+    number, and rows are kept in ascending order of ids:
+
+    - ids and user ids are `array('q')`,
+    - categories are codes of interned names in `array('H')`,
+    - titles are UTF-8 bytes in one `bytearray` addressed by a start and
+      a length per row,
+    - tags are codes of interned names packed in one `array('I')`
+      addressed by a start and a count per row.
+
+    Categories, tags and users map to ascending row numbers, so filtered
+    pages are binary searches in those lists. `Idea` models are built
+    only for the rows returned. Deleted rows and replaced titles or tags
+    are left in place and reclaimed by compacting the columns once they
+    take more space than the live data.
+    """
+
+    _ids: array
+    _user_ids: array
+    _categories: array
+    _title_starts: array
+    _title_lengths: array
+    _titles: bytearray
+    _tag_starts: array
+    _tag_counts: array
+    _tags: array
+    _alive: bytearray
+    _category_names: list[str]
+    _category_codes: dict[str, int]
+    _tag_names: list[str]
+    _tag_codes: dict[str, int]
+    _rows_by_category: dict[int, array]
+    _rows_by_tag: dict[int, array]
+    _rows_by_user: dict[int, array]
+    _next_id: int
+    _dead_rows: int
+    _dead_bytes: int
+    _dead_tags: int
+
+    def __init__(self) -> None:
+        """The initializer of the `ColumnarIdeaRepository`."""
+        self._category_names = []
+        self._category_codes = {}
+        self._tag_names = []
+        self._tag_codes = {}
+        self._next_id = 1
+        self._reset()
+
+    def __len__(self) -> int:
+        return len(self._ids) - self._dead_rows
+
+    async def get_all_ideas(
+        self, after: int | None = None, limit: int | None = None
+    ) -> Iterable[Idea]:
+        """The method getting a page of all ideas.
+
+        Args:
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Ideas ordered by id.
+        """
+        return [self._idea(row) for row in self._page(None, after, limit)]
+
+    async def get_by_category(
+        self, category: str, after: int | None = None, limit: int | None = None
+    ) -> Iterable[Idea]:
+        """The method getting a page of ideas assigned to the category.
+
+        Args:
+            category (str): The name of the category.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Ideas assigned to the category.
+        """
+        rows = self._category_rows(category)
+        return [self._idea(row) for row in self._page(rows, after, limit)]
+
+    async def get_ideas_json(
+        self,
+        category: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> IdeaPageJson:
+        """The method getting a page of ideas serialized to JSON.
+
+        Args:
+            category (str | None): The name of the category.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            IdeaPageJson: The JSON array of the ideas ordered by id.
+        """
+        rows = self._category_rows(category) if category else None
+        return page_json([self._idea(row) for row in self._page(rows, after, limit)])
+
+    async def iter_ideas(
+        self,
+        category: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[Idea]:
+        """The method streaming ideas one by one.
+
+        Ideas are built a page at a time and every page resumes after the
+        id of the last idea sent, as rows are renumbered when the columns
+        are compacted by writes made while the stream is consumed.
+
+        Args:
+            category (str | None): The name of the category.
+            after (int | None): Only ideas with a greater id are yielded.
+            limit (int | None): The maximal number of yielded ideas.
+
+        Yields:
+            Idea: The next idea ordered by id.
+        """
+        remaining = limit
+        while remaining is None or remaining > 0:
+            rows = self._category_rows(category) if category else None
+            size = STREAM_PAGE_SIZE if remaining is None else min(
+                remaining, STREAM_PAGE_SIZE
+            )
+            page = [self._idea(row) for row in self._page(rows, after, size)]
+            for idea in page:
+                yield idea
+            if len(page) < size:
+                return
+
+            after = page[-1].id
+            if remaining is not None:
+                remaining -= len(page)
+
+    async def get_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool = True,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> Iterable[Idea]:
+        """The method getting ideas having all or any of the given tags.
+
+        Matching all tags walks the rows of the rarest tag and checks the
+        packed tags of each; matching any merges the rows of all tags.
+
+        Args:
+            tags (list[str]): The tags to filter by.
+            match_all (bool): Whether ideas must have all tags or any of them.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Matching ideas ordered by id.
+        """
+        codes = {self._tag_codes.get(tag) for tag in tags}
+        codes.discard(None)
+        if not tags or (match_all and len(codes) < len(set(tags))):
+            return []
+
+        postings = [self._rows_by_tag.get(code, array("I")) for code in codes]
+        if match_all:
+            rows = min(postings, key=len)
+            candidates = (
+                row
+                for row in self._rows_after(rows, after)
+                if codes.issubset(self._row_tag_codes(row))
+            )
+        else:
+            candidates = self._unique(
+                merge(*(self._rows_after(rows, after) for rows in postings))
+            )
+
+        return [self._idea(row) for row in self._take(candidates, limit)]
+
+    async def search_by_title(
+        self,
+        query: str,
+        category: str | None = None,
+        tags: list[str] | None = None,
+        limit: int = 20,
+    ) -> Iterable[Idea]:
+        """The method getting ideas whose titles contain the query.
+
+        Titles of the rows of the category, or of all rows, are scanned;
+        the in-process search index is the fast path for searching.
+
+        Args:
+            query (str): The searched text.
+            category (str | None): The category to filter by.
+            tags (list[str] | None): Tags the ideas must all have.
+            limit (int): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Matching ideas ordered by id.
+        """
+        needle = query.lower()
+        codes = {self._tag_codes.get(tag) for tag in tags or ()}
+        if None in codes:
+            return []
+
+        rows = self._category_rows(category) if category else None
+        candidates = (
+            row
+            for row in self._rows_after(rows, None)
+            if needle in self._title(row).lower()
+            and codes.issubset(self._row_tag_codes(row))
+        )
+        return [self._idea(row) for row in self._take(candidates, limit)]
+
+    async def get_by_user(self, user_id: int) -> Iterable[Idea]:
+        """The method getting ideas created by the particular user.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Iterable[Idea]: Ideas created by the user.
+        """
+        rows = self._rows_by_user.get(user_id, ())
+        return [self._idea(row) for row in rows if self._alive[row]]
+
+    async def get_by_id(self, idea_id: int) -> Idea | None:
+        """The method getting an idea by provided id.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            Idea | None: The idea details if exists.
+        """
+        row = self._row(idea_id)
+        return self._idea(row) if row is not None else None
+
+    async def get_by_ids(self, idea_ids: list[int]) -> Iterable[Idea]:
+        """The method getting ideas with the given ids.
+
+        Args:
+            idea_ids (list[int]): The ids of the ideas.
+
+        Returns:
+            Iterable[Idea]: The existing ideas ordered by id.
+        """
+        rows = (self._row(idea_id) for idea_id in sorted(set(idea_ids)))
+        return [self._idea(row) for row in rows if row is not None]
+
+    async def get_random_idea(self, category: str | None = None) -> Idea | None:
+        """The method getting a random idea.
+
+        Live rows are at least half of all rows, so a few draws find one;
+        if they all hit deleted rows, a live row is drawn from a scan.
+
+        Args:
+            category (str | None): The category to pick from.
+
+        Returns:
+            Idea | None: A random idea if any exists.
+        """
+        rows: Sequence[int] = (
+            self._category_rows(category) if category else range(len(self._ids))
+        )
+        if not rows:
+            return None
+
+        for _ in range(RANDOM_PICK_ATTEMPTS):
+            row = rows[random.randrange(len(rows))]
+            if self._alive[row]:
+                return self._idea(row)
+
+        alive = [row for row in rows if self._alive[row]]
+        return self._idea(random.choice(alive)) if alive else None
+
+    async def add_idea(self, data: IdeaIn, user_id: int) -> Idea | None:
+        """The method adding new idea to the data storage.
+
+        Args:
+            data (IdeaIn): The details of the new idea.
+            user_id (int): The id of the user adding the idea.
+
+        Returns:
+            Idea | None: The newly added idea.
+        """
+        return self._idea(self._add(data, user_id))
+
+    async def add_ideas(
+        self, data: list[IdeaIn], user_id: int
+    ) -> list[Idea | None]:
+        """The method adding many ideas at once.
+
+        Args:
+            data (list[IdeaIn]): The details of the new ideas.
+            user_id (int): The id of the user adding the ideas.
+
+        Returns:
+            list[Idea | None]: The added ideas in the order of `data`.
+        """
+        return [self._idea(self._add(idea, user_id)) for idea in data]
+
+    async def add_ideas_by_users(
+        self, rows: list[tuple[IdeaIn, int]]
+    ) -> list[Idea | None]:
+        """The method adding many ideas of different users at once.
+
+        Args:
+            rows (list[tuple[IdeaIn, int]]): The details of the new ideas
+                with the ids of the users adding them.
+
+        Returns:
+            list[Idea | None]: The added ideas in the order of `rows`.
+        """
+        return [self._idea(self._add(idea, user_id)) for idea, user_id in rows]
+
+    async def update_idea(self, idea_id: int, data: IdeaIn) -> Idea | None:
+        """The method updating idea data in the data storage.
+
+        The new title and tags are appended to the packed columns and the
+        previous ones are left for compaction.
+
+        Args:
+            idea_id (int): The id of the idea.
+            data (IdeaIn): The updated details of the idea.
+
+        Returns:
+            Idea | None: The updated idea details if exists.
+        """
+        row = self._row(idea_id)
+        if row is None:
+            return None
+
+        category = self._intern_category(data.category)
+        if category != self._categories[row]:
+            self._unlink(self._rows_by_category, self._categories[row], row)
+            insort(self._rows_by_category.setdefault(category, array("I")), row)
+            self._categories[row] = category
+
+        for code in self._distinct_tag_codes(row):
+            self._unlink(self._rows_by_tag, code, row)
+        self._dead_bytes += self._title_lengths[row]
+        self._dead_tags += self._tag_counts[row]
+        self._titles_append(row, data.title.encode())
+        self._tags_append(row, [self._intern_tag(tag) for tag in data.tags])
+        for code in self._distinct_tag_codes(row):
+            insort(self._rows_by_tag.setdefault(code, array("I")), row)
+
+        idea = self._idea(row)
+        self._compact_if_sparse()
+        return idea
+
+    async def update_ideas(
+        self, rows: list[tuple[int, IdeaIn]]
+    ) -> list[Idea | None]:
+        """The method updating many ideas in order.
+
+        Args:
+            rows (list[tuple[int, IdeaIn]]): The ids of the ideas with
+                their updated details.
+
+        Returns:
+            list[Idea | None]: The updated ideas, None for missing ones.
+        """
+        return [await self.update_idea(idea_id, data) for idea_id, data in rows]
+
+    async def delete_idea(self, idea_id: int) -> bool:
+        """The method removing an idea from the data storage.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        row = self._row(idea_id)
+        if row is None:
+            return False
+
+        self._alive[row] = 0
+        self._dead_rows += 1
+        self._dead_bytes += self._title_lengths[row]
+        self._dead_tags += self._tag_counts[row]
+        self._compact_if_sparse()
+        return True
+
+    def load(self, rows: Iterable[tuple[int, int, str, str, list[str]]]) -> None:
+        """The method appending ideas read from another data storage.
+
+        Meant for filling the repository, e.g. from the database, without
+        building `Idea` models. Ideas added later get greater ids.
+
+        Args:
+            rows (Iterable[tuple[int, int, str, str, list[str]]]): The ids,
+                user ids, titles, categories and tags of the ideas, in
+                ascending order of ids greater than the stored ones.
+
+        Raises:
+            ValueError: If the ids are not ascending.
+        """
+        for idea_id, user_id, title, category, tags in rows:
+            if self._ids and idea_id <= self._ids[-1]:
+                raise ValueError("Ideas must be loaded in ascending order of ids")
+
+            self._append(
+                idea_id,
+                user_id,
+                self._intern_category(category),
+                title.encode(),
+                [self._intern_tag(tag) for tag in tags],
+            )
+            self._next_id = idea_id + 1
+
+    def _reset(self) -> None:
+        """Replace the columns and row lists with empty ones."""
+        self._ids = array("q")
+        self._user_ids = array("q")
+        self._categories = array("H" if len(self._category_names) <= 0x10000 else "I")
+        self._title_starts = array("q")
+        self._title_lengths = array("I")
+        self._titles = bytearray()
+        self._tag_starts = array("q")
+        self._tag_counts = array("H")
+        self._tags = array("I")
+        self._alive = bytearray()
+        self._rows_by_category = {}
+        self._rows_by_tag = {}
+        self._rows_by_user = {}
+        self._dead_rows = 0
+        self._dead_bytes = 0
+        self._dead_tags = 0
+
+    def _intern_category(self, name: str) -> int:
+        """Get the code of a category, assigning a new one if needed.
+
+        The codes column is widened to `array('I')` when the codes no
+        longer fit two bytes.
+
+        Args:
+            name (str): The name of the category.
+
+        Returns:
+            int: The code.
+        """
+        code = self._category_codes.get(name)
+        if code is None:
+            code = self._category_codes[name] = len(self._category_names)
+            self._category_names.append(name)
+            if code > 0xFFFF and self._categories.typecode == "H":
+                self._categories = array("I", self._categories)
+
+        return code
+
+    def _intern_tag(self, name: str) -> int:
+        """Get the code of a tag, assigning a new one if needed.
+
+        Args:
+            name (str): The name of the tag.
+
+        Returns:
+            int: The code.
+        """
+        code = self._tag_codes.get(name)
+        if code is None:
+            code = self._tag_codes[name] = len(self._tag_names)
+            self._tag_names.append(name)
+
+        return code
+
+    def _add(self, data: IdeaIn, user_id: int) -> int:
+        """Append a new idea with the next id.
+
+        Args:
+            data (IdeaIn): The details of the idea.
+            user_id (int): The id of its author.
+
+        Returns:
+            int: The row of the idea.
+        """
+        idea_id = self._next_id
+        self._next_id += 1
+        return self._append(
+            idea_id,
+            user_id,
+            self._intern_category(data.category),
+            data.title.encode(),
+            [self._intern_tag(tag) for tag in data.tags],
+        )
+
+    def _append(
+        self,
+        idea_id: int,
+        user_id: int,
+        category: int,
+        title: bytes,
+        tags: Sequence[int],
+    ) -> int:
+        """Append a row to the columns and its row lists.
+
+        Args:
+            idea_id (int): The id, greater than the ids of all rows.
+            user_id (int): The id of the author.
+            category (int): The code of the category.
+            title (bytes): The encoded title.
+            tags (Sequence[int]): The codes of the tags.
+
+        Returns:
+            int: The row.
+        """
+        row = len(self._ids)
+        self._ids.append(idea_id)
+        self._user_ids.append(user_id)
+        self._categories.append(category)
+        self._alive.append(1)
+        self._title_starts.append(len(self._titles))
+        self._title_lengths.append(len(title))
+        self._titles += title
+        self._tag_starts.append(len(self._tags))
+        self._tag_counts.append(len(tags))
+        self._tags.extend(tags)
+
+        self._link(self._rows_by_category, category, row)
+        self._link(self._rows_by_user, user_id, row)
+        for code in tags if len(tags) < 2 else dict.fromkeys(tags):
+            self._link(self._rows_by_tag, code, row)
+
+        return row
+
+    def _titles_append(self, row: int, title: bytes) -> None:
+        """Point a row at a title appended to the packed titles.
+
+        Args:
+            row (int): The row.
+            title (bytes): The encoded title.
+        """
+        self._title_starts[row] = len(self._titles)
+        self._title_lengths[row] = len(title)
+        self._titles += title
+
+    def _tags_append(self, row: int, tags: Sequence[int]) -> None:
+        """Point a row at tag codes appended to the packed tags.
+
+        Args:
+            row (int): The row.
+            tags (Sequence[int]): The codes of the tags.
+        """
+        self._tag_starts[row] = len(self._tags)
+        self._tag_counts[row] = len(tags)
+        self._tags.extend(tags)
+
+    def _distinct_tag_codes(self, row: int) -> Iterable[int]:
+        """Get the tag codes of a row without repeats.
+
+        Args:
+            row (int): The row.
+
+        Returns:
+            Iterable[int]: The codes in the order of the tags.
+        """
+        return dict.fromkeys(self._row_tag_codes(row))
+
+    def _title(self, row: int) -> str:
+        """Decode the title of a row.
+
+        Args:
+            row (int): The row.
+
+        Returns:
+            str: The title.
+        """
+        start = self._title_starts[row]
+        return self._titles[start:start + self._title_lengths[row]].decode()
+
+    def _row_tag_codes(self, row: int) -> array:
+        """Get the tag codes of a row.
+
+        Args:
+            row (int): The row.
+
+        Returns:
+            array: The codes.
+        """
+        start = self._tag_starts[row]
+        return self._tags[start:start + self._tag_counts[row]]
+
+    def _idea(self, row: int) -> Idea:
+        """Build the model of a row.
+
+        The columns hold validated data, so the model is constructed
+        without validating it again.
+
+        Args:
+            row (int): The row.
+
+        Returns:
+            Idea: The idea.
+        """
+        names = self._tag_names
+        return Idea.model_construct(
+            id=self._ids[row],
+            user_id=self._user_ids[row],
+            title=self._title(row),
+            category=self._category_names[self._categories[row]],
+            tags=[names[code] for code in self._row_tag_codes(row)],
+        )
+
+    def _row(self, idea_id: int) -> Optional[int]:
+        """Find the live row of an idea.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            Optional[int]: The row if the idea exists.
+        """
+        row = bisect_left(self._ids, idea_id)
+        if row == len(self._ids) or self._ids[row] != idea_id:
+            return None
+
+        return row if self._alive[row] else None
+
+    def _category_rows(self, category: str) -> Sequence[int]:
+        """Get the rows of a category.
+
+        Args:
+            category (str): The name of the category.
+
+        Returns:
+            Sequence[int]: Ascending rows, including deleted ones.
+        """
+        code = self._category_codes.get(category)
+        return self._rows_by_category.get(code, ()) if code is not None else ()
+
+    def _rows_after(
+        self, rows: Optional[Sequence[int]], after: Optional[int]
+    ) -> Iterator[int]:
+        """Iterate live rows of ideas with ids greater than `after`.
+
+        Args:
+            rows (Optional[Sequence[int]]): Ascending rows, None for all.
+            after (Optional[int]): The id of the last skipped idea.
+
+        Yields:
+            int: The rows.
+        """
+        alive = self._alive
+        if rows is None:
+            start = bisect_right(self._ids, after) if after is not None else 0
+            rows = range(start, len(self._ids))
+        elif after is not None:
+            start = bisect_right(rows, after, key=self._ids.__getitem__)
+            rows = rows[start:]
+
+        return (row for row in rows if alive[row])
+
+    def _page(
+        self,
+        rows: Optional[Sequence[int]],
+        after: Optional[int],
+        limit: Optional[int],
+    ) -> list[int]:
+        """Select the rows of a keyset page.
+
+        Args:
+            rows (Optional[Sequence[int]]): Ascending rows, None for all.
+            after (Optional[int]): The id of the last idea of the previous page.
+            limit (Optional[int]): The maximal number of rows.
+
+        Returns:
+            list[int]: The rows of the page.
+        """
+        return self._take(self._rows_after(rows, after), limit)
+
+    @staticmethod
+    def _take(rows: Iterable[int], limit: Optional[int]) -> list[int]:
+        """Take at most `limit` rows.
+
+        Args:
+            rows (Iterable[int]): The rows.
+            limit (Optional[int]): The maximal number of rows, None for all.
+
+        Returns:
+            list[int]: The rows.
+        """
+        if limit is None:
+            return list(rows)
+
+        page = []
+        for row in rows:
+            if len(page) == limit:
+                break
+            page.append(row)
+        return page
+
+    @staticmethod
+    def _unique(rows: Iterable[int]) -> Iterator[int]:
+        """Drop repeated rows of an ascending sequence.
+
+        Args:
+            rows (Iterable[int]): Ascending rows.
+
+        Yields:
+            int: The rows without repeats.
+        """
+        previous = -1
+        for row in rows:
+            if row != previous:
+                yield row
+                previous = row
+
+    @staticmethod
+    def _link(postings: dict[int, array], key: int, row: int) -> None:
+        """Append a row, greater than all rows of a key, to its rows.
+
+        Args:
+            postings (dict[int, array]): The rows by key.
+            key (int): The key.
+            row (int): The row.
+        """
+        rows = postings.get(key)
+        if rows is None:
+            rows = postings[key] = array("I")
+        rows.append(row)
+
+    @staticmethod
+    def _unlink(postings: dict[int, array], key: int, row: int) -> None:
+        """Remove a row from the ascending rows of a key.
+
+        Args:
+            postings (dict[int, array]): The rows by key.
+            key (int): The key.
+            row (int): The row.
+        """
+        rows = postings.get(key)
+        if rows is None:
+            return
+
+        position = bisect_left(rows, row)
+        if position < len(rows) and rows[position] == row:
+            del rows[position]
+        if not rows:
+            del postings[key]
+
+    def _compact_if_sparse(self) -> None:
+        """Rewrite the columns if dead data outweighs the live data."""
+        if (
+            self._dead_rows * 2 > len(self._ids)
+            or self._dead_bytes * 2 > len(self._titles)
+            or self._dead_tags * 2 > len(self._tags)
+        ):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the columns keeping only the live rows and their data."""
+        old = ColumnarIdeaRepository.__new__(ColumnarIdeaRepository)
+        old.__dict__.update(self.__dict__)
+        self._reset()
+
+        for row in range(len(old._ids)):
+            if not old._alive[row]:
+                continue
+
+            start = old._title_starts[row]
+            self._append(
+                old._ids[row],
+                old._user_ids[row],
+                old._categories[row],
+                bytes(old._titles[start:start + old._title_lengths[row]]),
+                old._row_tag_codes(row),
+            )
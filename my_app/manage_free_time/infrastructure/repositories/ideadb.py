@@ -0,0 +1,643 @@
+"""Module containing idea database repository implementation."""
+
+import json
+import random
+from typing import AsyncIterator, Iterable
+
+from asyncpg.exceptions import PostgresError  # type: ignore
+from sqlalchemy import (
+    Integer,
+    Select,
+    Text,
+    any_,
+    bindparam,
+    cast,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+
+from manage_free_time.core.domain.idea import Idea, IdeaIn
+from manage_free_time.core.repositories.iidea import IIdeaRepository
+from manage_free_time.infrastructure.db import database, idea_table
+from manage_free_time.infrastructure.repositories.iidea_changes import \
+    IIdeaChangeRepository
+from manage_free_time.infrastructure.repositories.iidea_pages import (
+    IdeaPageJson,
+    IIdeaPageRepository,
+)
+
+_select_all = select(idea_table).order_by(idea_table.c.id.asc())
+_select_by_id = select(idea_table).where(idea_table.c.id == bindparam("idea_id"))
+_select_by_category = (
+    select(idea_table)
+    .where(idea_table.c.category == bindparam("category"))
+    .order_by(idea_table.c.id.asc())
+)
+_select_by_user = (
+    select(idea_table)
+    .where(idea_table.c.user_id == bindparam("user_id"))
+    .order_by(idea_table.c.id.asc())
+)
+_select_id_bounds = select(
+    func.min(idea_table.c.id).label("low"),
+    func.max(idea_table.c.id).label("high"),
+)
+_select_id_bounds_by_category = _select_id_bounds.where(
+    idea_table.c.category == bindparam("category")
+)
+_select_first_from = (
+    select(idea_table)
+    .where(idea_table.c.id >= bindparam("pivot"))
+    .order_by(idea_table.c.id.asc())
+    .limit(1)
+)
+_select_first_from_by_category = (
+    select(idea_table)
+    .where(idea_table.c.category == bindparam("category"))
+    .where(idea_table.c.id >= bindparam("pivot"))
+    .order_by(idea_table.c.id.asc())
+    .limit(1)
+)
+_select_by_ids = (
+    select(idea_table)
+    .where(idea_table.c.id == any_(bindparam("idea_ids", type_=ARRAY(Integer))))
+    .order_by(idea_table.c.id.asc())
+)
+_select_by_all_tags = (
+    select(idea_table)
+    .where(idea_table.c.tags.contains(bindparam("tags")))
+    .order_by(idea_table.c.id.asc())
+)
+_select_by_any_tag = (
+    select(idea_table)
+    .where(idea_table.c.tags.overlap(bindparam("tags")))
+    .order_by(idea_table.c.id.asc())
+)
+
+_RESERVE_IDS = (
+    "SELECT nextval(pg_get_serial_sequence('ideas', 'id')) "
+    "FROM generate_series(1, $1)"
+)
+_COPY_COLUMNS = ["id", "title", "category", "tags", "user_id"]
+# Tag lists differ in length, so they are passed as JSON arrays and
+# unpacked per row.
+_UPDATE_MANY = """
+UPDATE ideas AS idea
+SET title = changed.title,
+    category = changed.category,
+    tags = ARRAY(
+        SELECT tag.value
+        FROM jsonb_array_elements_text(changed.tags::jsonb)
+            WITH ORDINALITY AS tag(value, position)
+        ORDER BY tag.position
+    )
+FROM unnest($1::int[], $2::text[], $3::text[], $4::text[])
+    AS changed(id, title, category, tags)
+WHERE idea.id = changed.id
+RETURNING idea.id, idea.title, idea.category, idea.tags, idea.user_id
+"""
+
+_SELECT_CHANGE_VERSION = "SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+_SELECT_CHANGED_IDS = """
+SELECT
+    (SELECT max(pruned_before) FROM idea_change_horizon) AS pruned_before,
+    ARRAY(
+        SELECT DISTINCT idea_id FROM idea_changes WHERE transaction_id >= $1
+    ) AS idea_ids
+"""
+_PRUNE_CHANGES = """
+WITH horizon AS (
+    INSERT INTO idea_change_horizon (id, pruned_before) VALUES (1, $1)
+    ON CONFLICT (id) DO UPDATE
+    SET pruned_before = greatest(
+        idea_change_horizon.pruned_before, excluded.pruned_before
+    )
+    RETURNING pruned_before
+)
+DELETE FROM idea_changes
+WHERE transaction_id < (SELECT pruned_before FROM horizon)
+"""
+
+
+def _paginate(query: Select, after: int | None, limit: int | None) -> Select:
+    """Narrow an id-ordered query to a keyset page.
+
+    Args:
+        query (Select): The query ordered by ascending id.
+        after (int | None): Only rows with a greater id are selected.
+        limit (int | None): The maximal number of selected rows.
+
+    Returns:
+        Select: The narrowed query.
+    """
+    if after is not None:
+        query = query.where(idea_table.c.id > bindparam("after", after))
+    if limit is not None:
+        query = query.limit(bindparam("limit", limit))
+    return query
+
+
+def _as_json_array(query: Select) -> Select:
+    """Wrap an id-ordered query to return its rows as one JSON array.
+
+    Args:
+        query (Select): The query of idea rows.
+
+    Returns:
+        Select: The query of the array as text, the number of rows and
+            the greatest id.
+    """
+    page = query.subquery("page")
+    rows = func.json_agg(aggregate_order_by(page.table_valued(), page.c.id))
+    return select(
+        func.coalesce(cast(rows, Text), "[]").label("body"),
+        func.count().label("count"),
+        func.max(page.c.id).label("last_id"),
+    )
+
+
+class IdeaRepository(
+    IIdeaRepository, IIdeaPageRepository, IIdeaChangeRepository
+):
+    """A class implementing the idea repository on top of the database."""
+
+    async def get_all_ideas(
+        self, after: int | None = None, limit: int | None = None
+    ) -> Iterable[Idea]:
+        """The method getting all ideas from the data storage.
+
+        Args:
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Ideas in the data storage.
+        """
+        ideas = await database.fetch_all(_paginate(_select_all, after, limit))
+        return [Idea(**dict(idea)) for idea in ideas]
+
+    async def get_by_category(
+        self, category: str, after: int | None = None, limit: int | None = None
+    ) -> Iterable[Idea]:
+        """The method getting ideas assigned to the particular category.
+
+        Args:
+            category (str): The name of the category.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Ideas assigned to the category.
+        """
+        query = _paginate(_select_by_category, after, limit)
+        ideas = await database.fetch_all(query.params(category=category))
+        return [Idea(**dict(idea)) for idea in ideas]
+
+    async def get_ideas_json(
+        self,
+        category: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> IdeaPageJson:
+        """The method getting ideas serialized to JSON by the database.
+
+        Rows are aggregated with `json_agg`, so no `Idea` models are built
+        and the response body is sent as received.
+
+        Args:
+            category (str | None): The name of the category.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            IdeaPageJson: The JSON array of the ideas ordered by id.
+        """
+        if category:
+            query = _paginate(_select_by_category, after, limit)
+            query = _as_json_array(query).params(category=category)
+        else:
+            query = _as_json_array(_paginate(_select_all, after, limit))
+
+        page = await database.fetch_one(query)
+        return IdeaPageJson(
+            body=page["body"].encode(),
+            count=page["count"],
+            last_id=page["last_id"],
+        )
+
+    async def iter_ideas(
+        self,
+        category: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[Idea]:
+        """The method streaming ideas through a server-side cursor.
+
+        Args:
+            category (str | None): The name of the category.
+            after (int | None): Only ideas with a greater id are yielded.
+            limit (int | None): The maximal number of yielded ideas.
+
+        Yields:
+            Idea: The next idea ordered by id.
+        """
+        if category:
+            query = _paginate(_select_by_category, after, limit)
+            query = query.params(category=category)
+        else:
+            query = _paginate(_select_all, after, limit)
+
+        async for idea in database.iterate(query):
+            yield Idea(**dict(idea))
+
+    async def get_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool = True,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> Iterable[Idea]:
+        """The method getting ideas having all or any of the given tags.
+
+        Args:
+            tags (list[str]): The tags to filter by.
+            match_all (bool): Whether ideas must have all tags or any of them.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Ideas matching the tags.
+        """
+        query = _select_by_all_tags if match_all else _select_by_any_tag
+        query = _paginate(query, after, limit).params(tags=tags)
+        ideas = await database.fetch_all(query)
+        return [Idea(**dict(idea)) for idea in ideas]
+
+    async def get_by_ids(self, idea_ids: list[int]) -> Iterable[Idea]:
+        """The method getting ideas with the given ids in one query.
+
+        Args:
+            idea_ids (list[int]): The ids of the ideas.
+
+        Returns:
+            Iterable[Idea]: The existing ideas ordered by id.
+        """
+        if not idea_ids:
+            return []
+
+        ideas = await database.fetch_all(
+            _select_by_ids.params(idea_ids=list(idea_ids)),
+        )
+        return [Idea(**dict(idea)) for idea in ideas]
+
+    async def search_by_title(
+        self,
+        query: str,
+        category: str | None = None,
+        tags: list[str] | None = None,
+        limit: int = 20,
+    ) -> Iterable[Idea]:
+        """The method getting ideas whose titles contain the query.
+
+        Args:
+            query (str): The searched text.
+            category (str | None): The category to filter by.
+            tags (list[str] | None): Tags the ideas must all have.
+            limit (int): The maximal number of returned ideas.
+
+        Returns:
+            Iterable[Idea]: Matching ideas ordered by id.
+        """
+        query_filter = idea_table.c.title.icontains(query, autoescape=True)
+        statement = select(idea_table).where(query_filter)
+        if category:
+            statement = statement.where(idea_table.c.category == category)
+        if tags:
+            statement = statement.where(idea_table.c.tags.contains(tags))
+        statement = statement.order_by(idea_table.c.id.asc()).limit(limit)
+        ideas = await database.fetch_all(statement)
+        return [Idea(**dict(idea)) for idea in ideas]
+
+    async def get_by_user(self, user_id: int) -> Iterable[Idea]:
+        """The method getting ideas created by the particular user.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Iterable[Idea]: Ideas created by the user.
+        """
+        ideas = await database.fetch_all(_select_by_user.params(user_id=user_id))
+        return [Idea(**dict(idea)) for idea in ideas]
+
+    async def get_by_id(self, idea_id: int) -> Idea | None:
+        """The method getting an idea by provided id.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            Idea | None: The idea details if exists.
+        """
+        idea = await database.fetch_one(_select_by_id.params(idea_id=idea_id))
+        return Idea(**dict(idea)) if idea else None
+
+    async def get_random_idea(self, category: str | None = None) -> Idea | None:
+        """The method getting a random idea.
+
+        A random pivot is drawn from the id range and the first idea at or
+        after it is returned. Both steps are index lookups, unlike
+        `ORDER BY random()` which sorts the whole filtered table. Gaps in
+        the id sequence make the choice only approximately uniform.
+
+        Args:
+            category (str | None): The category to pick from.
+
+        Returns:
+            Idea | None: A random idea if any exists.
+        """
+        if category:
+            bounds = await database.fetch_one(
+                _select_id_bounds_by_category.params(category=category),
+            )
+        else:
+            bounds = await database.fetch_one(_select_id_bounds)
+        if not bounds or bounds["low"] is None:
+            return None
+
+        pivot = random.randint(bounds["low"], bounds["high"])
+        if category:
+            idea = await database.fetch_one(
+                _select_first_from_by_category.params(
+                    category=category,
+                    pivot=pivot,
+                ),
+            )
+        else:
+            idea = await database.fetch_one(_select_first_from.params(pivot=pivot))
+        return Idea(**dict(idea)) if idea else None
+
+    async def add_idea(self, data: IdeaIn, user_id: int) -> Idea | None:
+        """The method adding new idea to the data storage.
+
+        Args:
+            data (IdeaIn): The details of the new idea.
+            user_id (int): The id of the user adding the idea.
+
+        Returns:
+            Idea | None: The newly added idea.
+        """
+        query = (
+            insert(idea_table)
+            .values(**data.model_dump(), user_id=user_id)
+            .returning(idea_table)
+        )
+        idea = await database.fetch_one(query)
+        return Idea(**dict(idea)) if idea else None
+
+    async def add_ideas(
+        self, data: list[IdeaIn], user_id: int
+    ) -> list[Idea | None]:
+        """The method adding many ideas with a single COPY.
+
+        Ids are reserved from the table's sequence up front, so the ideas
+        can be returned without reading them back. If the COPY fails, the
+        rows are inserted one by one to find the failing ones.
+
+        Args:
+            data (list[IdeaIn]): The details of the new ideas.
+            user_id (int): The id of the user adding the ideas.
+
+        Returns:
+            list[Idea | None]: The added ideas, None for failed rows.
+        """
+        return await self.add_ideas_by_users([(idea, user_id) for idea in data])
+
+    async def add_ideas_by_users(
+        self, rows: list[tuple[IdeaIn, int]]
+    ) -> list[Idea | None]:
+        """The method adding many ideas of different users with a single COPY.
+
+        Falls back to inserting the rows one by one like `add_ideas`.
+
+        Args:
+            rows (list[tuple[IdeaIn, int]]): The details of the new ideas
+                with the ids of the users adding them.
+
+        Returns:
+            list[Idea | None]: The added ideas, None for failed rows.
+        """
+        if not rows:
+            return []
+
+        try:
+            return await self._copy_ideas(rows)
+        except PostgresError:
+            pass
+
+        ideas = []
+        for idea, user_id in rows:
+            try:
+                ideas.append(await self.add_idea(idea, user_id))
+            except PostgresError:
+                ideas.append(None)
+        return ideas
+
+    async def _copy_ideas(self, rows: list[tuple[IdeaIn, int]]) -> list[Idea]:
+        """Store ideas with reserved ids through the COPY protocol.
+
+        Args:
+            rows (list[tuple[IdeaIn, int]]): The details of the new ideas
+                with the ids of the users adding them.
+
+        Returns:
+            list[Idea]: The added ideas.
+        """
+        async with database.connection() as connection:
+            async with connection.transaction():
+                raw = connection.raw_connection
+                ids = await raw.fetch(_RESERVE_IDS, len(rows))
+                # The rows are validated already, so the models are built
+                # without validating them again.
+                ideas = [
+                    Idea.model_construct(
+                        id=reserved[0],
+                        user_id=user_id,
+                        title=idea.title,
+                        category=idea.category,
+                        tags=idea.tags,
+                    )
+                    for reserved, (idea, user_id) in zip(ids, rows)
+                ]
+                await raw.copy_records_to_table(
+                    idea_table.name,
+                    records=[
+                        (
+                            idea.id,
+                            idea.title,
+                            idea.category,
+                            idea.tags,
+                            idea.user_id,
+                        )
+                        for idea in ideas
+                    ],
+                    columns=_COPY_COLUMNS,
+                )
+
+        return ideas
+
+    async def update_idea(self, idea_id: int, data: IdeaIn) -> Idea | None:
+        """The method updating idea data in the data storage.
+
+        Args:
+            idea_id (int): The id of the idea.
+            data (IdeaIn): The updated details of the idea.
+
+        Returns:
+            Idea | None: The updated idea details if exists.
+        """
+        query = (
+            update(idea_table)
+            .where(idea_table.c.id == idea_id)
+            .values(**data.model_dump())
+            .returning(idea_table)
+        )
+        idea = await database.fetch_one(query)
+        return Idea(**dict(idea)) if idea else None
+
+    async def update_ideas(
+        self, rows: list[tuple[int, IdeaIn]]
+    ) -> list[Idea | None]:
+        """The method updating many ideas in a single transaction.
+
+        Every run of rows with distinct ids is applied by one UPDATE over
+        unnested arrays, and a repeated id starts the next run, so later
+        rows win. If the transaction fails, the rows are updated one by
+        one to find the failing ones.
+
+        Args:
+            rows (list[tuple[int, IdeaIn]]): The ids of the ideas with
+                their updated details.
+
+        Returns:
+            list[Idea | None]: The ideas as updated by each row, None for
+                missing ideas and failed rows.
+        """
+        if not rows:
+            return []
+
+        try:
+            return await self._update_runs(rows)
+        except PostgresError:
+            pass
+
+        ideas = []
+        for idea_id, data in rows:
+            try:
+                ideas.append(await self.update_idea(idea_id, data))
+            except PostgresError:
+                ideas.append(None)
+        return ideas
+
+    async def _update_runs(
+        self, rows: list[tuple[int, IdeaIn]]
+    ) -> list[Idea | None]:
+        """Apply updates as runs of distinct ids within one transaction.
+
+        Args:
+            rows (list[tuple[int, IdeaIn]]): The ids of the ideas with
+                their updated details.
+
+        Returns:
+            list[Idea | None]: The ideas as updated by each row.
+        """
+        runs: list[list[tuple[int, IdeaIn]]] = [[]]
+        run_ids: set[int] = set()
+        for idea_id, data in rows:
+            if idea_id in run_ids:
+                runs.append([])
+                run_ids.clear()
+            runs[-1].append((idea_id, data))
+            run_ids.add(idea_id)
+
+        ideas: list[Idea | None] = []
+        async with database.connection() as connection:
+            async with connection.transaction():
+                raw = connection.raw_connection
+                for run in runs:
+                    updated = {
+                        row["id"]: Idea(**dict(row))
+                        for row in await raw.fetch(
+                            _UPDATE_MANY,
+                            [idea_id for idea_id, _ in run],
+                            [data.title for _, data in run],
+                            [data.category for _, data in run],
+                            [json.dumps(data.tags) for _, data in run],
+                        )
+                    }
+                    ideas.extend(updated.get(idea_id) for idea_id, _ in run)
+
+        return ideas
+
+    async def delete_idea(self, idea_id: int) -> bool:
+        """The method removing an idea from the data storage.
+
+        Args:
+            idea_id (int): The id of the idea.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        query = (
+            delete(idea_table)
+            .where(idea_table.c.id == idea_id)
+            .returning(idea_table.c.id)
+        )
+        return await database.fetch_one(query) is not None
+
+    async def get_change_version(self) -> int:
+        """The method getting the oldest transaction still in progress.
+
+        Transactions not visible to later reads are either in progress
+        now or start later, so their ids are not lower than the xmin of
+        the current snapshot.
+
+        Returns:
+            int: The xmin of the current snapshot.
+        """
+        async with database.connection() as connection:
+            return await connection.raw_connection.fetchval(_SELECT_CHANGE_VERSION)
+
+    async def get_changed_ids(self, since: int) -> list[int] | None:
+        """The method getting the ideas changed by transactions since a version.
+
+        The pruning horizon and the changes are read by one statement, so
+        from the same snapshot.
+
+        Args:
+            since (int): The xmin returned by `get_change_version`.
+
+        Returns:
+            list[int] | None: The ids of the changed ideas, or None if the
+                changes since the version were pruned.
+        """
+        async with database.connection() as connection:
+            row = await connection.raw_connection.fetchrow(_SELECT_CHANGED_IDS, since)
+
+        if row["pruned_before"] is not None and row["pruned_before"] > since:
+            return None
+
+        return list(row["idea_ids"])
+
+    async def prune_changes(self, before: int) -> None:
+        """The method removing the changes of transactions older than a version.
+
+        Args:
+            before (int): The xmin returned by `get_change_version`.
+        """
+        async with database.connection() as connection:
+            await connection.raw_connection.execute(_PRUNE_CHANGES, before)
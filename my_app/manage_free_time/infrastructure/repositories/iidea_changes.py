@@ -0,0 +1,43 @@
+"""Module containing the protocol of repositories tracking changed ideas."""
+
+from abc import ABC, abstractmethod
+
+
+class IIdeaChangeRepository(ABC):
+    """An abstract class representing repositories logging changed ideas.
+
+    The log lets a worker starting from a catalogue snapshot read only
+    the ideas changed since the snapshot was taken. Only stores shared
+    by several processes implement it.
+    """
+
+    @abstractmethod
+    async def get_change_version(self) -> int:
+        """Retrieve the version to replay later changes of ideas from.
+
+        Every change not visible to reads started after this call gets
+        a version not lower than the returned one.
+
+        Returns:
+            int: The version.
+        """
+
+    @abstractmethod
+    async def get_changed_ids(self, since: int) -> list[int] | None:
+        """Retrieve the ids of ideas added, updated or removed since a version.
+
+        Args:
+            since (int): The version returned by `get_change_version`.
+
+        Returns:
+            list[int] | None: The ids of the changed ideas, or None if the
+                changes since the version are no longer kept.
+        """
+
+    @abstractmethod
+    async def prune_changes(self, before: int) -> None:
+        """Forget the changes of ideas older than a version.
+
+        Args:
+            before (int): The version returned by `get_change_version`.
+        """
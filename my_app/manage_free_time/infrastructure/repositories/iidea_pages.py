@@ -0,0 +1,87 @@
+"""Module containing the protocol of repositories serializing idea pages."""
+
+from abc import ABC, abstractmethod
+from typing import NamedTuple, Optional, Sequence
+
+from pydantic_core import to_json
+
+from manage_free_time.core.domain.idea import Idea
+from manage_free_time.core.repositories.iidea import IIdeaRepository
+
+
+class IdeaPageJson(NamedTuple):
+    """A page of ideas already encoded as the body of a JSON response."""
+
+    body: bytes
+    count: int
+    last_id: Optional[int] = None
+
+
+class IIdeaPageRepository(ABC):
+    """An abstract class representing repositories encoding pages of ideas.
+
+    A repository implementing it returns a page as a ready JSON array, e.g.
+    built by the database, so the ideas are never turned into models.
+    """
+
+    @abstractmethod
+    async def get_ideas_json(
+        self,
+        category: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> IdeaPageJson:
+        """Retrieve ideas ordered by id already serialized to a JSON array.
+
+        Args:
+            category (str | None): The category to filter by.
+            after (int | None): Only ideas with a greater id are returned.
+            limit (int | None): The maximal number of returned ideas.
+
+        Returns:
+            IdeaPageJson: The JSON array with the number of ideas in it and
+                the id of the last one.
+        """
+
+
+def page_json(ideas: Sequence[Idea]) -> IdeaPageJson:
+    """Encode a page of ideas.
+
+    Args:
+        ideas (Sequence[Idea]): The ideas ordered by id.
+
+    Returns:
+        IdeaPageJson: The JSON array of the ideas.
+    """
+    return IdeaPageJson(
+        body=to_json(ideas),
+        count=len(ideas),
+        last_id=ideas[-1].id if ideas else None,
+    )
+
+
+async def fetch_page_json(
+    repository: IIdeaRepository,
+    category: str | None = None,
+    after: int | None = None,
+    limit: int | None = None,
+) -> IdeaPageJson:
+    """Get a page of ideas encoded by the repository if it can, else here.
+
+    Args:
+        repository (IIdeaRepository): The repository of ideas.
+        category (str | None): The category to filter by.
+        after (int | None): Only ideas with a greater id are returned.
+        limit (int | None): The maximal number of returned ideas.
+
+    Returns:
+        IdeaPageJson: The JSON array of the ideas ordered by id.
+    """
+    if isinstance(repository, IIdeaPageRepository):
+        return await repository.get_ideas_json(category, after, limit)
+
+    if category:
+        ideas = await repository.get_by_category(category, after, limit)
+    else:
+        ideas = await repository.get_all_ideas(after, limit)
+    return page_json(list(ideas))
@@ -0,0 +1,30 @@
+"""Module containing the protocol of shared versions of idea collections."""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class IIdeaVersionRepository(ABC):
+    """An abstract class representing versions of idea collections.
+
+    Unlike `CollectionVersions` the versions are kept in the data storage,
+    so every worker sees a change made through any of them.
+    """
+
+    @abstractmethod
+    async def get_version(
+        self,
+        category: Optional[str] = None,
+        user_id: Optional[int] = None,
+    ) -> str:
+        """Retrieve the version of all ideas, a category or a user's ideas.
+
+        Args:
+            category (Optional[str]): The category of the collection.
+            user_id (Optional[int]): The author of the collection, used
+                when no category is given.
+
+        Returns:
+            str: The version, changed by every write of an idea of the
+                collection.
+        """
@@ -0,0 +1,400 @@
+"""Module containing invitation database repository implementation."""
+
+from collections import Counter
+from typing import AsyncIterator, Iterable, Optional
+
+from sqlalchemy import (
+    Integer,
+    Update,
+    any_,
+    bindparam,
+    delete,
+    func,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from manage_free_time.core.domain.invitations import Invitation, InvitationIn
+from manage_free_time.core.repositories.iinvitations import IInvitationRepository
+from manage_free_time.infrastructure.db import (
+    database,
+    invitation_inviter_count_table,
+    invitation_status_count_table,
+    invitation_table,
+)
+
+_select_all = select(invitation_table).order_by(invitation_table.c.id.asc())
+_select_by_id = select(invitation_table).where(
+    invitation_table.c.id == bindparam("invitation_id")
+)
+_select_by_user = (
+    select(invitation_table)
+    .where(invitation_table.c.inviter_id == bindparam("user_id"))
+    .order_by(invitation_table.c.id.asc())
+)
+_select_by_event = (
+    select(invitation_table)
+    .where(invitation_table.c.event_id == bindparam("event_id"))
+    .order_by(invitation_table.c.id.asc())
+)
+_select_by_status = (
+    select(invitation_table)
+    .where(
+        invitation_table.c.status == bindparam("status"),
+        invitation_table.c.id > bindparam("after"),
+    )
+    .order_by(invitation_table.c.id.asc())
+    .limit(bindparam("limit"))
+)
+_select_status_counts = select(invitation_status_count_table)
+_select_inviter_counts = select(invitation_inviter_count_table).where(
+    invitation_inviter_count_table.c.inviter_id == bindparam("inviter_id")
+)
+
+StatusChanges = Counter[tuple[int, str]]
+
+
+async def _apply_status_changes(changes: StatusChanges) -> None:
+    """Add changes of the numbers of invitations to the status counters.
+
+    It has to run in the transaction which changed the invitations. Rows
+    are upserted in key order, so concurrent transactions lock them in
+    the same order.
+
+    Args:
+        changes (StatusChanges): Changes keyed by inviter id and status.
+    """
+    per_inviter = sorted((key, delta) for key, delta in changes.items() if delta)
+    if not per_inviter:
+        return
+
+    per_status: Counter[str] = Counter()
+    for (_, status), delta in per_inviter:
+        per_status[status] += delta
+
+    inviter_counts = pg_insert(invitation_inviter_count_table).values([
+        {"inviter_id": inviter_id, "status": status, "count": delta}
+        for (inviter_id, status), delta in per_inviter
+    ])
+    status_counts = pg_insert(invitation_status_count_table).values([
+        {"status": status, "count": delta}
+        for status, delta in sorted(per_status.items())
+    ])
+    await database.execute(
+        inviter_counts.on_conflict_do_update(
+            index_elements=["inviter_id", "status"],
+            set_={
+                "count": invitation_inviter_count_table.c.count
+                + inviter_counts.excluded.count,
+            },
+        )
+    )
+    await database.execute(
+        status_counts.on_conflict_do_update(
+            index_elements=["status"],
+            set_={
+                "count": invitation_status_count_table.c.count
+                + status_counts.excluded.count,
+            },
+        )
+    )
+
+
+def _update_statuses_query(invitation_ids: list[int], status: str) -> Update:
+    """Build an update changing statuses and returning the previous ones.
+
+    The rows to change are locked first, so the returned statuses are
+    the ones the update actually replaced.
+
+    Args:
+        invitation_ids (list[int]): The ids of the invitations.
+        status (str): The new status of the invitations.
+
+    Returns:
+        Update: The statement returning the changed invitations along
+            with their `previous_status`.
+    """
+    previous = (
+        select(invitation_table.c.id, invitation_table.c.status)
+        .where(
+            invitation_table.c.id == any_(literal(invitation_ids, ARRAY(Integer)))
+        )
+        .with_for_update()
+        .cte("previous")
+    )
+
+    return (
+        update(invitation_table)
+        .where(invitation_table.c.id == previous.c.id)
+        .values(status=status)
+        .returning(invitation_table, previous.c.status.label("previous_status"))
+    )
+
+
+def _status_changes(invitations: Iterable, status: str) -> StatusChanges:
+    """Get counter changes of invitations moved to a new status.
+
+    Args:
+        invitations (Iterable): Rows returned by `_update_statuses_query`.
+        status (str): The new status of the invitations.
+
+    Returns:
+        StatusChanges: Changes keyed by inviter id and status.
+    """
+    changes: StatusChanges = Counter()
+    for invitation in invitations:
+        if invitation["previous_status"] == status:
+            continue
+        changes[(invitation["inviter_id"], invitation["previous_status"])] -= 1
+        changes[(invitation["inviter_id"], status)] += 1
+
+    return changes
+
+
+class InvitationRepository(IInvitationRepository):
+    """A class implementing the invitation repository on top of the database."""
+
+    async def get_all_invitations(self) -> Iterable[Invitation]:
+        """The method getting all invitations from the data storage.
+
+        Returns:
+            Iterable[Invitation]: Invitations in the data storage.
+        """
+        invitations = await database.fetch_all(_select_all)
+        return [Invitation(**dict(invitation)) for invitation in invitations]
+
+    async def get_by_user(self, user_id: int) -> Iterable[Invitation]:
+        """The method getting invitations sent by the particular user.
+
+        Args:
+            user_id (int): The id of the inviting user.
+
+        Returns:
+            Iterable[Invitation]: Invitations sent by the user.
+        """
+        invitations = await database.fetch_all(
+            _select_by_user.params(user_id=user_id),
+        )
+        return [Invitation(**dict(invitation)) for invitation in invitations]
+
+    async def get_by_event(self, event_id: int) -> Iterable[Invitation]:
+        """The method getting invitations for the particular event.
+
+        Args:
+            event_id (int): The id of the event.
+
+        Returns:
+            Iterable[Invitation]: Invitations for the event.
+        """
+        invitations = await database.fetch_all(
+            _select_by_event.params(event_id=event_id),
+        )
+        return [Invitation(**dict(invitation)) for invitation in invitations]
+
+    async def get_by_status(
+        self,
+        status: str,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Invitation]:
+        """The method streaming a page of invitations with the given status.
+
+        The page is read with a keyset condition on the status and id
+        index through a server-side cursor.
+
+        Args:
+            status (str): The status of the invitations.
+            after (Optional[int]): Only invitations with greater ids are returned.
+            limit (Optional[int]): The maximal number of returned invitations.
+
+        Yields:
+            Invitation: The next invitation with the status.
+        """
+        query = _select_by_status.params(
+            status=status,
+            after=after if after is not None else 0,
+            limit=limit,
+        )
+        async for invitation in database.iterate(query):
+            yield Invitation(**dict(invitation))
+
+    async def get_status_counts(
+        self, inviter_id: Optional[int] = None
+    ) -> dict[str, int]:
+        """The method getting the numbers of invitations per status.
+
+        The numbers are read from the counters instead of the invitations.
+
+        Args:
+            inviter_id (Optional[int]): The id of the inviting user, or None
+                for the counts of all invitations.
+
+        Returns:
+            dict[str, int]: The number of invitations for every status.
+        """
+        if inviter_id is None:
+            rows = await database.fetch_all(_select_status_counts)
+        else:
+            rows = await database.fetch_all(
+                _select_inviter_counts.params(inviter_id=inviter_id),
+            )
+        return {row["status"]: row["count"] for row in rows if row["count"]}
+
+    async def rebuild_status_counts(self) -> None:
+        """The method recomputing the status counters from the invitations."""
+        per_inviter = select(
+            invitation_table.c.inviter_id,
+            invitation_table.c.status,
+            func.count(),
+        ).group_by(invitation_table.c.inviter_id, invitation_table.c.status)
+        per_status = select(
+            invitation_inviter_count_table.c.status,
+            func.sum(invitation_inviter_count_table.c.count),
+        ).group_by(invitation_inviter_count_table.c.status)
+
+        async with database.transaction():
+            await database.execute(
+                "LOCK TABLE invitations IN SHARE ROW EXCLUSIVE MODE"
+            )
+            await database.execute(delete(invitation_inviter_count_table))
+            await database.execute(delete(invitation_status_count_table))
+            await database.execute(
+                invitation_inviter_count_table.insert().from_select(
+                    ["inviter_id", "status", "count"], per_inviter
+                )
+            )
+            await database.execute(
+                invitation_status_count_table.insert().from_select(
+                    ["status", "count"], per_status
+                )
+            )
+
+    async def get_by_id(self, invitation_id: int) -> Invitation | None:
+        """The method getting an invitation by provided id.
+
+        Args:
+            invitation_id (int): The id of the invitation.
+
+        Returns:
+            Invitation | None: The invitation details if exists.
+        """
+        invitation = await database.fetch_one(
+            _select_by_id.params(invitation_id=invitation_id),
+        )
+        return Invitation(**dict(invitation)) if invitation else None
+
+    async def send_invitation(self, data: InvitationIn) -> None:
+        """The method adding new invitation to the data storage.
+
+        Args:
+            data (InvitationIn): The details of the new invitation.
+        """
+        query = (
+            pg_insert(invitation_table)
+            .values(**data.model_dump())
+            .on_conflict_do_nothing(constraint="uq_invitations_inviter_email")
+            .returning(invitation_table.c.inviter_id, invitation_table.c.status)
+        )
+        async with database.transaction():
+            invitation = await database.fetch_one(query)
+            if invitation:
+                await _apply_status_changes(
+                    Counter({(invitation["inviter_id"], invitation["status"]): 1})
+                )
+
+    async def add_invitations(self, data: list[InvitationIn]) -> list[Invitation]:
+        """The method adding many invitations with a single statement.
+
+        Invitations the inviter has already sent to the same email are
+        skipped.
+
+        Args:
+            data (list[InvitationIn]): The details of the new invitations.
+
+        Returns:
+            list[Invitation]: The stored invitations, without duplicates.
+        """
+        if not data:
+            return []
+
+        query = (
+            pg_insert(invitation_table)
+            .values([invitation.model_dump() for invitation in data])
+            .on_conflict_do_nothing(constraint="uq_invitations_inviter_email")
+            .returning(invitation_table)
+        )
+        async with database.transaction():
+            invitations = await database.fetch_all(query)
+            await _apply_status_changes(Counter(
+                (invitation["inviter_id"], invitation["status"])
+                for invitation in invitations
+            ))
+
+        return [Invitation(**dict(invitation)) for invitation in invitations]
+
+    async def update_invitation_status(
+        self, invitation_id: int, status: str
+    ) -> Invitation | None:
+        """The method updating the status of an invitation.
+
+        The status counters are updated in the same transaction.
+
+        Args:
+            invitation_id (int): The id of the invitation.
+            status (str): The new status of the invitation.
+
+        Returns:
+            Invitation | None: The updated invitation details if exists.
+        """
+        async with database.transaction():
+            invitation = await database.fetch_one(
+                _update_statuses_query([invitation_id], status),
+            )
+            if invitation:
+                await _apply_status_changes(_status_changes([invitation], status))
+
+        return Invitation(**dict(invitation)) if invitation else None
+
+    async def update_statuses(self, invitation_ids: list[int], status: str) -> None:
+        """The method updating the status of many invitations at once.
+
+        The status counters are updated in the same transaction.
+
+        Args:
+            invitation_ids (list[int]): The ids of the invitations.
+            status (str): The new status of the invitations.
+        """
+        if not invitation_ids:
+            return
+
+        async with database.transaction():
+            invitations = await database.fetch_all(
+                _update_statuses_query(invitation_ids, status),
+            )
+            await _apply_status_changes(_status_changes(invitations, status))
+
+    async def delete_invitation(self, invitation_id: int) -> bool:
+        """The method removing an invitation from the data storage.
+
+        Args:
+            invitation_id (int): The id of the invitation.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        query = (
+            delete(invitation_table)
+            .where(invitation_table.c.id == invitation_id)
+            .returning(invitation_table.c.inviter_id, invitation_table.c.status)
+        )
+        async with database.transaction():
+            invitation = await database.fetch_one(query)
+            if invitation:
+                await _apply_status_changes(
+                    Counter({(invitation["inviter_id"], invitation["status"]): -1})
+                )
+
+        return invitation is not None
@@ -0,0 +1,212 @@
+"""Module containing the caching decorator of the user profile repository."""
+
+from typing import AsyncIterator, Iterable, Optional
+
+from manage_free_time.core.domain.user_profile import UserProfile, UserProfileIn
+from manage_free_time.core.repositories.iuser_profile import IUserProfileRepository
+from manage_free_time.infrastructure.cache import CachingRepository, LRUCache
+
+
+def profile_tags(profile: Optional[UserProfile]) -> list[str]:
+    """Get the cache tags of a user profile.
+
+    Profiles carry the `user:<id>` tag, as their idea ids change whenever
+    the idea repository invalidates the user's ideas.
+
+    Args:
+        profile (Optional[UserProfile]): The profile.
+
+    Returns:
+        list[str]: The tags of the profile.
+    """
+    if profile is None:
+        return []
+
+    return [
+        f"profile:{profile.id}",
+        f"username:{profile.username}",
+        f"user:{profile.id}",
+    ]
+
+
+class CachedUserProfileRepository(CachingRepository, IUserProfileRepository):
+    """A class caching reads of the wrapped user profile repository."""
+
+    namespace = "profiles"
+
+    _repository: IUserProfileRepository
+
+    def __init__(
+        self,
+        repository: IUserProfileRepository,
+        cache: LRUCache,
+        ttls: dict[str, float],
+        default_ttl: float,
+        negative_ttl: float,
+    ) -> None:
+        """The initializer of the `CachedUserProfileRepository`.
+
+        Args:
+            repository (IUserProfileRepository): The wrapped repository.
+            cache (LRUCache): The cache shared by the decorators.
+            ttls (dict[str, float]): TTLs by `profiles.<method>`.
+            default_ttl (float): TTL of methods missing in `ttls`.
+            negative_ttl (float): TTL of cached "not found" results.
+        """
+        super().__init__(cache, ttls, default_ttl, negative_ttl)
+        self._repository = repository
+
+    async def get_all_profiles(self) -> Iterable[UserProfile]:
+        """The method getting all user profiles through the cache.
+
+        Returns:
+            Iterable[UserProfile]: User profiles in the data storage.
+        """
+        async def load() -> tuple[UserProfile, ...]:
+            return tuple(await self._repository.get_all_profiles())
+
+        return await self._read(
+            "get_all_profiles",
+            (),
+            load,
+            lambda _: ["profiles", "ideas"],
+        )
+
+    async def get_by_id(self, user_id: int) -> Optional[UserProfile]:
+        """The method getting user profile by id through the cache.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Optional[UserProfile]: The user profile details if exists.
+        """
+        return await self._read(
+            "get_by_id",
+            (user_id,),
+            lambda: self._repository.get_by_id(user_id),
+            lambda _: [f"profile:{user_id}", f"user:{user_id}"],
+        )
+
+    async def get_by_username(self, username: str) -> Optional[UserProfile]:
+        """The method getting user profile by username through the cache.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            Optional[UserProfile]: The user profile details if exists.
+        """
+        return await self._read(
+            "get_by_username",
+            (username,),
+            lambda: self._repository.get_by_username(username),
+            lambda profile: [f"username:{username}", *profile_tags(profile)],
+        )
+
+    async def get_user_ideas(self, user_id: int) -> Iterable[int]:
+        """The method getting ids of user's ideas through the cache.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Iterable[int]: Ids of the user's ideas.
+        """
+        async def load() -> tuple[int, ...]:
+            return tuple(await self._repository.get_user_ideas(user_id))
+
+        return await self._read(
+            "get_user_ideas",
+            (user_id,),
+            load,
+            lambda _: [f"user:{user_id}"],
+        )
+
+    async def add_user_profile(self, data: UserProfileIn) -> UserProfile:
+        """The method adding a user profile and evicting results it changes.
+
+        Args:
+            data (UserProfileIn): The details of the new user profile.
+
+        Returns:
+            UserProfile: The created user profile.
+        """
+        profile = await self._repository.add_user_profile(data)
+        self._cache.invalidate("profiles", *profile_tags(profile))
+
+        return profile
+
+    async def update_user_profile(
+        self, user_id: int, data: UserProfileIn
+    ) -> Optional[UserProfile]:
+        """The method updating a user profile and evicting results it changes.
+
+        Args:
+            user_id (int): The id of the user.
+            data (UserProfileIn): The details of the updated user profile.
+
+        Returns:
+            Optional[UserProfile]: The updated user profile if exists.
+        """
+        previous = await self.get_by_id(user_id)
+        profile = await self._repository.update_user_profile(user_id, data)
+        self._cache.invalidate(
+            "profiles",
+            f"profile:{user_id}",
+            f"username:{data.username}",
+            *profile_tags(previous),
+        )
+
+        return profile
+
+    async def delete_user_profile(self, user_id: int) -> bool:
+        """The method removing a user profile and evicting results it changes.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        previous = await self.get_by_id(user_id)
+        deleted = await self._repository.delete_user_profile(user_id)
+        self._cache.invalidate(
+            "profiles",
+            f"profile:{user_id}",
+            *profile_tags(previous),
+        )
+
+        return deleted
+
+    async def follow_user(self, follower_id: int, followee_id: int) -> bool:
+        """The method storing a follow in the wrapped repository.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_id (int): The id of the followed user.
+
+        Returns:
+            bool: Whether the follow was new.
+        """
+        return await self._repository.follow_user(follower_id, followee_id)
+
+    async def unfollow_user(self, follower_id: int, followee_id: int) -> bool:
+        """The method removing a follow from the wrapped repository.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_id (int): The id of the followed user.
+
+        Returns:
+            bool: Whether the follow existed.
+        """
+        return await self._repository.unfollow_user(follower_id, followee_id)
+
+    def iter_follows(self) -> AsyncIterator[tuple[int, int]]:
+        """The method streaming all follows straight from the wrapped repository.
+
+        Returns:
+            AsyncIterator[tuple[int, int]]: Pairs of follower and followee ids.
+        """
+        return self._repository.iter_follows()
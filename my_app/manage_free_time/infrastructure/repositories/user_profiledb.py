@@ -0,0 +1,210 @@
+"""Module containing user profile database repository implementation."""
+
+from typing import AsyncIterator, Iterable, Optional
+
+from sqlalchemy import Integer, bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from manage_free_time.core.domain.user_profile import UserProfile, UserProfileIn
+from manage_free_time.core.repositories.iuser_profile import IUserProfileRepository
+from manage_free_time.infrastructure.db import (
+    database,
+    follow_table,
+    idea_table,
+    user_profile_table,
+)
+
+_select_profiles = (
+    select(
+        user_profile_table,
+        func.array_remove(
+            func.array_agg(idea_table.c.id),
+            None,
+            type_=ARRAY(Integer),
+        ).label("idea_ids"),
+    )
+    .select_from(
+        user_profile_table.outerjoin(
+            idea_table,
+            idea_table.c.user_id == user_profile_table.c.id,
+        )
+    )
+    .group_by(user_profile_table.c.id)
+)
+_select_all = _select_profiles.order_by(user_profile_table.c.id.asc())
+_select_by_id = _select_profiles.where(
+    user_profile_table.c.id == bindparam("user_id")
+)
+_select_by_username = _select_profiles.where(
+    user_profile_table.c.username == bindparam("username")
+)
+_select_idea_ids = (
+    select(idea_table.c.id)
+    .where(idea_table.c.user_id == bindparam("user_id"))
+    .order_by(idea_table.c.id.asc())
+)
+_select_follows = select(follow_table.c.follower_id, follow_table.c.followee_id)
+
+
+class UserProfileRepository(IUserProfileRepository):
+    """A class implementing the user profile repository on top of the database."""
+
+    async def get_all_profiles(self) -> Iterable[UserProfile]:
+        """The method getting all user profiles from the data storage.
+
+        Returns:
+            Iterable[UserProfile]: User profiles in the data storage.
+        """
+        profiles = await database.fetch_all(_select_all)
+        return [UserProfile(**dict(profile)) for profile in profiles]
+
+    async def get_by_id(self, user_id: int) -> Optional[UserProfile]:
+        """The method getting user profile by provided id.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Optional[UserProfile]: The user profile details if exists.
+        """
+        profile = await database.fetch_one(_select_by_id.params(user_id=user_id))
+        return UserProfile(**dict(profile)) if profile else None
+
+    async def get_by_username(self, username: str) -> Optional[UserProfile]:
+        """The method getting user profile by provided username.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            Optional[UserProfile]: The user profile details if exists.
+        """
+        profile = await database.fetch_one(
+            _select_by_username.params(username=username),
+        )
+        return UserProfile(**dict(profile)) if profile else None
+
+    async def get_user_ideas(self, user_id: int) -> Iterable[int]:
+        """The method getting ids of ideas created by the user.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Iterable[int]: Ids of the user's ideas.
+        """
+        rows = await database.fetch_all(_select_idea_ids.params(user_id=user_id))
+        return [row["id"] for row in rows]
+
+    async def add_user_profile(self, data: UserProfileIn) -> UserProfile:
+        """The method adding new user profile to the data storage.
+
+        Args:
+            data (UserProfileIn): The details of the new user profile.
+
+        Returns:
+            UserProfile: The created user profile.
+        """
+        query = (
+            insert(user_profile_table)
+            .values(**data.model_dump())
+            .returning(user_profile_table)
+        )
+        profile = await database.fetch_one(query)
+        return UserProfile(**dict(profile), idea_ids=[])
+
+    async def update_user_profile(
+        self, user_id: int, data: UserProfileIn
+    ) -> Optional[UserProfile]:
+        """The method updating user profile data in the data storage.
+
+        Args:
+            user_id (int): The id of the user.
+            data (UserProfileIn): The details of the updated user profile.
+
+        Returns:
+            Optional[UserProfile]: The updated user profile if exists.
+        """
+        query = (
+            update(user_profile_table)
+            .where(user_profile_table.c.id == user_id)
+            .values(**data.model_dump())
+            .returning(user_profile_table.c.id)
+        )
+        if await database.fetch_one(query) is None:
+            return None
+
+        return await self.get_by_id(user_id)
+
+    async def delete_user_profile(self, user_id: int) -> bool:
+        """The method removing user profile from the data storage.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        query = (
+            delete(user_profile_table)
+            .where(user_profile_table.c.id == user_id)
+            .returning(user_profile_table.c.id)
+        )
+        follows = delete(follow_table).where(
+            or_(
+                follow_table.c.follower_id == user_id,
+                follow_table.c.followee_id == user_id,
+            )
+        )
+        async with database.transaction():
+            deleted = await database.fetch_one(query) is not None
+            if deleted:
+                await database.execute(follows)
+
+        return deleted
+
+    async def follow_user(self, follower_id: int, followee_id: int) -> bool:
+        """The method storing that a user follows another user.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_id (int): The id of the followed user.
+
+        Returns:
+            bool: Whether the follow was new.
+        """
+        query = (
+            pg_insert(follow_table)
+            .values(follower_id=follower_id, followee_id=followee_id)
+            .on_conflict_do_nothing()
+            .returning(follow_table.c.follower_id)
+        )
+        return await database.fetch_one(query) is not None
+
+    async def unfollow_user(self, follower_id: int, followee_id: int) -> bool:
+        """The method removing a follow from the data storage.
+
+        Args:
+            follower_id (int): The id of the follower.
+            followee_id (int): The id of the followed user.
+
+        Returns:
+            bool: Whether the follow existed.
+        """
+        query = (
+            delete(follow_table)
+            .where(follow_table.c.follower_id == follower_id)
+            .where(follow_table.c.followee_id == followee_id)
+            .returning(follow_table.c.follower_id)
+        )
+        return await database.fetch_one(query) is not None
+
+    async def iter_follows(self) -> AsyncIterator[tuple[int, int]]:
+        """The method streaming all follows through a server-side cursor.
+
+        Yields:
+            tuple[int, int]: The follower and followee ids.
+        """
+        async for row in database.iterate(_select_follows):
+            yield row["follower_id"], row["followee_id"]
@@ -0,0 +1,160 @@
+"""Module containing the caching decorator of the weekly plan repository."""
+
+from datetime import date
+from typing import AsyncIterator, Iterable, Optional
+
+from manage_free_time.core.domain.weekly_plan import WeeklyPlan, WeeklyPlanIn
+from manage_free_time.core.repositories.iweekly_plan import IWeeklyPlanRepository
+from manage_free_time.infrastructure.cache import CachingRepository, LRUCache
+
+
+class CachedWeeklyPlanRepository(CachingRepository, IWeeklyPlanRepository):
+    """A class caching reads of the wrapped weekly plan repository."""
+
+    namespace = "plans"
+
+    _repository: IWeeklyPlanRepository
+
+    def __init__(
+        self,
+        repository: IWeeklyPlanRepository,
+        cache: LRUCache,
+        ttls: dict[str, float],
+        default_ttl: float,
+        negative_ttl: float,
+    ) -> None:
+        """The initializer of the `CachedWeeklyPlanRepository`.
+
+        Args:
+            repository (IWeeklyPlanRepository): The wrapped repository.
+            cache (LRUCache): The cache shared by the decorators.
+            ttls (dict[str, float]): TTLs by `plans.<method>`.
+            default_ttl (float): TTL of methods missing in `ttls`.
+            negative_ttl (float): TTL of cached "not found" results.
+        """
+        super().__init__(cache, ttls, default_ttl, negative_ttl)
+        self._repository = repository
+
+    async def get_plan_by_user(self, user_id: int) -> Optional[WeeklyPlan]:
+        """The method getting the latest plan of the user through the cache.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Optional[WeeklyPlan]: The weekly plan if exists.
+        """
+        return await self._read(
+            "get_plan_by_user",
+            (user_id,),
+            lambda: self._repository.get_plan_by_user(user_id),
+            lambda _: [f"plan:{user_id}"],
+        )
+
+    async def get_plan(self, user_id: int, week_start: date) -> Optional[WeeklyPlan]:
+        """The method getting a plan of the user through the cache.
+
+        Args:
+            user_id (int): The id of the user.
+            week_start (date): The first day of the plan.
+
+        Returns:
+            Optional[WeeklyPlan]: The weekly plan if exists.
+        """
+        return await self._read(
+            "get_plan",
+            (user_id, week_start),
+            lambda: self._repository.get_plan(user_id, week_start),
+            lambda _: [f"plan:{user_id}"],
+        )
+
+    async def get_plans(
+        self, user_id: int, week_starts: list[date]
+    ) -> Iterable[WeeklyPlan]:
+        """The method getting plans of the user starting on the days, uncached.
+
+        Args:
+            user_id (int): The id of the user.
+            week_starts (list[date]): The first days of the plans.
+
+        Returns:
+            Iterable[WeeklyPlan]: The plans in ascending order of weeks.
+        """
+        return await self._repository.get_plans(user_id, week_starts)
+
+    async def get_latest_plans(self, before: date) -> Iterable[WeeklyPlan]:
+        """The method getting the last plan of every user, uncached.
+
+        Args:
+            before (date): Only plans starting before this day are considered.
+
+        Returns:
+            Iterable[WeeklyPlan]: At most one plan of every user.
+        """
+        return await self._repository.get_latest_plans(before)
+
+    def iter_plan_weeks(self) -> AsyncIterator[tuple[int, date, date]]:
+        """The method streaming the date ranges of all plans, uncached.
+
+        Returns:
+            AsyncIterator[tuple[int, date, date]]: The user ids with the
+                first and the last days of their plans.
+        """
+        return self._repository.iter_plan_weeks()
+
+    async def create_weekly_plan(self, user_id: int, data: WeeklyPlanIn) -> WeeklyPlan:
+        """The method adding a weekly plan and evicting the user's plans.
+
+        Args:
+            user_id (int): The id of the user.
+            data (WeeklyPlanIn): The details of the new plan.
+
+        Returns:
+            WeeklyPlan: The created weekly plan.
+        """
+        plan = await self._repository.create_weekly_plan(user_id, data)
+        self._cache.invalidate(f"plan:{user_id}")
+
+        return plan
+
+    async def update_weekly_plan(
+        self, user_id: int, week_start: date, data: WeeklyPlanIn
+    ) -> Optional[WeeklyPlan]:
+        """The method updating a weekly plan and evicting the user's plans.
+
+        Args:
+            user_id (int): The id of the user.
+            week_start (date): The current first day of the plan.
+            data (WeeklyPlanIn): The updated details of the plan.
+
+        Returns:
+            Optional[WeeklyPlan]: The updated weekly plan if exists.
+        """
+        plan = await self._repository.update_weekly_plan(user_id, week_start, data)
+        self._cache.invalidate(f"plan:{user_id}")
+
+        return plan
+
+    async def delete_weekly_plan(self, user_id: int, week_start: date) -> bool:
+        """The method removing a weekly plan and evicting the user's plans.
+
+        Args:
+            user_id (int): The id of the user.
+            week_start (date): The first day of the plan.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        deleted = await self._repository.delete_weekly_plan(user_id, week_start)
+        self._cache.invalidate(f"plan:{user_id}")
+
+        return deleted
+
+    async def save_weekly_plans(self, plans: list[WeeklyPlan]) -> None:
+        """The method storing many plans and evicting the users' plans.
+
+        Args:
+            plans (list[WeeklyPlan]): The plans to store.
+        """
+        await self._repository.save_weekly_plans(plans)
+        self._cache.invalidate(*(f"plan:{plan.user_id}" for plan in plans))
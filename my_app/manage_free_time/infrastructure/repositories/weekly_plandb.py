@@ -0,0 +1,209 @@
+"""Module containing weekly plan database repository implementation."""
+
+from datetime import date
+from typing import AsyncIterator, Iterable, Optional
+
+from sqlalchemy import Date, any_, bindparam, delete, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from manage_free_time.core.domain.weekly_plan import WeeklyPlan, WeeklyPlanIn
+from manage_free_time.core.repositories.iweekly_plan import IWeeklyPlanRepository
+from manage_free_time.infrastructure.config import config
+from manage_free_time.infrastructure.db import database, weekly_plan_table
+
+_select_latest_by_user = (
+    select(weekly_plan_table)
+    .where(weekly_plan_table.c.user_id == bindparam("user_id"))
+    .order_by(weekly_plan_table.c.week_start_date.desc())
+    .limit(1)
+)
+_select_by_week = select(weekly_plan_table).where(
+    weekly_plan_table.c.user_id == bindparam("user_id"),
+    weekly_plan_table.c.week_start_date == bindparam("week_start"),
+)
+_select_by_weeks = (
+    select(weekly_plan_table)
+    .where(
+        weekly_plan_table.c.user_id == bindparam("user_id"),
+        weekly_plan_table.c.week_start_date
+        == any_(bindparam("week_starts", type_=ARRAY(Date))),
+    )
+    .order_by(weekly_plan_table.c.week_start_date.asc())
+)
+_select_latest_before = (
+    select(weekly_plan_table)
+    .where(weekly_plan_table.c.week_start_date < bindparam("before"))
+    .distinct(weekly_plan_table.c.user_id)
+    .order_by(
+        weekly_plan_table.c.user_id,
+        weekly_plan_table.c.week_start_date.desc(),
+    )
+)
+_select_weeks = select(
+    weekly_plan_table.c.user_id,
+    weekly_plan_table.c.week_start_date,
+    weekly_plan_table.c.week_end_date,
+)
+
+
+class WeeklyPlanRepository(IWeeklyPlanRepository):
+    """A class implementing the weekly plan repository on top of the database."""
+
+    async def get_plan_by_user(self, user_id: int) -> Optional[WeeklyPlan]:
+        """The method getting the latest weekly plan of the user.
+
+        Args:
+            user_id (int): The id of the user.
+
+        Returns:
+            Optional[WeeklyPlan]: The weekly plan if exists.
+        """
+        plan = await database.fetch_one(
+            _select_latest_by_user.params(user_id=user_id),
+        )
+        return WeeklyPlan(**dict(plan)) if plan else None
+
+    async def get_plan(self, user_id: int, week_start: date) -> Optional[WeeklyPlan]:
+        """The method getting the plan of the user starting on the day.
+
+        Args:
+            user_id (int): The id of the user.
+            week_start (date): The first day of the plan.
+
+        Returns:
+            Optional[WeeklyPlan]: The weekly plan if exists.
+        """
+        plan = await database.fetch_one(
+            _select_by_week.params(user_id=user_id, week_start=week_start),
+        )
+        return WeeklyPlan(**dict(plan)) if plan else None
+
+    async def get_plans(
+        self, user_id: int, week_starts: list[date]
+    ) -> Iterable[WeeklyPlan]:
+        """The method getting the plans of the user starting on the days.
+
+        Args:
+            user_id (int): The id of the user.
+            week_starts (list[date]): The first days of the plans.
+
+        Returns:
+            Iterable[WeeklyPlan]: The plans in ascending order of weeks.
+        """
+        if not week_starts:
+            return []
+
+        plans = await database.fetch_all(
+            _select_by_weeks.params(user_id=user_id, week_starts=week_starts),
+        )
+        return [WeeklyPlan(**dict(plan)) for plan in plans]
+
+    async def get_latest_plans(self, before: date) -> Iterable[WeeklyPlan]:
+        """The method getting the last plan of every user before the day.
+
+        Args:
+            before (date): Only plans starting before this day are considered.
+
+        Returns:
+            Iterable[WeeklyPlan]: At most one plan of every user.
+        """
+        plans = await database.fetch_all(_select_latest_before.params(before=before))
+        return [WeeklyPlan(**dict(plan)) for plan in plans]
+
+    async def iter_plan_weeks(self) -> AsyncIterator[tuple[int, date, date]]:
+        """The method streaming the date ranges of all plans.
+
+        Yields:
+            tuple[int, date, date]: The user id with the first and the last
+                day of a plan.
+        """
+        async for row in database.iterate(_select_weeks):
+            yield row["user_id"], row["week_start_date"], row["week_end_date"]
+
+    async def create_weekly_plan(self, user_id: int, data: WeeklyPlanIn) -> WeeklyPlan:
+        """The method adding new weekly plan to the data storage.
+
+        Args:
+            user_id (int): The id of the user.
+            data (WeeklyPlanIn): The details of the new plan.
+
+        Returns:
+            WeeklyPlan: The created weekly plan.
+        """
+        query = (
+            insert(weekly_plan_table)
+            .values(**data.model_dump(), user_id=user_id)
+            .returning(weekly_plan_table)
+        )
+        plan = await database.fetch_one(query)
+        return WeeklyPlan(**dict(plan))
+
+    async def update_weekly_plan(
+        self, user_id: int, week_start: date, data: WeeklyPlanIn
+    ) -> Optional[WeeklyPlan]:
+        """The method updating the plan of the user starting on the day.
+
+        Args:
+            user_id (int): The id of the user.
+            week_start (date): The current first day of the plan.
+            data (WeeklyPlanIn): The updated details of the plan.
+
+        Returns:
+            Optional[WeeklyPlan]: The updated weekly plan if exists.
+        """
+        query = (
+            update(weekly_plan_table)
+            .where(
+                weekly_plan_table.c.user_id == user_id,
+                weekly_plan_table.c.week_start_date == week_start,
+            )
+            .values(**data.model_dump())
+            .returning(weekly_plan_table)
+        )
+        plan = await database.fetch_one(query)
+        return WeeklyPlan(**dict(plan)) if plan else None
+
+    async def delete_weekly_plan(self, user_id: int, week_start: date) -> bool:
+        """The method removing the plan of the user starting on the day.
+
+        Args:
+            user_id (int): The id of the user.
+            week_start (date): The first day of the plan.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        query = (
+            delete(weekly_plan_table)
+            .where(
+                weekly_plan_table.c.user_id == user_id,
+                weekly_plan_table.c.week_start_date == week_start,
+            )
+            .returning(weekly_plan_table.c.id)
+        )
+        return await database.fetch_one(query) is not None
+
+    async def save_weekly_plans(self, plans: list[WeeklyPlan]) -> None:
+        """The method upserting the weekly plans of many users.
+
+        Plans are written in multi-row statements of
+        `PLAN_SAVE_BATCH_SIZE` rows replacing the users' plans for the
+        same weeks.
+
+        Args:
+            plans (list[WeeklyPlan]): The plans to store.
+        """
+        for start in range(0, len(plans), config.PLAN_SAVE_BATCH_SIZE):
+            batch = plans[start:start + config.PLAN_SAVE_BATCH_SIZE]
+            query = pg_insert(weekly_plan_table).values(
+                [plan.model_dump() for plan in batch]
+            )
+            query = query.on_conflict_do_update(
+                constraint="uq_weekly_plans_user_week",
+                set_={
+                    "week_end_date": query.excluded.week_end_date,
+                    "ideas_ids": query.excluded.ideas_ids,
+                },
+            )
+            await database.execute(query)
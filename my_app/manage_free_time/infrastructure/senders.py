@@ -0,0 +1,104 @@
+"""Module containing senders delivering invitations to invitees."""
+
+import asyncio
+import smtplib
+from abc import ABC, abstractmethod
+from email.message import EmailMessage
+from typing import Optional
+
+from manage_free_time.core.domain.invitations import Invitation
+
+
+class IInvitationSender(ABC):
+    """An abstract class representing a channel delivering invitations."""
+
+    @abstractmethod
+    async def send(self, invitation: Invitation) -> None:
+        """Deliver an invitation to the invitee.
+
+        Args:
+            invitation (Invitation): The invitation.
+
+        Raises:
+            Exception: When the delivery failed and may be retried.
+        """
+
+
+class SmtpInvitationSender(IInvitationSender):
+    """A class delivering invitations as emails through an SMTP server."""
+
+    _host: str
+    _port: int
+    _sender: str
+    _username: Optional[str]
+    _password: Optional[str]
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+    ) -> None:
+        """The initializer of the `SmtpInvitationSender`.
+
+        Args:
+            host (str): The host of the SMTP server.
+            port (int): The port of the SMTP server.
+            sender (str): The address the emails are sent from.
+            username (Optional[str]): The login to the SMTP server.
+            password (Optional[str]): The password to the SMTP server.
+        """
+        self._host = host
+        self._port = port
+        self._sender = sender
+        self._username = username
+        self._password = password
+
+    async def send(self, invitation: Invitation) -> None:
+        """The method sending the invitation email in a worker thread.
+
+        Args:
+            invitation (Invitation): The invitation.
+        """
+        message = EmailMessage()
+        message["From"] = self._sender
+        message["To"] = invitation.invitee_email
+        message["Subject"] = "Zaproszenie do Manage Free Time"
+        message.set_content(invitation.message or "Zostałeś zaproszony!")
+
+        await asyncio.to_thread(self._deliver, message)
+
+    def _deliver(self, message: EmailMessage) -> None:
+        """Send an email over a new SMTP connection.
+
+        Args:
+            message (EmailMessage): The email.
+        """
+        with smtplib.SMTP(self._host, self._port, timeout=10) as smtp:
+            if self._username:
+                smtp.starttls()
+                smtp.login(self._username, self._password or "")
+            smtp.send_message(message)
+
+
+class MemoryInvitationSender(IInvitationSender):
+    """A class keeping invitations in memory instead of delivering them.
+
+    It stands in for SMTP in local runs and tests.
+    """
+
+    sent: list[Invitation]
+
+    def __init__(self) -> None:
+        """The initializer of the `MemoryInvitationSender`."""
+        self.sent = []
+
+    async def send(self, invitation: Invitation) -> None:
+        """The method recording the invitation as delivered.
+
+        Args:
+            invitation (Invitation): The invitation.
+        """
+        self.sent.append(invitation)
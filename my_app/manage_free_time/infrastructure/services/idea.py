@@ -1,93 +1,632 @@
-from typing import Iterable, Optional
-from manage_free_time.core.domain.idea import Idea, IdeaIn
-from manage_free_time.core.repositories.iidea import IIdeaRepository
-from manage_free_time.infrastructure.services.idea import IIdeaService
-
-
-class IdeaService(IIdeaService):
-    """A class implementing the idea service."""
-
-    _repository: IIdeaRepository
-
-    def __init__(self, repository: IIdeaRepository) -> None:
-        """The initializer of the `IdeaService`.
-
-        Args:
-            repository (IIdeaRepository): The reference to the repository.
-        """
-        self._repository = repository
-
-    async def get_random_idea(self, category: Optional[str] = None) -> Optional[Idea]:
-        """The method getting a random idea.
-
-        Args:
-            category (Optional[str]): The category of the idea (optional).
-
-        Returns:
-            Optional[Idea]: A random idea or None if no idea found.
-        """
-        return await self._repository.get_random_idea(category=category)
-
-    async def get_all_ideas(self) -> Iterable[Idea]:
-        """The method getting all ideas.
-
-        Returns:
-            Iterable[Idea]: Collection of all ideas.
-        """
-        return await self._repository.get_all_ideas()
-
-    async def get_ideas_by_category(self, category: str) -> Iterable[Idea]:
-        """The method getting ideas filtered by category.
-
-        Args:
-            category (str): The category name.
-
-        Returns:
-            Iterable[Idea]: Collection of ideas for the category.
-        """
-        return await self._repository.get_ideas_by_category(category)
-
-    async def add_idea(self, data: IdeaIn) -> Idea:
-        """The method adding a new idea.
-
-        Args:
-            data (IdeaIn): Details of the new idea.
-
-        Returns:
-            Idea: The newly added idea.
-        """
-        return await self._repository.add_idea(data)
-
-    async def update_idea(self, idea_id: int, data: IdeaIn) -> Optional[Idea]:
-        """The method updating an existing idea.
-
-        Args:
-            idea_id (int): The ID of the idea to update.
-            data (IdeaIn): The updated idea data.
-
-        Returns:
-            Optional[Idea]: The updated idea or None if not found.
-        """
-        return await self._repository.update_idea(idea_id=idea_id, data=data)
-
-    async def delete_idea(self, idea_id: int) -> bool:
-        """The method deleting an idea.
-
-        Args:
-            idea_id (int): The ID of the idea to delete.
-
-        Returns:
-            bool: Success of the operation.
-        """
-        return await self._repository.delete_idea(idea_id)
-
-    async def get_ideas_by_user(self, user_id: int) -> Iterable[Idea]:
-        """The method fetching ideas created by a specific user.
-
-        Args:
-            user_id (int): The ID of the user.
-
-        Returns:
-            Iterable[Idea]: Collection of ideas created by the user.
-        """
-        return await self._repository.get_ideas_by_user(user_id)
+import heapq
+from typing import AsyncIterator, Iterable, Optional
+from manage_free_time.core.domain.idea import (
+    Idea,
+    IdeaIn,
+    IdeaImportError,
+    IdeaImportReport,
+)
+from manage_free_time.core.repositories.iidea import IIdeaRepository
+from manage_free_time.infrastructure.idea_writer import IdeaWriteQueue
+from manage_free_time.infrastructure.indexes.category import CategoryIndex
+from manage_free_time.infrastructure.indexes.feed import FeedStore
+from manage_free_time.infrastructure.indexes.picker import PersonalizedPicker
+from manage_free_time.infrastructure.indexes.search import SearchIndex
+from manage_free_time.infrastructure.indexes.similar import (
+    SimilarityIndex,
+    jaccard,
+)
+from manage_free_time.infrastructure.indexes.tags import TagIndex
+from manage_free_time.infrastructure.indexes.versions import \
+    CollectionVersions
+from manage_free_time.infrastructure.repositories.iidea_pages import (
+    IdeaPageJson,
+    fetch_page_json,
+)
+from manage_free_time.infrastructure.repositories.iidea_versions import \
+    IIdeaVersionRepository
+from manage_free_time.infrastructure.services.iidea import IIdeaService
+from manage_free_time.infrastructure.single_flight import single_flight
+from manage_free_time.infrastructure.snapshot import IdeaSnapshots
+
+RANDOM_PICK_ATTEMPTS = 3
+MAX_REPORTED_IMPORT_ERRORS = 1000
+
+
+class IdeaService(IIdeaService):
+    """A class implementing the idea service."""
+
+    _repository: IIdeaRepository
+    _category_index: CategoryIndex
+    _tag_index: TagIndex
+    _search_index: SearchIndex
+    _similarity_index: SimilarityIndex
+    _random_picker: PersonalizedPicker
+    _feed: FeedStore
+    _versions: CollectionVersions
+    _shared_versions: Optional[IIdeaVersionRepository]
+    _writer: Optional[IdeaWriteQueue]
+    _snapshots: Optional[IdeaSnapshots]
+    _max_similar_candidates: int
+
+    def __init__(
+        self,
+        repository: IIdeaRepository,
+        category_index: CategoryIndex,
+        tag_index: TagIndex,
+        search_index: SearchIndex,
+        similarity_index: SimilarityIndex,
+        random_picker: PersonalizedPicker,
+        feed: FeedStore,
+        versions: CollectionVersions,
+        shared_versions: Optional[IIdeaVersionRepository] = None,
+        writer: Optional[IdeaWriteQueue] = None,
+        snapshots: Optional[IdeaSnapshots] = None,
+        max_similar_candidates: int = 2_000,
+    ) -> None:
+        """The initializer of the `IdeaService`.
+
+        Args:
+            repository (IIdeaRepository): The reference to the repository.
+            category_index (CategoryIndex): The index of idea ids per category.
+            tag_index (TagIndex): The inverted index of idea tags.
+            search_index (SearchIndex): The full-text index of idea titles.
+            similarity_index (SimilarityIndex): The MinHash LSH index
+                of idea tags.
+            random_picker (PersonalizedPicker): The picker of random ideas
+                weighted by the tastes of users.
+            feed (FeedStore): The home feed timelines.
+            versions (CollectionVersions): The version counters of the
+                idea collections.
+            shared_versions (Optional[IIdeaVersionRepository]): The versions
+                of the collections kept in the data storage for all workers,
+                or None to use the in-process `versions`.
+            writer (Optional[IdeaWriteQueue]): The queue batching adds and
+                updates, or None to store each of them on its own.
+            snapshots (Optional[IdeaSnapshots]): The catalogue snapshot
+                the indexes are loaded from, or None to read all ideas
+                from the repository.
+            max_similar_candidates (int): The maximal number of ideas
+                ranked by similarity while the index is not loaded.
+        """
+        self._repository = repository
+        self._category_index = category_index
+        self._tag_index = tag_index
+        self._search_index = search_index
+        self._similarity_index = similarity_index
+        self._random_picker = random_picker
+        self._feed = feed
+        self._versions = versions
+        self._shared_versions = shared_versions
+        self._writer = writer
+        self._snapshots = snapshots
+        self._max_similar_candidates = max_similar_candidates
+
+    async def load_indexes(self) -> None:
+        """The method building the in-process indexes.
+
+        With a snapshot only the ideas changed since it was written are
+        read from the repository, and the indexes read the other ones
+        straight from its columns.
+        """
+        catalogue = None
+        if self._snapshots is not None:
+            catalogue = await self._snapshots.load()
+        if catalogue is None:
+            ideas = await self._repository.get_all_ideas()
+            self._category_index.load(ideas)
+            self._tag_index.load(ideas)
+            self._search_index.load(ideas)
+            self._similarity_index.load(ideas)
+            self._feed.load(ideas)
+            return
+
+        self._category_index.load_rows(catalogue.rows("category"))
+        self._tag_index.load_rows(catalogue.rows("tags"))
+        self._search_index.load_rows(catalogue.rows("title", "category", "tags"))
+        self._similarity_index.load_rows(catalogue.rows("tags", "category"))
+        self._feed.load_rows(catalogue.rows("user_id"))
+
+    async def get_random_idea(
+        self,
+        category: Optional[str] = None,
+        user_id: Optional[int] = None,
+    ) -> Optional[Idea]:
+        """The method getting a random idea.
+
+        The id is picked from the in-process category index when it is
+        loaded, otherwise the repository draws the idea itself. For a user
+        the pick favours tags of the user's own ideas and avoids ideas the
+        user has recently been shown.
+
+        Args:
+            category (Optional[str]): The category of the idea (optional).
+            user_id (Optional[int]): The ID of the user asking (optional).
+
+        Returns:
+            Optional[Idea]: A random idea or None if no idea found.
+        """
+        warm = self._category_index.is_warm and self._tag_index.is_warm
+        if user_id is not None and warm:
+            return await self._pick_for_user(category, user_id)
+
+        if self._category_index.is_warm:
+            for _ in range(RANDOM_PICK_ATTEMPTS):
+                idea_id = self._category_index.pick(category)
+                if idea_id is None:
+                    return None
+
+                idea = await self._repository.get_by_id(idea_id)
+                if idea:
+                    return idea
+
+                self._category_index.remove(idea_id)
+
+        return await self._repository.get_random_idea(category=category)
+
+    async def _pick_for_user(
+        self, category: Optional[str], user_id: int
+    ) -> Optional[Idea]:
+        """Pick a random idea weighted by the tastes of a user.
+
+        The user's ideas are read again only after their version changed.
+
+        Args:
+            category (Optional[str]): The category of the idea.
+            user_id (int): The ID of the user.
+
+        Returns:
+            Optional[Idea]: A random idea or None if no idea found.
+        """
+        user_version = self._versions.token(user_id=user_id)
+        if not self._random_picker.knows(user_id, user_version):
+            self._random_picker.learn(
+                user_id,
+                user_version,
+                await self._repository.get_by_user(user_id),
+            )
+
+        version = self._versions.token(category=category or None)
+        for _ in range(RANDOM_PICK_ATTEMPTS):
+            idea_id = self._random_picker.pick(user_id, category, version)
+            if idea_id is None:
+                return None
+
+            idea = await self._repository.get_by_id(idea_id)
+            if idea:
+                self._random_picker.mark_seen(user_id, idea.id)
+                return idea
+
+            self._category_index.remove(idea_id)
+
+        return await self._repository.get_random_idea(category=category)
+
+    @single_flight
+    async def get_all_ideas(
+        self, after: Optional[int] = None, limit: Optional[int] = None
+    ) -> Iterable[Idea]:
+        """The method getting all ideas.
+
+        Args:
+            after (Optional[int]): The id of the last idea of the previous page.
+            limit (Optional[int]): The maximal number of ideas.
+
+        Returns:
+            Iterable[Idea]: Collection of all ideas.
+        """
+        return await self._repository.get_all_ideas(after=after, limit=limit)
+
+    @single_flight
+    async def get_ideas_by_category(
+        self,
+        category: str,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterable[Idea]:
+        """The method getting ideas filtered by category.
+
+        Args:
+            category (str): The category name.
+            after (Optional[int]): The id of the last idea of the previous page.
+            limit (Optional[int]): The maximal number of ideas.
+
+        Returns:
+            Iterable[Idea]: Collection of ideas for the category.
+        """
+        return await self._repository.get_by_category(
+            category,
+            after=after,
+            limit=limit,
+        )
+
+    @single_flight
+    async def get_ideas_json(
+        self,
+        category: Optional[str] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> IdeaPageJson:
+        """The method getting ideas serialized to a JSON array.
+
+        Args:
+            category (Optional[str]): The category name (optional).
+            after (Optional[int]): The id of the last idea of the previous page.
+            limit (Optional[int]): The maximal number of ideas.
+
+        Returns:
+            IdeaPageJson: The JSON array of the ideas ordered by id.
+        """
+        return await fetch_page_json(
+            self._repository,
+            category=category,
+            after=after,
+            limit=limit,
+        )
+
+    @single_flight
+    async def get_ideas_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool = True,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterable[Idea]:
+        """The method getting ideas filtered by tags.
+
+        The ids are resolved by the in-process tag index when it is loaded
+        and the ideas are then fetched in a single batch.
+
+        Args:
+            tags (list[str]): The tags to filter by.
+            match_all (bool): Whether ideas must have all tags or any of them.
+            after (Optional[int]): The id of the last idea of the previous page.
+            limit (Optional[int]): The maximal number of ideas.
+
+        Returns:
+            Iterable[Idea]: Collection of ideas matching the tags.
+        """
+        if not self._tag_index.is_warm:
+            return await self._repository.get_by_tags(
+                tags,
+                match_all=match_all,
+                after=after,
+                limit=limit,
+            )
+
+        idea_ids = self._tag_index.query(
+            tags,
+            match_all=match_all,
+            after=after,
+            limit=limit,
+        )
+        return await self._repository.get_by_ids(idea_ids)
+
+    @single_flight
+    async def search_ideas(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        prefix: bool = True,
+        limit: int = 20,
+    ) -> Iterable[Idea]:
+        """The method searching ideas by title.
+
+        Args:
+            query (str): The searched text.
+            category (Optional[str]): The category to filter by.
+            tags (Optional[list[str]]): Tags the ideas must all have.
+            prefix (bool): Whether the last word of the query is incomplete.
+            limit (int): The maximal number of ideas.
+
+        Returns:
+            Iterable[Idea]: Matching ideas, best matches first.
+        """
+        if not self._search_index.is_warm:
+            return await self._repository.search_by_title(
+                query,
+                category=category,
+                tags=tags,
+                limit=limit,
+            )
+
+        idea_ids = self._search_index.search(
+            query,
+            category=category,
+            tags=tags,
+            prefix=prefix,
+            limit=limit,
+        )
+        found = await self._repository.get_by_ids(idea_ids)
+        ideas = {idea.id: idea for idea in found}
+        return [ideas[idea_id] for idea_id in idea_ids if idea_id in ideas]
+
+    @single_flight
+    async def get_similar_ideas(
+        self, idea_id: int, limit: int = 10
+    ) -> Optional[list[Idea]]:
+        """The method getting ideas with tags most similar to an idea.
+
+        Candidates come from the LSH buckets of the similarity index when
+        it is loaded, otherwise from the ideas sharing a tag with the idea,
+        and only they are ranked by the Jaccard similarity of tags.
+
+        Args:
+            idea_id (int): The ID of the idea.
+            limit (int): The maximal number of returned ideas.
+
+        Returns:
+            Optional[list[Idea]]: Similar ideas, the most similar first,
+                or None if the idea is not found.
+        """
+        idea = await self._repository.get_by_id(idea_id)
+        if idea is None:
+            return None
+
+        if self._similarity_index.is_warm:
+            idea_ids = self._similarity_index.similar(idea_id, limit)
+            ideas = {
+                found.id: found
+                for found in await self._repository.get_by_ids(idea_ids)
+            }
+            return [ideas[found] for found in idea_ids if found in ideas]
+
+        if not idea.tags:
+            return []
+
+        tags = frozenset(idea.tags)
+        candidates = await self._repository.get_by_tags(
+            idea.tags,
+            match_all=False,
+            limit=self._max_similar_candidates,
+        )
+        return heapq.nlargest(
+            limit,
+            (candidate for candidate in candidates if candidate.id != idea_id),
+            key=lambda candidate: (
+                jaccard(tags, frozenset(candidate.tags)),
+                candidate.category == idea.category,
+                candidate.id,
+            ),
+        )
+
+    async def get_version(
+        self,
+        category: Optional[str] = None,
+        user_id: Optional[int] = None,
+    ) -> str:
+        """The method getting the version of a collection of ideas.
+
+        The version changes whenever an idea of the collection is added,
+        updated or deleted. With shared versions it is read from the data
+        storage, so it is the same in all workers; otherwise it counts the
+        writes made through this process.
+
+        Args:
+            category (Optional[str]): The category of the collection.
+            user_id (Optional[int]): The author of the collection, used
+                when no category is given.
+
+        Returns:
+            str: The version of the category, the user's ideas or all ideas.
+        """
+        if self._shared_versions is not None:
+            return await self._shared_versions.get_version(category, user_id)
+
+        return self._versions.token(category=category, user_id=user_id)
+
+    def stream_ideas(
+        self,
+        category: Optional[str] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Idea]:
+        """The method streaming ideas one by one.
+
+        Args:
+            category (Optional[str]): The category name (optional).
+            after (Optional[int]): The id of the last idea already received.
+            limit (Optional[int]): The maximal number of ideas.
+
+        Returns:
+            AsyncIterator[Idea]: Ideas ordered by id.
+        """
+        return self._repository.iter_ideas(
+            category=category,
+            after=after,
+            limit=limit,
+        )
+
+    @single_flight
+    async def get_idea_by_id(self, idea_id: int) -> Optional[Idea]:
+        """The method getting an idea by its ID.
+
+        Args:
+            idea_id (int): The ID of the idea.
+
+        Returns:
+            Optional[Idea]: The idea or None if not found.
+        """
+        return await self._repository.get_by_id(idea_id)
+
+    async def add_idea(self, data: IdeaIn, user_id: int) -> Optional[Idea]:
+        """The method adding a new idea.
+
+        In write-behind mode the idea is stored together with other
+        concurrently added ideas.
+
+        Args:
+            data (IdeaIn): Details of the new idea.
+            user_id (int): The ID of the user adding the idea.
+
+        Returns:
+            Optional[Idea]: The newly added idea.
+        """
+        if self._writer is not None:
+            idea = await self._writer.add_idea(data, user_id)
+        else:
+            idea = await self._repository.add_idea(data, user_id)
+        if idea:
+            self._index_idea(idea)
+            self._feed.publish(idea.id, idea.user_id)
+            self._versions.bump(idea.category, idea.user_id)
+
+        return idea
+
+    async def import_ideas(
+        self,
+        rows: AsyncIterator[tuple[int, IdeaIn | str]],
+        user_id: int,
+        batch_size: int,
+    ) -> IdeaImportReport:
+        """The method importing a stream of ideas in batches.
+
+        Rows which failed validation or storing are reported and skipped,
+        the rest of the batch is stored anyway.
+
+        Args:
+            rows (AsyncIterator[tuple[int, IdeaIn | str]]): Line numbers
+                with parsed ideas or validation error messages.
+            user_id (int): The ID of the user adding the ideas.
+            batch_size (int): The number of ideas stored at once.
+
+        Returns:
+            IdeaImportReport: Counts of imported and failed rows.
+        """
+        report = IdeaImportReport()
+
+        def reject(line: int, error: str) -> None:
+            report.failed += 1
+            if len(report.errors) < MAX_REPORTED_IMPORT_ERRORS:
+                report.errors.append(IdeaImportError(line=line, error=error))
+
+        async def flush(batch: list[tuple[int, IdeaIn]]) -> None:
+            ideas = await self._repository.add_ideas(
+                [data for _, data in batch],
+                user_id,
+            )
+            for (line, _), idea in zip(batch, ideas):
+                if idea is None:
+                    reject(line, "the idea could not be stored")
+                    continue
+                report.imported += 1
+                self._index_idea(idea)
+                self._feed.publish(idea.id, idea.user_id)
+                self._versions.bump(idea.category, idea.user_id)
+
+        batch: list[tuple[int, IdeaIn]] = []
+        async for line, row in rows:
+            if isinstance(row, str):
+                reject(line, row)
+                continue
+            batch.append((line, row))
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+        return report
+
+    async def update_idea(self, idea_id: int, data: IdeaIn) -> Optional[Idea]:
+        """The method updating an existing idea.
+
+        The category the idea is moved out of is taken from the category
+        index, so it gets a new version too without reading the idea. In
+        write-behind mode the update is stored together with other
+        concurrent updates.
+
+        Args:
+            idea_id (int): The ID of the idea to update.
+            data (IdeaIn): The updated idea data.
+
+        Returns:
+            Optional[Idea]: The updated idea or None if not found.
+        """
+        previous_category = self._category_index.category_of(idea_id)
+        if self._writer is not None:
+            idea = await self._writer.update_idea(idea_id, data)
+        else:
+            idea = await self._repository.update_idea(idea_id=idea_id, data=data)
+        if idea:
+            self._index_idea(idea)
+            self._versions.bump(idea.category, idea.user_id)
+            if previous_category and previous_category != idea.category:
+                self._versions.bump(previous_category, idea.user_id)
+
+        return idea
+
+    async def delete_idea(self, idea_id: int) -> bool:
+        """The method deleting an idea.
+
+        Args:
+            idea_id (int): The ID of the idea to delete.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        previous = await self._repository.get_by_id(idea_id)
+        deleted = await self._repository.delete_idea(idea_id)
+        if deleted:
+            self._unindex_idea(idea_id)
+            self._feed.retract(idea_id)
+            if previous:
+                self._versions.bump(previous.category, previous.user_id)
+
+        return deleted
+
+    @single_flight
+    async def get_ideas_by_user(self, user_id: int) -> Iterable[Idea]:
+        """The method fetching ideas created by a specific user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Iterable[Idea]: Collection of ideas created by the user.
+        """
+        return await self._repository.get_by_user(user_id)
+
+    @single_flight
+    async def get_feed(
+        self, user_id: int, before: Optional[int] = None, limit: int = 20
+    ) -> list[Idea]:
+        """The method getting a page of ideas from users followed by a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            before (Optional[int]): Only ideas with a lower ID are returned.
+            limit (int): The maximal number of returned ideas.
+
+        Returns:
+            list[Idea]: The ideas of the page, newest first.
+        """
+        idea_ids = self._feed.read(user_id, before, limit)
+        ideas = {
+            idea.id: idea
+            for idea in await self._repository.get_by_ids(idea_ids)
+        }
+
+        return [ideas[idea_id] for idea_id in idea_ids if idea_id in ideas]
+
+    def _index_idea(self, idea: Idea) -> None:
+        """Add a new or changed idea to the in-process indexes.
+
+        Args:
+            idea (Idea): The idea.
+        """
+        self._category_index.add(idea.id, idea.category)
+        self._tag_index.add(idea.id, idea.tags)
+        self._search_index.add(idea)
+        self._similarity_index.add(idea)
+
+    def _unindex_idea(self, idea_id: int) -> None:
+        """Remove a deleted idea from the in-process indexes.
+
+        Args:
+            idea_id (int): The ID of the idea.
+        """
+        self._category_index.remove(idea_id)
+        self._tag_index.remove(idea_id)
+        self._search_index.remove(idea_id)
+        self._similarity_index.remove(idea_id)
@@ -1,35 +1,129 @@
-from abc import ABC, abstractmethod
-from typing import Iterable
-
-from manage_free_time.core.domain.idea import Idea, IdeaIn
-
-
-class IIdeaService(ABC):
-    """A class representing idea-related operations."""
-
-    @abstractmethod
-    async def get_all(self) -> Iterable[Idea]:
-        """Fetch all ideas."""
-
-    @abstractmethod
-    async def get_random(self, category: str = None, tags: list = None) -> Idea:
-        """Get a random idea, optionally filtered by category and tags."""
-
-    @abstractmethod
-    async def get_by_id(self, idea_id: int) -> Idea | None:
-        """Fetch an idea by its ID."""
-
-    @abstractmethod
-    async def get_by_user(self, user_id: int) -> Iterable[Idea]:
-        """Fetch all ideas created by a specific user."""
-
-    async def add_idea(self, data: IdeaIn) -> Idea:
-        """Add a new idea to the system."""
-
-    @abstractmethod
-    async def update_idea(self, idea_id: int, data: IdeaIn) -> Idea | None:
-        """Update the details of an existing idea."""
-
-    @abstractmethod
-    async def delete_idea(self, idea_id: int) -> bool:
-        """Remove an idea from the system."""
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterable, Optional
+
+from manage_free_time.core.domain.idea import (
+    Idea,
+    IdeaIn,
+    IdeaImportReport,
+)
+from manage_free_time.infrastructure.repositories.iidea_pages import \
+    IdeaPageJson
+
+
+class IIdeaService(ABC):
+    """A class representing idea-related operations."""
+
+    @abstractmethod
+    async def load_indexes(self) -> None:
+        """Build the in-process indexes from the data storage."""
+
+    @abstractmethod
+    async def get_random_idea(
+        self,
+        category: Optional[str] = None,
+        user_id: Optional[int] = None,
+    ) -> Optional[Idea]:
+        """Get a random idea, optionally filtered by category and personalized."""
+
+    @abstractmethod
+    async def get_all_ideas(
+        self, after: Optional[int] = None, limit: Optional[int] = None
+    ) -> Iterable[Idea]:
+        """Fetch all ideas, optionally one keyset page at a time."""
+
+    @abstractmethod
+    async def get_ideas_by_category(
+        self,
+        category: str,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterable[Idea]:
+        """Fetch ideas assigned to a category, optionally paginated."""
+
+    @abstractmethod
+    async def get_ideas_json(
+        self,
+        category: Optional[str] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> IdeaPageJson:
+        """Fetch ideas, optionally from a category, serialized to JSON."""
+
+    @abstractmethod
+    async def get_ideas_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool = True,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterable[Idea]:
+        """Fetch ideas having all (or any) of the given tags."""
+
+    @abstractmethod
+    async def search_ideas(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        prefix: bool = True,
+        limit: int = 20,
+    ) -> Iterable[Idea]:
+        """Search ideas by title, best matches first."""
+
+    @abstractmethod
+    async def get_similar_ideas(
+        self, idea_id: int, limit: int = 10
+    ) -> Optional[list[Idea]]:
+        """Fetch ideas with tags most similar to the tags of an idea."""
+
+    @abstractmethod
+    async def get_version(
+        self,
+        category: Optional[str] = None,
+        user_id: Optional[int] = None,
+    ) -> str:
+        """Get the version of all ideas, a category or a user's ideas."""
+
+    @abstractmethod
+    def stream_ideas(
+        self,
+        category: Optional[str] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Idea]:
+        """Stream ideas one by one, optionally from a category."""
+
+    @abstractmethod
+    async def get_idea_by_id(self, idea_id: int) -> Optional[Idea]:
+        """Fetch an idea by its ID."""
+
+    @abstractmethod
+    async def get_ideas_by_user(self, user_id: int) -> Iterable[Idea]:
+        """Fetch all ideas created by a specific user."""
+
+    @abstractmethod
+    async def add_idea(self, data: IdeaIn, user_id: int) -> Optional[Idea]:
+        """Add a new idea to the system."""
+
+    @abstractmethod
+    async def import_ideas(
+        self,
+        rows: AsyncIterator[tuple[int, IdeaIn | str]],
+        user_id: int,
+        batch_size: int,
+    ) -> IdeaImportReport:
+        """Import a stream of parsed ideas in batches."""
+
+    @abstractmethod
+    async def update_idea(self, idea_id: int, data: IdeaIn) -> Optional[Idea]:
+        """Update the details of an existing idea."""
+
+    @abstractmethod
+    async def delete_idea(self, idea_id: int) -> bool:
+        """Remove an idea from the system."""
+
+    @abstractmethod
+    async def get_feed(
+        self, user_id: int, before: Optional[int] = None, limit: int = 20
+    ) -> list[Idea]:
+        """Get a page of ideas from users followed by the user."""
@@ -0,0 +1,54 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterable, Optional
+
+from manage_free_time.core.domain.invitations import (
+    Invitation,
+    InvitationCounts,
+    InvitationIn,
+    InvitationJob,
+)
+
+
+class IInvitationService(ABC):
+    """A class representing invitation-related operations."""
+
+    @abstractmethod
+    async def get_invitation_by_id(self, invitation_id: int) -> Invitation | None:
+        """Fetch an invitation by ID."""
+
+    @abstractmethod
+    async def get_invitations_by_user(self, user_id: int) -> Iterable[Invitation]:
+        """Fetch invitations sent by a user."""
+
+    @abstractmethod
+    def get_invitations_by_status(
+        self,
+        status: str,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Invitation]:
+        """Stream a page of invitations with a status."""
+
+    @abstractmethod
+    async def get_status_counts(
+        self, user_id: Optional[int] = None
+    ) -> InvitationCounts:
+        """Fetch the numbers of invitations per status."""
+
+    @abstractmethod
+    async def ensure_status_counts(self) -> None:
+        """Build the status counters if they have never been built."""
+
+    @abstractmethod
+    async def update_invitation_status(
+        self, invitation_id: int, status: str
+    ) -> Invitation | None:
+        """Change the status of an invitation."""
+
+    @abstractmethod
+    def send_invitations(self, data: list[InvitationIn]) -> InvitationJob:
+        """Queue invitations for delivery."""
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> InvitationJob | None:
+        """Fetch the status of a queued delivery."""
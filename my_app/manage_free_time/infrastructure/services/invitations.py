@@ -0,0 +1,136 @@
+from typing import AsyncIterator, Iterable, Optional
+from manage_free_time.core.domain.invitations import (
+    Invitation,
+    InvitationCounts,
+    InvitationIn,
+    InvitationJob,
+)
+from manage_free_time.core.repositories.iinvitations import IInvitationRepository
+from manage_free_time.infrastructure.invitation_queue import InvitationQueue
+from manage_free_time.infrastructure.services.iinvitations import IInvitationService
+
+
+class InvitationService(IInvitationService):
+    """A class implementing the invitation service."""
+
+    _repository: IInvitationRepository
+    _queue: InvitationQueue
+
+    def __init__(
+        self,
+        repository: IInvitationRepository,
+        queue: InvitationQueue,
+    ) -> None:
+        """The initializer of the `InvitationService`.
+
+        Args:
+            repository (IInvitationRepository): The reference to the repository.
+            queue (InvitationQueue): The queue dispatching invitations.
+        """
+        self._repository = repository
+        self._queue = queue
+
+    async def get_invitation_by_id(self, invitation_id: int) -> Optional[Invitation]:
+        """The method getting an invitation by ID.
+
+        Args:
+            invitation_id (int): The ID of the invitation.
+
+        Returns:
+            Optional[Invitation]: The invitation or None if not found.
+        """
+        return await self._repository.get_by_id(invitation_id)
+
+    async def get_invitations_by_user(self, user_id: int) -> Iterable[Invitation]:
+        """The method getting invitations sent by a user.
+
+        Args:
+            user_id (int): The ID of the inviting user.
+
+        Returns:
+            Iterable[Invitation]: Invitations sent by the user.
+        """
+        return await self._repository.get_by_user(user_id)
+
+    def get_invitations_by_status(
+        self,
+        status: str,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Invitation]:
+        """The method streaming a page of invitations with a status.
+
+        Args:
+            status (str): The status of the invitations.
+            after (Optional[int]): Only invitations with greater IDs are returned.
+            limit (Optional[int]): The maximal number of returned invitations.
+
+        Returns:
+            AsyncIterator[Invitation]: Invitations by ascending ID.
+        """
+        return self._repository.get_by_status(status, after, limit)
+
+    async def get_status_counts(
+        self, user_id: Optional[int] = None
+    ) -> InvitationCounts:
+        """The method getting the numbers of invitations per status.
+
+        Args:
+            user_id (Optional[int]): The ID of the inviting user, or None
+                for all invitations.
+
+        Returns:
+            InvitationCounts: The numbers of invitations.
+        """
+        statuses = await self._repository.get_status_counts(user_id)
+
+        return InvitationCounts(
+            inviter_id=user_id,
+            total=sum(statuses.values()),
+            statuses=statuses,
+        )
+
+    async def ensure_status_counts(self) -> None:
+        """The method building the status counters on their first use.
+
+        The counters are empty when the database predates them or has no
+        invitations yet, and in both cases they are recomputed once.
+        """
+        if not await self._repository.get_status_counts():
+            await self._repository.rebuild_status_counts()
+
+    async def update_invitation_status(
+        self, invitation_id: int, status: str
+    ) -> Optional[Invitation]:
+        """The method changing the status of an invitation.
+
+        Args:
+            invitation_id (int): The ID of the invitation.
+            status (str): The new status.
+
+        Returns:
+            Optional[Invitation]: The updated invitation or None if not found.
+        """
+        return await self._repository.update_invitation_status(invitation_id, status)
+
+    def send_invitations(self, data: list[InvitationIn]) -> InvitationJob:
+        """The method queueing invitations for storing and delivery.
+
+        Args:
+            data (list[InvitationIn]): The invitations to send.
+
+        Returns:
+            InvitationJob: The job tracking the delivery.
+        """
+        return self._queue.submit(data)
+
+    def get_job(self, job_id: str) -> Optional[InvitationJob]:
+        """The method getting the status of a queued delivery.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            Optional[InvitationJob]: The job or None if not found.
+        """
+        return self._queue.get_job(job_id)
@@ -1,31 +1,76 @@
-from abc import ABC, abstractmethod
-from typing import Iterable
-
-from manage_free_time.core.domain.user_profile import UserProfile, UserProfileIn
-
-
-class IUserProfileService(ABC):
-    """A class representing user profile-related operations."""
-
-    @abstractmethod
-    async def get_by_id(self, user_id: int) -> UserProfile | None:
-        """Fetch user profile by ID."""
-
-    @abstractmethod
-    async def get_by_username(self, username: str) -> UserProfile | None:
-        """Fetch user profile by username."""
-
-    @abstractmethod
-    async def get_all(self) -> Iterable[UserProfile]:
-        """Fetch all user profiles."""
-
-    async def create_profile(self, data: UserProfileIn) -> UserProfile:
-        """Create a new user profile."""
-
-    @abstractmethod
-    async def update_profile(self, user_id: int, data: UserProfileIn) -> UserProfile | None:
-        """Update a user profile."""
-
-    @abstractmethod
-    async def delete_profile(self, user_id: int) -> bool:
-        """Delete a user profile."""
+from abc import ABC, abstractmethod
+from typing import Iterable
+
+from manage_free_time.core.domain.user_profile import (
+    FollowCounts,
+    UserProfile,
+    UserProfileIn,
+)
+
+
+class IUserProfileService(ABC):
+    """A class representing user profile-related operations."""
+
+    @abstractmethod
+    async def get_profile_by_id(self, user_id: int) -> UserProfile | None:
+        """Fetch user profile by ID."""
+
+    @abstractmethod
+    async def get_profile_by_username(self, username: str) -> UserProfile | None:
+        """Fetch user profile by username."""
+
+    @abstractmethod
+    async def get_all_profiles(self) -> Iterable[UserProfile]:
+        """Fetch all user profiles."""
+
+    @abstractmethod
+    async def create_profile(self, data: UserProfileIn) -> UserProfile:
+        """Create a new user profile."""
+
+    @abstractmethod
+    async def update_profile(self, user_id: int, data: UserProfileIn) -> UserProfile | None:
+        """Update a user profile."""
+
+    @abstractmethod
+    async def delete_profile(self, user_id: int) -> bool:
+        """Delete a user profile."""
+
+    @abstractmethod
+    async def load_follow_graph(self) -> None:
+        """Build the in-process follow graph from the repository."""
+
+    @abstractmethod
+    async def follow_user(self, follower_id: int, followee_id: int) -> bool:
+        """Make a user follow another user."""
+
+    @abstractmethod
+    async def unfollow_user(self, follower_id: int, followee_id: int) -> bool:
+        """Make a user stop following another user."""
+
+    @abstractmethod
+    def is_following(
+        self, follower_id: int, followee_ids: list[int]
+    ) -> dict[int, bool]:
+        """Check which of the users are followed by a user."""
+
+    @abstractmethod
+    def get_follow_counts(self, user_id: int) -> FollowCounts:
+        """Get the numbers of followers and followed users."""
+
+    @abstractmethod
+    def get_followers(
+        self, user_id: int, after: int | None = None, limit: int | None = None
+    ) -> list[int]:
+        """Get a page of followers of a user."""
+
+    @abstractmethod
+    def get_following(
+        self, user_id: int, after: int | None = None, limit: int | None = None
+    ) -> list[int]:
+        """Get a page of users followed by a user."""
+
+    @abstractmethod
+    def get_mutual_follows(
+        self, user_id: int, after: int | None = None, limit: int | None = None
+    ) -> list[int]:
+        """Get a page of users following a user back."""
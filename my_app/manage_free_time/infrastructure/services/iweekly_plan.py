@@ -1,24 +1,59 @@
-from abc import ABC, abstractmethod
-from typing import Iterable
-
-from manage_free_time.core.domain.weekly_plan import WeeklyPlan, WeeklyPlanIn
-
-
-class IWeeklyPlanService(ABC):
-    """A class representing weekly plan-related operations."""
-
-    @abstractmethod
-    async def get_by_user(self, user_id: int) -> Iterable[WeeklyPlan]:
-        """Fetch all weekly plans for a user."""
-
-    @abstractmethod
-    async def create_weekly_plan(self, user_id: int, idea_ids: list) -> WeeklyPlan:
-        """Create a new weekly plan for the user."""
-
-    @abstractmethod
-    async def update_weekly_plan(self, plan_id: int, data: WeeklyPlanIn) -> WeeklyPlan | None:
-        """Update the details of a weekly plan."""
-
-    @abstractmethod
-    async def delete_weekly_plan(self, plan_id: int) -> bool:
-        """Delete a specific weekly plan."""
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Optional
+
+from manage_free_time.core.domain.weekly_plan import WeeklyPlan, WeeklyPlanIn
+
+
+class IWeeklyPlanService(ABC):
+    """A class representing weekly plan-related operations."""
+
+    @abstractmethod
+    async def load_plan_index(self) -> None:
+        """Build the in-process plan index from the repository."""
+
+    @abstractmethod
+    async def get_plan_by_user(self, user_id: int) -> Optional[WeeklyPlan]:
+        """Fetch the latest weekly plan of a user."""
+
+    @abstractmethod
+    async def get_plan(self, user_id: int, week_start: date) -> Optional[WeeklyPlan]:
+        """Fetch the plan of a user starting on a day."""
+
+    @abstractmethod
+    async def get_plan_covering(
+        self, user_id: int, day: date
+    ) -> Optional[WeeklyPlan]:
+        """Fetch the plan of a user covering a day."""
+
+    @abstractmethod
+    async def get_plans_in_range(
+        self, user_id: int, first: date, last: date
+    ) -> list[WeeklyPlan]:
+        """Fetch the plans of a user overlapping a date range."""
+
+    @abstractmethod
+    async def create_plan(
+        self, user_id: int, data: WeeklyPlanIn
+    ) -> WeeklyPlan | None:
+        """Create a new weekly plan for the user unless it overlaps another."""
+
+    @abstractmethod
+    async def update_plan(
+        self, user_id: int, week_start: date, data: WeeklyPlanIn
+    ) -> WeeklyPlan | None:
+        """Update the details of a user's weekly plan."""
+
+    @abstractmethod
+    async def delete_plan(self, user_id: int, week_start: date) -> bool:
+        """Delete a weekly plan of a user."""
+
+    @abstractmethod
+    async def generate_plan(
+        self, user_id: int, week_start: date
+    ) -> WeeklyPlan | None:
+        """Generate and store the weekly plan of a user."""
+
+    @abstractmethod
+    async def generate_all_plans(self, week_start: date) -> int:
+        """Generate and store the weekly plans of all users."""
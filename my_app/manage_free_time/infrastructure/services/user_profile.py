@@ -1,95 +1,225 @@
-from typing import Iterable, Optional
-from manage_free_time.core.domain.user_profile import UserProfile, UserProfileIn
-from manage_free_time.core.repositories.iuser_profile import IUserProfileRepository
-from manage_free_time.infrastructure.services.iuser_profile import IUserProfileService
-
-
-class UserProfileService(IUserProfileService):
-    """A class implementing the user profile service."""
-
-    _repository: IUserProfileRepository
-
-    def __init__(self, repository: IUserProfileRepository) -> None:
-        """The initializer of the `UserProfileService`.
-
-        Args:
-            repository (IUserProfileRepository): The reference to the repository.
-        """
-        self._repository = repository
-
-    async def create_profile(self, data: UserProfileIn) -> UserProfile:
-        """The method creating a user profile.
-
-        Args:
-            data (UserProfileIn): The details of the user profile.
-
-        Returns:
-            UserProfile: The created user profile.
-        """
-        return await self._repository.create_profile(data)
-
-    async def get_profile_by_id(self, user_id: int) -> Optional[UserProfile]:
-        """The method getting a user profile by ID.
-
-        Args:
-            user_id (int): The ID of the user.
-
-        Returns:
-            Optional[UserProfile]: The user profile or None if not found.
-        """
-        return await self._repository.get_profile_by_id(user_id)
-
-    async def update_profile(self, user_id: int, data: UserProfileIn) -> Optional[UserProfile]:
-        """The method updating a user profile.
-
-        Args:
-            user_id (int): The ID of the user profile.
-            data (UserProfileIn): The updated user profile data.
-
-        Returns:
-            Optional[UserProfile]: The updated profile or None if not found.
-        """
-        return await self._repository.update_profile(user_id=user_id, data=data)
-
-    async def delete_profile(self, user_id: int) -> bool:
-        """The method deleting a user profile.
-
-        Args:
-            user_id (int): The ID of the user profile.
-
-        Returns:
-            bool: Success of the operation.
-        """
-        return await self._repository.delete_profile(user_id)
-
-    async def get_all_profiles(self) -> Iterable[UserProfile]:
-        """The method retrieving all user profiles.
-
-        Returns:
-            Iterable[UserProfile]: Collection of all user profiles.
-        """
-        return await self._repository.get_all_profiles()
-
-    async def follow_user(self, follower_id: int, followee_id: int) -> bool:
-        """The method allowing a user to follow another user.
-
-        Args:
-            follower_id (int): The ID of the follower.
-            followee_id (int): The ID of the user to follow.
-
-        Returns:
-            bool: Success of the operation.
-        """
-        return await self._repository.follow_user(follower_id, followee_id)
-
-    async def unfollow_user(self, follower_id: int, followee_id: int) -> bool:
-        """The method allowing a user to unfollow another user.
-
-        Args:
-            follower_id (int): The ID of the follower.
-            followee_id (int): The ID of the user to unfollow.
-
-        Returns:
-            bool: Success of the operation.
-        """
-        return await self._repository.unfollow_user(follower_id, followee_id)
+from typing import Iterable, Optional
+from manage_free_time.core.domain.user_profile import (
+    FollowCounts,
+    UserProfile,
+    UserProfileIn,
+)
+from manage_free_time.core.repositories.iuser_profile import IUserProfileRepository
+from manage_free_time.infrastructure.indexes.feed import FeedStore
+from manage_free_time.infrastructure.indexes.follows import FollowGraph
+from manage_free_time.infrastructure.services.iuser_profile import IUserProfileService
+from manage_free_time.infrastructure.single_flight import single_flight
+
+
+class UserProfileService(IUserProfileService):
+    """A class implementing the user profile service."""
+
+    _repository: IUserProfileRepository
+    _follow_graph: FollowGraph
+    _feed: FeedStore
+
+    def __init__(
+        self,
+        repository: IUserProfileRepository,
+        follow_graph: FollowGraph,
+        feed: FeedStore,
+    ) -> None:
+        """The initializer of the `UserProfileService`.
+
+        Args:
+            repository (IUserProfileRepository): The reference to the repository.
+            follow_graph (FollowGraph): The in-process follow graph.
+            feed (FeedStore): The home feed timelines.
+        """
+        self._repository = repository
+        self._follow_graph = follow_graph
+        self._feed = feed
+
+    async def load_follow_graph(self) -> None:
+        """The method building the in-process follow graph from the repository."""
+        edges = [edge async for edge in self._repository.iter_follows()]
+        self._follow_graph.load(edges)
+
+    async def create_profile(self, data: UserProfileIn) -> UserProfile:
+        """The method creating a user profile.
+
+        Args:
+            data (UserProfileIn): The details of the user profile.
+
+        Returns:
+            UserProfile: The created user profile.
+        """
+        return await self._repository.add_user_profile(data)
+
+    @single_flight
+    async def get_profile_by_id(self, user_id: int) -> Optional[UserProfile]:
+        """The method getting a user profile by ID.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Optional[UserProfile]: The user profile or None if not found.
+        """
+        return await self._repository.get_by_id(user_id)
+
+    @single_flight
+    async def get_profile_by_username(self, username: str) -> Optional[UserProfile]:
+        """The method getting a user profile by username.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            Optional[UserProfile]: The user profile or None if not found.
+        """
+        return await self._repository.get_by_username(username)
+
+    async def update_profile(self, user_id: int, data: UserProfileIn) -> Optional[UserProfile]:
+        """The method updating a user profile.
+
+        Args:
+            user_id (int): The ID of the user profile.
+            data (UserProfileIn): The updated user profile data.
+
+        Returns:
+            Optional[UserProfile]: The updated profile or None if not found.
+        """
+        return await self._repository.update_user_profile(user_id=user_id, data=data)
+
+    async def delete_profile(self, user_id: int) -> bool:
+        """The method deleting a user profile.
+
+        Args:
+            user_id (int): The ID of the user profile.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        deleted = await self._repository.delete_user_profile(user_id)
+        if deleted:
+            self._follow_graph.remove_user(user_id)
+            self._feed.remove_user(user_id)
+
+        return deleted
+
+    @single_flight
+    async def get_all_profiles(self) -> Iterable[UserProfile]:
+        """The method retrieving all user profiles.
+
+        Returns:
+            Iterable[UserProfile]: Collection of all user profiles.
+        """
+        return await self._repository.get_all_profiles()
+
+    async def follow_user(self, follower_id: int, followee_id: int) -> bool:
+        """The method allowing a user to follow another user.
+
+        Args:
+            follower_id (int): The ID of the follower.
+            followee_id (int): The ID of the user to follow.
+
+        Returns:
+            bool: Whether the user was followed, False when either user
+                does not exist or the users are the same.
+        """
+        if follower_id == followee_id:
+            return False
+        for user_id in (follower_id, followee_id):
+            if not await self._repository.get_by_id(user_id):
+                return False
+
+        await self._repository.follow_user(follower_id, followee_id)
+        if self._follow_graph.add(follower_id, followee_id):
+            self._feed.follow(follower_id, followee_id)
+
+        return True
+
+    async def unfollow_user(self, follower_id: int, followee_id: int) -> bool:
+        """The method allowing a user to unfollow another user.
+
+        Args:
+            follower_id (int): The ID of the follower.
+            followee_id (int): The ID of the user to unfollow.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        unfollowed = await self._repository.unfollow_user(follower_id, followee_id)
+        if self._follow_graph.remove(follower_id, followee_id):
+            self._feed.unfollow(follower_id, followee_id)
+
+        return unfollowed
+
+    def is_following(
+        self, follower_id: int, followee_ids: list[int]
+    ) -> dict[int, bool]:
+        """The method checking which of the users are followed by a user.
+
+        Args:
+            follower_id (int): The ID of the follower.
+            followee_ids (list[int]): The IDs of the checked users.
+
+        Returns:
+            dict[int, bool]: Whether each of the users is followed.
+        """
+        return self._follow_graph.is_following_many(follower_id, followee_ids)
+
+    def get_follow_counts(self, user_id: int) -> FollowCounts:
+        """The method getting the numbers of followers and followed users.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            FollowCounts: The numbers of followers and followed users.
+        """
+        return FollowCounts(
+            followers=self._follow_graph.follower_count(user_id),
+            following=self._follow_graph.following_count(user_id),
+        )
+
+    def get_followers(
+        self, user_id: int, after: int | None = None, limit: int | None = None
+    ) -> list[int]:
+        """The method getting a page of followers of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            after (int | None): Only IDs greater than this one are returned.
+            limit (int | None): The maximal number of returned IDs.
+
+        Returns:
+            list[int]: Ascending IDs of the followers.
+        """
+        return self._follow_graph.followers(user_id, after, limit)
+
+    def get_following(
+        self, user_id: int, after: int | None = None, limit: int | None = None
+    ) -> list[int]:
+        """The method getting a page of users followed by a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            after (int | None): Only IDs greater than this one are returned.
+            limit (int | None): The maximal number of returned IDs.
+
+        Returns:
+            list[int]: Ascending IDs of the followed users.
+        """
+        return self._follow_graph.following(user_id, after, limit)
+
+    def get_mutual_follows(
+        self, user_id: int, after: int | None = None, limit: int | None = None
+    ) -> list[int]:
+        """The method getting a page of users following a user back.
+
+        Args:
+            user_id (int): The ID of the user.
+            after (int | None): Only IDs greater than this one are returned.
+            limit (int | None): The maximal number of returned IDs.
+
+        Returns:
+            list[int]: Ascending IDs of the mutually following users.
+        """
+        return self._follow_graph.mutual(user_id, after, limit)
@@ -1,63 +1,311 @@
-from typing import Iterable, Optional
-from manage_free_time.core.domain.weekly_plan import WeeklyPlan, WeeklyPlanIn
-from manage_free_time.core.repositories.iweekly_plan import IWeeklyPlanRepository
-from manage_free_time.infrastructure.services.iweekly_plan import IWeeklyPlanService
-
-
-class WeeklyPlanService(IWeeklyPlanService):
-    """A class implementing the weekly plan service."""
-
-    _repository: IWeeklyPlanRepository
-
-    def __init__(self, repository: IWeeklyPlanRepository) -> None:
-        """The initializer of the `WeeklyPlanService`.
-
-        Args:
-            repository (IWeeklyPlanRepository): The reference to the repository.
-        """
-        self._repository = repository
-
-    async def create_plan(self, data: WeeklyPlanIn) -> WeeklyPlan:
-        """The method creating a weekly plan.
-
-        Args:
-            data (WeeklyPlanIn): Details of the new weekly plan.
-
-        Returns:
-            WeeklyPlan: The created weekly plan.
-        """
-        return await self._repository.create_plan(data)
-
-    async def get_plan_by_user(self, user_id: int) -> Optional[WeeklyPlan]:
-        """The method getting a weekly plan for a specific user.
-
-        Args:
-            user_id (int): The ID of the user.
-
-        Returns:
-            Optional[WeeklyPlan]: The user's weekly plan.
-        """
-        return await self._repository.get_plan_by_user(user_id)
-
-    async def update_plan(self, plan_id: int, data: WeeklyPlanIn) -> Optional[WeeklyPlan]:
-        """The method updating a weekly plan.
-
-        Args:
-            plan_id (int): The ID of the weekly plan to update.
-            data (WeeklyPlanIn): The updated plan data.
-
-        Returns:
-            Optional[WeeklyPlan]: The updated plan or None if not found.
-        """
-        return await self._repository.update_plan(plan_id=plan_id, data=data)
-
-    async def delete_plan(self, plan_id: int) -> bool:
-        """The method deleting a weekly plan.
-
-        Args:
-            plan_id (int): The ID of the weekly plan to delete.
-
-        Returns:
-            bool: Success of the operation.
-        """
-        return await self._repository.delete_plan(plan_id)
+from datetime import date, timedelta
+from typing import Optional
+from manage_free_time.core.domain.weekly_plan import WeeklyPlan, WeeklyPlanIn
+from manage_free_time.core.repositories.iidea import IIdeaRepository
+from manage_free_time.core.repositories.iuser_profile import IUserProfileRepository
+from manage_free_time.core.repositories.iweekly_plan import IWeeklyPlanRepository
+from manage_free_time.infrastructure.config import config
+from manage_free_time.infrastructure.indexes.plans import PlanIntervalIndex
+from manage_free_time.infrastructure.planning import PlanGenerator
+from manage_free_time.infrastructure.services.iweekly_plan import IWeeklyPlanService
+from manage_free_time.infrastructure.single_flight import single_flight
+
+
+class WeeklyPlanService(IWeeklyPlanService):
+    """A class implementing the weekly plan service."""
+
+    _repository: IWeeklyPlanRepository
+    _idea_repository: IIdeaRepository
+    _user_profile_repository: IUserProfileRepository
+    _generator: PlanGenerator
+    _plan_index: PlanIntervalIndex
+
+    def __init__(
+        self,
+        repository: IWeeklyPlanRepository,
+        idea_repository: IIdeaRepository,
+        user_profile_repository: IUserProfileRepository,
+        generator: PlanGenerator,
+        plan_index: PlanIntervalIndex,
+    ) -> None:
+        """The initializer of the `WeeklyPlanService`.
+
+        Args:
+            repository (IWeeklyPlanRepository): The reference to the repository.
+            idea_repository (IIdeaRepository): The reference to the idea
+                repository providing the catalogue.
+            user_profile_repository (IUserProfileRepository): The reference
+                to the user profile repository.
+            generator (PlanGenerator): The shared plan generator.
+            plan_index (PlanIntervalIndex): The in-process index of the
+                date ranges of plans.
+        """
+        self._repository = repository
+        self._idea_repository = idea_repository
+        self._user_profile_repository = user_profile_repository
+        self._generator = generator
+        self._plan_index = plan_index
+
+    async def load_plan_index(self) -> None:
+        """The method building the in-process plan index from the repository."""
+        weeks = [week async for week in self._repository.iter_plan_weeks()]
+        self._plan_index.load(weeks)
+
+    async def create_plan(
+        self, user_id: int, data: WeeklyPlanIn
+    ) -> Optional[WeeklyPlan]:
+        """The method creating a weekly plan.
+
+        Args:
+            user_id (int): The ID of the user.
+            data (WeeklyPlanIn): Details of the new weekly plan.
+
+        Returns:
+            Optional[WeeklyPlan]: The created weekly plan, or None when it
+                overlaps another plan of the user.
+        """
+        if self._plan_index.overlapping(
+            user_id, data.week_start_date, data.week_end_date
+        ):
+            return None
+
+        self._plan_index.add(user_id, data.week_start_date, data.week_end_date)
+        try:
+            return await self._repository.create_weekly_plan(user_id, data)
+        except BaseException:
+            self._plan_index.remove(user_id, data.week_start_date)
+            raise
+
+    @single_flight
+    async def get_plan_by_user(self, user_id: int) -> Optional[WeeklyPlan]:
+        """The method getting the latest weekly plan of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Optional[WeeklyPlan]: The user's latest weekly plan.
+        """
+        return await self._repository.get_plan_by_user(user_id)
+
+    @single_flight
+    async def get_plan(self, user_id: int, week_start: date) -> Optional[WeeklyPlan]:
+        """The method getting the plan of a user starting on a day.
+
+        Args:
+            user_id (int): The ID of the user.
+            week_start (date): The first day of the plan.
+
+        Returns:
+            Optional[WeeklyPlan]: The plan or None if not found.
+        """
+        return await self._repository.get_plan(user_id, week_start)
+
+    @single_flight
+    async def get_plan_covering(
+        self, user_id: int, day: date
+    ) -> Optional[WeeklyPlan]:
+        """The method getting the plan of a user covering a day.
+
+        Args:
+            user_id (int): The ID of the user.
+            day (date): The day.
+
+        Returns:
+            Optional[WeeklyPlan]: The plan or None if the day is not planned.
+        """
+        week_start = self._plan_index.covering(user_id, day)
+        if week_start is None:
+            return None
+
+        return await self._repository.get_plan(user_id, week_start)
+
+    @single_flight
+    async def get_plans_in_range(
+        self, user_id: int, first: date, last: date
+    ) -> list[WeeklyPlan]:
+        """The method getting the plans of a user sharing a day with a range.
+
+        Args:
+            user_id (int): The ID of the user.
+            first (date): The first day of the range.
+            last (date): The last day of the range.
+
+        Returns:
+            list[WeeklyPlan]: The plans in ascending order of weeks.
+        """
+        week_starts = self._plan_index.overlapping(user_id, first, last)
+
+        return list(await self._repository.get_plans(user_id, week_starts))
+
+    async def update_plan(
+        self, user_id: int, week_start: date, data: WeeklyPlanIn
+    ) -> Optional[WeeklyPlan]:
+        """The method updating a weekly plan.
+
+        Args:
+            user_id (int): The ID of the user whose plan is updated.
+            week_start (date): The current first day of the plan.
+            data (WeeklyPlanIn): The updated plan data.
+
+        Returns:
+            Optional[WeeklyPlan]: The updated plan, or None if not found or
+                if the new dates overlap another plan of the user.
+        """
+        if not await self._repository.get_plan(user_id, week_start):
+            return None
+        if any(
+            other != week_start
+            for other in self._plan_index.overlapping(
+                user_id, data.week_start_date, data.week_end_date
+            )
+        ):
+            return None
+
+        plan = await self._repository.update_weekly_plan(
+            user_id=user_id, week_start=week_start, data=data
+        )
+        if plan:
+            self._plan_index.remove(user_id, week_start)
+            self._plan_index.add(user_id, plan.week_start_date, plan.week_end_date)
+
+        return plan
+
+    async def delete_plan(self, user_id: int, week_start: date) -> bool:
+        """The method deleting a weekly plan.
+
+        Args:
+            user_id (int): The ID of the user whose plan is deleted.
+            week_start (date): The first day of the plan.
+
+        Returns:
+            bool: Success of the operation.
+        """
+        deleted = await self._repository.delete_weekly_plan(user_id, week_start)
+        if deleted:
+            self._plan_index.remove(user_id, week_start)
+
+        return deleted
+
+    async def generate_plan(
+        self, user_id: int, week_start: date
+    ) -> Optional[WeeklyPlan]:
+        """The method generating and storing the weekly plan of a user.
+
+        A plan for the same week is replaced and the ideas of the user's
+        previous plan are not repeated.
+
+        Args:
+            user_id (int): The ID of the user.
+            week_start (date): The first day of the planned week.
+
+        Returns:
+            Optional[WeeklyPlan]: The generated weekly plan, or None when
+                the week overlaps another plan of the user.
+        """
+        if not self._is_free(user_id, week_start):
+            return None
+        if self._generator.is_stale(config.PLAN_FEATURES_MAX_AGE):
+            self._generator.load(await self._idea_repository.get_all_ideas())
+
+        previous_start = self._plan_index.previous(user_id, week_start)
+        previous = (
+            await self._repository.get_plan(user_id, previous_start)
+            if previous_start
+            else None
+        )
+        plan = self._plans(
+            [user_id],
+            [previous.ideas_ids if previous else []],
+            week_start,
+        )[0]
+        await self._repository.save_weekly_plans([plan])
+        self._plan_index.add(user_id, plan.week_start_date, plan.week_end_date)
+
+        return plan
+
+    async def generate_all_plans(self, week_start: date) -> int:
+        """The method generating and storing the weekly plans of all users.
+
+        The catalogue is reloaded first, so the plans see every idea.
+        Users with another plan overlapping the week are skipped.
+
+        Args:
+            week_start (date): The first day of the planned week.
+
+        Returns:
+            int: The number of generated plans.
+        """
+        self._generator.load(await self._idea_repository.get_all_ideas())
+
+        user_ids = [
+            profile.id
+            for profile in await self._user_profile_repository.get_all_profiles()
+            if self._is_free(profile.id, week_start)
+        ]
+        previous = {
+            plan.user_id: plan.ideas_ids
+            for plan in await self._repository.get_latest_plans(week_start)
+        }
+        plans = self._plans(
+            user_ids,
+            [previous.get(user_id, []) for user_id in user_ids],
+            week_start,
+        )
+        await self._repository.save_weekly_plans(plans)
+        for plan in plans:
+            self._plan_index.add(plan.user_id, plan.week_start_date, plan.week_end_date)
+
+        return len(plans)
+
+    def _is_free(self, user_id: int, week_start: date) -> bool:
+        """Check whether a generated plan for the week would fit in.
+
+        Args:
+            user_id (int): The ID of the user.
+            week_start (date): The first day of the planned week.
+
+        Returns:
+            bool: Whether no plan of the user overlaps the week, apart
+                from a plan for the same week which is replaced.
+        """
+        week_end = week_start + timedelta(days=6)
+
+        return all(
+            other == week_start
+            for other in self._plan_index.overlapping(user_id, week_start, week_end)
+        )
+
+    def _plans(
+        self,
+        user_ids: list[int],
+        previous: list[list[int]],
+        week_start: date,
+    ) -> list[WeeklyPlan]:
+        """Generate the plans of the users for the week.
+
+        Args:
+            user_ids (list[int]): The IDs of the users.
+            previous (list[list[int]]): Ideas of the users' previous plans.
+            week_start (date): The first day of the planned week.
+
+        Returns:
+            list[WeeklyPlan]: The generated plans.
+        """
+        week_end = week_start + timedelta(days=6)
+        ideas_ids = self._generator.generate(
+            user_ids,
+            previous,
+            config.PLAN_SIZE,
+            seed=week_start.toordinal(),
+        )
+
+        return [
+            WeeklyPlan(
+                user_id=user_id,
+                week_start_date=week_start,
+                week_end_date=week_end,
+                ideas_ids=ids,
+            )
+            for user_id, ids in zip(user_ids, ideas_ids)
+        ]
@@ -0,0 +1,201 @@
+"""Module containing the coalescing of concurrent identical calls."""
+
+import asyncio
+from functools import wraps
+from typing import Any, Callable, Coroutine, Hashable, Optional, TypeVar
+
+from manage_free_time.infrastructure.config import config
+from manage_free_time.infrastructure.metrics import single_flight_calls
+
+T = TypeVar("T")
+
+
+class Flight:
+    """A class holding the outcome of a call in flight for its followers."""
+
+    done: Optional[asyncio.Future]
+    result: Any
+    error: Optional[BaseException]
+    abandoned: bool
+
+    def __init__(self) -> None:
+        """The initializer of the `Flight`."""
+        self.done = None
+        self.result = None
+        self.error = None
+        self.abandoned = False
+
+    def wait(self) -> asyncio.Future:
+        """The method getting the future resolved when the call finishes.
+
+        Returns:
+            asyncio.Future: The future, created for the first follower.
+        """
+        if self.done is None:
+            self.done = asyncio.get_running_loop().create_future()
+
+        return self.done
+
+
+class SingleFlight:
+    """A class running at most one call per key at a time.
+
+    The first caller of a key, the leader, runs the call itself and every
+    caller arriving before it finishes waits for its outcome, so all of
+    them get the same result or exception. A follower waits through
+    `asyncio.shield`, hence cancelling it leaves the call running. When
+    the leader is cancelled the followers do not inherit the cancellation:
+    they start over and one of them leads the call again. An uncontended
+    call costs a dictionary insert and no task; a finished call is
+    forgotten at once, results are never cached.
+    """
+
+    _flights: dict[Hashable, Flight]
+    _leaders: Any
+    _coalesced: Any
+
+    def __init__(self, component: str, method: str) -> None:
+        """The initializer of the `SingleFlight`.
+
+        Args:
+            component (str): The name of the class of the method, used
+                as a metric label.
+            method (str): The name of the method, used as a metric label.
+        """
+        self._flights = {}
+        self._leaders = single_flight_calls.labels(component, method, "leader")
+        self._coalesced = single_flight_calls.labels(component, method, "coalesced")
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def run(
+        self, key: Hashable, call: Callable[[], Coroutine[Any, Any, T]]
+    ) -> T:
+        """The method running a call unless one with the key is in flight.
+
+        Args:
+            key (Hashable): The key of the call.
+            call (Callable[[], Coroutine[Any, Any, T]]): The function
+                starting the call.
+
+        Returns:
+            T: The result of the call.
+        """
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                return await self._lead(key, call)
+
+            self._coalesced.inc()
+            await asyncio.shield(flight.wait())
+            if flight.error is not None:
+                raise flight.error
+            if not flight.abandoned:
+                return flight.result
+
+    async def _lead(
+        self, key: Hashable, call: Callable[[], Coroutine[Any, Any, T]]
+    ) -> T:
+        """Run a call and hand its outcome to the followers.
+
+        Args:
+            key (Hashable): The key of the call.
+            call (Callable[[], Coroutine[Any, Any, T]]): The function
+                starting the call.
+
+        Returns:
+            T: The result of the call.
+        """
+        flight = self._flights[key] = Flight()
+        self._leaders.inc()
+        try:
+            flight.result = await call()
+            return flight.result
+        except asyncio.CancelledError:
+            flight.abandoned = True
+            raise
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            del self._flights[key]
+            if flight.done is not None:
+                flight.done.set_result(None)
+
+
+def single_flight(
+    function: Callable[..., Coroutine[Any, Any, T]]
+) -> Callable[..., Coroutine[Any, Any, T]]:
+    """Coalesce concurrent calls of a coroutine method with equal arguments.
+
+    Calls are keyed on the arguments without `self`: services are created
+    per request from the same dependencies, so the calls of all instances
+    of a class share the flights. Lists and sets in the arguments are
+    compared by their items; calls with other unhashable arguments are not
+    coalesced. The same arguments passed once by position and once by
+    keyword give different keys. When `SINGLE_FLIGHT_ENABLED` is off the
+    method is returned unchanged.
+
+    Args:
+        function (Callable[..., Coroutine[Any, Any, T]]): The read-only
+            coroutine method.
+
+    Returns:
+        Callable[..., Coroutine[Any, Any, T]]: The wrapper.
+    """
+    if not config.SINGLE_FLIGHT_ENABLED:
+        return function
+
+    component, _, method = function.__qualname__.rpartition(".")
+    flights = SingleFlight(component, method)
+
+    @wraps(function)
+    async def coalesced(self: Any, *args: Any, **kwargs: Any) -> T:
+        key = _freeze(args, kwargs)
+        if key is None:
+            return await function(self, *args, **kwargs)
+
+        return await flights.run(key, lambda: function(self, *args, **kwargs))
+
+    coalesced.flights = flights  # type: ignore[attr-defined]
+    return coalesced
+
+
+def _freeze(args: tuple, kwargs: dict[str, Any]) -> Optional[Hashable]:
+    """Build the key of a call from its arguments.
+
+    Args:
+        args (tuple): The positional arguments.
+        kwargs (dict[str, Any]): The keyword arguments.
+
+    Returns:
+        Optional[Hashable]: The key or None if an argument is unhashable.
+    """
+    key = (
+        tuple(_hashable(value) for value in args),
+        tuple(sorted((name, _hashable(value)) for name, value in kwargs.items())),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+def _hashable(value: Any) -> Any:
+    """Replace a list or a set with an equal tuple or frozen set.
+
+    Args:
+        value (Any): The argument.
+
+    Returns:
+        Any: The argument to hash.
+    """
+    if isinstance(value, list):
+        return (list, *value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+
+    return value
@@ -0,0 +1,558 @@
+"""Module containing memory-mapped snapshots of the idea catalogue.
+
+A snapshot is a binary file with every idea of the catalogue stored
+column by column, like in `ColumnarIdeaRepository`:
+
+- a header with the format, the byte order, the change version the
+  snapshot was taken at and the number of ideas,
+- a table of `(offset, length)` of every section,
+- the sections, each aligned to 8 bytes: ids and user ids as int64,
+  category codes as uint32, UTF-8 titles with int64 end offsets, tag
+  codes as uint32 with int64 end offsets per idea, and the names of the
+  categories and the tags with their end offsets.
+
+Workers map the file read-only, so all workers of a host share the pages
+of the page cache, and feed the indexes with rows read in place from the
+columns through memoryviews, without building `Idea` models. Only the
+worker holding the lock file next to the snapshot writes it; the file is
+replaced atomically, a worker still reading the previous one keeps its
+mapping.
+"""
+
+import asyncio
+import heapq
+import logging
+import mmap
+import os
+import struct
+from array import array
+from operator import attrgetter, itemgetter
+from pathlib import Path
+from typing import Any, Callable, Collection, Iterable, Iterator, Optional
+
+from manage_free_time.core.domain.idea import Idea
+from manage_free_time.core.repositories.iidea import IIdeaRepository
+from manage_free_time.infrastructure.repositories.iidea_changes import \
+    IIdeaChangeRepository
+from manage_free_time.infrastructure.locks import ProcessLock
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MFTIDEAS"
+FORMAT_VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+ALIGNMENT = 8
+REPLAY_BATCH_SIZE = 10_000
+
+SECTIONS = (
+    ("ids", "q"),
+    ("user_ids", "q"),
+    ("categories", "I"),
+    ("title_ends", "q"),
+    ("titles", "B"),
+    ("tag_ends", "q"),
+    ("tags", "I"),
+    ("category_name_ends", "q"),
+    ("category_names", "B"),
+    ("tag_name_ends", "q"),
+    ("tag_names", "B"),
+)
+
+_HEADER = struct.Struct("=8sIIqq")
+_SECTION = struct.Struct("=qq")
+
+
+def write_snapshot(path: Path, ideas: Iterable[Idea], version: int) -> int:
+    """Write a snapshot of ideas and atomically replace the previous one.
+
+    Args:
+        path (Path): The path of the snapshot.
+        ideas (Iterable[Idea]): All ideas, in ascending order of ids.
+        version (int): The change version taken before reading the ideas.
+
+    Returns:
+        int: The number of written ideas.
+    """
+    columns = {name: array(typecode) for name, typecode in SECTIONS}
+    category_codes: dict[str, int] = {}
+    tag_codes: dict[str, int] = {}
+    titles = bytearray()
+    for idea in ideas:
+        columns["ids"].append(idea.id)
+        columns["user_ids"].append(idea.user_id)
+        columns["categories"].append(_code(category_codes, idea.category))
+        titles += idea.title.encode()
+        columns["title_ends"].append(len(titles))
+        columns["tags"].extend(_code(tag_codes, tag) for tag in idea.tags)
+        columns["tag_ends"].append(len(columns["tags"]))
+
+    buffers: dict[str, bytes | bytearray | array] = {**columns, "titles": titles}
+    for name, codes in (("category_names", category_codes), ("tag_names", tag_codes)):
+        names = bytearray()
+        ends = columns[f"{name[:-1]}_ends"]
+        for text in codes:
+            names += text.encode()
+            ends.append(len(names))
+        buffers[name] = names
+
+    offset = _align(_HEADER.size + _SECTION.size * len(SECTIONS))
+    table = []
+    for name, _ in SECTIONS:
+        length = memoryview(buffers[name]).nbytes
+        table.append((offset, length))
+        offset = _align(offset + length)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}")
+    with open(temporary, "wb") as file:
+        file.write(_HEADER.pack(
+            MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK, version, len(columns["ids"])
+        ))
+        for entry in table:
+            file.write(_SECTION.pack(*entry))
+        for (name, _), (start, _) in zip(SECTIONS, table):
+            file.write(bytes(start - file.tell()))
+            file.write(memoryview(buffers[name]))
+    os.replace(temporary, path)
+
+    return len(columns["ids"])
+
+
+class IdeaSnapshot:
+    """A class reading the ideas of a snapshot mapped into memory.
+
+    The columns are memoryviews of the mapping, so nothing is copied until
+    a row is read; only the names of categories and tags are decoded up
+    front. Rows hold just the requested fields of an idea, named like the
+    attributes of `Idea`. The mapping is closed once the snapshot and all
+    iterators of it are garbage collected.
+    """
+
+    version: int
+    _map: mmap.mmap
+    _columns: dict[str, memoryview]
+    _category_names: list[str]
+    _tag_names: list[str]
+
+    def __init__(self, path: Path) -> None:
+        """The initializer of the `IdeaSnapshot`.
+
+        Args:
+            path (Path): The path of the snapshot.
+
+        Raises:
+            ValueError: If the file is not a complete snapshot of this
+                format written on a machine with the same byte order.
+        """
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < _HEADER.size + _SECTION.size * len(SECTIONS):
+            raise ValueError("the snapshot is truncated")
+        magic, format_version, mark, self.version, count = _HEADER.unpack_from(
+            self._map
+        )
+        if (magic, format_version, mark) != (MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK):
+            raise ValueError("the snapshot has an unknown format")
+
+        view = memoryview(self._map)
+        self._columns = {}
+        for position, (name, typecode) in enumerate(SECTIONS):
+            offset, length = _SECTION.unpack_from(
+                self._map, _HEADER.size + _SECTION.size * position
+            )
+            if offset + length > len(self._map):
+                raise ValueError("the snapshot is truncated")
+            self._columns[name] = view[offset:offset + length].cast(typecode)
+
+        if len(self._columns["ids"]) != count:
+            raise ValueError("the snapshot is inconsistent")
+        self._category_names = self._names("category_names")
+        self._tag_names = self._names("tag_names")
+
+    def __len__(self) -> int:
+        return len(self._columns["ids"])
+
+    def __iter__(self) -> Iterator[Idea]:
+        return self.ideas()
+
+    def ids(self) -> memoryview:
+        """The method getting the ascending ids of the ideas.
+
+        Returns:
+            memoryview: The ids, read in place from the mapping.
+        """
+        return self._columns["ids"]
+
+    def rows(self, *fields: str, skip: Collection[int] = ()) -> Iterator[tuple]:
+        """The method iterating chosen fields of the ideas by ascending ids.
+
+        Args:
+            *fields (str): The names of the fields after the id: "user_id",
+                "title", "category" or "tags".
+            skip (Collection[int]): Ids of ideas to leave out.
+
+        Returns:
+            Iterator[tuple]: The id and the fields of every idea, the tags
+                as a tuple.
+        """
+        rows = zip(self._columns["ids"], *map(self._column, fields))
+        if not skip:
+            return rows
+
+        return (row for row in rows if row[0] not in skip)
+
+    def ideas(self, skip: Collection[int] = ()) -> Iterator[Idea]:
+        """The method iterating the ideas in ascending order of ids.
+
+        The models are built without validating them again, like
+        `ColumnarIdeaRepository` does.
+
+        Args:
+            skip (Collection[int]): Ids of ideas not to build.
+
+        Yields:
+            Idea: The ideas.
+        """
+        construct = Idea.model_construct
+        rows = self.rows("user_id", "title", "category", "tags", skip=skip)
+        for idea_id, user_id, title, category, tags in rows:
+            yield construct(
+                id=idea_id,
+                user_id=user_id,
+                title=title,
+                category=category,
+                tags=list(tags),
+            )
+
+    def _column(self, field: str) -> Iterator[Any]:
+        """Iterate the values of a field of every idea.
+
+        Args:
+            field (str): The name of the field.
+
+        Returns:
+            Iterator[Any]: The values in the order of the ideas.
+
+        Raises:
+            ValueError: If the snapshot does not store the field.
+        """
+        columns = self._columns
+        if field == "user_id":
+            return iter(columns["user_ids"])
+        if field == "category":
+            return map(self._category_names.__getitem__, columns["categories"])
+        if field == "title":
+            return self._slices("titles", _decode)
+        if field == "tags":
+            names = self._tag_names.__getitem__
+            return self._slices("tags", lambda codes: tuple(map(names, codes)))
+
+        raise ValueError(f"the snapshot does not store {field!r}")
+
+    def _slices(
+        self, section: str, decode: Callable[[memoryview], Any]
+    ) -> Iterator[Any]:
+        """Iterate the decoded values stored back to back in a section.
+
+        Args:
+            section (str): The section of the values, with their end
+                offsets in the section named like it with "_ends".
+            decode (Callable[[memoryview], Any]): The function decoding
+                one value.
+
+        Yields:
+            Any: The decoded values in the order they are stored.
+        """
+        values = self._columns[section]
+        start = 0
+        for end in self._columns[f"{section[:-1]}_ends"]:
+            yield decode(values[start:end])
+            start = end
+
+    def _names(self, section: str) -> list[str]:
+        """Decode the names stored in a section.
+
+        Args:
+            section (str): The section of the names.
+
+        Returns:
+            list[str]: The names in the order of their codes.
+        """
+        return list(self._slices(section, _decode))
+
+
+class ReplayedSnapshot:
+    """A class iterating a snapshot with the ideas changed since applied.
+
+    Ideas changed since the snapshot are skipped in it and the current
+    versions of those still existing are merged in, so the iteration
+    stays in ascending order of ids and can be repeated.
+    """
+
+    snapshot: IdeaSnapshot
+    changed: dict[int, Optional[Idea]]
+
+    def __init__(
+        self, snapshot: IdeaSnapshot, changed: dict[int, Optional[Idea]]
+    ) -> None:
+        """The initializer of the `ReplayedSnapshot`.
+
+        Args:
+            snapshot (IdeaSnapshot): The snapshot.
+            changed (dict[int, Optional[Idea]]): The current version of
+                every changed idea, None for removed ones.
+        """
+        self.snapshot = snapshot
+        self.changed = changed
+
+    def __iter__(self) -> Iterator[Idea]:
+        return heapq.merge(
+            self.snapshot.ideas(skip=self.changed),
+            sorted(self._current(), key=attrgetter("id")),
+            key=attrgetter("id"),
+        )
+
+    def rows(self, *fields: str) -> Iterator[tuple]:
+        """The method iterating chosen fields of the current ideas.
+
+        Args:
+            *fields (str): The names of the fields after the id, like in
+                `IdeaSnapshot.rows`.
+
+        Returns:
+            Iterator[tuple]: The id and the fields of every idea, in
+                ascending order of ids.
+        """
+        rows = self.snapshot.rows(*fields, skip=self.changed)
+        current = sorted(
+            (idea.id, *(_row_value(idea, field) for field in fields))
+            for idea in self._current()
+        )
+        if not current:
+            return rows
+
+        return heapq.merge(rows, current, key=itemgetter(0))
+
+    def _current(self) -> Iterator[Idea]:
+        """Iterate the current versions of the changed ideas still existing.
+
+        Returns:
+            Iterator[Idea]: The changed ideas.
+        """
+        return (idea for idea in self.changed.values() if idea is not None)
+
+
+class IdeaSnapshots:
+    """A class loading the idea catalogue from a snapshot and its changes.
+
+    When the snapshot can be read and the changes since its version are
+    still kept, only the changed ideas are fetched from the repository and
+    the indexes are fed straight from the mapping. The snapshot has a
+    single writer: the worker holding the lock file next to it writes it
+    when it is missing or once `max_changes` ideas changed since, and with
+    `prune` then forgets the changes it covers. A started refresher of
+    that worker repeats the check every `interval` seconds, and takes the
+    lock over when its holder exits, so the change log stays bounded
+    while the workers keep running. The other workers only read.
+    """
+
+    _repository: IIdeaRepository
+    _changes: IIdeaChangeRepository
+    _path: Path
+    _lock: ProcessLock
+    _max_changes: int
+    _prune: bool
+    _interval: float
+    _refresher: Optional[asyncio.Task]
+
+    def __init__(
+        self,
+        repository: IIdeaRepository,
+        changes: IIdeaChangeRepository,
+        path: str,
+        max_changes: int = 10_000,
+        prune: bool = True,
+        interval: float = 600.0,
+    ) -> None:
+        """The initializer of the `IdeaSnapshots`.
+
+        Args:
+            repository (IIdeaRepository): The reference to the repository.
+            changes (IIdeaChangeRepository): The log of changed ideas.
+            path (str): The path of the snapshot file.
+            max_changes (int): The number of changed ideas since the
+                snapshot after which it is written again.
+            prune (bool): Whether to forget changes older than a newly
+                written snapshot.
+            interval (float): Seconds between checks of a started refresher.
+        """
+        self._repository = repository
+        self._changes = changes
+        self._path = Path(path)
+        self._lock = ProcessLock(f"{path}.lock")
+        self._max_changes = max_changes
+        self._prune = prune
+        self._interval = interval
+        self._refresher = None
+
+    async def load(self) -> Optional[ReplayedSnapshot]:
+        """The method getting the catalogue for building the indexes.
+
+        The snapshot is written first when it is missing or outdated and
+        this worker is its writer.
+
+        Returns:
+            Optional[ReplayedSnapshot]: The snapshot with the changes since
+                replayed, None if there is no usable snapshot yet and the
+                ideas have to be read from the repository.
+        """
+        version = await self._changes.get_change_version()
+        replayed = await self._replay()
+        if replayed is not None and len(replayed.changed) < self._max_changes:
+            return replayed
+        if not self._lock.acquire():
+            return replayed
+
+        ideas = replayed
+        if ideas is None:
+            ideas = await self._repository.get_all_ideas()
+        if not await self._write(ideas, version):
+            return replayed
+
+        return await self._replay()
+
+    async def start(self) -> None:
+        """The method starting the periodic refresh of the snapshot."""
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh())
+
+    async def stop(self) -> None:
+        """The method stopping the periodic refresh and leaving the writes."""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+        self._lock.release()
+
+    async def _refresh(self) -> None:
+        """Write the snapshot again whenever enough ideas changed since."""
+        while True:
+            await asyncio.sleep(self._interval)
+            if not self._lock.acquire():
+                continue
+
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Refreshing the idea snapshot %s failed", self._path)
+
+    async def _replay(self) -> Optional[ReplayedSnapshot]:
+        """Open the snapshot and fetch the ideas changed since it was taken.
+
+        Returns:
+            Optional[ReplayedSnapshot]: The replayed snapshot, None if
+                there is no usable snapshot.
+        """
+        try:
+            snapshot = IdeaSnapshot(self._path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as error:
+            logger.warning("Ignoring the idea snapshot %s: %s", self._path, error)
+            return None
+
+        changed_ids = await self._changes.get_changed_ids(snapshot.version)
+        if changed_ids is None:
+            logger.info("Changes since the idea snapshot %s were pruned", self._path)
+            return None
+
+        changed: dict[int, Optional[Idea]] = dict.fromkeys(changed_ids)
+        for start in range(0, len(changed_ids), REPLAY_BATCH_SIZE):
+            batch = changed_ids[start:start + REPLAY_BATCH_SIZE]
+            for idea in await self._repository.get_by_ids(batch):
+                changed[idea.id] = idea
+
+        return ReplayedSnapshot(snapshot, changed)
+
+    async def _write(self, ideas: Iterable[Idea], version: int) -> bool:
+        """Write a new snapshot and prune the changes it covers.
+
+        Failures are logged.
+
+        Args:
+            ideas (Iterable[Idea]): All ideas in ascending order of ids.
+            version (int): The change version taken before reading them.
+
+        Returns:
+            bool: Whether the snapshot was written.
+        """
+        try:
+            count = write_snapshot(self._path, ideas, version)
+        except OSError:
+            logger.exception("Writing the idea snapshot %s failed", self._path)
+            return False
+
+        logger.info("Wrote %d ideas to the snapshot %s", count, self._path)
+        if self._prune:
+            await self._changes.prune_changes(version)
+        return True
+
+
+def _code(codes: dict[str, int], name: str) -> int:
+    """Get the code of a name, assigning the next one to a new name.
+
+    Args:
+        codes (dict[str, int]): The codes of the names seen so far.
+        name (str): The name.
+
+    Returns:
+        int: The code.
+    """
+    code = codes.get(name)
+    if code is None:
+        code = codes[name] = len(codes)
+
+    return code
+
+
+def _row_value(idea: Idea, field: str) -> Any:
+    """Get a field of an idea the way snapshot rows hold it.
+
+    Args:
+        idea (Idea): The idea.
+        field (str): The name of the field.
+
+    Returns:
+        Any: The value of the field, the tags as a tuple.
+    """
+    value = getattr(idea, field)
+    return tuple(value) if field == "tags" else value
+
+
+def _decode(text: memoryview) -> str:
+    """Decode a UTF-8 text read from the mapping.
+
+    Args:
+        text (memoryview): The encoded text.
+
+    Returns:
+        str: The text.
+    """
+    return str(text, "utf-8")
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the alignment of the sections.
+
+    Args:
+        offset (int): The offset.
+
+    Returns:
+        int: The aligned offset.
+    """
+    return -(-offset // ALIGNMENT) * ALIGNMENT
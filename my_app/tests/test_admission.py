@@ -0,0 +1,87 @@
+"""Tests of the admission control of requests."""
+
+import asyncio
+
+import pytest
+
+from manage_free_time.infrastructure.admission import (
+    ConcurrencyLimiter,
+    Overloaded,
+    RateLimitMiddleware,
+    limited,
+)
+from manage_free_time.infrastructure.config import config
+
+
+def test_rate_limit_ignores_the_user_in_the_query(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMITS", {"POST /idea/dodaj": (0.001, 2.0)})
+
+    async def app(scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def statuses() -> list[int]:
+        middleware = RateLimitMiddleware(app)
+        result = []
+        for user_id in range(1, 5):
+            messages = []
+
+            async def send(message) -> None:
+                messages.append(message)
+
+            await middleware(
+                {
+                    "type": "http",
+                    "method": "POST",
+                    "path": "/idea/dodaj",
+                    "query_string": f"uzytkownik_id={user_id}".encode(),
+                    "headers": [],
+                    "client": ("10.0.0.1", 40000 + user_id),
+                },
+                None,
+                send,
+            )
+            result.append(messages[0]["status"])
+        return result
+
+    assert asyncio.run(statuses()) == [201, 201, 429, 429]
+
+
+class _Repository:
+    async def get(self) -> int:
+        return 1
+
+    async def iterate(self):
+        for number in range(3):
+            yield number
+
+
+def test_stream_holds_its_slot_until_closed():
+    limiter = ConcurrencyLimiter(limit=1, max_wait=0.01)
+    repository = limited(_Repository, limiter)()
+
+    async def read_while_streaming() -> int:
+        stream = repository.iterate()
+        assert await anext(stream) == 0
+        with pytest.raises(Overloaded):
+            await repository.get()
+        await stream.aclose()
+        return await repository.get()
+
+    assert asyncio.run(read_while_streaming()) == 1
+
+
+def test_tasks_started_exempt_do_not_take_slots():
+    limiter = ConcurrencyLimiter(limit=1, max_wait=0.01)
+    repository = limited(_Repository, limiter)()
+
+    async def read_in_background() -> int:
+        stream = repository.iterate()
+        await anext(stream)
+        with limiter.exempt():
+            background = asyncio.create_task(repository.get())
+        result = await background
+        await stream.aclose()
+        return result
+
+    assert asyncio.run(read_in_background()) == 1
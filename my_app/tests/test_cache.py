@@ -0,0 +1,67 @@
+"""Tests of the in-process repository cache."""
+
+import asyncio
+
+from benchmarks.memory import MemoryIdeaRepository
+from manage_free_time.core.domain.idea import IdeaIn
+from manage_free_time.infrastructure.cache import (
+    MISSING,
+    CachingRepository,
+    LRUCache,
+)
+from manage_free_time.infrastructure.repositories.ideacached import \
+    CachedIdeaRepository
+
+
+class _Repository(CachingRepository):
+    namespace = "things"
+
+
+def test_load_overlapping_an_invalidation_is_not_cached():
+    async def read_during_write() -> object:
+        cache = LRUCache(max_entries=10)
+        repository = _Repository(cache, {}, default_ttl=60, negative_ttl=5)
+        loading = asyncio.Event()
+        written = asyncio.Event()
+
+        async def load_old_value() -> str:
+            loading.set()
+            await written.wait()
+            return "old"
+
+        read = asyncio.create_task(repository._read(
+            "get_by_id", (7,), load_old_value, lambda _: ["thing:7"]
+        ))
+        await loading.wait()
+        cache.invalidate("thing:7")
+        written.set()
+
+        assert await read == "old"
+        return cache.get(("things", "get_by_id", (7,)))
+
+    assert asyncio.run(read_during_write()) is MISSING
+
+
+def test_load_not_overlapping_an_invalidation_is_cached():
+    cache = LRUCache(max_entries=10)
+    since = cache.start_load()
+    cache.invalidate("thing:8")
+    cache.set("key", "value", 60, ["thing:7"], since)
+    cache.finish_load()
+
+    assert cache.get("key") == "value"
+
+
+def test_unlimited_idea_pages_are_not_cached():
+    async def read_pages() -> int:
+        cache = LRUCache(max_entries=10)
+        repository = CachedIdeaRepository(
+            MemoryIdeaRepository(), cache, {}, default_ttl=30, negative_ttl=5
+        )
+        await repository.add_idea(IdeaIn(title="idea", category="sport", tags=[]), 1)
+        await repository.get_ideas_json()
+        await repository.get_ideas_json("sport")
+        await repository.get_ideas_json(limit=10)
+        return len(cache)
+
+    assert asyncio.run(read_pages()) == 1
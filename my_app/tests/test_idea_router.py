@@ -0,0 +1,68 @@
+"""Tests of the idea routes served by several workers."""
+
+import asyncio
+from typing import Optional
+
+import httpx
+from dependency_injector import providers
+
+from benchmarks.memory import MemoryIdeaRepository
+from manage_free_time.core.domain.idea import IdeaIn
+from manage_free_time.infrastructure import main
+from manage_free_time.infrastructure.config import config
+from manage_free_time.infrastructure.container import Container
+from manage_free_time.infrastructure.repositories.iidea_versions import \
+    IIdeaVersionRepository
+
+
+class _SharedVersions(IIdeaVersionRepository):
+    """Versions bumped by every write to the shared store, like triggers."""
+
+    def __init__(self, store: MemoryIdeaRepository) -> None:
+        self._store = store
+
+    async def get_version(
+        self, category: Optional[str] = None, user_id: Optional[int] = None
+    ) -> str:
+        return str(await self._store.get_change_version())
+
+
+def _worker(container: Container, store, versions) -> Container:
+    container.idea_store.override(providers.Object(store))
+    container.idea_version_store.override(providers.Object(versions))
+    container.reset_singletons()
+    return container
+
+
+def test_conditional_get_after_a_write_through_another_worker(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMITS", {})
+    store = MemoryIdeaRepository()
+    versions = _SharedVersions(store)
+    reading = _worker(main.container, store, versions)
+    writing = _worker(Container(), store, versions)
+
+    async def read_write_read() -> tuple[int, list[str]]:
+        await writing.idea_service().add_idea(
+            IdeaIn(title="first", category="sport", tags=[]), 1
+        )
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://worker"
+        ) as client:
+            first = await client.get("/idea/kategoria/sport?limit=10")
+            await writing.idea_service().add_idea(
+                IdeaIn(title="second", category="sport", tags=[]), 1
+            )
+            second = await client.get(
+                "/idea/kategoria/sport?limit=10",
+                headers={"If-None-Match": first.headers["ETag"]},
+            )
+
+        assert second.headers["ETag"] != first.headers["ETag"]
+        return second.status_code, [idea["title"] for idea in second.json()]
+
+    try:
+        assert asyncio.run(read_write_read()) == (200, ["first", "second"])
+    finally:
+        main.container.reset_override()
+        main.container.reset_singletons()
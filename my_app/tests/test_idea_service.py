@@ -0,0 +1,48 @@
+"""Tests of the idea service."""
+
+import asyncio
+
+from dependency_injector import providers
+
+from benchmarks.memory import MemoryIdeaRepository
+from manage_free_time.core.domain.idea import IdeaIn
+from manage_free_time.infrastructure.container import Container
+
+
+class _CountingRepository(MemoryIdeaRepository):
+    reads = 0
+
+    async def get_by_id(self, idea_id: int):
+        self.reads += 1
+        return await super().get_by_id(idea_id)
+
+
+def test_update_versions_the_old_category_without_reading_the_idea():
+    repository = _CountingRepository()
+    container = Container()
+    container.idea_repository.override(providers.Object(repository))
+    container.idea_version_store.override(providers.Object(None))
+
+    async def move() -> tuple[str, str, str, str]:
+        idea = await repository.add_idea(
+            IdeaIn(title="idea", category="sport", tags=[]), user_id=1
+        )
+        service = container.idea_service()
+        await service.load_indexes()
+        before = (
+            await service.get_version(category="sport"),
+            await service.get_version(category="music"),
+        )
+        await service.update_idea(
+            idea.id, IdeaIn(title="idea", category="music", tags=[])
+        )
+        return (
+            *before,
+            await service.get_version(category="sport"),
+            await service.get_version(category="music"),
+        )
+
+    sport, music, sport_after, music_after = asyncio.run(move())
+
+    assert sport_after != sport and music_after != music
+    assert repository.reads == 0
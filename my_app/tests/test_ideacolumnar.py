@@ -0,0 +1,48 @@
+"""Tests of the columnar idea repository."""
+
+import asyncio
+
+from manage_free_time.core.domain.idea import IdeaIn
+from manage_free_time.infrastructure.repositories import ideacolumnar
+from manage_free_time.infrastructure.repositories.ideacolumnar import \
+    ColumnarIdeaRepository
+
+
+def test_stream_survives_compaction_by_deletes(monkeypatch):
+    monkeypatch.setattr(ideacolumnar, "STREAM_PAGE_SIZE", 2)
+
+    async def stream_while_deleting() -> list[int]:
+        repository = ColumnarIdeaRepository()
+        for number in range(10):
+            await repository.add_idea(
+                IdeaIn(title=f"idea {number}", category="sport", tags=["a"]),
+                user_id=1,
+            )
+
+        stream = repository.iter_ideas()
+        streamed = [(await anext(stream)).id]
+        for idea_id in range(2, 8):
+            assert await repository.delete_idea(idea_id)
+
+        return streamed + [idea.id async for idea in stream]
+
+    assert asyncio.run(stream_while_deleting()) == [1, 2, 8, 9, 10]
+
+
+def test_stream_pages_respect_limit(monkeypatch):
+    monkeypatch.setattr(ideacolumnar, "STREAM_PAGE_SIZE", 3)
+
+    async def stream() -> list[int]:
+        repository = ColumnarIdeaRepository()
+        for number in range(10):
+            await repository.add_idea(
+                IdeaIn(title=f"idea {number}", category="sport", tags=[]),
+                user_id=1,
+            )
+
+        return [
+            idea.id
+            async for idea in repository.iter_ideas("sport", after=2, limit=5)
+        ]
+
+    assert asyncio.run(stream()) == [3, 4, 5, 6, 7]
@@ -0,0 +1,87 @@
+"""Tests of the idea repository against a Postgres database.
+
+They run when `DB_HOST`, `DB_NAME`, `DB_USER` and `DB_PASSWORD` point to
+a database the tests may empty, and are skipped otherwise.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+import pytest
+
+from manage_free_time.core.domain.idea import IdeaIn
+from manage_free_time.infrastructure.config import config
+from manage_free_time.infrastructure.db import database, engine, init_db
+from manage_free_time.infrastructure.idea_writer import IdeaWriteQueue
+from manage_free_time.infrastructure.repositories.ideadb import IdeaRepository
+
+pytestmark = pytest.mark.skipif(
+    not config.DB_HOST, reason="needs a Postgres database in DB_HOST"
+)
+
+T = TypeVar("T")
+
+
+def _run(test: Callable[[IdeaRepository], Awaitable[T]]) -> T:
+    async def with_database() -> T:
+        await init_db(retries=1, delay=0)
+        # The pool of the engine is bound to the loop of the previous test.
+        await engine.dispose()
+        await database.connect()
+        try:
+            await database.execute("TRUNCATE ideas RESTART IDENTITY")
+            return await test(IdeaRepository())
+        finally:
+            await database.disconnect()
+
+    return asyncio.run(with_database())
+
+
+def _idea(title: str, category: str = "sport") -> IdeaIn:
+    return IdeaIn(title=title, category=category, tags=[title, "x"])
+
+
+def test_write_queue_flushes_concurrent_adds_and_updates():
+    async def write(repository: IdeaRepository) -> tuple[list, list]:
+        existing = await repository.add_idea(_idea("old"), 1)
+        writer = IdeaWriteQueue(repository, batch_size=50, batch_wait=0.01)
+        await writer.start()
+        try:
+            written = await asyncio.gather(
+                *(writer.add_idea(_idea(f"new {user}"), user) for user in range(5)),
+                writer.update_idea(existing.id, _idea("updated", "music")),
+            )
+        finally:
+            await writer.stop()
+        stored = await repository.get_by_ids([idea.id for idea in written])
+        return written, list(stored)
+
+    written, stored = _run(write)
+
+    assert [idea.title for idea in written] == [
+        "new 0", "new 1", "new 2", "new 3", "new 4", "updated"
+    ]
+    assert [idea.user_id for idea in written[:5]] == [0, 1, 2, 3, 4]
+    assert written[5].category == "music" and written[5].tags == ["updated", "x"]
+    assert sorted(stored, key=lambda idea: idea.id) == sorted(
+        written, key=lambda idea: idea.id
+    )
+
+
+def test_failing_rows_of_a_batch_are_stored_one_by_one():
+    async def write(repository: IdeaRepository) -> tuple[list, list, list]:
+        added = await repository.add_ideas_by_users([
+            (_idea("first"), 1), (_idea("nul \x00"), 2), (_idea("third"), 3)
+        ])
+        updated = await repository.update_ideas([
+            (added[0].id, _idea("changed")),
+            (added[2].id, _idea("nul \x00")),
+            (added[2].id + 100, _idea("missing")),
+        ])
+        return added, updated, list(await repository.get_all_ideas())
+
+    added, updated, stored = _run(write)
+
+    assert [idea and idea.title for idea in added] == ["first", None, "third"]
+    assert [idea and idea.title for idea in updated] == ["changed", None, None]
+    assert [idea.title for idea in stored] == ["changed", "third"]
@@ -0,0 +1,15 @@
+"""Tests of the locks shared by the worker processes of a host."""
+
+from manage_free_time.infrastructure.locks import ProcessLock
+
+
+def test_lock_is_held_by_one_holder_at_a_time(tmp_path):
+    path = str(tmp_path / "locks" / "store.lock")
+    first, second = ProcessLock(path), ProcessLock(path)
+
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    assert second.held and not first.held
+    second.release()
@@ -0,0 +1,42 @@
+"""Tests of the personalized picking of random ideas."""
+
+import random
+from collections import Counter
+
+from manage_free_time.core.domain.idea import Idea
+from manage_free_time.infrastructure.indexes.category import CategoryIndex
+from manage_free_time.infrastructure.indexes.picker import PersonalizedPicker
+from manage_free_time.infrastructure.indexes.tags import TagIndex
+
+
+def _idea(idea_id: int, tags: list[str]) -> Idea:
+    return Idea(id=idea_id, user_id=1, title="idea", category="sport", tags=tags)
+
+
+def test_picks_follow_the_weights_of_liked_tags():
+    ideas = [
+        _idea(1, ["las"]),
+        _idea(2, ["las"]),
+        _idea(3, ["las", "rower"]),
+        _idea(4, ["rower"]),
+        _idea(5, ["muzyka"]),
+        *(_idea(idea_id, []) for idea_id in range(6, 11)),
+    ]
+    category_index, tag_index = CategoryIndex(), TagIndex()
+    category_index.load(ideas)
+    tag_index.load(ideas)
+    picker = PersonalizedPicker(category_index, tag_index, boost=4.0)
+    picker.learn(7, "1", [_idea(11, ["las"]), _idea(12, ["las", "rower"])])
+
+    random.seed(21)
+    draws = 200_000
+    counts = Counter(picker.pick(7, None, "1") for _ in range(draws))
+
+    affinity = {"las": 1.0, "rower": 0.5}
+    weights = {
+        idea.id: 1 + 4.0 * sum(affinity.get(tag, 0.0) for tag in idea.tags)
+        for idea in ideas
+    }
+    total = sum(weights.values())
+    for idea_id, weight in weights.items():
+        assert abs(counts[idea_id] / draws - weight / total) < 0.003
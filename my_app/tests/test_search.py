@@ -0,0 +1,40 @@
+"""Tests of the in-process full-text index of idea titles."""
+
+from manage_free_time.core.domain.idea import Idea
+from manage_free_time.infrastructure.indexes.search import SearchIndex
+
+
+def _index(*ideas: tuple[int, str, str, list[str]]) -> SearchIndex:
+    index = SearchIndex()
+    index.load(
+        Idea(id=idea_id, user_id=1, title=title, category=category, tags=tags)
+        for idea_id, title, category, tags in ideas
+    )
+    return index
+
+
+def test_exact_matches_rank_above_prefix_matches():
+    index = _index(
+        (1, "Wycieczka rowerowa w góry", "sport", ["las"]),
+        (2, "Rower", "sport", []),
+        (3, "Rowerek dla dziecka", "rodzina", ["las"]),
+        (4, "Koncert w parku", "muzyka", []),
+    )
+
+    assert index.search("rower") == [2, 3, 1]
+    assert index.search("rower", category="sport") == [2, 1]
+    assert index.search("rower", tags=["las"]) == [3, 1]
+    assert index.search("gory") == [1]
+    assert index.search("r") == []
+
+
+def test_misspelled_tokens_find_ideas():
+    index = _index(
+        (1, "Wycieczka rowerowa w góry", "sport", []),
+        (2, "Koncert w parku", "muzyka", []),
+        (3, "Wycieczka do muzeum", "kultura", []),
+    )
+
+    assert index.search("wycieczak", prefix=False) == [3, 1]
+    assert index.search("koncret parku", prefix=False) == [2]
+    assert index.search("wycieczka muzuem", prefix=False) == [3, 1]
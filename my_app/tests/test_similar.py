@@ -0,0 +1,47 @@
+"""Tests of the in-process index of ideas with similar tags."""
+
+import random
+
+from manage_free_time.core.domain.idea import Idea
+from manage_free_time.infrastructure.indexes.similar import (
+    SimilarityIndex,
+    jaccard,
+)
+
+
+def test_similar_ideas_match_brute_force_scores():
+    rng = random.Random(7)
+    tags = [f"tag{number}" for number in range(40)]
+    ideas = [
+        Idea(
+            id=idea_id,
+            user_id=1,
+            title="idea",
+            category=rng.choice(["sport", "muzyka"]),
+            tags=rng.sample(tags, rng.randint(1, 5)),
+        )
+        for idea_id in range(1, 5001)
+    ]
+    index = SimilarityIndex()
+    index.load(ideas)
+    tag_sets = {idea.id: frozenset(idea.tags) for idea in ideas}
+
+    matched = slots = 0
+    for idea in rng.sample(ideas, 200):
+        own = tag_sets[idea.id]
+        found = [jaccard(own, tag_sets[other]) for other in index.similar(idea.id)]
+        best = sorted(
+            (
+                jaccard(own, other_tags)
+                for other, other_tags in tag_sets.items()
+                if other != idea.id
+            ),
+            reverse=True,
+        )[:10]
+        found += [0.0] * (len(best) - len(found))
+        matched += sum(
+            score == expected for score, expected in zip(found, best)
+        )
+        slots += len(best)
+
+    assert matched / slots >= 0.99
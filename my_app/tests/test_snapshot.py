@@ -0,0 +1,78 @@
+"""Tests of the memory-mapped snapshots of the idea catalogue."""
+
+import asyncio
+
+from benchmarks.memory import MemoryIdeaRepository
+from manage_free_time.core.domain.idea import IdeaIn
+from manage_free_time.infrastructure.snapshot import IdeaSnapshot, IdeaSnapshots
+
+
+def test_refresh_rewrites_the_snapshot_and_prunes_changes(tmp_path):
+    path = tmp_path / "ideas.snapshot"
+
+    async def refresh() -> tuple[list, list]:
+        repository = MemoryIdeaRepository()
+        for number in range(10):
+            await repository.add_idea(
+                IdeaIn(title=f"idea {number}", category="sport", tags=[]),
+                user_id=1,
+            )
+        snapshots = IdeaSnapshots(
+            repository, repository, str(path), max_changes=3, interval=0.01
+        )
+        await snapshots.load()
+
+        await snapshots.start()
+        for idea_id in range(1, 6):
+            await repository.update_idea(
+                idea_id, IdeaIn(title="changed", category="sport", tags=[])
+            )
+        await asyncio.sleep(0.1)
+        await snapshots.stop()
+
+        changed = await repository.get_changed_ids(IdeaSnapshot(path).version)
+        return changed, list(await snapshots.load())
+
+    changed, ideas = asyncio.run(refresh())
+
+    assert changed == []
+    assert [idea.title for idea in ideas[:6]] == ["changed"] * 5 + ["idea 5"]
+    assert list(IdeaSnapshot(path)) == ideas
+
+
+def test_only_the_lock_holder_writes_and_rows_replay_changes(tmp_path):
+    path = tmp_path / "ideas.snapshot"
+
+    async def load() -> tuple[int, int, list, int]:
+        repository = MemoryIdeaRepository()
+        for number in range(3):
+            await repository.add_idea(
+                IdeaIn(title=f"idea {number}", category="sport", tags=["a"]),
+                user_id=1,
+            )
+        writer = IdeaSnapshots(repository, repository, str(path), max_changes=1)
+        reader = IdeaSnapshots(repository, repository, str(path), max_changes=1)
+        await writer.load()
+        written = IdeaSnapshot(path).version
+
+        await repository.update_idea(
+            2, IdeaIn(title="changed", category="music", tags=["b", "c"])
+        )
+        await repository.delete_idea(3)
+        replayed = await reader.load()
+        unchanged = IdeaSnapshot(path).version
+        rows = list(replayed.rows("title", "category", "tags"))
+
+        await writer.stop()
+        await reader.load()
+        await reader.stop()
+        return written, unchanged, rows, IdeaSnapshot(path).version
+
+    written, unchanged, rows, rewritten = asyncio.run(load())
+
+    assert unchanged == written
+    assert rows == [
+        (1, "idea 0", "sport", ("a",)),
+        (2, "changed", "music", ("b", "c")),
+    ]
+    assert rewritten > written